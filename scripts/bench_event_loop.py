@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+bench_event_loop.py - Compare event loops on the tool request path.
+
+Starts the fake ATTOM gateway (scripts/fake_attom.py) and, for each event
+loop (asyncio, and uvloop when installed) and concurrency level, issues
+property_detail calls through the server's shared request path with the
+response cache disabled. Reports throughput and latency percentiles.
+
+Usage:
+    python scripts/bench_event_loop.py [--concurrency 1,8,32,128] [--requests N]
+                                       [--latency-ms MS] [--records N] [--port PORT]
+
+Options:
+    --concurrency LIST  Comma-separated in-flight request counts (default: 1,8,32,128)
+    --requests N        Calls per measurement (default: 500)
+    --latency-ms MS     Fake gateway latency (default: 20)
+    --records N         Property records per fake response (default: 1)
+    --port PORT         Fake gateway port (default: 8765)
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def start_gateway(port: int, latency_ms: float, records: int = 1, **options: float) -> subprocess.Popen:
+    """Start the fake gateway and wait until it answers.
+
+    Extra keyword options are passed as fake_attom.py flags, e.g. ``error_rate=0.01``.
+    """
+    flags = [f"--{name.replace('_', '-')}={value}" for name, value in options.items()]
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            str(REPO_ROOT / "scripts" / "fake_attom.py"),
+            "--port",
+            str(port),
+            "--latency-ms",
+            str(latency_ms),
+            "--records",
+            str(records),
+            *flags,
+        ],
+        cwd=REPO_ROOT,
+    )
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1).read()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Fake ATTOM gateway did not start")
+
+
+async def measure(concurrency: int, requests: int, offset: int) -> tuple:
+    """Issue ``requests`` calls with at most ``concurrency`` in flight."""
+    from src.models import PropertyIdentifier
+    from src.tools.utils import call_endpoint
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(index: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            response = await call_endpoint("property_detail", PropertyIdentifier(attom_id=str(offset + index)))
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                raise RuntimeError(response.status_message)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return requests / elapsed, statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare event loops on the tool request path")
+    parser.add_argument("--concurrency", default="1,8,32,128", help="Comma-separated in-flight request counts")
+    parser.add_argument("--requests", type=int, default=500, help="Calls per measurement")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Fake gateway latency")
+    parser.add_argument("--records", type=int, default=1, help="Property records per fake response")
+    parser.add_argument("--port", type=int, default=8765, help="Fake gateway port")
+    args = parser.parse_args()
+
+    os.environ.update(
+        {
+            "ATTOM_API_KEY": "bench",
+            "ATTOM_HOST_URL": f"http://127.0.0.1:{args.port}",
+            "ATTOM_RESPONSE_CACHE_SIZE": "0",
+            "LOG_LEVEL": "WARNING",
+        }
+    )
+    sys.path.insert(0, str(REPO_ROOT))
+    import structlog
+
+    from src import runtime
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(30))
+    loops = ["asyncio"] + (["uvloop"] if runtime.uvloop_available() else [])
+    if len(loops) == 1:
+        print("uvloop is not installed; measuring the asyncio loop only")
+
+    gateway = start_gateway(args.port, args.latency_ms, args.records)
+    try:
+        levels = [int(value) for value in args.concurrency.split(",")]
+        offset = 0
+        # Warm up connections and threads so the first measurement is not penalized
+        for loop in loops:
+            runtime.run(lambda: measure(max(levels), max(levels) * 2, offset), loop)
+            offset += max(levels) * 2
+
+        print(f"{'loop':>8} {'concurrency':>11} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+        for concurrency in levels:
+            for loop in loops:
+                rate, p50, p99 = runtime.run(lambda: measure(concurrency, args.requests, offset), loop)
+                offset += args.requests
+                print(f"{loop:>8} {concurrency:>11} {rate:>9.1f} {p50 * 1000:>8.1f} {p99 * 1000:>8.1f}")
+    finally:
+        gateway.terminate()
+        gateway.wait(timeout=10)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+bench_memory.py - Peak memory allocated per tool call on large payloads.
+
+Starts the fake ATTOM gateway (scripts/fake_attom.py) serving large
+responses and calls tools through the server with tracemalloc running.
+Each call also serializes its result into a JSON-RPC message, as the stdio
+transport does. For every tool it reports the upstream body size, the peak
+memory allocated during the call and serialization, that peak as a multiple
+of the body size, and whether the body was truncated at
+ATTOM_MAX_RESPONSE_BYTES.
+
+Usage:
+    python scripts/bench_memory.py [--records N] [--tools LIST] [--max-response-mb MB] [--port PORT]
+
+Options:
+    --records N          Records per fake response (default: 5000, about 9 MB)
+    --tools LIST         Comma-separated tools (default: property_detail,sales_comparables_analysis,
+                         school_search,boundary_detail)
+    --max-response-mb MB Sets ATTOM_MAX_RESPONSE_BYTES (default: the server default)
+    --port PORT          Fake gateway port (default: 8765)
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tracemalloc
+from typing import Any, Dict
+
+from bench_event_loop import REPO_ROOT, start_gateway
+
+DEFAULT_TOOLS = "property_detail,sales_comparables_analysis,school_search,boundary_detail"
+
+# Arguments of each tool; page sizes and ids are filled in per call
+TOOL_PARAMS: Dict[str, Dict[str, Any]] = {
+    "property_detail": {"attom_id": "{id}"},
+    "sales_comparables_analysis": {"attom_id": "{id}"},
+    "school_search": {"geoid_v4": "ZI{id}", "page": 1, "page_size": "{records}"},
+    "boundary_detail": {"geoid_v4": "CO{id}"},
+}
+
+
+async def measure(tools: list, records: int) -> None:
+    from mcp.types import CallToolResult, JSONRPCResponse
+
+    import src.server  # noqa: F401 - registers the tools
+    from src import metrics
+    from src.mcp_server import mcp
+
+    print(f"{'tool':>28} {'body MB':>8} {'peak MB':>8} {'x body':>7}  truncated")
+    for index, tool in enumerate(tools):
+        params = {
+            key: value.format(id=1000 + index, records=records) if isinstance(value, str) else value
+            for key, value in TOOL_PARAMS.get(tool, {"attom_id": "{id}"}).items()
+        }
+        if params.get("page_size"):
+            params["page_size"] = int(params["page_size"])
+        body_bytes = sum(state[1] for state in metrics.upstream_response_bytes._values.values())
+
+        tracemalloc.start()
+        result = await mcp.call_tool(tool, {"params": params})
+        content, structured = result.content, result.structured_content
+        # As the MCP SDK answers a request and the stdio transport writes it
+        dumped = CallToolResult(content=content, structuredContent=structured).model_dump(
+            by_alias=True, mode="json", exclude_none=True
+        )
+        message = JSONRPCResponse(jsonrpc="2.0", id=index, result=dumped)
+        line = message.model_dump_json(by_alias=True, exclude_unset=True)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del result, content, dumped, message, line
+
+        body = sum(state[1] for state in metrics.upstream_response_bytes._values.values()) - body_bytes
+        data = (structured or {}).get("data") or {}
+        truncated = "-"
+        if isinstance(data, dict) and isinstance(data.get("truncated"), dict):
+            truncated = f"at {data['truncated']['cut_at']}"
+        if (structured or {}).get("status_code") != 200:
+            truncated = f"status {(structured or {}).get('status_code')}: {(structured or {}).get('status_message')}"
+        ratio = f"{peak / body:>7.1f}" if body else f"{'-':>7}"
+        print(f"{tool:>28} {body / 1e6:>8.1f} {peak / 1e6:>8.1f} {ratio}  {truncated}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Peak memory allocated per tool call on large payloads")
+    parser.add_argument("--records", type=int, default=5000, help="Records per fake response")
+    parser.add_argument("--tools", default=DEFAULT_TOOLS, help="Comma-separated tools")
+    parser.add_argument("--max-response-mb", type=float, help="Sets ATTOM_MAX_RESPONSE_BYTES")
+    parser.add_argument("--port", type=int, default=8765, help="Fake gateway port")
+    args = parser.parse_args()
+
+    os.environ.update(
+        {
+            "ATTOM_API_KEY": "bench",
+            "ATTOM_HOST_URL": f"http://127.0.0.1:{args.port}",
+            "ATTOM_RESPONSE_CACHE_SIZE": "0",
+            "LOG_LEVEL": "ERROR",
+        }
+    )
+    if args.max_response_mb is not None:
+        os.environ["ATTOM_MAX_RESPONSE_BYTES"] = str(int(args.max_response_mb * 1024 * 1024))
+    sys.path.insert(0, str(REPO_ROOT))
+
+    gateway = start_gateway(args.port, 1.0, args.records, comps=args.records, total=args.records)
+    try:
+        asyncio.run(measure([tool for tool in args.tools.split(",") if tool], args.records))
+    finally:
+        gateway.terminate()
+        gateway.wait(timeout=10)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
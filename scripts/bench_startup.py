@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+bench_startup.py - Measure MCP server cold-start time.
+
+Starts fresh interpreters that import the server module (lazy and eager tool
+registration), and optionally complete an MCP initialize + tools/list
+handshake over stdio, reporting min/median/max wall time per mode.
+
+Usage:
+    python scripts/bench_startup.py [--runs N] [--handshake] [--max-ms MS]
+
+Options:
+    --runs N      Runs per mode (default: 10)
+    --handshake   Time a full stdio initialize + tools/list exchange
+    --max-ms MS   Exit non-zero if the lazy median exceeds MS milliseconds
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+HANDSHAKE = "\n".join(
+    json.dumps(message)
+    for message in (
+        {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "initialize",
+            "params": {
+                "protocolVersion": "2025-03-26",
+                "capabilities": {},
+                "clientInfo": {"name": "bench", "version": "1.0"},
+            },
+        },
+        {"jsonrpc": "2.0", "method": "notifications/initialized"},
+        {"jsonrpc": "2.0", "id": 2, "method": "tools/list", "params": {}},
+    )
+) + "\n"
+
+
+def run_once(lazy: bool, handshake: bool) -> float:
+    """Time one cold start in seconds."""
+    env = {
+        **os.environ,
+        "ATTOM_API_KEY": os.environ.get("ATTOM_API_KEY", "bench"),
+        "ATTOM_LAZY_TOOLS": "true" if lazy else "false",
+        "LOG_LEVEL": "WARNING",
+    }
+    start = time.perf_counter()
+    if handshake:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "src.server"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            env=env,
+            cwd=REPO_ROOT,
+        )
+        process.stdin.write(HANDSHAKE)
+        process.stdin.flush()
+        for line in process.stdout:
+            if '"id":2' in line.replace(" ", ""):
+                break
+        elapsed = time.perf_counter() - start
+        process.stdin.close()
+        process.wait(timeout=10)
+        return elapsed
+    subprocess.run([sys.executable, "-c", "import src.server"], env=env, cwd=REPO_ROOT, check=True)
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure MCP server cold-start time")
+    parser.add_argument("--runs", type=int, default=10, help="Runs per mode")
+    parser.add_argument("--handshake", action="store_true", help="Time a stdio initialize + tools/list exchange")
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail if the lazy median exceeds this")
+    args = parser.parse_args()
+
+    medians = {}
+    for mode, lazy in (("lazy", True), ("eager", False)):
+        times = [run_once(lazy, args.handshake) * 1000 for _ in range(args.runs)]
+        medians[mode] = statistics.median(times)
+        print(f"{mode:>5}: min {min(times):7.1f} ms  median {medians[mode]:7.1f} ms  max {max(times):7.1f} ms")
+    print(f"saved: {medians['eager'] - medians['lazy']:.1f} ms per cold start")
+
+    if args.max_ms is not None and medians["lazy"] > args.max_ms:
+        print(f"Lazy start-up median {medians['lazy']:.1f} ms exceeds {args.max_ms:.1f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+bench_tools.py - Throughput, latency, CPU and memory of tool families.
+
+Starts the fake ATTOM gateway (scripts/fake_attom.py) and runs each
+scenario in a fresh interpreter, calling tools through an in-memory MCP
+client so that validation, middleware and result serialization are
+measured along with the request path:
+
+    single      property_detail for one property per operation
+    batch       sales_comparables_analysis over --comps comparable sales
+    pagination  school_search walked page by page through --total schools
+    dossier     six property tools called concurrently for one property
+
+Every operation uses a property or area not seen before, so calls miss the
+response cache. Reports tool calls per second, operation latency
+percentiles, process CPU time per tool call (server and in-memory client
+together) and peak RSS. Results can be saved as a baseline and later runs
+compared against it.
+
+Usage:
+    python scripts/bench_tools.py [--scenarios LIST] [--operations N] [--concurrency N]
+                                  [--latency-ms MS] [--jitter-ms MS] [--comps N] [--total N]
+                                  [--page-size N] [--error-rate P] [--throttle-rate P]
+                                  [--port PORT] [--save PATH] [--compare PATH] [--tolerance PCT]
+
+Options:
+    --scenarios LIST    Comma-separated scenarios (default: single,batch,pagination,dossier)
+    --operations N      Operations per scenario (default: 200)
+    --concurrency N     Operations in flight (default: 8)
+    --latency-ms MS     Fake gateway latency (default: 20)
+    --jitter-ms MS      Fake gateway extra random latency (default: 10)
+    --comps N           Comparable sales per batch operation (default: 200)
+    --total N           Schools walked per pagination operation (default: 500)
+    --page-size N       Page size of the pagination scenario (default: 50)
+    --error-rate P      Share of upstream requests failing with 500 (default: 0)
+    --throttle-rate P   Share of upstream requests throttled with 429 (default: 0)
+    --port PORT         Fake gateway port (default: 8765)
+    --save PATH         Write the results to PATH as a baseline
+    --compare PATH      Compare with a saved baseline; exit 1 on regressions
+    --tolerance PCT     Allowed regression before failing a comparison (default: 15)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+from bench_event_loop import REPO_ROOT, start_gateway
+
+SCENARIOS = ("single", "batch", "pagination", "dossier")
+
+# Tools called together by a dossier operation
+DOSSIER_TOOLS = (
+    "property_detail",
+    "sales_history_detail",
+    "avm_detail",
+    "assessment_detail",
+    "all_events_snapshot",
+    "property_building_permits",
+)
+
+# First property id used by the scenarios, far from the fake gateway's comparable ids
+FIRST_ID = 1_000_000
+
+# Compared metrics: (key, label, True when higher is better)
+COMPARED = (
+    ("calls_per_s", "calls/s", True),
+    ("p95_ms", "p95 ms", False),
+    ("cpu_ms_per_call", "CPU ms/call", False),
+    ("peak_rss_mb", "RSS MB", False),
+)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted ``values``."""
+    return values[max(0, min(len(values) - 1, int(round(fraction * len(values))) - 1))]
+
+
+async def _call(client: Any, tool: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    result = await client.call_tool(tool, {"params": params}, raise_on_error=False)
+    return result.structured_content or {}
+
+
+async def single(client: Any, index: int, args: argparse.Namespace) -> List[int]:
+    response = await _call(client, "property_detail", {"attom_id": str(FIRST_ID + index)})
+    return [response.get("status_code", 0)]
+
+
+async def batch(client: Any, index: int, args: argparse.Namespace) -> List[int]:
+    response = await _call(client, "sales_comparables_analysis", {"attom_id": str(FIRST_ID + index)})
+    return [response.get("status_code", 0)]
+
+
+async def pagination(client: Any, index: int, args: argparse.Namespace) -> List[int]:
+    statuses = []
+    page = 1
+    while True:
+        params = {"geoid_v4": f"ZI{FIRST_ID + index}", "page": page, "page_size": args.page_size}
+        response = await _call(client, "school_search", params)
+        statuses.append(response.get("status_code", 0))
+        schools = (response.get("data") or {}).get("school") or []
+        if statuses[-1] != 200 or len(schools) < args.page_size:
+            return statuses
+        page += 1
+
+
+async def dossier(client: Any, index: int, args: argparse.Namespace) -> List[int]:
+    params = {"attom_id": str(FIRST_ID + index)}
+    responses = await asyncio.gather(*(_call(client, tool, params) for tool in DOSSIER_TOOLS))
+    return [response.get("status_code", 0) for response in responses]
+
+
+async def measure(name: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Run one scenario in this process and collect its measurements."""
+    from fastmcp import Client
+
+    import src.server  # noqa: F401 - registers the tools
+    from src.mcp_server import mcp
+
+    operation = globals()[name]
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: List[float] = []
+    statuses: List[int] = []
+
+    async with Client(mcp) as client:
+
+        async def one(index: int, record: bool) -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                codes = await operation(client, index, args)
+                if record:
+                    latencies.append(time.perf_counter() - start)
+                    statuses.extend(codes)
+
+        # Warm up imports, connections and threads on operations that are not reported
+        warmup = max(args.concurrency, 4)
+        await asyncio.gather(*(one(args.operations + i, False) for i in range(warmup)))
+
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        cpu = usage.ru_utime + usage.ru_stime
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i, True) for i in range(args.operations)))
+        elapsed = time.perf_counter() - start
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        cpu = usage.ru_utime + usage.ru_stime - cpu
+
+    latencies.sort()
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak_rss = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return {
+        "operations": args.operations,
+        "calls": len(statuses),
+        "errors": sum(1 for status in statuses if status != 200),
+        "calls_per_s": round(len(statuses) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "cpu_ms_per_call": round(cpu * 1000 / max(len(statuses), 1), 3),
+        "peak_rss_mb": round(peak_rss, 1),
+    }
+
+
+def run_scenario(name: str, argv: List[str], port: int) -> Dict[str, Any]:
+    """Run a scenario in a fresh interpreter, so caches and peak RSS start clean."""
+    env = dict(
+        os.environ,
+        ATTOM_API_KEY="bench",
+        ATTOM_HOST_URL=f"http://127.0.0.1:{port}",
+        # Injected upstream failures would otherwise log an error each
+        LOG_LEVEL="CRITICAL",
+    )
+    completed = subprocess.run(
+        [sys.executable, __file__, *argv, "--run-scenario", name],
+        cwd=REPO_ROOT,
+        env=env,
+        stdout=subprocess.PIPE,
+        check=True,
+        text=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Print the change from a baseline; returns the regressions beyond ``tolerance`` percent."""
+    regressions = []
+    print(f"\n{'scenario':>10} {'metric':>12} {'baseline':>10} {'now':>10} {'change':>8}")
+    for name, result in results.items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        for key, label, higher_is_better in COMPARED:
+            old, new = before.get(key), result.get(key)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            worse = -change if higher_is_better else change
+            flag = " !" if worse > tolerance else ""
+            print(f"{name:>10} {label:>12} {old:>10} {new:>10} {change:>+7.1f}%{flag}")
+            if flag:
+                regressions.append(f"{name} {label} {change:+.1f}%")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark tool families against the fake ATTOM gateway")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated scenarios")
+    parser.add_argument("--operations", type=int, default=200, help="Operations per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Operations in flight")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Fake gateway latency")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="Fake gateway extra random latency")
+    parser.add_argument("--comps", type=int, default=200, help="Comparable sales per batch operation")
+    parser.add_argument("--total", type=int, default=500, help="Schools walked per pagination operation")
+    parser.add_argument("--page-size", type=int, default=50, help="Page size of the pagination scenario")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of upstream requests failing")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of upstream requests throttled")
+    parser.add_argument("--port", type=int, default=8765, help="Fake gateway port")
+    parser.add_argument("--save", help="Write the results to this baseline file")
+    parser.add_argument("--compare", help="Compare with this baseline file")
+    parser.add_argument("--tolerance", type=float, default=15.0, help="Allowed regression in percent")
+    parser.add_argument("--run-scenario", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_scenario:
+        sys.path.insert(0, str(REPO_ROOT))
+        print(json.dumps(asyncio.run(measure(args.run_scenario, args))))
+        return 0
+
+    names = [name for name in args.scenarios.split(",") if name]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    argv = [
+        f"--operations={args.operations}",
+        f"--concurrency={args.concurrency}",
+        f"--page-size={args.page_size}",
+    ]
+    ignored = ("scenarios", "save", "compare", "tolerance", "run_scenario")
+    settings = {key: value for key, value in vars(args).items() if key not in ignored}
+
+    results: Dict[str, Dict[str, Any]] = {}
+    gateway = start_gateway(
+        args.port,
+        args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        comps=args.comps,
+        total=args.total,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+    )
+    try:
+        print(
+            f"{'scenario':>10} {'calls':>6} {'errors':>6} {'calls/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'p99 ms':>8} {'CPU ms/call':>11} {'RSS MB':>7}"
+        )
+        for name in names:
+            result = results[name] = run_scenario(name, argv, args.port)
+            print(
+                f"{name:>10} {result['calls']:>6} {result['errors']:>6} {result['calls_per_s']:>8.1f} "
+                f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} "
+                f"{result['cpu_ms_per_call']:>11.2f} {result['peak_rss_mb']:>7.1f}"
+            )
+    finally:
+        gateway.terminate()
+        gateway.wait(timeout=10)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"settings": settings, "results": results}, f, indent=2)
+            f.write("\n")
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        changed = sorted(
+            key for key, value in baseline.get("settings", {}).items() if settings.get(key) != value
+        )
+        if changed:
+            print(f"\nWarning: settings differ from the baseline: {', '.join(changed)}")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nRegressions beyond {args.tolerance:g}%: {'; '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
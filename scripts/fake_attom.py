@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+fake_attom.py - Local stand-in for the ATTOM API gateway.
+
+Answers GET requests with property payloads of realistic size after a
+configurable latency, so benchmarks can drive the server without network
+access or an API key. Point the server at it with
+ATTOM_HOST_URL=http://127.0.0.1:PORT.
+
+School requests get a ``school`` list and every other request a
+``property`` list. Paginated requests (``page`` and ``pageSize`` or
+``pagesize``) get one page of a ``--total``-record result set. A share of
+requests can fail with 500 or be throttled with 429.
+
+Usage:
+    python scripts/fake_attom.py [--port PORT] [--latency-ms MS] [--jitter-ms MS]
+                                 [--records N] [--comps N] [--total N]
+                                 [--error-rate P] [--throttle-rate P] [--seed N]
+
+Options:
+    --port PORT          Port to listen on (default: 8765)
+    --latency-ms MS      Delay before each response (default: 20)
+    --jitter-ms MS       Extra random delay of up to MS (default: 0)
+    --records N          Property records per response (default: 1)
+    --comps N            Comparable sales per sales comparables response (default: 50)
+    --total N            Size of paginated result sets (default: 500)
+    --error-rate P       Share of requests answered with 500 (default: 0)
+    --throttle-rate P    Share of requests answered with 429 (default: 0)
+    --seed N             Random seed for jitter and failures (default: 0)
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from typing import Any, Dict, List
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+
+def property_item(attom_id: int, i: int) -> Dict[str, Any]:
+    """One property record, about the size of a property detail record (~1.5 KB)."""
+    return {
+        "identifier": {"Id": attom_id, "fips": "08031", "apn": f"0234{i:06d}", "attomId": attom_id},
+        "lot": {"lotNum": str(i % 40), "lotSize1": 0.1234, "lotSize2": 5375 + i, "zoningType": "Residential"},
+        "area": {"countrySecSubd": "Denver", "countyUse1": "1112", "munCode": "DE", "subdName": "CAPITOL HILL"},
+        "address": {
+            "country": "US",
+            "countrySubd": "CO",
+            "line1": f"{100 + i} MAIN ST",
+            "line2": "DENVER, CO 80202",
+            "locality": "Denver",
+            "oneLine": f"{100 + i} MAIN ST, DENVER, CO 80202",
+            "postal1": "80202",
+        },
+        "location": {
+            "accuracy": "Rooftop",
+            "latitude": f"{39.74 + (i % 100) * 1e-4:.6f}",
+            "longitude": f"{-104.99 - (i // 100) * 1e-4:.6f}",
+            "distance": round(0.01 * (i % 50), 2),
+            "geoid": "CO08031, CS0891007, DB0803360, ND0000118424, SB0000076145, ZI80202",
+        },
+        "summary": {
+            "absenteeInd": "OWNER OCCUPIED",
+            "propClass": "Single Family Residence / Townhouse",
+            "propType": "SFR",
+            "propertyType": "SINGLE FAMILY RESIDENCE",
+            "yearBuilt": 1950 + i % 70,
+            "propLandUse": "SFR",
+        },
+        "utilities": {"coolingType": "CENTRAL", "heatingFuel": "GAS", "heatingType": "FORCED AIR"},
+        "building": {
+            "size": {"bldgSize": 1800 + i % 900, "livingSize": 1500 + i % 900, "universalSize": 1500 + i % 900},
+            "rooms": {"bathsFull": 2, "bathsTotal": 2.5, "beds": 2 + i % 4, "roomsTotal": 7},
+            "interior": {"bsmtSize": 600, "bsmtType": "FULL", "fplcCount": 1},
+            "construction": {"condition": "AVERAGE", "wallType": "BRICK", "roofCover": "ASPHALT"},
+            "parking": {"garageType": "DETACHED", "prkgSize": 400, "prkgSpaces": "2"},
+            "summary": {"levels": 2, "quality": "AVERAGE", "storyDesc": "TWO STORY"},
+        },
+        "assessment": {
+            "assessed": {"assdImprValue": 31000 + i, "assdLandValue": 12000, "assdTtlValue": 43000 + i},
+            "market": {"mktImprValue": 430000 + i * 10, "mktLandValue": 170000, "mktTtlValue": 600000 + i * 10},
+            "tax": {"taxAmt": 3100.5 + i, "taxPerSizeUnit": 2.07, "taxYear": 2024},
+        },
+        "sale": {
+            "saleSearchDate": "2024-05-01",
+            "saleTransDate": "2024-05-01",
+            "amount": {"saleAmt": 450000 + i * 100, "saleRecDate": "2024-05-01", "saleTransType": "Resale"},
+        },
+        "vintage": {"lastModified": "2025-01-15", "pubDate": "2025-01-15"},
+    }
+
+
+def school_item(i: int) -> Dict[str, Any]:
+    """One school search record."""
+    return {
+        "Identifier": {"OBInstID": f"{i:08d}", "NCESSchoolID": f"08033{i:07d}"},
+        "School": {
+            "InstitutionName": f"SCHOOL {i}",
+            "gradeRange": "K-5",
+            "Filetypetext": "PUBLIC",
+            "GSTestRating": 1 + i % 10,
+            "distance": round(0.05 * (i % 60), 2),
+            "locationAddress": f"{200 + i} SCHOOL AVE",
+            "locationCity": "DENVER",
+            "stateAbbrev": "CO",
+            "ZIP": "80202",
+        },
+    }
+
+
+def payload(path: str, query: Dict[str, str], records: int, comps: int, total: int) -> bytes:
+    """Build the response body for a request."""
+    page_size = query.get("pageSize") or query.get("pagesize")
+    start, count = 0, comps if path.startswith("salescomparables") else records
+    if page_size:
+        size = int(page_size)
+        start = (int(query.get("page") or 1) - 1) * size
+        count = max(0, min(size, total - start))
+    if "school" in path:
+        items: List[Dict[str, Any]] = [school_item(start + i) for i in range(count)]
+        key = "school"
+    else:
+        attom_id = query.get("AttomID") or query.get("attomid") or path.rsplit("/", 1)[-1]
+        base = int(attom_id) * 1000 if attom_id.isdigit() else 0
+        items = [property_item(base + start + i, start + i) for i in range(count)]
+        key = "property"
+    status = {"code": 0, "msg": "SuccessWithResult", "total": total if page_size else count}
+    if page_size:
+        status.update({"page": int(query.get("page") or 1), "pagesize": int(page_size)})
+    return json.dumps({"status": status, key: items}).encode()
+
+
+def create_app(
+    latency_ms: float,
+    records: int,
+    jitter_ms: float = 0.0,
+    comps: int = 50,
+    total: int = 500,
+    error_rate: float = 0.0,
+    throttle_rate: float = 0.0,
+    seed: int = 0,
+) -> Starlette:
+    """Build the fake gateway app."""
+    rng = random.Random(seed)
+
+    async def handle(request: Request) -> Response:
+        await asyncio.sleep((latency_ms + rng.uniform(0, jitter_ms)) / 1000.0)
+        draw = rng.random()
+        if draw < throttle_rate:
+            return Response(b'{"status": {"code": 429, "msg": "Too Many Requests"}}', status_code=429,
+                            headers={"Retry-After": "1"}, media_type="application/json")
+        if draw < throttle_rate + error_rate:
+            return Response(b'{"status": {"code": 500, "msg": "Server Error"}}', status_code=500,
+                            media_type="application/json")
+        body = payload(request.path_params["path"], dict(request.query_params), records, comps, total)
+        return Response(body, media_type="application/json")
+
+    async def health(request: Request) -> Response:
+        return Response(b'{"status": "ok"}', media_type="application/json")
+
+    return Starlette(routes=[Route("/health", health), Route("/{path:path}", handle)])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Delay before each response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Extra random delay of up to this")
+    parser.add_argument("--records", type=int, default=1, help="Property records per response")
+    parser.add_argument("--comps", type=int, default=50, help="Comparable sales per sales comparables response")
+    parser.add_argument("--total", type=int, default=500, help="Size of paginated result sets")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for jitter and failures")
+    args = parser.parse_args()
+
+    app = create_app(
+        args.latency_ms,
+        args.records,
+        jitter_ms=args.jitter_ms,
+        comps=args.comps,
+        total=args.total,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        seed=args.seed,
+    )
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+load_mcp.py - Keep concurrent MCP tool calls in flight against a server.
+
+Speaks MCP the way an agent does: over stdio to a ``src.server`` process it
+spawns (newline-delimited JSON-RPC, responses matched by id), or over
+streamable HTTP to a running server. Workers keep ``--concurrency`` tool
+calls in flight, drawing tools from a weighted mix and property ids from a
+pool, and time each call from writing the framed request to reading its
+response, so transport framing and serialization are included.
+
+With ``--fake-gateway`` the spawned server talks to scripts/fake_attom.py
+instead of the real ATTOM API.
+
+Usage:
+    python scripts/load_mcp.py [--transport stdio|http] [--url URL] [--concurrency N]
+                               [--duration S | --calls N] [--mix SPEC] [--ids SPEC]
+                               [--fake-gateway] [--latency-ms MS] [--json]
+
+Options:
+    --transport T       stdio (spawn the server) or http (default: stdio)
+    --url URL           HTTP endpoint of a running server (default: http://127.0.0.1:8000/mcp)
+    --server-arg ARG    Extra argument for the spawned server (repeatable)
+    --concurrency N     Tool calls in flight (default: 16)
+    --duration S        Seconds to run (default: 30)
+    --calls N           Stop after N calls instead of a duration
+    --warmup S          Seconds of calls not counted (default: 2)
+    --mix SPEC          Weighted tools, e.g. property_detail=5,avm_detail=2 (default: a property mix)
+    --ids SPEC          Property ids: a range like 1000-1999 or @file with one id per line
+                        (default: 1000000-1000999)
+    --seed N            Random seed for tools and ids (default: 0)
+    --fake-gateway      Start fake_attom.py and point the spawned server at it
+    --latency-ms MS     Fake gateway latency (default: 20)
+    --port PORT         Fake gateway port (default: 8765)
+    --json              Print the results as JSON
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from bench_event_loop import REPO_ROOT, start_gateway
+
+PROTOCOL_VERSION = "2025-06-18"
+
+DEFAULT_MIX = "property_detail=4,property_expanded_profile=2,sales_history_detail=2,avm_detail=2,all_events_snapshot=1"
+
+# Largest response line read from a stdio server
+MAX_LINE = 64 * 1024 * 1024
+
+
+def parse_mix(spec: str) -> List[Tuple[str, int]]:
+    """Parse ``tool=weight,...`` (weight defaults to 1)."""
+    mix = []
+    for part in spec.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name:
+            mix.append((name, int(weight or 1)))
+    if not mix:
+        raise ValueError("the tool mix is empty")
+    return mix
+
+
+def parse_ids(spec: str) -> List[str]:
+    """Parse a ``first-last`` id range or an ``@file`` of ids."""
+    if spec.startswith("@"):
+        with open(spec[1:], encoding="utf-8") as f:
+            ids = [line.strip() for line in f if line.strip()]
+    else:
+        first, _, last = spec.partition("-")
+        ids = [str(value) for value in range(int(first), int(last or first) + 1)]
+    if not ids:
+        raise ValueError("the id pool is empty")
+    return ids
+
+
+def outcome(message: Dict[str, Any]) -> str:
+    """Outcome of a tools/call response: ok, an ATTOM status code, tool_error or rpc_error."""
+    if "error" in message:
+        return "rpc_error"
+    result = message.get("result") or {}
+    if result.get("isError"):
+        return "tool_error"
+    status = (result.get("structuredContent") or {}).get("status_code", 200)
+    return "ok" if status == 200 else str(status)
+
+
+class StdioTransport:
+    """Spawns the server and multiplexes requests over its stdin and stdout."""
+
+    def __init__(self, argv: List[str], env: Dict[str, str]):
+        self.argv = argv
+        self.env = env
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._reader: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self.process = await asyncio.create_subprocess_exec(
+            *self.argv,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            env=self.env,
+            cwd=REPO_ROOT,
+            limit=MAX_LINE,
+        )
+        self._reader = asyncio.create_task(self._read())
+
+    async def _read(self) -> None:
+        assert self.process is not None and self.process.stdout is not None
+        while True:
+            line = await self.process.stdout.readline()
+            if not line:
+                break
+            message = json.loads(line)
+            future = self._pending.pop(message.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(message)
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("server closed stdout"))
+
+    async def _write(self, message: Dict[str, Any]) -> None:
+        assert self.process is not None and self.process.stdin is not None
+        self.process.stdin.write(json.dumps(message).encode() + b"\n")
+        await self.process.stdin.drain()
+
+    async def request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        await self._write({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+        return await future
+
+    async def notify(self, method: str) -> None:
+        await self._write({"jsonrpc": "2.0", "method": method})
+
+    async def close(self) -> None:
+        if self.process is None:
+            return
+        if self.process.stdin is not None:
+            self.process.stdin.close()
+        try:
+            await asyncio.wait_for(self.process.wait(), 30)
+        except asyncio.TimeoutError:
+            self.process.kill()
+        if self._reader is not None:
+            await self._reader
+
+
+class HttpTransport:
+    """Posts requests to a streamable HTTP endpoint, in one MCP session."""
+
+    def __init__(self, url: str, connections: int):
+        import httpx
+
+        self.url = url
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(120.0), limits=httpx.Limits(max_connections=connections)
+        )
+        self.headers = {"Accept": "application/json, text/event-stream", "Content-Type": "application/json"}
+        self._ids = itertools.count(1)
+
+    async def start(self) -> None:
+        pass
+
+    def _parse(self, response: Any, request_id: Optional[int]) -> Dict[str, Any]:
+        response.raise_for_status()
+        session = response.headers.get("mcp-session-id")
+        if session:
+            self.headers["mcp-session-id"] = session
+        if not response.headers.get("content-type", "").startswith("text/event-stream"):
+            return response.json() if response.content else {}
+        for line in response.text.splitlines():
+            if line.startswith("data:"):
+                message = json.loads(line[5:])
+                if message.get("id") == request_id:
+                    return message
+        raise ValueError(f"no response for request {request_id} in the event stream")
+
+    async def request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        request_id = next(self._ids)
+        body = {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+        response = await self.client.post(self.url, json=body, headers=self.headers)
+        if method == "initialize":
+            self.headers["mcp-protocol-version"] = PROTOCOL_VERSION
+        return self._parse(response, request_id)
+
+    async def notify(self, method: str) -> None:
+        response = await self.client.post(self.url, json={"jsonrpc": "2.0", "method": method}, headers=self.headers)
+        response.raise_for_status()
+
+    async def close(self) -> None:
+        if "mcp-session-id" in self.headers:
+            await self.client.delete(self.url, headers=self.headers)
+        await self.client.aclose()
+
+
+async def run_load(transport: Any, args: argparse.Namespace) -> Dict[str, Any]:
+    """Initialize a session, then keep ``args.concurrency`` tool calls in flight."""
+    await transport.start()
+    initialized = await transport.request(
+        "initialize",
+        {
+            "protocolVersion": PROTOCOL_VERSION,
+            "capabilities": {},
+            "clientInfo": {"name": "load_mcp", "version": "1.0"},
+        },
+    )
+    if "error" in initialized:
+        raise RuntimeError(f"initialize failed: {initialized['error']}")
+    await transport.notify("notifications/initialized")
+
+    tools, weights = zip(*parse_mix(args.mix))
+    ids = parse_ids(args.ids)
+    rng = random.Random(args.seed)
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    outcomes: Dict[str, Counter] = defaultdict(Counter)
+    remaining = [args.calls] if args.calls else None
+    start = time.perf_counter()
+    measure_from = start + (0 if args.calls else args.warmup)
+    stop_at = measure_from + args.duration
+
+    async def worker() -> None:
+        while True:
+            if remaining is not None:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            elif time.perf_counter() >= stop_at:
+                return
+            tool = rng.choices(tools, weights)[0]
+            params = {"name": tool, "arguments": {"params": {"attom_id": rng.choice(ids)}}}
+            sent = time.perf_counter()
+            try:
+                message = await transport.request("tools/call", params)
+                result = outcome(message)
+            except Exception as e:
+                result = type(e).__name__
+            received = time.perf_counter()
+            if sent >= measure_from:
+                latencies[tool].append(received - sent)
+                outcomes[tool][result] += 1
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - max(measure_from, start)
+    finally:
+        await transport.close()
+    return summarize(latencies, outcomes, elapsed)
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """p50/p95/p99 and max of ``values``, in milliseconds."""
+    ordered = sorted(values)
+
+    def rank(fraction: float) -> float:
+        return ordered[max(0, min(len(ordered) - 1, int(round(fraction * len(ordered))) - 1))] * 1000
+
+    return {
+        "p50_ms": round(rank(0.50), 2),
+        "p95_ms": round(rank(0.95), 2),
+        "p99_ms": round(rank(0.99), 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+def summarize(latencies: Dict[str, List[float]], outcomes: Dict[str, Counter], elapsed: float) -> Dict[str, Any]:
+    """Per-tool and overall throughput, latency and outcomes."""
+    every = [value for values in latencies.values() for value in values]
+    total: Counter = sum(outcomes.values(), Counter())
+    summary: Dict[str, Any] = {
+        "seconds": round(elapsed, 2),
+        "calls": len(every),
+        "calls_per_s": round(len(every) / elapsed, 1) if elapsed else 0.0,
+        "outcomes": dict(total),
+        "tools": {},
+    }
+    if every:
+        summary.update(percentiles(every))
+    for tool, values in sorted(latencies.items()):
+        summary["tools"][tool] = {"calls": len(values), "outcomes": dict(outcomes[tool]), **percentiles(values)}
+    return summary
+
+
+def print_summary(summary: Dict[str, Any]) -> None:
+    print(
+        f"{summary['calls']} calls in {summary['seconds']} s: {summary['calls_per_s']} calls/s, "
+        f"outcomes {summary['outcomes']}"
+    )
+    print(f"{'tool':>28} {'calls':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}  errors")
+    rows = list(summary["tools"].items())
+    if summary["calls"]:
+        rows.append(("all", summary))
+    for tool, row in rows:
+        errors = sum(count for name, count in row["outcomes"].items() if name != "ok")
+        print(
+            f"{tool:>28} {row['calls']:>7} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+            f"{row['p99_ms']:>8.1f} {row['max_ms']:>8.1f}  {errors}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Keep concurrent MCP tool calls in flight against a server")
+    parser.add_argument("--transport", choices=["stdio", "http"], default="stdio", help="MCP transport")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/mcp", help="HTTP endpoint of a running server")
+    parser.add_argument("--server-arg", action="append", default=[], help="Extra argument for the spawned server")
+    parser.add_argument("--concurrency", type=int, default=16, help="Tool calls in flight")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--calls", type=int, help="Stop after this many calls instead of a duration")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds of calls not counted")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Weighted tools, e.g. property_detail=5,avm_detail=2")
+    parser.add_argument("--ids", default="1000000-1000999", help="Id range first-last, or @file")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for tools and ids")
+    parser.add_argument("--fake-gateway", action="store_true", help="Point the spawned server at fake_attom.py")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Fake gateway latency")
+    parser.add_argument("--port", type=int, default=8765, help="Fake gateway port")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    try:
+        parse_mix(args.mix)
+        parse_ids(args.ids)
+    except (ValueError, OSError) as e:
+        parser.error(str(e))
+
+    gateway = None
+    env = dict(os.environ)
+    if args.fake_gateway:
+        gateway = start_gateway(args.port, args.latency_ms)
+        env.update(ATTOM_API_KEY="load", ATTOM_HOST_URL=f"http://127.0.0.1:{args.port}")
+    try:
+        if args.transport == "stdio":
+            transport: Any = StdioTransport([sys.executable, "-m", "src.server", *args.server_arg], env)
+        else:
+            transport = HttpTransport(args.url, args.concurrency)
+        summary = asyncio.run(run_load(transport, args))
+    finally:
+        if gateway is not None:
+            gateway.terminate()
+            gateway.wait(timeout=10)
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""Fuzzy matching of typed addresses against the properties seen so far.
+
+Every property record with an address is indexed under its normalized
+address: upper case, punctuation removed, street suffixes, directionals and
+unit designators abbreviated the USPS way. Each address is broken into
+character trigrams kept in posting lists, so a query only scores the
+addresses sharing the most trigrams with it.
+
+A match needs the same house and unit numbers, and the same ZIP when the
+query has one; a typo in the street or city name costs a few trigrams, a
+different number is a different property. Trigram scores only rank
+suggestions: a typed address resolves to a known ATTOM ID before any request
+goes upstream only when its words (street name, suffix, directional, city and
+state) all equal those of exactly one known address.
+"""
+
+import re
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+
+import structlog
+
+from src import config
+from src.records import PropertyRecord
+
+# Configure logging
+logger = structlog.get_logger(__name__)
+
+# USPS standard abbreviations of common address words
+ABBREVIATIONS = {
+    "ALLEY": "ALY",
+    "AVENUE": "AVE",
+    "AV": "AVE",
+    "BOULEVARD": "BLVD",
+    "CIRCLE": "CIR",
+    "COURT": "CT",
+    "DRIVE": "DR",
+    "EXPRESSWAY": "EXPY",
+    "FREEWAY": "FWY",
+    "HIGHWAY": "HWY",
+    "LANE": "LN",
+    "PARKWAY": "PKWY",
+    "PLACE": "PL",
+    "ROAD": "RD",
+    "SQUARE": "SQ",
+    "STREET": "ST",
+    "TERRACE": "TER",
+    "TRAIL": "TRL",
+    "NORTH": "N",
+    "SOUTH": "S",
+    "EAST": "E",
+    "WEST": "W",
+    "NORTHEAST": "NE",
+    "NORTHWEST": "NW",
+    "SOUTHEAST": "SE",
+    "SOUTHWEST": "SW",
+    "APARTMENT": "APT",
+    "SUITE": "STE",
+    "UNIT": "APT",
+    "#": "APT",
+}
+# Country names dropped from the end of an address
+COUNTRIES = ("USA", "US", "UNITED STATES")
+
+# Trigram candidates verified per query
+CANDIDATES = 20
+
+_ZIP_PLUS4 = re.compile(r"\b(\d{5})-\d{4}\b")
+_TOKEN = re.compile(r"#|[A-Z0-9]+")
+_ZIP = re.compile(r"^\d{5}$")
+
+
+def normalize_address(text: str) -> str:
+    """Normalize an address for matching.
+
+    Args:
+        text: Address as typed or as returned by ATTOM
+
+    Returns:
+        Upper-case tokens separated by single spaces, with standard abbreviations
+    """
+    text = _ZIP_PLUS4.sub(r"\1", text.upper())
+    tokens = [ABBREVIATIONS.get(token, token) for token in _TOKEN.findall(text)]
+    joined = " ".join(tokens)
+    for country in COUNTRIES:
+        if joined.endswith(" " + country):
+            joined = joined[: -len(country) - 1]
+            break
+    return joined
+
+
+def _numbers(text: str) -> FrozenSet[str]:
+    """Tokens containing a digit (house, unit and ZIP numbers)."""
+    return frozenset(token for token in text.split() if any(char.isdigit() for char in token))
+
+
+def _words(text: str) -> List[str]:
+    """Tokens without a digit (street name, suffix, directional, unit designator, city, state)."""
+    return sorted(token for token in text.split() if not any(char.isdigit() for char in token))
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i: i + 3] for i in range(len(padded) - 2)}
+
+
+def _strip_zip(text: str) -> str:
+    head, _, last = text.rpartition(" ")
+    return head if head and _ZIP.match(last) else text
+
+
+@dataclass(frozen=True)
+class AddressEntry:
+    """One indexed address."""
+
+    attom_id: str
+    address: str
+    # Normalized address, and without the ZIP for queries that have none
+    text: str
+    text_without_zip: str
+    # Numbers of the street line, which a query must repeat
+    street_numbers: FrozenSet[str]
+    trigrams: FrozenSet[str]
+
+
+@dataclass(frozen=True)
+class AddressMatch:
+    """A known property matching a typed address."""
+
+    attom_id: str
+    address: str
+    score: float
+
+    def to_dict(self) -> Dict[str, object]:
+        return {"attom_id": self.attom_id, "address": self.address, "score": round(self.score, 3)}
+
+
+class AddressIndex:
+    """Trigram index of the addresses of known properties."""
+
+    def __init__(
+        self,
+        max_size: int = config.ATTOM_RECORD_STORE_SIZE,
+        min_score: float = config.ATTOM_ADDRESS_SUGGEST_SCORE,
+    ):
+        """Initialize the index.
+
+        Args:
+            max_size: Most addresses indexed; the least recently updated are evicted
+            min_score: Lowest similarity (0-1) of a suggested address
+        """
+        self.max_size = max_size
+        self.min_score = min_score
+        self._entries: "OrderedDict[str, AddressEntry]" = OrderedDict()
+        self._postings: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, records: Iterable[Optional[PropertyRecord]]) -> int:
+        """Index the addresses of records; records without an ATTOM ID or address are skipped.
+
+        Returns:
+            Number of addresses indexed
+        """
+        count = 0
+        for record in records:
+            if record is None or record.attom_id is None or self.max_size <= 0:
+                continue
+            address = record.address_full
+            if not address and record.address_line1 and record.address_line2:
+                address = f"{record.address_line1}, {record.address_line2}"
+            if not address:
+                continue
+            self.remove(record.attom_id)
+            if len(self._entries) >= self.max_size:
+                self.remove(next(iter(self._entries)))
+            text = normalize_address(address)
+            entry = AddressEntry(
+                attom_id=record.attom_id,
+                address=address,
+                text=text,
+                text_without_zip=_strip_zip(text),
+                street_numbers=_numbers(normalize_address(record.address_line1 or address.split(",")[0])),
+                trigrams=frozenset(_trigrams(text)),
+            )
+            self._entries[record.attom_id] = entry
+            for trigram in entry.trigrams:
+                self._postings.setdefault(trigram, set()).add(record.attom_id)
+            count += 1
+        return count
+
+    def remove(self, attom_id: str) -> bool:
+        """Drop a property's address from the index."""
+        entry = self._entries.pop(str(attom_id), None)
+        if entry is None:
+            return False
+        for trigram in entry.trigrams:
+            posting = self._postings[trigram]
+            posting.discard(entry.attom_id)
+            if not posting:
+                del self._postings[trigram]
+        return True
+
+    def _score(self, text: str, trigrams: Set[str], numbers: FrozenSet[str], entry: AddressEntry) -> float:
+        """Similarity of a normalized query to an entry, 0 when their numbers disagree."""
+        if not numbers <= _numbers(entry.text) or not entry.street_numbers <= numbers:
+            return 0.0
+        has_zip = bool(_ZIP.match(text.rpartition(" ")[2]))
+        target = entry.text if has_zip else entry.text_without_zip
+        if text == target:
+            return 1.0
+        target_trigrams = entry.trigrams if has_zip else _trigrams(target)
+        return 2 * len(trigrams & target_trigrams) / (len(trigrams) + len(target_trigrams))
+
+    def search(self, address: str, limit: int = 5) -> List[AddressMatch]:
+        """Known addresses most similar to a typed one.
+
+        Args:
+            address: Address as typed
+            limit: Most matches returned
+
+        Returns:
+            Matches scoring at least the suggestion threshold, best first
+        """
+        text = normalize_address(address)
+        if not text or not self._entries:
+            return []
+        trigrams = _trigrams(text)
+        numbers = _numbers(text)
+        shared: Counter = Counter()
+        for trigram in trigrams:
+            shared.update(self._postings.get(trigram, ()))
+        matches = []
+        for attom_id, _ in shared.most_common(CANDIDATES):
+            entry = self._entries[attom_id]
+            score = self._score(text, trigrams, numbers, entry)
+            if score >= self.min_score:
+                matches.append(AddressMatch(entry.attom_id, entry.address, score))
+        matches.sort(key=lambda match: (-match.score, match.attom_id))
+        return matches[:limit]
+
+    def resolve(self, address: str) -> Optional[AddressMatch]:
+        """The known property a typed address refers to, if it is certain.
+
+        The numbers must agree as for suggestions, and the words of the typed
+        address must equal those of exactly one known address, so a different
+        street name, suffix, directional, city or state never resolves; only
+        abbreviations, punctuation, word order and a missing ZIP may differ.
+        """
+        text = normalize_address(address)
+        words = _words(text)
+        resolved = [
+            match for match in self.search(address, limit=CANDIDATES)
+            if _words(self._entries[match.attom_id].text_without_zip) == words
+        ]
+        return resolved[0] if len(resolved) == 1 else None
+
+    def clear(self) -> None:
+        """Remove all addresses."""
+        self._entries.clear()
+        self._postings.clear()
+
+
+def typed_address(params: object) -> Optional[str]:
+    """The address a tool's parameters identify a property by, if any.
+
+    Args:
+        params: Tool parameter model
+
+    Returns:
+        ``address``, or ``address1, address2``; None when an ATTOM ID is given
+    """
+    values = params.model_dump(exclude_none=True) if hasattr(params, "model_dump") else {}
+    if values.get("attom_id"):
+        return None
+    if values.get("address"):
+        return str(values["address"])
+    if values.get("address1") and values.get("address2"):
+        return f"{values['address1']}, {values['address2']}"
+    return None
+
+
+# Create a singleton index shared by the tools
+address_index = AddressIndex()
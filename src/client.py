@@ -3,13 +3,20 @@
 This module provides a client for making HTTP requests to the ATTOM API.
 """
 
-from typing import Any, Dict, Optional
+import json
+import time
+from functools import partial
+from typing import Any, Dict, Optional, Tuple
 from urllib.parse import urljoin
 
 import httpx
 import structlog
+from opentelemetry.trace import SpanKind
 
-from src import config
+from src import config, metrics, tracing, usage
+from src.lifecycle import lifecycle
+from src.payload import decode_prefix, read_body
+from src.runtime import run_blocking
 
 # Configure logging
 logger = structlog.get_logger(__name__)
@@ -34,6 +41,7 @@ class AttomClient:
         prop_api_prefix: str = config.ATTOM_PROP_API_PREFIX,
         dlp_v2_prefix: str = config.ATTOM_DLP_V2_PREFIX,
         dlp_v3_prefix: str = config.ATTOM_DLP_V3_PREFIX,
+        max_response_bytes: int = config.ATTOM_MAX_RESPONSE_BYTES,
     ):
         """Initialize the ATTOM API client.
 
@@ -43,19 +51,34 @@ class AttomClient:
             prop_api_prefix: Prefix for property API endpoints
             dlp_v2_prefix: Prefix for DLP v2 API endpoints
             dlp_v3_prefix: Prefix for DLP v3 API endpoints
+            max_response_bytes: Longest response body read before truncating (0 for no limit)
         """
         self.api_key = api_key
         self.host_url = host_url
         self.prop_api_prefix = prop_api_prefix
         self.dlp_v2_prefix = dlp_v2_prefix
         self.dlp_v3_prefix = dlp_v3_prefix
-        self.client = httpx.Client(
-            headers={
-                "apikey": self.api_key,
-                "Accept": "application/json",
-            },
-            timeout=30.0,
-        )
+        self.max_response_bytes = max_response_bytes
+        self._client: Optional[httpx.Client] = None
+
+    @property
+    def client(self) -> httpx.Client:
+        """HTTP client, created on first use to keep start-up cheap."""
+        if self._client is None:
+            self._client = httpx.Client(
+                headers={
+                    "apikey": self.api_key,
+                    "Accept": "application/json",
+                },
+                timeout=30.0,
+            )
+        return self._client
+
+    def close(self) -> None:
+        """Close the connection pool; a new one is created on next use."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
 
     def _build_url(self, endpoint: str, api_prefix: Optional[str] = None) -> str:
         """Build a URL for the ATTOM API.
@@ -83,11 +106,85 @@ class AttomClient:
 
         return url
 
+    def _send(self, method: str, url: str, **kwargs: Any) -> Tuple[Dict[str, Any], int, int, int]:
+        """Send a request and decode its JSON body (blocking).
+
+        The body is streamed into one buffer and decoded from it. Bodies longer
+        than ``max_response_bytes`` are cut off and decoded partially (see
+        ``src.payload``).
+
+        Returns:
+            Decoded body, body size in bytes, and when decoding started and ended (ns since the epoch)
+        """
+        with self.client.stream(method, url, **kwargs) as response:
+            if response.is_error:
+                response.read()
+                response.raise_for_status()
+            body, complete = read_body(response.iter_bytes(), self.max_response_bytes)
+        decode_start = time.time_ns()
+        if complete:
+            payload = json.loads(body)
+        else:
+            logger.warning(
+                "Response truncated",
+                url=url,
+                limit_bytes=self.max_response_bytes,
+                content_length=response.headers.get("content-length"),
+            )
+            payload = decode_prefix(body, self.max_response_bytes)
+        return payload, len(body), decode_start, time.time_ns()
+
+    async def _request(self, method: str, url: str, label: str, **kwargs: Any) -> Dict[str, Any]:
+        """Send a request off the event loop, recording its metrics, span and usage under ``label``."""
+        start = time.perf_counter()
+        status = "error"
+        size = 0
+        with tracing.span(
+            f"attom.http {method}",
+            kind=SpanKind.CLIENT,
+            **{"http.request.method": method, "url.full": url, "attom.endpoint": label},
+        ) as span:
+            try:
+                payload, size, decode_start, decode_end = await run_blocking(
+                    partial(self._send, method, url, **kwargs)
+                )
+                status = "200"
+                span.set_attribute("http.response.status_code", 200)
+                span.set_attribute("attom.response_bytes", size)
+                tracing.record_interval("attom.decode", decode_start, decode_end, **{"attom.response_bytes": size})
+                metrics.upstream_response_bytes.observe(size, endpoint=label)
+                metrics.upstream_decode.observe((decode_end - decode_start) / 1e9, endpoint=label)
+                return payload
+            except httpx.HTTPStatusError as e:
+                status = str(e.response.status_code)
+                span.set_attribute("http.response.status_code", e.response.status_code)
+                logger.error(
+                    "API request failed",
+                    url=url,
+                    status_code=e.response.status_code,
+                    response=e.response.text,
+                )
+                raise AttomAPIError(e.response.status_code, e.response.text)
+            except httpx.RequestError as e:
+                logger.error("API request failed", url=url, error=str(e))
+                raise AttomAPIError(500, str(e))
+            finally:
+                metrics.upstream_duration.observe(time.perf_counter() - start, endpoint=label)
+                metrics.upstream_requests.inc(endpoint=label, status=status)
+                usage.ledger.record(
+                    label,
+                    usage.cache_outcome.get(),
+                    status=int(status) if status.isdigit() else 0,
+                    size=size,
+                    key=usage.key_fingerprint(self.api_key),
+                )
+
     async def get(
         self,
         endpoint: str,
         params: Optional[Dict[str, Any]] = None,
         api_prefix: Optional[str] = None,
+        label: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Make a GET request to the ATTOM API.
 
@@ -95,6 +192,7 @@ class AttomClient:
             endpoint: API endpoint path
             params: Query parameters
             api_prefix: API prefix to use (default: property API prefix)
+            label: Endpoint name for metrics (default: the endpoint path)
 
         Returns:
             API response as a dictionary
@@ -103,27 +201,15 @@ class AttomClient:
             AttomAPIError: If the API returns an error
         """
         url = self._build_url(endpoint, api_prefix)
-        log = logger.bind(method="GET", url=url, params=params)
-
-        log.debug("Making API request")
-
-        try:
-            response = self.client.get(url, params=params)
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            log.error(
-                "API request failed",
-                status_code=e.response.status_code,
-                response=e.response.text,
-            )
-            raise AttomAPIError(e.response.status_code, e.response.text)
-        except httpx.RequestError as e:
-            log.error("API request failed", error=str(e))
-            raise AttomAPIError(500, str(e))
+        logger.debug("Making API request", method="GET", url=url, params=params)
+        return await self._request("GET", url, label or endpoint, params=params)
 
     async def post(
-        self, endpoint: str, data: Dict[str, Any], api_prefix: Optional[str] = None
+        self,
+        endpoint: str,
+        data: Dict[str, Any],
+        api_prefix: Optional[str] = None,
+        label: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Make a POST request to the ATTOM API.
 
@@ -131,6 +217,7 @@ class AttomClient:
             endpoint: API endpoint path
             data: Form data
             api_prefix: API prefix to use (default: property API prefix)
+            label: Endpoint name for metrics (default: the endpoint path)
 
         Returns:
             API response as a dictionary
@@ -139,29 +226,16 @@ class AttomClient:
             AttomAPIError: If the API returns an error
         """
         url = self._build_url(endpoint, api_prefix)
-        log = logger.bind(method="POST", url=url, data=data)
-
-        log.debug("Making API request")
-
-        try:
-            response = self.client.post(
-                url,
-                data=data,
-                headers={"Content-Type": "application/x-www-form-urlencoded"},
-            )
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            log.error(
-                "API request failed",
-                status_code=e.response.status_code,
-                response=e.response.text,
-            )
-            raise AttomAPIError(e.response.status_code, e.response.text)
-        except httpx.RequestError as e:
-            log.error("API request failed", error=str(e))
-            raise AttomAPIError(500, str(e))
+        logger.debug("Making API request", method="POST", url=url, data=data)
+        return await self._request(
+            "POST",
+            url,
+            label or endpoint,
+            data=data,
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+        )
 
 
 # Create a singleton instance of the client
 client = AttomClient()
+lifecycle.on_shutdown(client.close)
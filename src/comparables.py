@@ -0,0 +1,315 @@
+"""Local sales-comparables analytics.
+
+This module parses sales comparables payloads into property records and
+computes price-per-square-foot statistics, adjusted comparable values and
+distance-weighted estimates with vectorized NumPy code.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.geo import haversine_miles
+from src.records import (
+    PropertyRecord,
+    extract_records,
+    parse_date,
+    parse_float,
+    to_columns,
+)
+
+# Default dollar adjustments applied per unit difference from the subject
+DEFAULT_BED_ADJUSTMENT = 10000.0
+DEFAULT_BATH_ADJUSTMENT = 7500.0
+DEFAULT_YEAR_ADJUSTMENT = 500.0
+
+# Distance (miles) added before weighting so that very close comps don't dominate
+DISTANCE_FLOOR_MILES = 0.1
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+TABLE_COLUMNS = (
+    "attom_id",
+    "address",
+    "sale_date",
+    "sale_amount",
+    "living_sqft",
+    "price_per_sqft",
+    "distance_miles",
+    "adjusted_value",
+    "weight",
+    "score",
+)
+
+
+def _find_attr(node: Any, name: str) -> Any:
+    """Depth-first search for an ``@Attribute`` value in a DLP payload node."""
+    if isinstance(node, dict):
+        if name in node:
+            return node[name]
+        for key, value in node.items():
+            if key == "COMPARABLE_PROPERTY_ext":
+                # Never read a nested comparable's attributes as our own
+                continue
+            found = _find_attr(value, name)
+            if found is not None:
+                return found
+    elif isinstance(node, list):
+        for value in node:
+            found = _find_attr(value, name)
+            if found is not None:
+                return found
+    return None
+
+
+def _record_from_dlp(node: Dict[str, Any]) -> Tuple[PropertyRecord, Optional[float]]:
+    """Build a record and subject distance from a DLP v2 property node."""
+    street = _find_attr(node, "@_StreetAddress")
+    city = _find_attr(node, "@_City")
+    state = _find_attr(node, "@_State")
+    postal = _find_attr(node, "@_PostalCode")
+    line2 = " ".join(part for part in (f"{city}," if city else None, state, postal) if part)
+    attom_id = _find_attr(node, "@RTPropertyID_ext") or _find_attr(node, "@PropertyParcelID")
+    record = PropertyRecord(
+        attom_id=str(attom_id) if attom_id else None,
+        address_line1=street,
+        address_line2=line2 or None,
+        address_full=f"{street}, {line2}" if street and line2 else street,
+        city=city,
+        state=state,
+        zip_code=postal,
+        latitude=parse_float(_find_attr(node, "@LatitudeNumber")),
+        longitude=parse_float(_find_attr(node, "@LongitudeNumber")),
+        sale_amount=parse_float(_find_attr(node, "@PropertySalesAmount")),
+        sale_date=parse_date(_find_attr(node, "@PropertySalesDate")),
+        living_sqft=parse_float(_find_attr(node, "@GrossLivingAreaSquareFeetCount")),
+        beds=parse_float(_find_attr(node, "@TotalBedroomCount")),
+        baths=parse_float(_find_attr(node, "@TotalBathroomCount")),
+        year_built=parse_float(_find_attr(node, "@PropertyStructureBuiltYear")),
+        lot_sqft=parse_float(_find_attr(node, "@LotSquareFeetCount")),
+    )
+    distance = parse_float(_find_attr(node, "@DistanceFromSubjectPropertyMilesCount"))
+    return record, distance
+
+
+def _collect(node: Any, key: str, found: List[Any]) -> List[Any]:
+    """Collect every value stored under ``key`` anywhere in the payload."""
+    if isinstance(node, dict):
+        for name, value in node.items():
+            if name == key:
+                found.extend(value if isinstance(value, list) else [value])
+            else:
+                _collect(value, key, found)
+    elif isinstance(node, list):
+        for value in node:
+            _collect(value, key, found)
+    return found
+
+
+def extract_comparables(
+    payload: Dict[str, Any],
+) -> Tuple[Optional[PropertyRecord], List[PropertyRecord], List[Optional[float]]]:
+    """Extract the subject and comparable sales from a comps payload.
+
+    Both the DLP v2 ``salescomparables`` response and plain property API
+    payloads with a ``property`` list are accepted.
+
+    Args:
+        payload: Decoded comparables response
+
+    Returns:
+        Tuple of (subject record or None, comparable records, reported distances)
+    """
+    if isinstance(payload, dict) and isinstance(payload.get("property"), list):
+        comps = extract_records(payload)
+        return None, comps, [None] * len(comps)
+
+    subject = None
+    subjects = _collect(payload, "SUBJECT_PROPERTY_ext", [])
+    if subjects:
+        properties = subjects[0].get("PROPERTY") if isinstance(subjects[0], dict) else None
+        nodes = properties if isinstance(properties, list) else [properties or subjects[0]]
+        for node in nodes:
+            if isinstance(node, dict) and "COMPARABLE_PROPERTY_ext" not in node:
+                subject, _ = _record_from_dlp(node)
+                break
+
+    comps, distances = [], []
+    for node in _collect(payload, "COMPARABLE_PROPERTY_ext", []):
+        if isinstance(node, dict):
+            record, distance = _record_from_dlp(node)
+            comps.append(record)
+            distances.append(distance)
+    return subject, comps, distances
+
+
+def nearby_sales(
+    subject: PropertyRecord, records: Iterable[PropertyRecord], radius_miles: float
+) -> Tuple[List[PropertyRecord], List[float]]:
+    """Select sold properties within a radius of the subject.
+
+    Args:
+        subject: Subject property record with latitude and longitude
+        records: Candidate records, e.g. from the local record store
+        radius_miles: Search radius in miles
+
+    Returns:
+        Tuple of (nearby sold records, their distances in miles)
+    """
+    if subject.latitude is None or subject.longitude is None:
+        return [], []
+    candidates = [
+        record
+        for record in records
+        if record.attom_id != subject.attom_id and record.sale_amount
+    ]
+    if not candidates:
+        return [], []
+    columns = to_columns(candidates)
+    distance = haversine_miles(
+        subject.latitude,
+        subject.longitude,
+        _column(columns, "latitude"),
+        _column(columns, "longitude"),
+    )
+    selected = np.flatnonzero(distance <= radius_miles)
+    return [candidates[i] for i in selected], [float(distance[i]) for i in selected]
+
+
+def _round(value: float, digits: int = 2) -> Optional[float]:
+    """Round a float for output, mapping NaN to None."""
+    return None if value is None or np.isnan(value) else round(float(value), digits)
+
+
+def _column(columns: Dict[str, Any], name: str) -> np.ndarray:
+    """View a numeric record column as a float64 array without copying."""
+    return np.frombuffer(columns[name], dtype=np.float64)
+
+
+def analyze_comparables(
+    subject: PropertyRecord,
+    comps: Iterable[PropertyRecord],
+    distances: Optional[Iterable[Optional[float]]] = None,
+    bed_adjustment: float = DEFAULT_BED_ADJUSTMENT,
+    bath_adjustment: float = DEFAULT_BATH_ADJUSTMENT,
+    year_adjustment: float = DEFAULT_YEAR_ADJUSTMENT,
+    max_rows: int = 10,
+) -> Dict[str, Any]:
+    """Compute a comparables summary for a subject property.
+
+    Comparable values are adjusted to the subject using the median price per
+    square foot for the size difference, plus fixed dollar adjustments for
+    bedrooms, bathrooms and year built. Comps are weighted by inverse squared
+    distance and ranked by a similarity score.
+
+    Args:
+        subject: Subject property record
+        comps: Comparable sale records
+        distances: Reported distances from the subject in miles, if known
+        bed_adjustment: Dollar adjustment per bedroom difference
+        bath_adjustment: Dollar adjustment per bathroom difference
+        year_adjustment: Dollar adjustment per year of age difference
+        max_rows: Maximum number of comps in the summary table
+
+    Returns:
+        Summary with statistics, value estimates and a compact comps table
+    """
+    comps = list(comps)
+    columns = to_columns(comps)
+    price = _column(columns, "sale_amount")
+    sqft = _column(columns, "living_sqft")
+
+    distance = np.array(
+        [np.nan if d is None else d for d in (distances or [None] * len(comps))],
+        dtype=np.float64,
+    )
+    if subject.latitude is not None and subject.longitude is not None:
+        computed = haversine_miles(
+            subject.latitude,
+            subject.longitude,
+            _column(columns, "latitude"),
+            _column(columns, "longitude"),
+        )
+        distance = np.where(np.isnan(distance), computed, distance)
+
+    valid = (price > 0) & (sqft > 0)
+    ppsf = np.where(valid, price / np.where(sqft > 0, sqft, np.nan), np.nan)
+    used = int(valid.sum())
+
+    summary: Dict[str, Any] = {
+        "subject": subject.to_dict(),
+        "comp_count": len(comps),
+        "used_count": used,
+    }
+    if used == 0:
+        summary["price_per_sqft"] = None
+        summary["estimate"] = None
+        summary["table"] = {"columns": list(TABLE_COLUMNS), "rows": []}
+        return summary
+
+    valid_ppsf = ppsf[valid]
+    median_ppsf = float(np.median(valid_ppsf))
+    summary["price_per_sqft"] = {
+        "mean": _round(valid_ppsf.mean()),
+        "min": _round(valid_ppsf.min()),
+        "max": _round(valid_ppsf.max()),
+        **{f"p{p}": _round(v) for p, v in zip(PERCENTILES, np.percentile(valid_ppsf, PERCENTILES))},
+    }
+
+    def difference(name: str) -> np.ndarray:
+        value = getattr(subject, name)
+        if value is None:
+            return np.zeros(len(comps))
+        return np.nan_to_num(value - _column(columns, name))
+
+    adjusted = (
+        price
+        + difference("living_sqft") * median_ppsf
+        + difference("beds") * bed_adjustment
+        + difference("baths") * bath_adjustment
+        + difference("year_built") * year_adjustment
+    )
+    adjusted = np.where(valid, adjusted, np.nan)
+
+    known_distance = ~np.isnan(distance)
+    weight = np.where(
+        valid,
+        1.0 / (np.where(known_distance, distance, 1.0) + DISTANCE_FLOOR_MILES) ** 2,
+        0.0,
+    )
+    weight = weight / weight.sum()
+
+    # Similarity score in (0, 1]: closer and similarly sized comps score higher
+    size_gap = np.abs(difference("living_sqft")) / (subject.living_sqft or np.nanmedian(sqft[valid]))
+    score = np.exp(-np.where(known_distance, distance, 1.0)) * np.exp(-size_gap)
+    score = np.where(valid, score, 0.0)
+
+    valid_adjusted = adjusted[valid]
+    estimate = {
+        "median_adjusted_value": _round(np.median(valid_adjusted), 0),
+        "weighted_adjusted_value": _round(np.nansum(adjusted * weight), 0),
+        "adjusted_value_p25": _round(np.percentile(valid_adjusted, 25), 0),
+        "adjusted_value_p75": _round(np.percentile(valid_adjusted, 75), 0),
+    }
+    if subject.living_sqft:
+        estimate["median_ppsf_value"] = _round(median_ppsf * subject.living_sqft, 0)
+    summary["estimate"] = estimate
+
+    order = np.argsort(-score, kind="stable")[: min(max_rows, used)]
+    rows = [
+        [
+            comps[i].attom_id,
+            comps[i].address_full,
+            comps[i].sale_date,
+            _round(price[i], 0),
+            _round(sqft[i], 0),
+            _round(ppsf[i]),
+            _round(distance[i]),
+            _round(adjusted[i], 0),
+            _round(weight[i], 4),
+            _round(score[i], 4),
+        ]
+        for i in order
+    ]
+    summary["table"] = {"columns": list(TABLE_COLUMNS), "rows": rows}
+    return summary
@@ -18,9 +18,106 @@ ATTOM_PROP_API_PREFIX: str = os.getenv("ATTOM_PROP_API_PREFIX", "/propertyapi/v1
 ATTOM_DLP_V2_PREFIX: str = os.getenv("ATTOM_DLP_V2_PREFIX", "/property/v2")
 ATTOM_DLP_V3_PREFIX: str = os.getenv("ATTOM_DLP_V3_PREFIX", "/property/v3")
 
+# Local cache configuration (an empty directory keeps caches in memory only)
+ATTOM_CACHE_DIR: str = os.getenv("ATTOM_CACHE_DIR", "")
+
+# Reference dataset directory (empty uses ATTOM_CACHE_DIR/reference, then the bundled data)
+ATTOM_REFERENCE_DIR: str = os.getenv("ATTOM_REFERENCE_DIR", "")
+
+# Local analytics configuration
+ATTOM_RECORD_STORE_SIZE: int = int(os.getenv("ATTOM_RECORD_STORE_SIZE", "50000"))
+# Properties with AVM, sale and assessment time series kept, and seconds before a history is refetched
+ATTOM_TIMESERIES_SIZE: int = int(os.getenv("ATTOM_TIMESERIES_SIZE", "10000"))
+ATTOM_TIMESERIES_MAX_AGE: float = float(os.getenv("ATTOM_TIMESERIES_MAX_AGE", str(7 * 86400)))
+# Lowest similarity (0-1) of known addresses suggested for a typed one
+ATTOM_ADDRESS_SUGGEST_SCORE: float = float(os.getenv("ATTOM_ADDRESS_SUGGEST_SCORE", "0.5"))
+
+# POI cache configuration (radii in miles, TTL in seconds)
+ATTOM_POI_CACHE_SIZE: int = int(os.getenv("ATTOM_POI_CACHE_SIZE", "1000"))
+ATTOM_POI_CACHE_TTL: float = float(os.getenv("ATTOM_POI_CACHE_TTL", "86400"))
+ATTOM_POI_GEOHASH_PRECISION: int = int(os.getenv("ATTOM_POI_GEOHASH_PRECISION", "5"))
+ATTOM_POI_FETCH_RADIUS: float = float(os.getenv("ATTOM_POI_FETCH_RADIUS", "1.0"))
+ATTOM_POI_FETCH_PAGE_SIZE: int = int(os.getenv("ATTOM_POI_FETCH_PAGE_SIZE", "100"))
+
+# Upstream response cache (entries; expiry comes from each endpoint's cache class)
+ATTOM_RESPONSE_CACHE_SIZE: int = int(os.getenv("ATTOM_RESPONSE_CACHE_SIZE", "1024"))
+
+# Boundary geometry configuration
+ATTOM_GEOMETRY_CACHE_SIZE: int = int(os.getenv("ATTOM_GEOMETRY_CACHE_SIZE", "256"))
+
+# Longest upstream response body read, in bytes; longer bodies are truncated (0 is unlimited)
+ATTOM_MAX_RESPONSE_BYTES: int = int(os.getenv("ATTOM_MAX_RESPONSE_BYTES", str(16 * 1024 * 1024)))
+
+# Usage ledger: cost of a billed call per endpoint ("default=1,sales_comparables=5"), budgets
+# per UTC day in cost units (0 is unlimited; endpoint budgets as "name=units,...") and days kept
+ATTOM_USAGE_COSTS: str = os.getenv("ATTOM_USAGE_COSTS", "")
+ATTOM_DAILY_BUDGET: float = float(os.getenv("ATTOM_DAILY_BUDGET", "0"))
+ATTOM_SESSION_BUDGET: float = float(os.getenv("ATTOM_SESSION_BUDGET", "0"))
+ATTOM_ENDPOINT_BUDGETS: str = os.getenv("ATTOM_ENDPOINT_BUDGETS", "")
+ATTOM_USAGE_RETENTION_DAYS: int = int(os.getenv("ATTOM_USAGE_RETENTION_DAYS", "31"))
+# Serve /usage in HTTP mode
+ATTOM_USAGE_ROUTE: bool = os.getenv("ATTOM_USAGE_ROUTE", "").lower() in ("1", "true", "yes")
+
+# Watchlist: seconds between checks of a property, changes kept in memory and snapshot requests in flight
+ATTOM_WATCHLIST_INTERVAL: float = float(os.getenv("ATTOM_WATCHLIST_INTERVAL", "21600"))
+ATTOM_WATCHLIST_FEED_SIZE: int = int(os.getenv("ATTOM_WATCHLIST_FEED_SIZE", "10000"))
+ATTOM_WATCHLIST_CONCURRENCY: int = int(os.getenv("ATTOM_WATCHLIST_CONCURRENCY", "8"))
+
+# Server transport configuration (stdio, or http for the streamable HTTP transport)
+MCP_TRANSPORT: str = os.getenv("MCP_TRANSPORT", "stdio")
+MCP_HOST: str = os.getenv("MCP_HOST", "127.0.0.1")
+MCP_PORT: int = int(os.getenv("MCP_PORT", "8000"))
+MCP_HTTP_PATH: str = os.getenv("MCP_HTTP_PATH", "/mcp")
+MCP_WORKERS: int = int(os.getenv("MCP_WORKERS", "1"))
+# Stateless HTTP lets any worker serve any request; it is forced on with several workers
+MCP_STATELESS_HTTP: bool = os.getenv("MCP_STATELESS_HTTP", "").lower() in ("1", "true", "yes")
+# Seconds in-flight HTTP requests get to finish on shutdown or reload
+MCP_GRACEFUL_TIMEOUT: float = float(os.getenv("MCP_GRACEFUL_TIMEOUT", "30"))
+
+# Event loop (asyncio, uvloop or auto) and threads for blocking upstream I/O (0 sizes from the CPU count)
+ATTOM_EVENT_LOOP: str = os.getenv("ATTOM_EVENT_LOOP", "asyncio")
+ATTOM_EXECUTOR_WORKERS: int = int(os.getenv("ATTOM_EXECUTOR_WORKERS", "0"))
+
+# Tool calls in flight and queued, for the whole server and per client session (0 calls is unlimited)
+ATTOM_MAX_CONCURRENT_CALLS: int = int(os.getenv("ATTOM_MAX_CONCURRENT_CALLS", "64"))
+ATTOM_MAX_QUEUED_CALLS: int = int(os.getenv("ATTOM_MAX_QUEUED_CALLS", "512"))
+ATTOM_MAX_SESSION_CALLS: int = int(os.getenv("ATTOM_MAX_SESSION_CALLS", "32"))
+ATTOM_MAX_SESSION_QUEUED: int = int(os.getenv("ATTOM_MAX_SESSION_QUEUED", "256"))
+
+# Metrics file written in stdio mode (empty disables) and seconds between writes
+ATTOM_METRICS_FILE: str = os.getenv("ATTOM_METRICS_FILE", "")
+ATTOM_METRICS_INTERVAL: float = float(os.getenv("ATTOM_METRICS_INTERVAL", "15"))
+# Serve /metrics in HTTP mode
+ATTOM_METRICS_ROUTE: bool = os.getenv("ATTOM_METRICS_ROUTE", "").lower() in ("1", "true", "yes")
+
+# Trace exporter (console, otlp or file:<path>; empty disables tracing) and service name
+ATTOM_TRACE_EXPORTER: str = os.getenv("ATTOM_TRACE_EXPORTER", "")
+ATTOM_TRACE_SERVICE_NAME: str = os.getenv("ATTOM_TRACE_SERVICE_NAME", "mcp-server-attom")
+
+# On-demand profiling: default session length, sampling interval (seconds), output
+# directory (empty uses ATTOM_CACHE_DIR/profiles, then the temp directory) and the HTTP route
+ATTOM_PROFILE_SECONDS: float = float(os.getenv("ATTOM_PROFILE_SECONDS", "30"))
+ATTOM_PROFILE_INTERVAL: float = float(os.getenv("ATTOM_PROFILE_INTERVAL", "0.005"))
+ATTOM_PROFILE_DIR: str = os.getenv("ATTOM_PROFILE_DIR", "")
+ATTOM_PROFILE_ROUTE: bool = os.getenv("ATTOM_PROFILE_ROUTE", "").lower() in ("1", "true", "yes")
+
+# Bearer token the /metrics, /usage and /debug/profile routes require (empty requires none)
+ATTOM_ROUTE_TOKEN: str = os.getenv("ATTOM_ROUTE_TOKEN", "")
+
+# Import tool modules on first call instead of at start-up
+ATTOM_LAZY_TOOLS: bool = os.getenv("ATTOM_LAZY_TOOLS", "true").lower() in ("1", "true", "yes")
+
+# Comma-separated tool profiles to expose (all, property, area)
+ATTOM_TOOL_PROFILE: str = os.getenv("ATTOM_TOOL_PROFILE", "all")
+
 # Logging configuration
 LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
 LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")
+# Fraction of debug and info events kept, with per-event overrides as "event=rate,..."
+LOG_SAMPLE_RATE: float = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+LOG_SAMPLE_RATES: str = os.getenv("LOG_SAMPLE_RATES", "")
+# Log lines buffered for the background writer (0 writes synchronously)
+LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
 
 # In server.py we'll check for the API key when actually running the server
 # But we don't validate here to allow tests to run without an API key
@@ -0,0 +1,348 @@
+"""Declarative registry of the ATTOM API endpoints used by the tools.
+
+Each endpoint's path, API prefix and query parameters are generated from
+the Postman collection in ``docs/attom-api.json`` into
+``endpoint_registry.json``. The tool name, cache class and any parameter
+aliases come from the ``TOOLS`` table below.
+
+Every request goes through ``fetch_endpoint``, which takes the path, prefix
+and cache lifetime from here. The property, assessment, event, sale,
+valuation and misc tools also build their query parameters from it with
+``call_endpoint``; the area, POI, school and community tools build their own,
+as they validate location options and answer from local indexes first.
+
+Regenerate the registry after updating the collection or ``TOOLS`` with::
+
+    python -m src.endpoints
+"""
+
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+REGISTRY_VERSION = 1
+REGISTRY_PATH = os.path.join(os.path.dirname(__file__), "endpoint_registry.json")
+COLLECTION_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "docs", "attom-api.json")
+
+# Collection variables naming the API prefix of a path; other paths are relative to the host
+PREFIX_VARIABLES = {
+    "{{PROP_API_PREFIX}}": "prop",
+    "{{DLP_V2_PREFIX}}": "dlp_v2",
+    "{{DLP_V3_PREFIX}}": "dlp_v3",
+}
+
+# Seconds a response of each cache class may be reused (None disables caching)
+CACHE_TTLS: Dict[str, Optional[float]] = {
+    "reference": 30 * 86400.0,
+    "daily": 86400.0,
+    "volatile": 3600.0,
+    "none": None,
+}
+
+# Query parameters that identify a single property
+PROPERTY_IDENTIFIER_PARAMS = {"attomid", "address", "address1", "address2", "fips", "apn"}
+
+# Tool name -> (collection path, cache class, extra options)
+TOOLS: Dict[str, Tuple[str, str, Dict[str, Any]]] = {
+    # Property
+    "property_address": ("property/address", "daily", {}),
+    "property_detail": ("property/detail", "daily", {}),
+    "property_basic_profile": ("property/basicprofile", "daily", {}),
+    "property_expanded_profile": ("property/expandedprofile", "daily", {}),
+    "property_detail_with_schools": ("property/detailwithschools", "daily", {}),
+    "property_basic_history": ("saleshistory/basichistory", "daily", {}),
+    "property_building_permits": ("property/buildingpermits", "daily", {}),
+    "property_detail_mortgage": ("property/detailmortgage", "daily", {}),
+    "property_detail_owner": ("property/detailowner", "daily", {}),
+    "property_detail_mortgage_owner": ("property/detailmortgageowner", "daily", {}),
+    "property_expanded_history": ("saleshistory/expandedhistory", "daily", {}),
+    "building_permits": ("property/BuildingPermits", "daily", {}),
+    "property_id_search_sort": ("property/id", "volatile", {"identifier": "property"}),
+    "property_snapshot": ("property/snapshot", "daily", {}),
+    # Assessment
+    "assessment_detail": ("assessment/detail", "daily", {}),
+    "assessment_snapshot": ("assessment/snapshot", "daily", {}),
+    "assessment_history_detail": ("assessmenthistory/detail", "daily", {}),
+    # Events
+    "all_events_detail": ("allevents/detail", "volatile", {}),
+    "all_events_snapshot": ("allevents/snapshot", "volatile", {}),
+    # Sales
+    "sale_detail": ("sale/detail", "daily", {}),
+    "sale_snapshot": ("sale/snapshot", "daily", {}),
+    "sales_history_detail": ("saleshistory/detail", "daily", {}),
+    "sales_history_snapshot": ("saleshistory/snapshot", "daily", {}),
+    "sales_comparables": (
+        "salescomparables/propid/{{AttomID}}",
+        "daily",
+        {
+            "templates": {
+                "attom_id": "salescomparables/propid/{attom_id}",
+                "address": "salescomparables/address/{street}/{city}/{county}/{state}/{zip}",
+            }
+        },
+    ),
+    # Valuation
+    "avm_detail": ("avm/detail", "daily", {}),
+    "avm_snapshot": ("avm/snapshot", "daily", {}),
+    "avm_history_detail": ("avmhistory/detail", "daily", {}),
+    "attom_avm_detail": ("attomavm/detail", "daily", {}),
+    "home_equity": ("valuation/homeequity", "daily", {}),
+    "rental_avm": ("valuation/rentalavm", "daily", {}),
+    # Misc
+    "enumerations_detail": ("enumerations/Detail", "reference", {}),
+    "transportation_noise": ("transportationnoise", "reference", {}),
+    "preforeclosure_details": (
+        "preforeclosuredetails",
+        "volatile",
+        {"identifier": "property", "aliases": {"address": "combinedAddress"}},
+    ),
+    # Area
+    "boundary_detail": ("areaapi/area/boundary/detail", "reference", {}),
+    "hierarchy_lookup": ("areaapi/area/hierarchy/lookup", "reference", {}),
+    "state_lookup": ("areaapi/area/state/lookup", "reference", {}),
+    "county_lookup": ("areaapi/area/county/lookup", "reference", {}),
+    "cbsa_lookup": ("areaapi/area/cbsa/lookup", "reference", {}),
+    "geoid_lookup": ("areaapi/area/geoid/lookup", "reference", {}),
+    "geocode_legacy_lookup": ("areaapi/area/geoId/legacyLookup", "reference", {}),
+    "location_lookup": ("v4/location/lookup", "reference", {}),
+    # POI
+    "poi_search": ("v4/neighborhood/poi", "daily", {}),
+    "poi_category_lookup": ("v4/neighborhood/poi/categorylookup", "reference", {}),
+    # Community
+    "neighborhood_community": ("v4.0.0/neighborhood/community", "daily", {}),
+    # Schools
+    "school_profile": ("v4/school/profile", "daily", {}),
+    "school_district": ("v4/school/district", "daily", {}),
+    "school_search": ("v4/school/search", "daily", {}),
+}
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    """One ATTOM API endpoint as called by a tool."""
+
+    name: str
+    path: str
+    prefix: str
+    params: Tuple[str, ...]
+    cache_class: str
+    identifier: Optional[str] = None
+    aliases: Dict[str, str] = field(default_factory=dict)
+    templates: Dict[str, str] = field(default_factory=dict)
+
+    def api_prefix(self, client: Any) -> str:
+        """API prefix to pass to ``client`` ("" for host-relative paths)."""
+        return {
+            "prop": client.prop_api_prefix,
+            "dlp_v2": client.dlp_v2_prefix,
+            "dlp_v3": client.dlp_v3_prefix,
+        }.get(self.prefix, "")
+
+    @property
+    def ttl(self) -> Optional[float]:
+        """Seconds a response may be reused, or None if not cacheable."""
+        return CACHE_TTLS[self.cache_class]
+
+    def build_params(self, params: BaseModel) -> Dict[str, Any]:
+        """Map a tool's parameter model onto this endpoint's query parameters.
+
+        Property identifiers are sent one method at a time, in order of
+        precedence, under their usual names unless the endpoint aliases them.
+        Other model fields match query parameters case-insensitively with
+        underscores removed (``page_size`` -> ``pageSize``).
+
+        Args:
+            params: Tool parameter model
+
+        Returns:
+            Query parameters without empty values
+        """
+        values = {k: v for k, v in params.model_dump(exclude_none=True).items() if v != ""}
+        request_params: Dict[str, Any] = {}
+        for name in _property_identifier(values):
+            request_params[self.aliases.get(name, _IDENTIFIER_PARAMS[name])] = values[name]
+        by_key = {_normalize(name): name for name in self.params}
+        for name, value in values.items():
+            if name in _IDENTIFIER_PARAMS:
+                continue
+            key = self.aliases.get(name) or by_key.get(_normalize(name))
+            if key is not None and key not in request_params:
+                request_params[key] = value
+        return request_params
+
+
+# Property identifier fields and the query parameters they are usually sent as
+_IDENTIFIER_PARAMS = {
+    "attom_id": "AttomID",
+    "address": "address",
+    "address1": "address1",
+    "address2": "address2",
+    "fips": "fips",
+    "apn": "apn",
+}
+
+
+def _property_identifier(values: Dict[str, Any]) -> Tuple[str, ...]:
+    """Pick the identification method used from a property identifier."""
+    if values.get("attom_id"):
+        return ("attom_id",)
+    if values.get("address"):
+        return ("address",)
+    if values.get("address1") and values.get("address2"):
+        return ("address1", "address2")
+    if values.get("fips") and values.get("apn"):
+        return ("fips", "apn")
+    return ()
+
+
+def _normalize(name: str) -> str:
+    """Normalize a field or query parameter name for matching."""
+    return name.replace("_", "").lower()
+
+
+def _walk_requests(items: List[Dict[str, Any]]):
+    """Yield every request of a Postman collection."""
+    for item in items:
+        if "item" in item:
+            yield from _walk_requests(item["item"])
+        elif "request" in item:
+            yield item["request"]
+
+
+def _split_url(raw: str) -> Tuple[str, str]:
+    """Split a collection URL into (prefix kind, path)."""
+    path = raw.split("?")[0].replace("{{HOST_URL}}", "")
+    prefix = "root"
+    for variable, kind in PREFIX_VARIABLES.items():
+        if path.startswith(variable):
+            prefix, path = kind, path[len(variable) :]
+    return prefix, path.strip("/")
+
+
+def generate_registry(collection: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the endpoint registry from a Postman collection.
+
+    Args:
+        collection: Decoded Postman collection
+
+    Returns:
+        Registry with one entry per tool in ``TOOLS``
+
+    Raises:
+        ValueError: If a tool's path is not in the collection
+    """
+    found: Dict[str, Dict[str, Any]] = {}
+    for request in _walk_requests(collection["item"]):
+        url = request.get("url")
+        raw = url.get("raw", "") if isinstance(url, dict) else str(url or "")
+        prefix, path = _split_url(raw)
+        entry = found.setdefault(path, {"prefix": prefix, "params": []})
+        for query in url.get("query", []) if isinstance(url, dict) else []:
+            key = query.get("key")
+            if key and key != "None" and _normalize(key) not in {_normalize(p) for p in entry["params"]}:
+                entry["params"].append(key)
+
+    endpoints = []
+    for name, (path, cache_class, options) in TOOLS.items():
+        if path not in found:
+            raise ValueError(f"Endpoint {path} for tool {name} is not in the collection")
+        entry = found[path]
+        params = entry["params"]
+        normalized = {_normalize(p) for p in params}
+        identifier = options.get("identifier")
+        if "templates" in options:
+            identifier = "path"
+        elif normalized & PROPERTY_IDENTIFIER_PARAMS and normalized <= PROPERTY_IDENTIFIER_PARAMS | {
+            "latitude",
+            "longitude",
+        }:
+            identifier = "property"
+        endpoints.append(
+            {
+                "name": name,
+                "path": path.split("/{{")[0] if "templates" in options else path,
+                "prefix": entry["prefix"],
+                "params": params,
+                "identifier": identifier,
+                "cache_class": cache_class,
+                **{key: value for key, value in options.items() if key != "identifier"},
+            }
+        )
+    return {"version": REGISTRY_VERSION, "endpoints": endpoints}
+
+
+def load_registry(path: str = REGISTRY_PATH) -> Dict[str, Endpoint]:
+    """Load the generated registry, keyed by tool name."""
+    with open(path, encoding="utf-8") as f:
+        registry = json.load(f)
+    if registry.get("version") != REGISTRY_VERSION:
+        raise ValueError(f"Unsupported endpoint registry version in {path}; run python -m src.endpoints")
+    return {
+        entry["name"]: Endpoint(
+            name=entry["name"],
+            path=entry["path"],
+            prefix=entry["prefix"],
+            params=tuple(entry["params"]),
+            cache_class=entry["cache_class"],
+            identifier=entry.get("identifier"),
+            aliases=entry.get("aliases", {}),
+            templates=entry.get("templates", {}),
+        )
+        for entry in registry["endpoints"]
+    }
+
+
+_registry: Optional[Dict[str, Endpoint]] = None
+
+
+def get_endpoint(name: str) -> Endpoint:
+    """Get a tool's endpoint, loading the registry on first use."""
+    global _registry
+    if _registry is None:
+        _registry = load_registry()
+    return _registry[name]
+
+
+_STREET_LINE = re.compile(r"^\s*(?P<city>[^,]+),\s*(?P<state>[A-Za-z]{2})\s*(?P<zip>\d{5})?")
+
+
+def template_path(endpoint: Endpoint, params: BaseModel) -> Optional[str]:
+    """Fill a path-parameter endpoint's template from a property identifier.
+
+    Returns:
+        Endpoint path, or None if the identifier can't fill any template
+    """
+    values = params.model_dump(exclude_none=True)
+    if values.get("attom_id") and "attom_id" in endpoint.templates:
+        return endpoint.templates["attom_id"].format(attom_id=values["attom_id"])
+    street, rest = values.get("address1"), values.get("address2")
+    if not (street and rest) and values.get("address") and "," in values["address"]:
+        street, rest = (part.strip() for part in values["address"].split(",", 1))
+    match = _STREET_LINE.match(rest or "")
+    if street and match and "address" in endpoint.templates:
+        return endpoint.templates["address"].format(
+            street=street.strip(),
+            city=match["city"].strip(),
+            county="-",
+            state=match["state"],
+            zip=match["zip"] or "-",
+        )
+    return None
+
+
+def main() -> None:
+    """Regenerate the endpoint registry from the Postman collection."""
+    with open(COLLECTION_PATH, encoding="utf-8") as f:
+        registry = generate_registry(json.load(f))
+    with open(REGISTRY_PATH, "w", encoding="utf-8") as f:
+        json.dump(registry, f, indent=1)
+        f.write("\n")
+    print(f"Wrote {len(registry['endpoints'])} endpoints to {REGISTRY_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""Geographic helpers shared by the local analytics and caching layers.
+
+This module provides distance calculations that work on scalars and NumPy
+arrays alike, geohash encoding for cell-keyed caches, and GeoJSON polygon
+simplification, bounding boxes and centroids.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+EARTH_RADIUS_MILES = 3958.7613
+
+Number = Union[float, np.ndarray]
+
+
+def haversine_miles(lat1: Number, lon1: Number, lat2: Number, lon2: Number) -> Number:
+    """Great-circle distance in miles between two points or arrays of points.
+
+    Args:
+        lat1: Latitude(s) of the first point(s) in degrees
+        lon1: Longitude(s) of the first point(s) in degrees
+        lat2: Latitude(s) of the second point(s) in degrees
+        lon2: Longitude(s) of the second point(s) in degrees
+
+    Returns:
+        Distance(s) in miles, broadcast over the inputs
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(value) for value in (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2.0) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2
+    )
+    return 2.0 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int = 5) -> str:
+    """Encode a point as a geohash.
+
+    Args:
+        latitude: Latitude in degrees
+        longitude: Longitude in degrees
+        precision: Number of geohash characters
+
+    Returns:
+        Geohash string
+    """
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        bounds, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (bounds[0] + bounds[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_GEOHASH_BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def geohash_bbox(code: str) -> Tuple[float, float, float, float]:
+    """Decode a geohash to its cell bounds.
+
+    Args:
+        code: Geohash string
+
+    Returns:
+        Tuple of (min_lat, min_lon, max_lat, max_lon)
+    """
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in code:
+        value = _GEOHASH_BASE32.index(char)
+        for shift in range(4, -1, -1):
+            bounds = lon_range if even else lat_range
+            middle = (bounds[0] + bounds[1]) / 2
+            if value >> shift & 1:
+                bounds[0] = middle
+            else:
+                bounds[1] = middle
+            even = not even
+    return lat_range[0], lon_range[0], lat_range[1], lon_range[1]
+
+
+def geohash_neighbors(code: str) -> List[str]:
+    """Get a geohash cell and its (up to) eight neighbors at the same precision."""
+    min_lat, min_lon, max_lat, max_lon = geohash_bbox(code)
+    height, width = max_lat - min_lat, max_lon - min_lon
+    center_lat, center_lon = (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+    cells = []
+    for d_lat in (-height, 0.0, height):
+        latitude = center_lat + d_lat
+        if not -90.0 < latitude < 90.0:
+            continue
+        for d_lon in (-width, 0.0, width):
+            longitude = (center_lon + d_lon + 180.0) % 360.0 - 180.0
+            cell = geohash_encode(latitude, longitude, len(code))
+            if cell not in cells:
+                cells.append(cell)
+    return cells
+
+
+def zoom_tolerance(zoom: int) -> float:
+    """Simplification tolerance in degrees of one 256px tile pixel at a web map zoom level."""
+    return 360.0 / (256 * 2 ** zoom)
+
+
+def _douglas_peucker(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """Mask of the vertices kept by Douglas-Peucker line simplification."""
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        segment = points[end] - points[start]
+        offsets = points[start + 1 : end] - points[start]
+        length = np.hypot(segment[0], segment[1])
+        if length == 0.0:
+            # Closed ring: measure from the shared start/end vertex
+            distance = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            distance = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / length
+        farthest = int(np.argmax(distance))
+        if distance[farthest] > tolerance:
+            index = start + 1 + farthest
+            keep[index] = True
+            stack.append((start, index))
+            stack.append((index, end))
+    return keep
+
+
+def simplify_ring(ring: List[List[float]], tolerance: float, precision: Optional[int] = None) -> List[List[float]]:
+    """Simplify a closed linear ring without collapsing it.
+
+    Vertices within ``tolerance`` of the simplified outline are dropped with
+    the Douglas-Peucker algorithm, but at least four vertices (a closed
+    triangle) are always kept so that every ring and hole survives.
+
+    Args:
+        ring: Ring coordinates as [x, y] pairs, first equal to last
+        tolerance: Maximum deviation in coordinate units (degrees)
+        precision: Decimal places to round coordinates to
+
+    Returns:
+        Simplified ring coordinates
+    """
+    points = np.asarray(ring, dtype=np.float64)[:, :2]
+    if len(points) > 4 and tolerance > 0:
+        keep = _douglas_peucker(points, tolerance)
+        if keep.sum() < 4:
+            keep[np.linspace(0, len(points) - 1, 4).astype(int)] = True
+        points = points[keep]
+    if precision is not None:
+        points = np.round(points, precision)
+        # Rounding can make neighbors coincide; drop repeats but keep the ring closed
+        distinct = np.concatenate(([True], np.any(points[1:] != points[:-1], axis=1)))
+        if distinct.sum() >= 4:
+            points = points[distinct]
+    return points.tolist()
+
+
+def _polygons(geometry: Dict[str, Any]) -> List[Any]:
+    """Get the polygons of a Polygon or MultiPolygon geometry."""
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    return geometry["coordinates"]
+
+
+def simplify_geometry(geometry: Dict[str, Any], tolerance: float, precision: Optional[int] = None) -> Dict[str, Any]:
+    """Simplify every ring of a GeoJSON Polygon or MultiPolygon.
+
+    Args:
+        geometry: GeoJSON Polygon or MultiPolygon
+        tolerance: Maximum deviation in degrees
+        precision: Decimal places to round coordinates to
+
+    Returns:
+        New geometry of the same type
+    """
+    polygons = [
+        [simplify_ring(ring, tolerance, precision) for ring in polygon if len(ring) >= 4]
+        for polygon in _polygons(geometry)
+    ]
+    coordinates = polygons[0] if geometry["type"] == "Polygon" else polygons
+    return {"type": geometry["type"], "coordinates": coordinates}
+
+
+def geometry_bbox(geometry: Dict[str, Any]) -> Tuple[float, float, float, float]:
+    """Bounding box of a GeoJSON Polygon or MultiPolygon.
+
+    Returns:
+        Tuple of (min_lon, min_lat, max_lon, max_lat)
+    """
+    points = np.concatenate(
+        [np.asarray(polygon[0], dtype=np.float64)[:, :2] for polygon in _polygons(geometry)]
+    )
+    min_x, min_y = points.min(axis=0)
+    max_x, max_y = points.max(axis=0)
+    return float(min_x), float(min_y), float(max_x), float(max_y)
+
+
+def geometry_centroid(geometry: Dict[str, Any]) -> Tuple[float, float]:
+    """Area-weighted centroid of a GeoJSON Polygon or MultiPolygon.
+
+    Holes are subtracted. Degenerate geometries fall back to the mean of the
+    outer ring vertices.
+
+    Returns:
+        Tuple of (longitude, latitude)
+    """
+    total_area = sum_x = sum_y = 0.0
+    for polygon in _polygons(geometry):
+        for index, ring in enumerate(polygon):
+            points = np.asarray(ring, dtype=np.float64)[:, :2]
+            x, y = points[:, 0], points[:, 1]
+            x1, y1 = np.roll(x, -1), np.roll(y, -1)
+            cross = x * y1 - x1 * y
+            area = cross.sum() / 2.0
+            # Outer rings add area and holes remove it, whatever their winding
+            sign = 1.0 if index == 0 else -1.0
+            weight = sign * abs(area)
+            if area != 0.0:
+                total_area += weight
+                sum_x += weight * ((x + x1) * cross).sum() / (6.0 * area)
+                sum_y += weight * ((y + y1) * cross).sum() / (6.0 * area)
+    if total_area == 0.0:
+        points = np.concatenate(
+            [np.asarray(polygon[0], dtype=np.float64)[:, :2] for polygon in _polygons(geometry)]
+        )
+        return float(points[:, 0].mean()), float(points[:, 1].mean())
+    return sum_x / total_area, sum_y / total_area
+
+
+GEOMETRY_OUTPUTS = ("full", "bbox", "centroid")
+
+
+def shape_geometry(
+    geometry: Dict[str, Any],
+    output: str = "full",
+    tolerance: Optional[float] = None,
+    precision: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Reduce a polygon geometry to a simplified shape, bounding box or centroid.
+
+    Args:
+        geometry: GeoJSON Polygon or MultiPolygon
+        output: One of ``GEOMETRY_OUTPUTS``
+        tolerance: Simplification tolerance in degrees for full output
+        precision: Decimal places to round coordinates to
+
+    Returns:
+        GeoJSON Polygon (with a ``bbox`` member for bbox output), Point or
+        simplified geometry of the input type
+    """
+
+    def rounded(value: float) -> float:
+        return round(value, precision) if precision is not None else value
+
+    if output == "bbox":
+        min_x, min_y, max_x, max_y = (rounded(v) for v in geometry_bbox(geometry))
+        return {
+            "type": "Polygon",
+            "bbox": [min_x, min_y, max_x, max_y],
+            "coordinates": [[[min_x, min_y], [max_x, min_y], [max_x, max_y], [min_x, max_y], [min_x, min_y]]],
+        }
+    if output == "centroid":
+        x, y = geometry_centroid(geometry)
+        return {"type": "Point", "coordinates": [rounded(x), rounded(y)]}
+    return simplify_geometry(geometry, tolerance or 0.0, precision)
@@ -0,0 +1,247 @@
+"""Server lifecycle: draining in-flight tool calls and orderly shutdown.
+
+Tool calls are tracked by ``DrainMiddleware``. On shutdown the server stops
+accepting new calls, waits up to ``MCP_GRACEFUL_TIMEOUT`` seconds for the
+calls in flight, then runs the registered shutdown hooks (flushing caches,
+closing connection pools) in reverse order of registration.
+
+Over stdio, ``run_stdio`` drains when stdin closes or on SIGTERM, before
+the session ends, so responses to calls in flight are still delivered.
+Over HTTP, uvicorn drains open requests and the lifespan runs the hooks.
+"""
+
+import asyncio
+import inspect
+import json
+import os
+import signal
+import sys
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Set
+
+import anyio
+import structlog
+from fastmcp import FastMCP
+from fastmcp.exceptions import ToolError
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+from src import config
+
+# Configure logging
+logger = structlog.get_logger(__name__)
+
+# Seconds between checks for idle while draining
+DRAIN_POLL_INTERVAL = 0.05
+
+
+class Lifecycle:
+    """Tracks in-flight tool calls and runs shutdown hooks."""
+
+    def __init__(self):
+        self.accepting = True
+        self.in_flight = 0
+        self._hooks: List[Callable[[], Any]] = []
+
+    def on_shutdown(self, hook: Callable[[], Any]) -> Callable[[], Any]:
+        """Register a sync or async function to run on shutdown.
+
+        Hooks run in reverse order of registration, so a component is torn
+        down before the components it was built on. Hooks must leave their
+        component usable again, as in-process servers can be restarted.
+        """
+        if hook not in self._hooks:
+            self._hooks.append(hook)
+        return hook
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        """Count a call as in flight.
+
+        Raises:
+            ToolError: If the server is draining
+        """
+        if not self.accepting:
+            raise ToolError("Server is shutting down; retry the call")
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+    async def drain(self, timeout: float = config.MCP_GRACEFUL_TIMEOUT) -> int:
+        """Stop accepting calls and wait for the calls in flight.
+
+        Args:
+            timeout: Seconds to wait
+
+        Returns:
+            Number of calls still in flight when the deadline passed
+        """
+        self.accepting = False
+        if self.in_flight:
+            logger.info("Draining in-flight calls", in_flight=self.in_flight, timeout=timeout)
+        deadline = time.monotonic() + timeout
+        while self.in_flight and time.monotonic() < deadline:
+            await asyncio.sleep(DRAIN_POLL_INTERVAL)
+        if self.in_flight:
+            logger.warning("Shutdown deadline passed with calls in flight", in_flight=self.in_flight)
+        return self.in_flight
+
+    async def shutdown(self, timeout: float = config.MCP_GRACEFUL_TIMEOUT) -> None:
+        """Drain, then run the shutdown hooks; errors are logged, not raised."""
+        await self.drain(timeout)
+        for hook in reversed(self._hooks):
+            try:
+                result = hook()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error("Shutdown hook failed", hook=getattr(hook, "__qualname__", repr(hook)), error=str(e))
+
+    def reset(self) -> None:
+        """Accept calls again, for a server that is starting (or restarting)."""
+        self.accepting = True
+
+
+class DrainMiddleware(Middleware):
+    """Rejects tool calls while draining and counts the calls in flight."""
+
+    def __init__(self, lifecycle: Lifecycle):
+        self.lifecycle = lifecycle
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: Callable) -> Any:
+        with self.lifecycle.track():
+            return await call_next(context)
+
+
+# Create a singleton lifecycle shared by the server and its components
+lifecycle = Lifecycle()
+
+
+@asynccontextmanager
+async def server_lifespan(server: FastMCP) -> AsyncIterator[Dict[str, Any]]:
+    """FastMCP lifespan that drains and runs the shutdown hooks on exit."""
+    lifecycle.reset()
+    try:
+        yield {}
+    finally:
+        await lifecycle.shutdown(config.MCP_GRACEFUL_TIMEOUT)
+
+
+async def _drain_requests(pending: Set[Any], timeout: float) -> None:
+    """Wait until every relayed request has been answered, or ``timeout`` passes."""
+    if pending:
+        logger.info("Draining unanswered requests", pending=len(pending), timeout=timeout)
+    deadline = time.monotonic() + timeout
+    while pending and time.monotonic() < deadline:
+        await asyncio.sleep(DRAIN_POLL_INTERVAL)
+
+
+def _message_id(line: str, key: str) -> Optional[Any]:
+    """Id of a JSON-RPC message line that has ``key`` (``method`` or ``result``/``error``)."""
+    try:
+        message = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(message, dict) or "id" not in message:
+        return None
+    if key == "method":
+        return message["id"] if "method" in message else None
+    return message["id"] if "result" in message or "error" in message else None
+
+
+async def run_stdio(server: FastMCP, timeout: Optional[float] = None, show_banner: Optional[bool] = None) -> None:
+    """Serve over stdio, draining calls in flight before the session ends.
+
+    Runs ``FastMCP.run_stdio_async`` on pipes standing in for stdin and
+    stdout, and relays the real streams through them, so that when stdin
+    closes (or SIGTERM arrives) the server's input stays open until every
+    request received has been answered or ``timeout`` passes.
+
+    Args:
+        server: Server to run
+        timeout: Seconds to drain (default: ``MCP_GRACEFUL_TIMEOUT``)
+        show_banner: Whether to print the FastMCP banner (default: FastMCP setting)
+    """
+    import fastmcp
+
+    timeout = config.MCP_GRACEFUL_TIMEOUT if timeout is None else timeout
+    if show_banner is None:
+        show_banner = fastmcp.settings.show_server_banner
+
+    stdin, stdout = sys.stdin, sys.stdout
+    in_read, in_write = os.pipe()
+    out_read, out_write = os.pipe()
+    server_input = os.fdopen(in_write, "wb")
+    server_output = os.fdopen(out_read, "r", encoding="utf-8")
+    sys.stdin = os.fdopen(in_read, "r", encoding="utf-8")
+    sys.stdout = os.fdopen(out_write, "w", encoding="utf-8")
+    pending: Set[Any] = set()
+    stopping = anyio.Event()
+    flushed = anyio.Event()
+
+    def forward(data: bytes) -> None:
+        server_input.write(data)
+        server_input.flush()
+
+    async def relay_input() -> None:
+        try:
+            while True:
+                line = await anyio.to_thread.run_sync(stdin.buffer.readline, abandon_on_cancel=True)
+                if not line:
+                    return
+                request = _message_id(line.decode("utf-8", errors="replace"), "method")
+                if request is not None:
+                    pending.add(request)
+                await anyio.to_thread.run_sync(forward, line)
+        finally:
+            stopping.set()
+
+    async def relay_output() -> None:
+        try:
+            while True:
+                line = await anyio.to_thread.run_sync(server_output.readline, abandon_on_cancel=True)
+                if not line:
+                    return
+                pending.discard(_message_id(line, "result"))
+                stdout.write(line)
+                stdout.flush()
+        finally:
+            flushed.set()
+
+    async def close_input() -> None:
+        await stopping.wait()
+        await _drain_requests(pending, timeout)
+        await lifecycle.drain(timeout)
+        # End of input ends the session
+        server_input.close()
+
+    async def stop_on_sigterm() -> None:
+        with anyio.open_signal_receiver(signal.SIGTERM) as signals:
+            async for _ in signals:
+                logger.info("Received SIGTERM")
+                stopping.set()
+                return
+
+    try:
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(relay_input)
+            tg.start_soon(relay_output)
+            tg.start_soon(close_input)
+            if sys.platform != "win32":
+                tg.start_soon(stop_on_sigterm)
+            try:
+                await server.run_stdio_async(show_banner=show_banner)
+            finally:
+                sys.stdout.close()
+            # Deliver the last responses before the relays are cancelled
+            with anyio.move_on_after(timeout):
+                await flushed.wait()
+            tg.cancel_scope.cancel()
+    finally:
+        sys.stdin.close()
+        sys.stdin, sys.stdout = stdin, stdout
+        if not server_input.closed:
+            server_input.close()
+        server_output.close()
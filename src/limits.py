@@ -0,0 +1,282 @@
+"""Per-session and global concurrency limits for tool calls.
+
+``ConcurrencyMiddleware`` caps the tool calls in flight for each client
+session (or client, for stateless HTTP) and for the whole server. Calls over a cap wait in a FIFO queue;
+when the queue is full the call is rejected at once with a "busy" error, so
+one runaway client cannot starve the connection pool for everyone else.
+A session waits in its own queue before it joins the global one.
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Optional
+
+import structlog
+from fastmcp.exceptions import ToolError
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+from src import config, metrics, tracing
+
+# Configure logging
+logger = structlog.get_logger(__name__)
+
+# Session key for calls made outside an MCP session
+DEFAULT_SESSION = "default"
+
+
+class ServerBusyError(ToolError):
+    """Raised when a call would exceed a full queue."""
+
+
+class ConcurrencyLimit:
+    """Caps calls in flight, queueing a bounded number of waiting calls."""
+
+    def __init__(self, name: str, limit: int, max_queue: int):
+        """Initialize the limit.
+
+        Args:
+            name: Name used in errors and stats
+            limit: Maximum calls in flight (0 or less is unlimited)
+            max_queue: Maximum calls waiting for a slot
+        """
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.queued = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of calls waiting for a slot."""
+        return len(self._waiters)
+
+    @property
+    def idle(self) -> bool:
+        """Whether no call holds or waits for a slot."""
+        return not self.in_flight and not self._waiters
+
+    async def acquire(self) -> float:
+        """Take a slot, waiting in the queue if none is free.
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            ServerBusyError: If no slot is free and the queue is full
+        """
+        if self.limit <= 0 or (self.in_flight < self.limit and not self._waiters):
+            self.in_flight += 1
+            self.admitted += 1
+            return 0.0
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise ServerBusyError(
+                f"Server busy: {self.name} has {self.in_flight} calls in flight and "
+                f"{len(self._waiters)} queued; retry later"
+            )
+
+        start = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        try:
+            await waiter
+        except BaseException:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            elif waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait was cancelled
+                self.release()
+            raise
+        waited = time.monotonic() - start
+        self.admitted += 1
+        self.wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        return waited
+
+    def release(self) -> None:
+        """Free a slot, handing it to the longest-waiting call."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Current load and totals since start-up."""
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "mean_wait_ms": round(self.wait_seconds / self.queued * 1000, 3) if self.queued else 0.0,
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+        }
+
+
+class ConcurrencyLimiter:
+    """A global limit plus one limit per client session."""
+
+    def __init__(
+        self,
+        max_calls: int = config.ATTOM_MAX_CONCURRENT_CALLS,
+        max_queued: int = config.ATTOM_MAX_QUEUED_CALLS,
+        max_session_calls: int = config.ATTOM_MAX_SESSION_CALLS,
+        max_session_queued: int = config.ATTOM_MAX_SESSION_QUEUED,
+    ):
+        self.max_session_calls = max_session_calls
+        self.max_session_queued = max_session_queued
+        self.total = ConcurrencyLimit("server", max_calls, max_queued)
+        self.sessions: Dict[str, ConcurrencyLimit] = {}
+        self.rejected_sessions = 0
+
+    def session(self, session_id: str) -> ConcurrencyLimit:
+        """Get the limit of a session, creating it on first use."""
+        limit = self.sessions.get(session_id)
+        if limit is None:
+            limit = ConcurrencyLimit(f"session {session_id}", self.max_session_calls, self.max_session_queued)
+            self.sessions[session_id] = limit
+        return limit
+
+    @asynccontextmanager
+    async def slot(self, session_id: str = DEFAULT_SESSION) -> AsyncIterator[float]:
+        """Hold a session slot and a global slot for the duration of a call.
+
+        Yields:
+            Seconds spent queueing
+
+        Raises:
+            ServerBusyError: If the session's or the server's queue is full
+        """
+        session = self.session(session_id)
+        try:
+            waited = await session.acquire()
+        except ServerBusyError:
+            self.rejected_sessions += 1
+            self._forget(session_id, session)
+            raise
+        try:
+            waited += await self.total.acquire()
+        except BaseException:
+            session.release()
+            self._forget(session_id, session)
+            raise
+        try:
+            yield waited
+        finally:
+            self.total.release()
+            session.release()
+            self._forget(session_id, session)
+
+    def _forget(self, session_id: str, session: ConcurrencyLimit) -> None:
+        # Idle sessions are dropped so the table only holds active clients
+        if session.idle and self.sessions.get(session_id) is session:
+            del self.sessions[session_id]
+
+    def stats(self) -> Dict[str, Any]:
+        """Global load plus the busiest sessions, keyed by fingerprint so session ids are never exposed."""
+        busiest = sorted(self.sessions.items(), key=lambda item: -(item[1].in_flight + item[1].queue_depth))
+        return {
+            **self.total.stats(),
+            "active_sessions": len(self.sessions),
+            "session_rejected": self.rejected_sessions,
+            "sessions": {fingerprint(session_id): limit.stats() for session_id, limit in busiest[:10]},
+        }
+
+
+def session_key(context: MiddlewareContext) -> str:
+    """Identify the client of a call.
+
+    Streamable HTTP sessions are keyed by their ``mcp-session-id``. Stateless
+    HTTP (several workers) has no sessions, so its calls are keyed by client
+    identity instead: a fingerprint of the ``Authorization`` header, else the
+    ``X-Client-Id`` header, else the peer address. Stdio serves a single
+    client, so its calls share ``DEFAULT_SESSION``.
+    """
+    fastmcp_context = context.fastmcp_context
+    request_context = fastmcp_context.request_context if fastmcp_context is not None else None
+    if request_context is None:
+        return DEFAULT_SESSION
+    connection = getattr(request_context.session, "_connection", None)
+    session_id = getattr(connection, "session_id", None)
+    request = request_context.request
+    if session_id is None and request is not None:
+        session_id = request.headers.get("mcp-session-id")
+        if session_id is None:
+            session_id = _client_identity(request)
+    return session_id or DEFAULT_SESSION
+
+
+def fingerprint(value: str) -> str:
+    """Short digest of a session key or credential, for showing in place of the value."""
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()[:16]
+
+
+def _client_identity(request: Any) -> Optional[str]:
+    """Key of the client sending a sessionless HTTP request."""
+    authorization = request.headers.get("authorization")
+    if authorization:
+        # Never keep the credential itself
+        return "auth:" + fingerprint(authorization)
+    client_id = request.headers.get("x-client-id")
+    if client_id:
+        return f"client:{client_id}"
+    peer = getattr(request, "client", None)
+    host = getattr(peer, "host", None)
+    return f"peer:{host}" if host else None
+
+
+class ConcurrencyMiddleware(Middleware):
+    """Applies a ``ConcurrencyLimiter`` to every tool call."""
+
+    def __init__(self, limiter: ConcurrencyLimiter, slow_wait: Optional[float] = 1.0):
+        """Initialize the middleware.
+
+        Args:
+            limiter: Limits to apply
+            slow_wait: Seconds of queueing above which a warning is logged
+        """
+        self.limiter = limiter
+        self.slow_wait = slow_wait
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: Callable) -> Any:
+        session_id = session_key(context)
+        try:
+            async with self.limiter.slot(session_id) as waited:
+                metrics.queue_wait.observe(waited)
+                if waited:
+                    now = time.time_ns()
+                    tracing.record_interval("attom.queue", now - int(waited * 1e9), now, **{"attom.session": session_id})
+                if self.slow_wait is not None and waited >= self.slow_wait:
+                    logger.warning(
+                        "Tool call queued",
+                        tool=getattr(context.message, "name", None),
+                        session=session_id,
+                        waited_ms=round(waited * 1000, 1),
+                        queue_depth=self.limiter.total.queue_depth,
+                    )
+                return await call_next(context)
+        except ServerBusyError as e:
+            metrics.calls_rejected.inc()
+            logger.warning(
+                "Rejected tool call", tool=getattr(context.message, "name", None), session=session_id, reason=str(e)
+            )
+            raise
+
+
+# Create a singleton limiter shared by the server
+limiter = ConcurrencyLimiter()
+metrics.registry.gauge("attom_tool_calls_in_flight", "Tool calls holding a server slot", lambda: limiter.total.in_flight)
+metrics.registry.gauge("attom_tool_calls_queued", "Tool calls waiting for a server slot", lambda: limiter.total.queue_depth)
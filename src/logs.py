@@ -0,0 +1,231 @@
+"""Logging configuration for the ATTOM MCP Server.
+
+Log lines are rendered by structlog as JSON or console text (``LOG_FORMAT``)
+and written to stderr by a background thread, so a slow or unread stderr
+pipe never blocks the event loop. Debug and info events can be sampled per
+event name, and models bound to a logger are only dumped when an event is
+actually emitted.
+"""
+
+import atexit
+import logging
+import queue
+import sys
+import threading
+from typing import Any, Dict, Optional, TextIO
+
+import structlog
+from pydantic import BaseModel
+
+from src import config
+
+# Levels that are never sampled away
+UNSAMPLED_LEVELS = frozenset({"warning", "warn", "error", "exception", "critical", "fatal"})
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """Parse ``event=rate`` pairs separated by commas.
+
+    Raises:
+        ValueError: If a pair is malformed or a rate is outside 0..1
+    """
+    rates = {}
+    for pair in filter(None, (item.strip() for item in value.split(","))):
+        event, separator, rate = pair.rpartition("=")
+        if not separator or not event.strip():
+            raise ValueError(f"Invalid log sample rate {pair!r}; expected event=rate")
+        rates[event.strip()] = _check_rate(float(rate))
+    return rates
+
+
+def _check_rate(rate: float) -> float:
+    if not 0.0 <= rate <= 1.0:
+        raise ValueError(f"Log sample rate must be between 0 and 1, got {rate}")
+    return rate
+
+
+class EventSampler:
+    """structlog processor keeping a fraction of debug and info events.
+
+    Sampling is deterministic: an event with rate 0.1 is kept once every ten
+    occurrences, starting with the first. Kept events carry ``sampled``, the
+    number of occurrences each one stands for.
+    """
+
+    def __init__(self, default_rate: float = 1.0, rates: Optional[Dict[str, float]] = None):
+        self.default_rate = _check_rate(default_rate)
+        self.rates = {event: _check_rate(rate) for event, rate in (rates or {}).items()}
+        self._counts: Dict[str, int] = {}
+
+    def __call__(self, logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+        if method_name in UNSAMPLED_LEVELS:
+            return event_dict
+        event = event_dict.get("event")
+        rate = self.rates.get(event, self.default_rate)
+        if rate >= 1.0:
+            return event_dict
+        if rate <= 0.0:
+            raise structlog.DropEvent
+        interval = round(1 / rate)
+        count = self._counts.get(event, 0)
+        self._counts[event] = count + 1
+        if count % interval:
+            raise structlog.DropEvent
+        event_dict["sampled"] = interval
+        return event_dict
+
+
+def dump_models(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Dump pydantic models bound to a logger, only for events being emitted."""
+    for key, value in event_dict.items():
+        if isinstance(value, BaseModel):
+            event_dict[key] = value.model_dump(exclude_none=True)
+    return event_dict
+
+
+class QueueSink:
+    """Writes lines to a stream from a background thread.
+
+    ``write`` never blocks: when the queue is full the line is dropped and
+    counted, and the count is reported once the writer catches up.
+    """
+
+    def __init__(self, stream: TextIO, max_size: int = 10000):
+        self.stream = stream
+        self.queue: "queue.Queue[Optional[str]]" = queue.Queue(max_size)
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def write(self, line: str) -> None:
+        """Queue a line for writing."""
+        if self._thread is None:
+            self._start()
+        try:
+            self.queue.put_nowait(line)
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="log-sink", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            line = self.queue.get()
+            if line is None:
+                break
+            try:
+                self.stream.write(line + "\n")
+                if self.dropped and self.queue.empty():
+                    dropped, self.dropped = self.dropped, 0
+                    self.stream.write(f"log sink dropped {dropped} lines\n")
+                if self.queue.empty():
+                    self.stream.flush()
+            except (OSError, ValueError):
+                # The stream was closed under us; keep draining so writers never block
+                pass
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write out the queued lines and stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self.queue.put(None)
+            thread.join(timeout)
+
+
+class QueueLogger:
+    """structlog logger handing rendered lines to a ``QueueSink``."""
+
+    def __init__(self, sink: QueueSink):
+        self._sink = sink
+
+    def msg(self, message: str) -> None:
+        self._sink.write(message)
+
+    log = debug = info = warn = warning = error = critical = exception = fatal = msg
+
+
+class QueueLoggerFactory:
+    """structlog logger factory for ``QueueLogger``."""
+
+    def __init__(self, sink: QueueSink):
+        self.sink = sink
+
+    def __call__(self, *args: Any) -> QueueLogger:
+        return QueueLogger(self.sink)
+
+
+# The active sink, set by configure_logging when logging is queued
+sink: Optional[QueueSink] = None
+
+
+def configure_logging(
+    level: str = config.LOG_LEVEL,
+    fmt: str = config.LOG_FORMAT,
+    sample_rate: float = config.LOG_SAMPLE_RATE,
+    sample_rates: str = config.LOG_SAMPLE_RATES,
+    queue_size: int = config.LOG_QUEUE_SIZE,
+    stream: Optional[TextIO] = None,
+) -> None:
+    """Configure stdlib logging and structlog to write to stderr.
+
+    Args:
+        level: Minimum level (DEBUG, INFO, WARNING, ERROR)
+        fmt: ``json`` for one JSON object per line, or ``console`` for text
+        sample_rate: Fraction of debug and info events kept
+        sample_rates: Per-event overrides, as ``event=rate`` pairs separated by commas
+        queue_size: Lines buffered for the writer thread (0 writes synchronously)
+        stream: Stream to write to (default: stderr)
+
+    Raises:
+        ValueError: If the format or a sample rate is invalid
+    """
+    global sink
+
+    fmt = fmt.lower()
+    if fmt not in ("json", "console"):
+        raise ValueError(f"Unknown log format {fmt!r}; expected json or console")
+    stream = stream or sys.stderr
+    log_level = getattr(logging, level.upper(), logging.INFO)
+    logging.basicConfig(format="%(message)s", stream=stream, level=log_level)
+
+    if sink is not None:
+        sink.close()
+        sink = None
+    if queue_size > 0:
+        sink = QueueSink(stream, queue_size)
+        logger_factory: Any = QueueLoggerFactory(sink)
+    else:
+        logger_factory = structlog.WriteLoggerFactory(file=stream)
+
+    processors: list = [EventSampler(sample_rate, parse_sample_rates(sample_rates)), dump_models]
+    if fmt == "json":
+        processors += [
+            structlog.processors.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.format_exc_info,
+            structlog.processors.JSONRenderer(),
+        ]
+    else:
+        processors += [
+            structlog.processors.add_log_level,
+            structlog.processors.TimeStamper(fmt="%H:%M:%S"),
+            structlog.dev.ConsoleRenderer(colors=stream.isatty()),
+        ]
+
+    structlog.configure(
+        processors=processors,
+        wrapper_class=structlog.make_filtering_bound_logger(log_level),
+        logger_factory=logger_factory,
+        cache_logger_on_first_use=True,
+    )
+
+
+@atexit.register
+def _close_sink() -> None:
+    if sink is not None:
+        sink.close()
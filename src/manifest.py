@@ -0,0 +1,314 @@
+"""Lightweight tool manifest for fast server start-up.
+
+Importing every tool module builds its Pydantic models, loggers and the
+ATTOM client. This module instead registers each tool from a pre-built JSON
+manifest of names, descriptions and schemas, and imports a tool's handler
+module the first time one of its tools is called.
+
+Schemas are stored with their ``$ref`` definitions already inlined, so
+``tools/list`` does not re-dereference every schema on each request, and a
+server can expose a subset of the tools through a profile.
+
+Rebuild the manifest after changing a tool's signature or docstring with::
+
+    python -m src.manifest
+"""
+
+import importlib
+import json
+import os
+import sys
+from typing import Annotated, Any, Dict, List, Optional, Tuple
+
+import structlog
+from fastmcp import FastMCP
+from fastmcp.tools import FunctionTool, Tool, ToolResult
+from fastmcp.utilities.json_schema import dereference_refs
+from mcp.types import TextContent
+from pydantic import Field
+from pydantic.json_schema import SkipJsonSchema
+
+from src.models import AttomResponse
+
+# Configure logging
+logger = structlog.get_logger(__name__)
+
+MANIFEST_VERSION = 1
+MANIFEST_PATH = os.path.join(os.path.dirname(__file__), "tool_manifest.json")
+
+# Modules whose @mcp.tool() decorators define the server's tools
+TOOL_MODULES = (
+    "src.tools.area_tools",
+    "src.tools.assessment_tools",
+    "src.tools.community_tools",
+    "src.tools.event_tools",
+    "src.tools.misc_tools",
+    "src.tools.poi_tools",
+    "src.tools.property_tools",
+    "src.tools.sale_tools",
+    "src.tools.school_tools",
+    "src.tools.usage_tools",
+    "src.tools.valuation_tools",
+    "src.tools.watchlist_tools",
+)
+
+# Tool subsets a server can expose, by tool module
+PROFILES: Dict[str, Tuple[str, ...]] = {
+    "all": TOOL_MODULES,
+    "property": (
+        "src.tools.assessment_tools",
+        "src.tools.event_tools",
+        "src.tools.misc_tools",
+        "src.tools.property_tools",
+        "src.tools.sale_tools",
+        "src.tools.valuation_tools",
+        "src.tools.watchlist_tools",
+    ),
+    "area": (
+        "src.tools.area_tools",
+        "src.tools.community_tools",
+        "src.tools.poi_tools",
+        "src.tools.school_tools",
+    ),
+}
+
+
+def profile_modules(profile: str) -> Tuple[str, ...]:
+    """Tool modules of one or more comma-separated profiles.
+
+    Raises:
+        ValueError: If a profile is unknown
+    """
+    modules: List[str] = []
+    for name in (part.strip().lower() for part in profile.split(",") if part.strip()):
+        if name not in PROFILES:
+            raise ValueError(f"Unknown tool profile {name!r}; expected one of: {', '.join(PROFILES)}")
+        modules.extend(module for module in PROFILES[name] if module not in modules)
+    return tuple(module for module in TOOL_MODULES if module in modules)
+
+
+def inline_schemas(tool: Tool) -> None:
+    """Inline a tool's ``$ref`` definitions once, in place."""
+    if "$defs" in tool.parameters:
+        tool.parameters = dereference_refs(tool.parameters)
+    if tool.output_schema is not None and "$defs" in tool.output_schema:
+        tool.output_schema = dereference_refs(tool.output_schema)
+
+
+class LazyTool(Tool):
+    """Tool registered from the manifest that imports its module on first call."""
+
+    module: Annotated[SkipJsonSchema[str], Field(exclude=True)]
+    server: Annotated[SkipJsonSchema[Any], Field(exclude=True)] = None
+
+    async def run(self, arguments: Dict[str, Any]) -> ToolResult:
+        """Load the real tool and run it."""
+        tool = load_module(self.server, self.module).get(self.name)
+        if tool is None:
+            raise RuntimeError(f"Tool {self.name} is not defined by {self.module}; rebuild the manifest")
+        return await tool.run(arguments)
+
+
+def response_result(response: AttomResponse) -> Optional[ToolResult]:
+    """Tool result of an ATTOM response, built without copying its data.
+
+    FastMCP would serialize the response to text twice and deep-copy it into
+    the structured content. Decoded ATTOM payloads are already plain JSON, so
+    here the structured content shares the response's data, the text is
+    serialized once and ``ToolResult`` validation (another deep copy) is
+    skipped.
+
+    Returns:
+        None if the data is not plain JSON, for FastMCP to convert instead
+    """
+    structured = {name: getattr(response, name) for name in type(response).model_fields}
+    try:
+        text = json.dumps(structured, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+    except (TypeError, ValueError):
+        return None
+    return ToolResult.model_construct(
+        content=[TextContent(type="text", text=text)], structured_content=structured, meta=None, is_error=False
+    )
+
+
+class ResponseTool(FunctionTool):
+    """Function tool converting ATTOM responses with ``response_result``."""
+
+    def convert_result(self, raw_value: Any) -> ToolResult:
+        if isinstance(raw_value, AttomResponse):
+            result = response_result(raw_value)
+            if result is not None:
+                return result
+        return super().convert_result(raw_value)
+
+
+def _registered_tools(server: FastMCP) -> List[Tool]:
+    """Tools registered on the server's local provider.
+
+    Tools are registered and swapped while the server module is imported,
+    where fastmcp's async ``list_tools`` cannot run, so this reads the
+    provider's component table. That table is private, which is why
+    fastmcp is pinned to an exact version; ``test_manifest`` checks this
+    against ``list_tools`` so a fastmcp upgrade that changes it fails there.
+    """
+    return [component for component in server.local_provider._components.values() if isinstance(component, Tool)]
+
+
+def _lazy_tools(server: FastMCP) -> Dict[str, LazyTool]:
+    """Registered lazy tools by name."""
+    return {tool.name: tool for tool in _registered_tools(server) if isinstance(tool, LazyTool)}
+
+
+def load_module(server: FastMCP, module: str) -> Dict[str, Tool]:
+    """Import a tool module, replacing its lazy tools with the real ones.
+
+    Args:
+        server: Server the tools are registered on
+        module: Tool module name
+
+    Returns:
+        Tools defined by the module, by name
+    """
+    if module not in sys.modules:
+        # Drop the placeholders first so the module's decorators register cleanly
+        for name, tool in _lazy_tools(server).items():
+            if tool.module == module:
+                server.local_provider.remove_tool(name)
+        logger.debug("Loading tool module", module=module)
+    imported = importlib.import_module(module)
+    tools = {
+        tool.name: tool
+        for tool in _registered_tools(server)
+        if isinstance(tool, FunctionTool) and getattr(tool.fn, "__module__", None) == imported.__name__
+    }
+    for name, tool in tools.items():
+        inline_schemas(tool)
+        if type(tool) is FunctionTool:
+            # Same fields, different result conversion
+            tools[name] = ResponseTool(**{field: getattr(tool, field) for field in FunctionTool.model_fields})
+            server.local_provider.remove_tool(name)
+            server.add_tool(tools[name])
+    return tools
+
+
+def build_manifest(server: FastMCP) -> Dict[str, Any]:
+    """Import every tool module and describe its tools.
+
+    Args:
+        server: Server the tool modules register on
+
+    Returns:
+        Manifest with one entry per tool, in registration order
+    """
+    tools: List[Dict[str, Any]] = []
+    for module in TOOL_MODULES:
+        for name, tool in load_module(server, module).items():
+            tools.append(
+                {
+                    "name": name,
+                    "module": module,
+                    "description": tool.description,
+                    "parameters": tool.parameters,
+                    "output_schema": tool.output_schema,
+                }
+            )
+    return {"version": MANIFEST_VERSION, "tools": tools}
+
+
+def load_manifest(path: str = MANIFEST_PATH) -> Optional[Dict[str, Any]]:
+    """Read the tool manifest, or None if it is missing or outdated."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def register_tools(server: FastMCP, lazy: bool = True, path: str = MANIFEST_PATH, profile: str = "all") -> int:
+    """Register the server's tools.
+
+    With ``lazy`` and a valid manifest, tools are registered as placeholders
+    and their modules imported on first call. Otherwise every tool module of
+    the profile is imported now.
+
+    Args:
+        server: Server to register the tools on
+        lazy: Whether to defer importing tool modules
+        path: Manifest path
+        profile: Comma-separated tool profiles to expose
+
+    Returns:
+        Number of tools registered lazily
+    """
+    modules = profile_modules(profile)
+    manifest = load_manifest(path) if lazy else None
+    if manifest is None:
+        for module in modules:
+            load_module(server, module)
+        return 0
+
+    existing = {tool.name for tool in _registered_tools(server)}
+    count = 0
+    for entry in manifest["tools"]:
+        if entry["name"] in existing or entry["module"] in sys.modules or entry["module"] not in modules:
+            continue
+        server.add_tool(
+            LazyTool(
+                name=entry["name"],
+                description=entry["description"],
+                parameters=entry["parameters"],
+                output_schema=entry["output_schema"],
+                module=entry["module"],
+                server=server,
+            )
+        )
+        count += 1
+    return count
+
+
+def select_profile(server: FastMCP, profile: str, lazy: bool = True, path: str = MANIFEST_PATH) -> int:
+    """Switch the registered tools to a profile.
+
+    Tools outside the profile are removed and missing ones registered.
+
+    Args:
+        server: Server the tools are registered on
+        profile: Comma-separated tool profiles to expose
+        lazy: Whether to defer importing tool modules
+        path: Manifest path
+
+    Returns:
+        Number of tools removed
+    """
+    modules = profile_modules(profile)
+    removed = 0
+    for tool in _registered_tools(server):
+        if isinstance(tool, LazyTool):
+            module = tool.module
+        elif isinstance(tool, FunctionTool):
+            module = getattr(tool.fn, "__module__", None)
+        else:
+            continue
+        if module in TOOL_MODULES and module not in modules:
+            server.local_provider.remove_tool(tool.name)
+            removed += 1
+    register_tools(server, lazy=lazy, path=path, profile=profile)
+    return removed
+
+
+def main() -> None:
+    """Write the tool manifest for the server's tool modules."""
+    from src.mcp_server import mcp
+
+    manifest = build_manifest(mcp)
+    with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+        f.write("\n")
+    print(f"Wrote {len(manifest['tools'])} tools to {MANIFEST_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,5 +2,22 @@
 
 from fastmcp import FastMCP
 
-# Create the main MCP server instance
-mcp = FastMCP("mcp-server-attom")
\ No newline at end of file
+from src.lifecycle import DrainMiddleware, lifecycle, server_lifespan
+from src.limits import ConcurrencyMiddleware, limiter
+from src.metrics import MetricsMiddleware
+from src.profiling import ProfilingMiddleware, profiler
+from src.usage import UsageMiddleware
+
+# Create the main MCP server instance; latency includes queueing, and queued calls
+# count as in flight while draining
+mcp = FastMCP(
+    "mcp-server-attom",
+    lifespan=server_lifespan,
+    middleware=[
+        MetricsMiddleware(),
+        DrainMiddleware(lifecycle),
+        ConcurrencyMiddleware(limiter),
+        ProfilingMiddleware(profiler),
+        UsageMiddleware(),
+    ],
+)
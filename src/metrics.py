@@ -0,0 +1,322 @@
+"""In-process metrics with Prometheus text exposition.
+
+A small registry of counters, gauges and histograms covering tool calls,
+queueing, upstream ATTOM requests and the local caches. In HTTP mode it is
+served at ``/metrics``; in stdio mode it can be written to a file
+(``ATTOM_METRICS_FILE``) in the format read by the node_exporter textfile
+collector.
+
+Metrics are per process: with several HTTP workers each scrape sees the
+worker that answered it, identified by the ``worker`` label on
+``attom_process_info``.
+"""
+
+import bisect
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import structlog
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+from src import config
+from src.lifecycle import lifecycle
+
+# Configure logging
+logger = structlog.get_logger(__name__)
+
+# Latency buckets in seconds, from cache hits to slow upstream calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Size buckets in bytes, from empty results to large area payloads
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """Base class for a metric family with a fixed set of label names."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, Any]) -> Labels:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterable[Tuple[str, Labels, str, float]]:
+        """Yield (suffix, label values, extra label, value) samples."""
+        return ()
+
+    def render(self) -> List[str]:
+        """Render the family in the Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for suffix, values, extra, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(self.labelnames, values, extra)} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[Tuple[str, Labels, str, float]]:
+        for key, value in list(self._values.items()):
+            yield "", key, "", value
+
+
+class Gauge(Metric):
+    """Value read from a callback when the metrics are rendered.
+
+    The callback returns either a number (no labels) or an iterable of
+    ``(label values, value)`` pairs.
+    """
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, callback: Callable[[], Any], labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self.callback = callback
+
+    def samples(self) -> Iterable[Tuple[str, Labels, str, float]]:
+        result = self.callback()
+        if isinstance(result, (int, float)):
+            yield "", (), "", result
+            return
+        for values, value in result:
+            yield "", tuple(values), "", value
+
+
+class CallbackCounter(Gauge):
+    """Counter read from a callback, for components that already count."""
+
+    type = "counter"
+
+
+class Histogram(Metric):
+    """Distribution of observations over fixed buckets."""
+
+    type = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (last is +Inf)], sum, count
+        self._values: Dict[Labels, list] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        state[0][bisect.bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def count(self, **labels: Any) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def samples(self) -> Iterable[Tuple[str, Labels, str, float]]:
+        for key, (counts, total, count) in list(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), list(counts)):
+                cumulative += bucket_count
+                yield "_bucket", key, f'le="{_format_value(bound)}"', cumulative
+            yield "_sum", key, "", total
+            yield "_count", key, "", count
+
+
+class Registry:
+    """Named metric families, rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._caches: Dict[str, Any] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """Add a family, or return the one already registered under its name."""
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def gauge(self, name: str, help: str, callback: Callable[[], Any], labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, callback, labelnames))
+
+    def watch_cache(self, name: str, cache: Any) -> None:
+        """Report a cache's ``hits``, ``misses`` and size under ``cache=name``."""
+        self._caches[name] = cache
+
+    def cache_samples(self, attribute: str) -> List[Tuple[Labels, float]]:
+        """An attribute (or zero-argument method) of every watched cache, by cache name."""
+        samples = []
+        for name, cache in list(self._caches.items()):
+            value = getattr(cache, attribute)
+            samples.append(((name,), value() if callable(value) else value))
+        return samples
+
+    def render(self) -> str:
+        """All families in the Prometheus text format (version 0.0.4)."""
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Create a singleton registry shared by the server and its components
+registry = Registry()
+
+registry.gauge(
+    "attom_process_info", "Process serving these metrics", lambda: [((str(os.getpid()),), 1)], ("worker",)
+)
+tool_calls = registry.counter("attom_tool_calls_total", "Tool calls by tool and outcome", ("tool", "outcome"))
+tool_duration = registry.histogram("attom_tool_duration_seconds", "Tool call latency, including queueing", ("tool",))
+tool_response_bytes = registry.histogram(
+    "attom_tool_response_bytes", "Size of serialized tool results", ("tool",), SIZE_BUCKETS
+)
+queue_wait = registry.histogram("attom_queue_wait_seconds", "Time tool calls waited for a concurrency slot")
+calls_rejected = registry.counter("attom_tool_calls_rejected_total", "Tool calls rejected because a queue was full")
+upstream_requests = registry.counter(
+    "attom_upstream_requests_total", "ATTOM API requests by endpoint and HTTP status", ("endpoint", "status")
+)
+upstream_duration = registry.histogram(
+    "attom_upstream_request_seconds", "ATTOM API request latency, including JSON decoding", ("endpoint",)
+)
+upstream_response_bytes = registry.histogram(
+    "attom_upstream_response_bytes", "Size of ATTOM API response bodies", ("endpoint",), SIZE_BUCKETS
+)
+upstream_decode = registry.histogram(
+    "attom_upstream_decode_seconds", "Time spent decoding ATTOM API JSON responses", ("endpoint",)
+)
+coalesced_requests = registry.counter(
+    "attom_upstream_coalesced_total", "Requests answered by an identical request already in flight", ("endpoint",)
+)
+address_matches = registry.counter(
+    "attom_address_matches_total", "Typed addresses resolved to or suggested as known properties", ("outcome",)
+)
+registry.register(
+    CallbackCounter("attom_cache_hits_total", "Cache hits", lambda: registry.cache_samples("hits"), ("cache",))
+)
+registry.register(
+    CallbackCounter("attom_cache_misses_total", "Cache misses", lambda: registry.cache_samples("misses"), ("cache",))
+)
+registry.gauge("attom_cache_entries", "Entries held by each cache", lambda: registry.cache_samples("__len__"), ("cache",))
+
+
+def tool_outcome(result: Any) -> str:
+    """Outcome label of a tool result: its ``status_code``, or ``ok``."""
+    structured = getattr(result, "structured_content", None)
+    if isinstance(structured, dict):
+        status = structured.get("status_code")
+        if status is not None:
+            return str(status)
+    return "ok"
+
+
+def result_bytes(result: Any) -> int:
+    """Size of the text blocks of a tool result, as sent to the client."""
+    return sum(len(getattr(block, "text", "") or "") for block in getattr(result, "content", None) or ())
+
+
+class MetricsMiddleware(Middleware):
+    """Records the latency, outcome and result size of every tool call."""
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: Callable) -> Any:
+        tool = getattr(context.message, "name", "unknown")
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await call_next(context)
+            outcome = tool_outcome(result)
+            tool_response_bytes.observe(result_bytes(result), tool=tool)
+            return result
+        except Exception as e:
+            from src.limits import ServerBusyError
+
+            outcome = "busy" if isinstance(e, ServerBusyError) else "error"
+            raise
+        finally:
+            tool_duration.observe(time.perf_counter() - start, tool=tool)
+            tool_calls.inc(tool=tool, outcome=outcome)
+
+
+class MetricsFileWriter:
+    """Writes the registry to a file periodically and on shutdown."""
+
+    def __init__(self, path: str, interval: float = config.ATTOM_METRICS_INTERVAL, metrics: Registry = registry):
+        self.path = path
+        self.interval = interval
+        self.metrics = metrics
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def write(self) -> None:
+        """Replace the file atomically, so readers never see a partial dump."""
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, "w", encoding="utf-8") as f:
+                f.write(self.metrics.render())
+            os.replace(temporary, self.path)
+        except OSError as e:
+            logger.warning("Could not write metrics file", path=self.path, error=str(e))
+
+    def start(self) -> None:
+        """Start writing every ``interval`` seconds, and once more on shutdown."""
+        lifecycle.on_shutdown(self.stop)
+        if self.interval > 0 and self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def stop(self) -> None:
+        """Stop the periodic writes and write a final dump."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(5)
+            self._thread = None
+        self.write()
@@ -0,0 +1,161 @@
+"""Bounded-memory reading and decoding of upstream response bodies.
+
+Bodies are streamed into a single buffer and decoded from it, so a response
+exists once as bytes and once decoded, instead of as a list of chunks, the
+joined body and the decoded value. A body longer than
+``ATTOM_MAX_RESPONSE_BYTES`` is cut off at the limit and what was received
+is decoded: complete list items and object members are kept, the partial
+value the body ended in is dropped, and a ``truncated`` member describes
+the cut.
+"""
+
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+# Key added to truncated payloads
+TRUNCATED_KEY = "truncated"
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+# Characters that may continue a number
+_NUMBER_CHARS = "0123456789.eE+-"
+
+Path = List[Union[str, int]]
+
+
+def read_body(chunks: Iterable[bytes], limit: int = 0) -> Tuple[bytearray, bool]:
+    """Collect a streamed body into one buffer, stopping after ``limit`` bytes.
+
+    Args:
+        chunks: Body chunks, e.g. ``response.iter_bytes()``
+        limit: Maximum bytes to keep (0 for no limit)
+
+    Returns:
+        The body (at most ``limit`` bytes) and whether it is complete
+    """
+    body = bytearray()
+    for chunk in chunks:
+        if limit and len(body) + len(chunk) > limit:
+            body += chunk[: limit - len(body)]
+            return body, False
+        body += chunk
+    return body, True
+
+
+def _skip(text: str, index: int) -> int:
+    while index < len(text) and text[index] in _WHITESPACE:
+        index += 1
+    return index
+
+
+def _decode(text: str, index: int) -> Tuple[Any, int]:
+    """Decode the complete value at ``index``.
+
+    A number is complete only when something other than a digit, sign,
+    point or exponent follows it: ``123`` at the end of the text may be the
+    start of ``123456``, and ``3`` before ``.`` the start of ``3.5``.
+
+    Raises:
+        json.JSONDecodeError: If the value is invalid or may have been cut off
+    """
+    value, end = _decoder.raw_decode(text, index)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if end == len(text) or text[end] in _NUMBER_CHARS:
+            raise json.JSONDecodeError("Number cut off", text, index)
+    return value, end
+
+
+def _salvage(text: str, index: int, path: Path) -> Tuple[Any, Optional[int], Path]:
+    """Decode the value at ``index``, salvaging the complete parts of a cut-off container.
+
+    Returns:
+        The value, the index after it (None when the text ended inside it) and
+        the path of the partial value that was dropped
+    """
+    try:
+        value, end = _decode(text, index)
+        return value, end, []
+    except json.JSONDecodeError:
+        pass
+    if index >= len(text) or text[index] not in "{[":
+        return None, None, path
+    if text[index] == "[":
+        return _salvage_list(text, index, path)
+    return _salvage_object(text, index, path)
+
+
+def _salvage_list(text: str, index: int, path: Path) -> Tuple[Any, Optional[int], Path]:
+    items: List[Any] = []
+    index = _skip(text, index + 1)
+    while index < len(text):
+        try:
+            item, index = _decode(text, index)
+        except json.JSONDecodeError:
+            if not items:
+                # Keep the complete parts of a list's only item rather than nothing
+                item, _, dropped = _salvage(text, index, path + [0])
+                if item is not None:
+                    items.append(item)
+                return items, None, dropped
+            break
+        items.append(item)
+        index = _skip(text, index)
+        if text[index : index + 1] == ",":
+            index = _skip(text, index + 1)
+        elif text[index : index + 1] == "]":
+            return items, index + 1, []
+    return items, None, path + [len(items)]
+
+
+def _salvage_object(text: str, index: int, path: Path) -> Tuple[Any, Optional[int], Path]:
+    members: Dict[str, Any] = {}
+    index = _skip(text, index + 1)
+    while index < len(text):
+        try:
+            key, index = _decoder.raw_decode(text, index)
+        except json.JSONDecodeError:
+            break
+        index = _skip(text, index)
+        if text[index : index + 1] != ":":
+            return members, None, path + [key]
+        index = _skip(text, index + 1)
+        value, end, dropped = _salvage(text, index, path + [key])
+        if end is None:
+            if value is not None:
+                members[key] = value
+            return members, None, dropped
+        members[key] = value
+        index = _skip(text, end)
+        if text[index : index + 1] == ",":
+            index = _skip(text, index + 1)
+        elif text[index : index + 1] == "}":
+            return members, index + 1, []
+    return members, None, path
+
+
+def format_path(path: Path) -> str:
+    """Render a path like ``response.result.item[3]``."""
+    rendered = ""
+    for part in path:
+        rendered += f"[{part}]" if isinstance(part, int) else (f".{part}" if rendered else str(part))
+    return rendered
+
+
+def decode_prefix(body: Union[bytes, bytearray], limit: int) -> Any:
+    """Decode a body cut off at ``limit`` bytes, keeping its complete parts.
+
+    A decoded object gets a ``truncated`` member with the limit and the path
+    of the value the body was cut in. Items of that list after the cut are
+    missing, and so is the value itself unless it is a container.
+
+    Raises:
+        ValueError: If nothing could be decoded
+    """
+    # A multi-byte character may be cut in two at the limit
+    text = body.decode("utf-8", errors="ignore")
+    value, _, dropped = _salvage(text, _skip(text, 0), [])
+    if value is None:
+        raise ValueError(f"Response exceeded {limit} bytes and could not be decoded")
+    if isinstance(value, dict):
+        value[TRUNCATED_KEY] = {"limit_bytes": limit, "cut_at": format_path(dropped)}
+    return value
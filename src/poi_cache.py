@@ -0,0 +1,239 @@
+"""Geohash-keyed superset cache for POI radius searches.
+
+This module caches ``poi_search`` results by geohash cell and category, and
+answers new radius queries by filtering a cached result set with a larger
+covering radius using haversine distances.
+"""
+
+import copy
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src import config, metrics
+from src.geo import geohash_encode, geohash_neighbors, haversine_miles
+from src.records import parse_float
+
+# Slack for floating point error when comparing covering radii (miles)
+COVERAGE_EPSILON_MILES = 1e-6
+
+
+def _coordinates(item: Any, depth: int = 0) -> Tuple[Optional[float], Optional[float]]:
+    """Find the latitude and longitude of a POI item."""
+    if not isinstance(item, dict) or depth > 3:
+        return None, None
+    latitude = parse_float(item.get("latitude", item.get("lat")))
+    longitude = parse_float(item.get("longitude", item.get("lon", item.get("lng"))))
+    if latitude is not None and longitude is not None:
+        return latitude, longitude
+    for value in item.values():
+        if isinstance(value, dict):
+            latitude, longitude = _coordinates(value, depth + 1)
+            if latitude is not None:
+                return latitude, longitude
+    return None, None
+
+
+def _item_path(payload: Any, path: Tuple = (), depth: int = 0) -> Optional[Tuple]:
+    """Find the key path of the POI item list in a response payload."""
+    if not isinstance(payload, dict) or depth > 4:
+        return None
+    if isinstance(payload.get("poi"), list):
+        return path + ("poi",)
+    for key, value in payload.items():
+        if isinstance(value, list) and value and all(isinstance(v, dict) for v in value):
+            if _coordinates(value[0])[0] is not None:
+                return path + (key,)
+        found = _item_path(value, path + (key,), depth + 1)
+        if found:
+            return found
+    return None
+
+
+def _total(payload: Dict[str, Any]) -> Optional[int]:
+    """Get the total result count reported by the POI API, if any."""
+    status = payload.get("status") if isinstance(payload, dict) else None
+    if isinstance(status, dict):
+        total = parse_float(status.get("total"))
+        if total is not None:
+            return int(total)
+    return None
+
+
+def parse_point(point: str) -> Tuple[Optional[float], Optional[float]]:
+    """Parse a ``POINT(longitude,latitude)`` string into (latitude, longitude)."""
+    text = point.strip()
+    if not text.upper().startswith("POINT(") or not text.endswith(")"):
+        return None, None
+    parts = text[6:-1].replace(",", " ").split()
+    if len(parts) != 2:
+        return None, None
+    longitude, latitude = parse_float(parts[0]), parse_float(parts[1])
+    return latitude, longitude
+
+
+class _Entry:
+    """Cached POI result set for one center, radius and category."""
+
+    __slots__ = ("latitude", "longitude", "radius", "payload", "path", "items", "lats", "lons", "expires")
+
+    def __init__(self, latitude, longitude, radius, payload, path, items, ttl):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.radius = radius
+        self.payload = payload
+        self.path = path
+        self.items = items
+        coords = [_coordinates(item) for item in items]
+        self.lats = np.array([c[0] for c in coords], dtype=np.float64)
+        self.lons = np.array([c[1] for c in coords], dtype=np.float64)
+        self.expires = time.monotonic() + ttl
+
+    def covers(self, latitude: float, longitude: float, radius: float) -> bool:
+        """Whether this entry's circle contains the query circle."""
+        distance = float(haversine_miles(self.latitude, self.longitude, latitude, longitude))
+        return distance + radius <= self.radius + COVERAGE_EPSILON_MILES
+
+    def filter(self, latitude: float, longitude: float, radius: float, limit: Optional[int]) -> Dict[str, Any]:
+        """Build a response for a query circle inside this entry."""
+        distance = haversine_miles(latitude, longitude, self.lats, self.lons)
+        selected = np.flatnonzero(distance <= radius)
+        selected = selected[np.argsort(distance[selected], kind="stable")]
+        total = len(selected)
+        if limit:
+            selected = selected[:limit]
+
+        payload = copy.copy(self.payload)
+        node = payload
+        for key in self.path[:-1]:
+            node[key] = copy.copy(node[key])
+            node = node[key]
+        node[self.path[-1]] = [self.items[i] for i in selected]
+        if isinstance(payload.get("status"), dict):
+            payload["status"] = {**payload["status"], "total": total}
+        return payload
+
+
+class POICache:
+    """Superset cache for POI searches keyed by geohash cell and category."""
+
+    def __init__(
+        self,
+        max_entries: int = config.ATTOM_POI_CACHE_SIZE,
+        ttl: float = config.ATTOM_POI_CACHE_TTL,
+        precision: int = config.ATTOM_POI_GEOHASH_PRECISION,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.precision = precision
+        self._entries: Dict[int, Tuple[tuple, _Entry]] = {}
+        self._cells: Dict[tuple, List[int]] = {}
+        self._next_id = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self,
+        latitude: float,
+        longitude: float,
+        radius: float,
+        category: tuple,
+        limit: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Answer a radius query from a cached covering result set.
+
+        Args:
+            latitude: Query center latitude
+            longitude: Query center longitude
+            radius: Query radius in miles
+            category: Normalized category filter key
+            limit: Maximum number of items to return
+
+        Returns:
+            Response payload filtered to the query circle, or None on a miss
+        """
+        now = time.monotonic()
+        cell = geohash_encode(latitude, longitude, self.precision)
+        for neighbor in geohash_neighbors(cell):
+            for entry_id in list(self._cells.get((neighbor, category), ())):
+                entry = self._entries[entry_id][1]
+                if entry.expires <= now:
+                    self._remove(entry_id)
+                elif entry.covers(latitude, longitude, radius):
+                    self.hits += 1
+                    return entry.filter(latitude, longitude, radius, limit)
+        self.misses += 1
+        return None
+
+    def put(
+        self,
+        latitude: float,
+        longitude: float,
+        radius: float,
+        category: tuple,
+        payload: Dict[str, Any],
+        page_size: Optional[int] = None,
+    ) -> bool:
+        """Cache a complete upstream result set.
+
+        Result sets that were truncated by paging, or whose items have no
+        coordinates, are not cached because they cannot answer sub-queries.
+
+        Args:
+            latitude: Center latitude of the upstream query
+            longitude: Center longitude of the upstream query
+            radius: Radius of the upstream query in miles
+            category: Normalized category filter key
+            payload: Upstream response payload
+            page_size: Page size of the upstream query, used when no total is reported
+
+        Returns:
+            True if the result set was cached
+        """
+        path = _item_path(payload)
+        if path is None:
+            return False
+        node = payload
+        for key in path:
+            node = node[key]
+        total = _total(payload)
+        if total is not None and total > len(node):
+            return False
+        if total is None and page_size and len(node) >= page_size:
+            return False
+        if any(_coordinates(item)[0] is None for item in node):
+            return False
+
+        key = (geohash_encode(latitude, longitude, self.precision), category)
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (key, _Entry(latitude, longitude, radius, payload, path, node, self.ttl))
+        self._cells.setdefault(key, []).append(entry_id)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+        return True
+
+    def _remove(self, entry_id: int) -> None:
+        """Drop an entry from the cache."""
+        key, _ = self._entries.pop(entry_id)
+        ids = self._cells.get(key, [])
+        if entry_id in ids:
+            ids.remove(entry_id)
+        if not ids:
+            self._cells.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries and reset statistics."""
+        self._entries.clear()
+        self._cells.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# Create a singleton cache shared by the POI tools
+poi_cache = POICache()
+metrics.registry.watch_cache("poi", poi_cache)
@@ -0,0 +1,325 @@
+"""On-demand CPU and allocation profiling of live traffic.
+
+A profiling session samples the stacks of the event loop thread and of
+executor threads doing upstream I/O every ``ATTOM_PROFILE_INTERVAL``
+seconds, tagging each sample with the tool being served. While a session
+runs, tracemalloc also records allocations. The session ends after a
+number of seconds or of tool calls, and writes collapsed-stack files
+(``tool;outer;...;inner count``) that flamegraph.pl, speedscope and
+similar tools read directly.
+
+Sessions are started with ``SIGUSR1`` (``ATTOM_PROFILE_SECONDS`` long) or,
+when ``ATTOM_PROFILE_ROUTE`` is enabled, through ``POST /debug/profile`` in
+HTTP mode. Outside a session the hooks cost one attribute check per call.
+"""
+
+import asyncio
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+
+import structlog
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+from src import config
+from src.lifecycle import lifecycle
+
+# Configure logging
+logger = structlog.get_logger(__name__)
+
+# Tag of samples taken outside any tool call
+IDLE_TAG = "(idle)"
+
+# Frames kept per allocation traceback
+ALLOCATION_FRAMES = 32
+
+# Tool served by the current task, for tagging executor work
+current_tool: ContextVar[Optional[str]] = ContextVar("current_tool", default=None)
+
+
+def frame_label(frame: Any) -> str:
+    """Flamegraph label of a frame: ``module:qualified name``."""
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def collapse(frame: Any) -> str:
+    """A thread's stack, outermost frame first, joined with semicolons."""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def profile_dir() -> str:
+    """Directory profiles are written to."""
+    if config.ATTOM_PROFILE_DIR:
+        return config.ATTOM_PROFILE_DIR
+    if config.ATTOM_CACHE_DIR:
+        return os.path.join(config.ATTOM_CACHE_DIR, "profiles")
+    return os.path.join(tempfile.gettempdir(), "mcp-server-attom-profiles")
+
+
+class Profiler:
+    """Runs one profiling session at a time."""
+
+    def __init__(self, interval: float = config.ATTOM_PROFILE_INTERVAL):
+        self.interval = interval
+        self.active = False
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.loop_thread: Optional[int] = None
+        self.last_result: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._samples: Counter = Counter()
+        self._task_tags: Dict[Any, str] = {}
+        self._thread_tags: Dict[int, str] = {}
+        self._calls = 0
+        self._max_calls: Optional[int] = None
+        self._memory = False
+        self._started = 0.0
+
+    def start(self, seconds: Optional[float] = None, calls: Optional[int] = None, memory: bool = True) -> bool:
+        """Start a session ending after ``seconds`` or ``calls`` tool calls, whichever comes first.
+
+        Args:
+            seconds: Session length (default: ``ATTOM_PROFILE_SECONDS``)
+            calls: Tool calls to profile (default: no limit)
+            memory: Whether to track allocations with tracemalloc
+
+        Returns:
+            False if a session is already running
+        """
+        with self._lock:
+            if self.active:
+                return False
+            self._samples = Counter()
+            self._task_tags.clear()
+            self._thread_tags.clear()
+            self._calls = 0
+            self._max_calls = calls
+            self._memory = memory and not tracemalloc.is_tracing()
+            if self._memory:
+                tracemalloc.start(ALLOCATION_FRAMES)
+            try:
+                # Sample the loop from the start when started on it (signal handler or route)
+                self._use_loop(asyncio.get_running_loop())
+            except RuntimeError:
+                pass
+            self._stop.clear()
+            self._started = time.monotonic()
+            self.active = True
+            self._thread = threading.Thread(
+                target=self._run, args=(seconds or config.ATTOM_PROFILE_SECONDS,), name="profiler", daemon=True
+            )
+            self._thread.start()
+        logger.warning("Profiling started", seconds=seconds or config.ATTOM_PROFILE_SECONDS, calls=calls, memory=memory)
+        return True
+
+    def stop(self) -> Optional[Dict[str, Any]]:
+        """End the running session and write its profiles.
+
+        Returns:
+            Summary with the files written, or None if no session was running
+        """
+        with self._lock:
+            if not self.active or self._stop.is_set():
+                return None
+            self._stop.set()
+            thread, self._thread = self._thread, None
+        # The session stays active until its profiles are written, so the
+        # summary is in place once a caller sees it end
+        try:
+            if thread is not None and thread is not threading.current_thread():
+                thread.join()
+            snapshot = None
+            if self._memory:
+                snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+            try:
+                self.last_result = self._write(snapshot)
+            except OSError as e:
+                logger.error("Could not write profiles", directory=profile_dir(), error=str(e))
+                return None
+        finally:
+            self.active = False
+        logger.warning("Profiling finished", **self.last_result)
+        return self.last_result
+
+    def _run(self, seconds: float) -> None:
+        deadline = time.monotonic() + seconds
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self._sample(own)
+            if time.monotonic() >= deadline:
+                self.stop()
+                return
+
+    def _sample(self, own: int) -> None:
+        loop_thread = self.loop_thread
+        loop_tag = IDLE_TAG
+        if self.loop is not None:
+            task = asyncio.current_task(self.loop)
+            if task is not None:
+                loop_tag = self._task_tags.get(task, IDLE_TAG)
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            if ident == loop_thread:
+                tag = loop_tag
+            else:
+                tag = self._thread_tags.get(ident)
+                if tag is None:
+                    # Only threads working for a tool call are of interest
+                    continue
+            self._samples[f"{tag};{collapse(frame)}"] += 1
+
+    def _use_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        if loop is not self.loop:
+            self.loop, self.loop_thread = loop, threading.get_ident()
+
+    def enter_call(self, tool: str) -> None:
+        """Tag the current task with the tool it serves."""
+        self._use_loop(asyncio.get_running_loop())
+        current_tool.set(tool)
+        self._task_tags[asyncio.current_task()] = tool
+
+    def exit_call(self) -> None:
+        """Untag the current task, ending the session after its last call.
+
+        The session is stopped on a separate thread: joining the sampler,
+        taking the allocation snapshot and writing the profiles would
+        otherwise block the event loop.
+        """
+        self._task_tags.pop(asyncio.current_task(), None)
+        self._calls += 1
+        if self._max_calls is not None and self._calls >= self._max_calls and self.active and not self._stop.is_set():
+            threading.Thread(target=self.stop, name="profiler-stop", daemon=True).start()
+
+    def tagged(self, fn: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap a function run on another thread so its samples carry the current tool."""
+        tool = current_tool.get()
+        if tool is None:
+            return fn
+
+        def run(*args: Any) -> Any:
+            ident = threading.get_ident()
+            self._thread_tags[ident] = tool
+            try:
+                return fn(*args)
+            finally:
+                self._thread_tags.pop(ident, None)
+
+        return run
+
+    def _write(self, snapshot: Optional[tracemalloc.Snapshot]) -> Dict[str, Any]:
+        directory = profile_dir()
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        prefix = os.path.join(directory, f"{stamp}-{os.getpid()}")
+        result: Dict[str, Any] = {
+            "seconds": round(time.monotonic() - self._started, 3),
+            "calls": self._calls,
+            "samples": sum(self._samples.values()),
+            "cpu": f"{prefix}-cpu.folded",
+        }
+        with open(result["cpu"], "w", encoding="utf-8") as f:
+            for stack, count in self._samples.most_common():
+                f.write(f"{stack} {count}\n")
+        if snapshot is not None:
+            result["memory"] = f"{prefix}-alloc.folded"
+            result["allocated_bytes"] = self._write_allocations(snapshot, result["memory"])
+        return result
+
+    @staticmethod
+    def _write_allocations(snapshot: tracemalloc.Snapshot, path: str) -> int:
+        """Write bytes still allocated, by allocation stack; returns the total."""
+        snapshot = snapshot.filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+        )
+        stacks: Counter = Counter()
+        for statistic in snapshot.statistics("traceback"):
+            frames = [
+                f"{os.path.splitext(os.path.basename(frame.filename))[0]}:{frame.lineno}"
+                for frame in statistic.traceback
+            ]
+            stacks[";".join(frames)] += statistic.size
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, size in stacks.most_common():
+                f.write(f"{stack} {size}\n")
+        return sum(stacks.values())
+
+    def status(self) -> Dict[str, Any]:
+        """Whether a session is running, and the last session's summary."""
+        return {"active": self.active, "calls": self._calls if self.active else None, "last": self.last_result}
+
+
+class ProfilingMiddleware(Middleware):
+    """Tags tool calls for a running profiling session."""
+
+    def __init__(self, profiler: Profiler):
+        self.profiler = profiler
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: Callable) -> Any:
+        if not self.profiler.active:
+            return await call_next(context)
+        self.profiler.enter_call(getattr(context.message, "name", "unknown"))
+        try:
+            return await call_next(context)
+        finally:
+            self.profiler.exit_call()
+
+
+# Create a singleton profiler shared by the server
+profiler = Profiler()
+lifecycle.on_shutdown(profiler.stop)
+
+
+def install_signal_handler(signum: int = getattr(signal, "SIGUSR1", 0)) -> bool:
+    """Start a profiling session of ``ATTOM_PROFILE_SECONDS`` when the process receives ``signum``.
+
+    Returns:
+        False where the signal does not exist (Windows) or off the main thread
+    """
+    if not signum or threading.current_thread() is not threading.main_thread():
+        return False
+    signal.signal(signum, _request_start)
+    return True
+
+
+def _request_start(*_: Any) -> None:
+    """Signal handler: start a session outside the handler.
+
+    The handler interrupts the main thread wherever it is, possibly while it
+    holds the profiler's lock, so the session is started on the event loop
+    when one is running and on a separate thread otherwise.
+    """
+    try:
+        asyncio.get_running_loop().call_soon_threadsafe(profiler.start)
+    except RuntimeError:
+        threading.Thread(target=profiler.start, name="profiler-start", daemon=True).start()
+
+
+def profile_options(query: Dict[str, str]) -> Dict[str, Any]:
+    """Session options from request query parameters.
+
+    Raises:
+        ValueError: If a value is not a number
+    """
+    options: Dict[str, Any] = {}
+    if query.get("seconds"):
+        options["seconds"] = float(query["seconds"])
+    if query.get("calls"):
+        options["calls"] = int(query["calls"])
+    if query.get("memory"):
+        options["memory"] = query["memory"].lower() in ("1", "true", "yes")
+    return options
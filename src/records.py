@@ -0,0 +1,385 @@
+"""Typed property records extracted from ATTOM API payloads.
+
+This module turns property, sale and AVM payloads into compact slotted
+records with parsed numeric types, and converts batches of records into
+column-oriented arrays for analytics.
+"""
+
+import math
+from array import array
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional
+
+from src import config
+from src.models import AddressComponents, PropertyBasicInfo
+
+# Record fields, in column order
+STRING_FIELDS = (
+    "attom_id",
+    "fips",
+    "apn",
+    "address_full",
+    "address_line1",
+    "address_line2",
+    "city",
+    "state",
+    "zip_code",
+    "zip_plus4",
+    "unit_number",
+    "property_type",
+    "sale_date",
+    "avm_date",
+)
+NUMERIC_FIELDS = (
+    "latitude",
+    "longitude",
+    "year_built",
+    "beds",
+    "baths",
+    "living_sqft",
+    "lot_sqft",
+    "sale_amount",
+    "avm_value",
+    "avm_low",
+    "avm_high",
+    "avm_score",
+    "assessed_total",
+    "market_total",
+    "tax_amount",
+)
+FIELDS = STRING_FIELDS + NUMERIC_FIELDS
+
+NAN = float("nan")
+
+
+def parse_float(value: Any) -> Optional[float]:
+    """Parse an ATTOM numeric value, which may be a number or a string.
+
+    Args:
+        value: Raw value from the payload
+
+    Returns:
+        Parsed float, or None if the value is missing or not numeric
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return None if math.isnan(value) else float(value)
+    text = str(value).strip().replace(",", "").lstrip("$")
+    if not text:
+        return None
+    try:
+        result = float(text)
+    except ValueError:
+        return None
+    return None if math.isnan(result) else result
+
+
+def parse_date(value: Any) -> Optional[str]:
+    """Normalize an ATTOM date (``YYYY-MM-DD``, ``YYYY-M-D`` or ``YYYY/MM/DD``).
+
+    Args:
+        value: Raw value from the payload
+
+    Returns:
+        ISO formatted date string, or None if the value cannot be parsed
+    """
+    if not value:
+        return None
+    text = str(value).strip()[:10].replace("/", "-")
+    parts = text.split("-")
+    if len(parts) != 3:
+        return None
+    try:
+        return date(int(parts[0]), int(parts[1]), int(parts[2])).isoformat()
+    except ValueError:
+        return None
+
+
+def _get(node: Any, *path: str) -> Any:
+    """Walk a nested dict, returning None if any key is missing."""
+    for key in path:
+        if not isinstance(node, dict):
+            return None
+        node = node.get(key)
+    return node
+
+
+def _first(node: Any, *paths: tuple) -> Any:
+    """Return the first non-empty value found along the given paths."""
+    for path in paths:
+        value = _get(node, *path)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+class PropertyRecord:
+    """Compact record of the commonly used fields of an ATTOM property.
+
+    String fields hold ``str`` or None; numeric fields hold ``float`` or None.
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(self, **values: Any):
+        for name in FIELDS:
+            setattr(self, name, values.get(name))
+
+    def __repr__(self) -> str:
+        return f"PropertyRecord(attom_id={self.attom_id!r}, address={self.address_full!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PropertyRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in FIELDS)
+
+    def to_dict(self, include_empty: bool = False) -> Dict[str, Any]:
+        """Convert the record to a dictionary.
+
+        Args:
+            include_empty: Whether to include fields that are None
+
+        Returns:
+            Field values keyed by field name
+        """
+        values = {name: getattr(self, name) for name in FIELDS}
+        if include_empty:
+            return values
+        return {name: value for name, value in values.items() if value is not None}
+
+    def merge(self, other: "PropertyRecord") -> "PropertyRecord":
+        """Fill in fields from another record, preferring the other's values.
+
+        Args:
+            other: Record with newer data for the same property
+
+        Returns:
+            This record, updated in place
+        """
+        for name in FIELDS:
+            value = getattr(other, name)
+            if value is not None:
+                setattr(self, name, value)
+        return self
+
+    def to_basic_info(self) -> PropertyBasicInfo:
+        """Convert the record to a PropertyBasicInfo model."""
+        street_number, street_name = _split_street(self.address_line1)
+        return PropertyBasicInfo(
+            attom_id=self.attom_id,
+            property_type=self.property_type,
+            address_full=self.address_full,
+            address_components=AddressComponents(
+                street_number=street_number,
+                street_name=street_name,
+                city=self.city,
+                state=self.state,
+                zip_code=self.zip_code,
+                zip_plus4=self.zip_plus4,
+                unit_number=self.unit_number,
+            ),
+            fips=self.fips,
+            apn=self.apn,
+            latitude=self.latitude,
+            longitude=self.longitude,
+        )
+
+
+def _split_street(line1: Optional[str]) -> tuple:
+    """Split an address line into street number and street name."""
+    if not line1:
+        return None, None
+    number, _, rest = line1.strip().partition(" ")
+    if number[:1].isdigit() and rest:
+        return number, rest
+    return None, line1.strip()
+
+
+def record_from_property(item: Dict[str, Any]) -> PropertyRecord:
+    """Build a record from one element of a ``property`` list.
+
+    Args:
+        item: Property object from a property, sale, assessment or AVM payload
+
+    Returns:
+        Parsed property record
+    """
+    identifier = item.get("identifier") or {}
+    address = item.get("address") or {}
+    attom_id = _first(identifier, ("attomId",), ("Id",), ("obPropId",))
+    sale = item.get("sale")
+    if not sale and isinstance(item.get("salehistory"), list) and item["salehistory"]:
+        # Sales history payloads list the most recent sale first
+        sale = item["salehistory"][0]
+    line1 = address.get("line1")
+    line2 = address.get("line2")
+    address_full = address.get("oneLine")
+    if not address_full and line1 and line2:
+        address_full = f"{line1}, {line2}"
+
+    return PropertyRecord(
+        attom_id=str(attom_id) if attom_id is not None else None,
+        fips=identifier.get("fips"),
+        apn=identifier.get("apn"),
+        address_full=address_full,
+        address_line1=line1,
+        address_line2=line2,
+        city=address.get("locality"),
+        state=address.get("countrySubd"),
+        zip_code=address.get("postal1"),
+        zip_plus4=address.get("postal2") or None,
+        unit_number=address.get("unitValue") or None,
+        property_type=_first(item, ("summary", "proptype"), ("summary", "propclass")),
+        sale_date=parse_date(
+            _first(
+                sale,
+                ("saleTransDate",),
+                ("amount", "salerecdate"),
+                ("saleSearchDate",),
+            )
+        ),
+        avm_date=parse_date(_get(item, "avm", "eventDate")),
+        latitude=parse_float(_get(item, "location", "latitude")),
+        longitude=parse_float(_get(item, "location", "longitude")),
+        year_built=parse_float(_get(item, "summary", "yearbuilt")),
+        beds=parse_float(_get(item, "building", "rooms", "beds")),
+        baths=parse_float(_get(item, "building", "rooms", "bathstotal")),
+        living_sqft=parse_float(
+            _first(
+                item,
+                ("building", "size", "livingsize"),
+                ("building", "size", "universalsize"),
+            )
+        ),
+        lot_sqft=parse_float(_get(item, "lot", "lotsize2")),
+        sale_amount=parse_float(
+            _first(
+                sale,
+                ("amount", "saleamt"),
+                ("saleAmountData", "saleAmt"),
+            )
+        ),
+        avm_value=parse_float(_get(item, "avm", "amount", "value")),
+        avm_low=parse_float(_get(item, "avm", "amount", "low")),
+        avm_high=parse_float(_get(item, "avm", "amount", "high")),
+        avm_score=parse_float(_get(item, "avm", "amount", "scr")),
+        assessed_total=parse_float(_get(item, "assessment", "assessed", "assdttlvalue")),
+        market_total=parse_float(_get(item, "assessment", "market", "mktttlvalue")),
+        tax_amount=parse_float(_get(item, "assessment", "tax", "taxamt")),
+    )
+
+
+def extract_records(payload: Dict[str, Any]) -> List[PropertyRecord]:
+    """Extract property records from an ATTOM property API payload.
+
+    Args:
+        payload: Decoded JSON response containing a ``property`` list
+
+    Returns:
+        One record per property in the payload
+    """
+    items = payload.get("property") if isinstance(payload, dict) else None
+    if not isinstance(items, list):
+        return []
+    return [record_from_property(item) for item in items if isinstance(item, dict)]
+
+
+def to_columns(records: Iterable[PropertyRecord]) -> Dict[str, Any]:
+    """Convert records to column-oriented storage.
+
+    Numeric fields become ``array('d')`` columns with NaN for missing values,
+    so they can be handed to NumPy without copying. String fields become lists.
+
+    Args:
+        records: Records to convert
+
+    Returns:
+        Columns keyed by field name
+    """
+    columns: Dict[str, Any] = {name: [] for name in STRING_FIELDS}
+    columns.update({name: array("d") for name in NUMERIC_FIELDS})
+    for record in records:
+        for name in STRING_FIELDS:
+            columns[name].append(getattr(record, name))
+        for name in NUMERIC_FIELDS:
+            value = getattr(record, name)
+            columns[name].append(NAN if value is None else value)
+    return columns
+
+
+def columns_to_json(columns: Dict[str, Any], fields: Optional[Iterable[str]] = None) -> Dict[str, list]:
+    """Convert columns to JSON-serializable lists, mapping NaN to None.
+
+    Args:
+        columns: Columns produced by ``to_columns``
+        fields: Optional subset of fields to include
+
+    Returns:
+        Lists keyed by field name
+    """
+    result = {}
+    for name in fields or columns:
+        column = columns[name]
+        if isinstance(column, array):
+            result[name] = [None if math.isnan(value) else value for value in column]
+        else:
+            result[name] = list(column)
+    return result
+
+
+class RecordStore:
+    """In-memory store of the latest known record for each property.
+
+    Records are merged as responses arrive, so fields from property, sale and
+    AVM payloads accumulate on the same record. The oldest records are evicted
+    once the store is full.
+    """
+
+    def __init__(self, max_size: int = config.ATTOM_RECORD_STORE_SIZE):
+        self.max_size = max_size
+        self._records: Dict[str, PropertyRecord] = {}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def get(self, attom_id: str) -> Optional[PropertyRecord]:
+        """Get the record for a property, if known."""
+        return self._records.get(str(attom_id))
+
+    def add(self, record: PropertyRecord) -> None:
+        """Add or merge a record; records without an ATTOM ID are ignored."""
+        if record.attom_id is None or self.max_size <= 0:
+            return
+        existing = self._records.pop(record.attom_id, None)
+        if existing is not None:
+            record = existing.merge(record)
+        elif len(self._records) >= self.max_size:
+            del self._records[next(iter(self._records))]
+        self._records[record.attom_id] = record
+
+    def observe(self, payload: Dict[str, Any]) -> List[PropertyRecord]:
+        """Extract records from a response payload and add them to the store.
+
+        Args:
+            payload: Decoded ATTOM response
+
+        Returns:
+            Records extracted from the payload
+        """
+        records = extract_records(payload)
+        for record in records:
+            self.add(record)
+        return records
+
+    def records(self) -> List[PropertyRecord]:
+        """Get all stored records."""
+        return list(self._records.values())
+
+    def clear(self) -> None:
+        """Remove all records."""
+        self._records.clear()
+
+
+# Create a singleton store shared by the tools
+store = RecordStore()
@@ -0,0 +1,391 @@
+"""Local reference tables for state, county and CBSA lookups.
+
+This module stores the near-static ``areaapi`` state, county and CBSA lookup
+results as a versioned dataset on disk. Rows are kept as JSON lines that are
+memory-mapped on first use and decoded on demand through a separate index
+file keyed by geoIdV4, legacy geoId, parent state, FIPS and name.
+
+The dataset is built once with::
+
+    python -m src.reference refresh [--output DIR]
+"""
+
+import argparse
+import asyncio
+import json
+import mmap
+import os
+import re
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import structlog
+
+from src import config
+from src.endpoints import get_endpoint
+from src.lifecycle import lifecycle
+
+# Configure logging
+logger = structlog.get_logger(__name__)
+
+# Bumped whenever the on-disk layout changes
+REFERENCE_FORMAT_VERSION = 1
+
+DATA_FILE = "areas.jsonl"
+INDEX_FILE = "areas.index.json"
+
+TABLES = ("state", "county", "cbsa")
+# Lookup tool whose endpoint fills each table
+ENDPOINTS = {
+    "state": "state_lookup",
+    "county": "county_lookup",
+    "cbsa": "cbsa_lookup",
+}
+INDEX_KEYS = ("geoidv4", "geoid", "state", "fips", "name")
+
+# Parent state tags added to county and CBSA rows by the refresh command
+STATE_ID_TAG = "_stateId"
+STATE_GEOIDV4_TAG = "_stateGeoIdV4"
+
+REFRESH_PAGE_SIZE = 100
+
+
+def default_path() -> str:
+    """Directory of the reference dataset.
+
+    ``ATTOM_REFERENCE_DIR`` wins, then ``ATTOM_CACHE_DIR/reference``, then the
+    ``data/reference`` directory shipped inside the package.
+    """
+    if config.ATTOM_REFERENCE_DIR:
+        return config.ATTOM_REFERENCE_DIR
+    if config.ATTOM_CACHE_DIR:
+        return os.path.join(config.ATTOM_CACHE_DIR, "reference")
+    return os.path.join(os.path.dirname(__file__), "data", "reference")
+
+
+def normalize_name(name: str) -> str:
+    """Normalize an area name for case- and spacing-insensitive matching."""
+    return re.sub(r"\s+", " ", str(name)).strip().lower()
+
+
+def _field(row: Dict[str, Any], *names: str) -> Any:
+    """Get the first non-empty field of a row, matching names case-insensitively."""
+    lowered = {key.lower(): value for key, value in row.items()}
+    for name in names:
+        value = lowered.get(name)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def row_keys(table: str, row: Dict[str, Any]) -> Dict[str, Set[str]]:
+    """Get the index keys of a reference row.
+
+    Args:
+        table: Table name, one of ``TABLES``
+        row: Lookup result row, with parent state tags for counties and CBSAs
+
+    Returns:
+        Mapping of index name to the row's keys in that index
+    """
+    keys: Dict[str, Set[str]] = {name: set() for name in INDEX_KEYS}
+    geoid_v4 = _field(row, "geoidv4")
+    geoid = _field(row, "geoid", "id")
+    if geoid_v4:
+        keys["geoidv4"].add(str(geoid_v4))
+    if geoid:
+        keys["geoid"].add(str(geoid))
+
+    if table == "state":
+        keys["state"].update(keys["geoidv4"] | keys["geoid"])
+    for tag in (STATE_ID_TAG, STATE_GEOIDV4_TAG):
+        if row.get(tag):
+            keys["state"].add(str(row[tag]))
+
+    fips = {key.lower(): str(value) for key, value in row.items() if "fips" in key.lower() and value}
+    keys["fips"].update(fips.values())
+    state_fips = fips.get("statefips") or fips.get("state_fips")
+    county_fips = fips.get("countyfips") or fips.get("county_fips")
+    if state_fips and county_fips and len(county_fips) <= 3:
+        keys["fips"].add(state_fips.zfill(2) + county_fips.zfill(3))
+
+    name = _field(row, f"{table}name", "name")
+    if name:
+        keys["name"].add(normalize_name(name))
+    return keys
+
+
+def extract_rows(payload: Any) -> List[Dict[str, Any]]:
+    """Find the result rows of an ``areaapi`` lookup response."""
+    if isinstance(payload, list):
+        if payload and all(isinstance(item, dict) for item in payload):
+            return payload
+        return []
+    if not isinstance(payload, dict):
+        return []
+    for key in ("item", "items", "result", "package", "response"):
+        value = payload.get(key)
+        if isinstance(value, dict) and _field(value, "geoidv4", "geoid"):
+            return [value]
+        rows = extract_rows(value)
+        if rows:
+            return rows
+    return []
+
+
+def write_dataset(path: str, tables: Dict[str, List[Dict[str, Any]]], source: str = "") -> Dict[str, int]:
+    """Write a reference dataset atomically.
+
+    Args:
+        path: Dataset directory
+        tables: Rows per table name
+        source: Description of where the rows came from
+
+    Returns:
+        Row count per table
+    """
+    os.makedirs(path, exist_ok=True)
+    index: Dict[str, Any] = {
+        "format": REFERENCE_FORMAT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "source": source,
+        "tables": {},
+    }
+    data_tmp = os.path.join(path, DATA_FILE + ".tmp")
+    offset = 0
+    with open(data_tmp, "wb") as f:
+        for table in TABLES:
+            spans: List[List[int]] = []
+            keys: Dict[str, Dict[str, List[int]]] = {name: {} for name in INDEX_KEYS}
+            for row in tables.get(table, []):
+                line = json.dumps(row, separators=(",", ":")).encode("utf-8") + b"\n"
+                f.write(line)
+                for name, values in row_keys(table, row).items():
+                    for value in values:
+                        keys[name].setdefault(value, []).append(len(spans))
+                spans.append([offset, len(line) - 1])
+                offset += len(line)
+            index["tables"][table] = {"rows": spans, "keys": keys}
+
+    index_tmp = os.path.join(path, INDEX_FILE + ".tmp")
+    with open(index_tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+    # Replace the data before the index so readers never see offsets into a stale file
+    os.replace(data_tmp, os.path.join(path, DATA_FILE))
+    os.replace(index_tmp, os.path.join(path, INDEX_FILE))
+    return {table: len(index["tables"][table]["rows"]) for table in TABLES}
+
+
+class ReferenceData:
+    """Lazily loaded, memory-mapped reference tables."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_path()
+        self._index: Optional[Dict[str, Any]] = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._file = None
+        self._loaded = False
+
+    def _ensure_loaded(self) -> None:
+        """Open the dataset on first use."""
+        if self._loaded:
+            return
+        self._loaded = True
+        index_path = os.path.join(self.path, INDEX_FILE)
+        data_path = os.path.join(self.path, DATA_FILE)
+        if not (os.path.exists(index_path) and os.path.exists(data_path)):
+            return
+        try:
+            with open(index_path, encoding="utf-8") as f:
+                index = json.load(f)
+        except ValueError:
+            logger.warning("Invalid reference index", path=index_path)
+            return
+        if index.get("format") != REFERENCE_FORMAT_VERSION:
+            logger.warning("Unsupported reference format", path=index_path, format=index.get("format"))
+            return
+        self._file = open(data_path, "rb")
+        if os.fstat(self._file.fileno()).st_size:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index = index
+        logger.info("Loaded reference dataset", path=self.path, created=index.get("created"))
+
+    @property
+    def version(self) -> Optional[str]:
+        """Creation timestamp of the loaded dataset, if any."""
+        self._ensure_loaded()
+        return self._index.get("created") if self._index else None
+
+    def has(self, table: str) -> bool:
+        """Whether the dataset has any rows for a table."""
+        self._ensure_loaded()
+        return bool(self._index and self._index["tables"].get(table, {}).get("rows"))
+
+    def _row(self, table: str, position: int) -> Dict[str, Any]:
+        """Decode one row from the memory-mapped data file."""
+        offset, length = self._index["tables"][table]["rows"][position]
+        return json.loads(self._mmap[offset : offset + length])
+
+    def _ids(self, table: str, key: str, value: str) -> Set[int]:
+        """Row positions of a table matching one index key."""
+        if key == "name":
+            value = normalize_name(value)
+        return set(self._index["tables"][table]["keys"][key].get(str(value), ()))
+
+    def find(
+        self,
+        table: str,
+        geoid_v4: Optional[str] = None,
+        geoid: Optional[str] = None,
+        state_id: Optional[str] = None,
+        fips: Optional[str] = None,
+        name: Optional[str] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Find reference rows matching all given filters.
+
+        A geoIdV4 matches a row's own id or its parent state's id. For states,
+        the geoIdV4 of a county or CBSA also matches the state containing it.
+
+        Args:
+            table: Table name, one of ``TABLES``
+            geoid_v4: Area geoIdV4
+            geoid: Legacy area geoId
+            state_id: Parent state id or geoIdV4
+            fips: State or county FIPS code
+            name: Area name
+
+        Returns:
+            Matching rows in dataset order, or None if the table is not available
+        """
+        if not self.has(table):
+            return None
+        selected: Optional[Set[int]] = None
+
+        def narrow(ids: Set[int]) -> None:
+            nonlocal selected
+            selected = ids if selected is None else selected & ids
+
+        if geoid_v4:
+            ids = self._ids(table, "geoidv4", geoid_v4) | self._ids(table, "state", geoid_v4)
+            if not ids and table == "state":
+                for row in self.find_any(geoid_v4=geoid_v4):
+                    parent = row.get(STATE_GEOIDV4_TAG) or row.get(STATE_ID_TAG)
+                    if parent:
+                        ids |= self._ids(table, "state", parent)
+            narrow(ids)
+        if geoid:
+            narrow(self._ids(table, "geoid", geoid))
+        if state_id:
+            narrow(self._ids(table, "state", state_id))
+        if fips:
+            narrow(self._ids(table, "fips", fips))
+        if name:
+            narrow(self._ids(table, "name", name))
+
+        if selected is None:
+            selected = set(range(len(self._index["tables"][table]["rows"])))
+        return [self._row(table, position) for position in sorted(selected)]
+
+    def find_any(self, geoid_v4: Optional[str] = None, geoid: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Find rows with a given own geoIdV4 or legacy geoId in any table."""
+        self._ensure_loaded()
+        rows = []
+        for table in TABLES:
+            if not self.has(table):
+                continue
+            ids: Set[int] = set()
+            if geoid_v4:
+                ids |= self._ids(table, "geoidv4", geoid_v4)
+            if geoid:
+                ids |= self._ids(table, "geoid", geoid)
+            rows.extend(self._row(table, position) for position in sorted(ids))
+        return rows
+
+    def close(self) -> None:
+        """Unmap the dataset; it is reopened on next use."""
+        if self._mmap is not None:
+            self._mmap.close()
+        if self._file is not None:
+            self._file.close()
+        self._index = self._mmap = self._file = None
+        self._loaded = False
+
+
+async def _fetch_all(client: Any, table: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Fetch every page of a lookup endpoint."""
+    rows: List[Dict[str, Any]] = []
+    page = 1
+    while True:
+        endpoint = get_endpoint(ENDPOINTS[table])
+        payload = await client.get(
+            endpoint.path,
+            {**params, "page": page, "pageSize": REFRESH_PAGE_SIZE},
+            api_prefix=endpoint.api_prefix(client),
+            label=endpoint.name,
+        )
+        batch = extract_rows(payload)
+        rows.extend(batch)
+        if len(batch) < REFRESH_PAGE_SIZE:
+            return rows
+        page += 1
+
+
+async def refresh(client: Any, path: Optional[str] = None) -> Dict[str, int]:
+    """Rebuild the reference dataset from the ATTOM Area API.
+
+    Args:
+        client: ATTOM API client
+        path: Dataset directory (default: ``default_path()``)
+
+    Returns:
+        Row count per table
+    """
+    path = path or default_path()
+    log = logger.bind(path=path)
+    tables: Dict[str, List[Dict[str, Any]]] = {"state": await _fetch_all(client, "state", {})}
+    log.info("Fetched states", count=len(tables["state"]))
+
+    for table in ("county", "cbsa"):
+        tables[table] = []
+        for state in tables["state"]:
+            state_id = _field(state, "geoid", "id")
+            if not state_id:
+                continue
+            for row in await _fetch_all(client, table, {"stateId": state_id}):
+                row[STATE_ID_TAG] = str(state_id)
+                if _field(state, "geoidv4"):
+                    row[STATE_GEOIDV4_TAG] = str(_field(state, "geoidv4"))
+                tables[table].append(row)
+        log.info(f"Fetched {table} rows", count=len(tables[table]))
+
+    counts = write_dataset(path, tables, source=client.host_url)
+    reference.close()
+    return counts
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    """Command line entry point for maintaining the reference dataset."""
+    parser = argparse.ArgumentParser(description="ATTOM reference dataset tools")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    refresh_parser = subcommands.add_parser("refresh", help="Rebuild the dataset from the ATTOM Area API")
+    refresh_parser.add_argument("--output", default=None, help="Dataset directory")
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    if not config.ATTOM_API_KEY:
+        logger.error("ATTOM_API_KEY environment variable is required")
+        sys.exit(1)
+
+    from src.client import client
+
+    counts = asyncio.run(refresh(client, args.output))
+    logger.info("Reference dataset refreshed", **counts)
+
+
+# Create a singleton dataset shared by the area tools
+reference = ReferenceData()
+lifecycle.on_shutdown(reference.close)
+
+
+if __name__ == "__main__":
+    main()
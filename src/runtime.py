@@ -0,0 +1,135 @@
+"""Event loop and executor settings for the server runtime.
+
+The event loop is chosen with ``ATTOM_EVENT_LOOP``: ``asyncio`` (default),
+``uvloop`` (opt-in, falls back to asyncio when uvloop is not installed) or
+``auto`` (uvloop when installed). Blocking work such as upstream HTTP
+requests and JSON decoding runs on a shared, size-bounded thread pool.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Optional
+
+import structlog
+
+from src import config
+from src.lifecycle import lifecycle
+from src.profiling import profiler
+
+# Configure logging
+logger = structlog.get_logger(__name__)
+
+EVENT_LOOPS = ("asyncio", "uvloop", "auto")
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def uvloop_available() -> bool:
+    """Whether uvloop can be imported."""
+    try:
+        import uvloop  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def resolve_loop(name: Optional[str] = None) -> str:
+    """Resolve an event loop setting to the loop actually used.
+
+    Args:
+        name: One of ``EVENT_LOOPS`` (default: ``ATTOM_EVENT_LOOP``)
+
+    Returns:
+        ``"uvloop"`` or ``"asyncio"``
+
+    Raises:
+        ValueError: If the setting is unknown
+    """
+    name = (name or config.ATTOM_EVENT_LOOP).lower()
+    if name not in EVENT_LOOPS:
+        raise ValueError(f"Unknown event loop {name!r}; expected one of: {', '.join(EVENT_LOOPS)}")
+    if name == "asyncio":
+        return "asyncio"
+    if uvloop_available():
+        return "uvloop"
+    if name == "uvloop":
+        logger.warning("uvloop is not installed; using the asyncio event loop")
+    return "asyncio"
+
+
+def loop_factory(name: Optional[str] = None) -> Callable[[], asyncio.AbstractEventLoop]:
+    """Get a factory for new event loops of the configured kind."""
+    if resolve_loop(name) == "uvloop":
+        import uvloop
+
+        return uvloop.new_event_loop
+    return asyncio.new_event_loop
+
+
+def executor_workers() -> int:
+    """Number of threads in the shared executor."""
+    if config.ATTOM_EXECUTOR_WORKERS > 0:
+        return config.ATTOM_EXECUTOR_WORKERS
+    # Threads mostly wait on upstream I/O, so allow several per CPU
+    return min(32, (os.cpu_count() or 1) * 8 + 8)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get the shared executor for blocking work, creating it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=executor_workers(), thread_name_prefix="attom")
+    return _executor
+
+
+@lifecycle.on_shutdown
+def shutdown_executor() -> None:
+    """Wait for blocking work to finish and release the executor's threads."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+async def run_blocking(fn: Callable[..., Any], *args: Any) -> Any:
+    """Run a blocking function on the shared executor without blocking the loop."""
+    if profiler.active:
+        fn = profiler.tagged(fn)
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), fn, *args)
+
+
+def configure_loop(loop: asyncio.AbstractEventLoop) -> None:
+    """Give the loop a fresh shared executor as its default executor.
+
+    The loop shuts its default executor down when it closes, so each loop
+    run with ``run`` gets its own.
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+    _executor = ThreadPoolExecutor(max_workers=executor_workers(), thread_name_prefix="attom")
+    loop.set_default_executor(_executor)
+
+
+def run(main: Callable[[], Awaitable[Any]], loop: Optional[str] = None) -> Any:
+    """Run a coroutine function on a new event loop of the configured kind.
+
+    Args:
+        main: Coroutine function to run
+        loop: Event loop setting (default: ``ATTOM_EVENT_LOOP``)
+
+    Returns:
+        The coroutine's result
+    """
+    import anyio
+
+    async def configured() -> Any:
+        configure_loop(asyncio.get_running_loop())
+        return await main()
+
+    global _executor
+    try:
+        return anyio.run(configured, backend="asyncio", backend_options={"loop_factory": loop_factory(loop)})
+    finally:
+        _executor = None
@@ -0,0 +1,263 @@
+"""In-process attribute search over the properties seen so far.
+
+Every property record merged into the record store is also indexed here, one
+row per property:
+
+- Numeric fields (beds, AVM value, sale date as a day number, ...) are
+  float64 columns with NaN for missing values. A sorted copy of each column
+  is built lazily once the column changed, so range filters are two binary
+  searches that set a bitmap of matching rows.
+- Categorical fields (state, city, ZIP, property type, FIPS) are
+  dictionary-encoded int32 columns, so equality and membership filters
+  compare integer codes.
+
+Filters intersect their bitmaps; results are ranked by any numeric field or
+by distance from a point, and returned without calling ATTOM.
+"""
+
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import structlog
+
+from src import config
+from src.geo import haversine_miles
+from src.records import NUMERIC_FIELDS, PropertyRecord
+
+# Configure logging
+logger = structlog.get_logger(__name__)
+
+# Date fields, indexed as days since the epoch
+DATE_FIELDS = ("sale_date", "avm_date")
+RANGE_FIELDS = NUMERIC_FIELDS + DATE_FIELDS
+CATEGORICAL_FIELDS = ("state", "city", "zip_code", "property_type", "fips")
+
+# Filter operators
+RANGE_OPS = ("gt", "gte", "lt", "lte", "between")
+CATEGORICAL_OPS = ("eq", "ne", "in")
+
+EPOCH = date(1970, 1, 1)
+
+
+def _normalize(value: Any) -> str:
+    return str(value).strip().upper()
+
+
+def _range_value(field: str, value: Any) -> float:
+    """A filter bound as a number; dates may be given as ``YYYY-MM-DD``."""
+    if field in DATE_FIELDS and isinstance(value, str):
+        return float((date.fromisoformat(value) - EPOCH).days)
+    return float(value)
+
+
+class AttributeIndex:
+    """Columnar index of property records for filtering and ranking."""
+
+    def __init__(self, max_size: int = config.ATTOM_RECORD_STORE_SIZE):
+        """Initialize the index.
+
+        Args:
+            max_size: Most properties indexed; the least recently updated are evicted
+        """
+        self.max_size = max_size
+        self._rows: Dict[str, int] = {}
+        self._records: List[Optional[PropertyRecord]] = []
+        self._free: List[int] = []
+        self._alive = np.zeros(0, dtype=bool)
+        self._numeric = {name: np.zeros(0, dtype=np.float64) for name in RANGE_FIELDS}
+        self._codes = {name: np.zeros(0, dtype=np.int32) for name in CATEGORICAL_FIELDS}
+        # Code of each categorical value; 0 is missing
+        self._dictionaries: Dict[str, Dict[str, int]] = {name: {} for name in CATEGORICAL_FIELDS}
+        # Sorted (values, rows) of each numeric column, rebuilt after changes
+        self._sorted: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _grow(self) -> None:
+        capacity = max(64, 2 * len(self._alive))
+        if self.max_size > 0:
+            capacity = min(capacity, max(self.max_size, len(self._alive) + 1))
+        extra = capacity - len(self._alive)
+        self._alive = np.concatenate([self._alive, np.zeros(extra, dtype=bool)])
+        for name, column in self._numeric.items():
+            self._numeric[name] = np.concatenate([column, np.full(extra, np.nan)])
+        for name, codes in self._codes.items():
+            self._codes[name] = np.concatenate([codes, np.zeros(extra, dtype=np.int32)])
+        self._free.extend(range(len(self._alive) - 1, len(self._alive) - extra - 1, -1))
+        self._records.extend([None] * extra)
+
+    def _row(self, attom_id: str) -> int:
+        row = self._rows.pop(attom_id, None)
+        if row is None:
+            if self.max_size > 0 and len(self._rows) >= self.max_size:
+                self.remove(next(iter(self._rows)))
+            if not self._free:
+                self._grow()
+            row = self._free.pop()
+        # Most recently updated last, for eviction
+        self._rows[attom_id] = row
+        return row
+
+    def add(self, records: Iterable[Optional[PropertyRecord]]) -> int:
+        """Index or re-index records; records without an ATTOM ID are skipped.
+
+        Returns:
+            Number of records indexed
+        """
+        count = 0
+        for record in records:
+            if record is None or record.attom_id is None or self.max_size <= 0:
+                continue
+            row = self._row(record.attom_id)
+            self._records[row] = record
+            self._alive[row] = True
+            for name in NUMERIC_FIELDS:
+                value = getattr(record, name)
+                self._numeric[name][row] = np.nan if value is None else value
+            for name in DATE_FIELDS:
+                value = getattr(record, name)
+                self._numeric[name][row] = np.nan if value is None else _range_value(name, value)
+            for name in CATEGORICAL_FIELDS:
+                value = getattr(record, name)
+                if value is None:
+                    self._codes[name][row] = 0
+                    continue
+                dictionary = self._dictionaries[name]
+                self._codes[name][row] = dictionary.setdefault(_normalize(value), len(dictionary) + 1)
+            count += 1
+        if count:
+            self._sorted.clear()
+        return count
+
+    def remove(self, attom_id: str) -> bool:
+        """Drop a property from the index."""
+        row = self._rows.pop(str(attom_id), None)
+        if row is None:
+            return False
+        self._alive[row] = False
+        self._records[row] = None
+        for column in self._numeric.values():
+            column[row] = np.nan
+        for codes in self._codes.values():
+            codes[row] = 0
+        self._free.append(row)
+        self._sorted.clear()
+        return True
+
+    def _sorted_column(self, field: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Values of a numeric column in ascending order (NaN last) and their rows."""
+        cached = self._sorted.get(field)
+        if cached is None:
+            column = self._numeric[field]
+            rows = np.argsort(column, kind="stable")
+            cached = self._sorted[field] = (column[rows], rows)
+        return cached
+
+    def _range(self, field: str, low: float, high: float, low_inclusive: bool, high_inclusive: bool) -> np.ndarray:
+        values, rows = self._sorted_column(field)
+        start = np.searchsorted(values, low, side="left" if low_inclusive else "right")
+        end = np.searchsorted(values, high, side="right" if high_inclusive else "left")
+        mask = np.zeros(len(self._alive), dtype=bool)
+        mask[rows[start:end]] = True
+        return mask
+
+    def _condition(self, field: str, op: str, value: Any) -> np.ndarray:
+        """Bitmap of the rows matching one filter.
+
+        Raises:
+            ValueError: If the field, operator or value is not valid
+        """
+        if field in RANGE_FIELDS:
+            if op not in RANGE_OPS:
+                raise ValueError(f"{field} takes one of: {', '.join(RANGE_OPS)}")
+            if op == "between":
+                if not isinstance(value, (list, tuple)) or len(value) != 2:
+                    raise ValueError(f"between on {field} takes [low, high]")
+                return self._range(field, _range_value(field, value[0]), _range_value(field, value[1]), True, True)
+            bound = _range_value(field, value)
+            if op in ("gt", "gte"):
+                return self._range(field, bound, np.inf, op == "gte", True)
+            return self._range(field, -np.inf, bound, True, op == "lte")
+        if field in CATEGORICAL_FIELDS:
+            if op not in CATEGORICAL_OPS:
+                raise ValueError(f"{field} takes one of: {', '.join(CATEGORICAL_OPS)}")
+            values = value if isinstance(value, (list, tuple)) else [value]
+            dictionary = self._dictionaries[field]
+            codes = [dictionary[key] for key in (_normalize(v) for v in values) if key in dictionary]
+            mask = np.isin(self._codes[field], codes)
+            return ~mask & self._alive if op == "ne" else mask
+        raise ValueError(f"Unknown field {field!r}; expected one of: {', '.join(RANGE_FIELDS + CATEGORICAL_FIELDS)}")
+
+    def search(
+        self,
+        filters: Sequence[Tuple[str, str, Any]] = (),
+        near: Optional[Tuple[float, float, float]] = None,
+        sort_by: Optional[str] = None,
+        descending: bool = False,
+        limit: int = 50,
+    ) -> Dict[str, Any]:
+        """Filter and rank the indexed properties.
+
+        Args:
+            filters: (field, operator, value) conditions, all of which must hold
+            near: (latitude, longitude, radius in miles) to keep properties within
+            sort_by: Numeric field to rank by, or ``distance`` with ``near``
+            descending: Rank from the highest value
+            limit: Most properties returned
+
+        Returns:
+            Number of matches and the ranked records, with distances when ``near`` is given
+
+        Raises:
+            ValueError: If a filter or the ranking field is not valid
+        """
+        mask = self._alive.copy()
+        for field, op, value in filters:
+            mask &= self._condition(field, op, value)
+        distances = None
+        if near is not None:
+            latitude, longitude, radius = near
+            distances = haversine_miles(latitude, longitude, self._numeric["latitude"], self._numeric["longitude"])
+            # Missing coordinates give NaN distances, which never compare as within the radius
+            mask &= distances <= radius
+
+        rows = np.flatnonzero(mask)
+        if sort_by == "distance":
+            if distances is None:
+                raise ValueError("Sorting by distance needs a point and radius")
+            keys = distances[rows]
+        elif sort_by is not None:
+            if sort_by not in RANGE_FIELDS:
+                raise ValueError(f"Cannot sort by {sort_by!r}; expected a numeric field or distance")
+            keys = self._numeric[sort_by][rows]
+        else:
+            keys = None
+        if keys is not None:
+            # Missing values rank last either way
+            order = np.lexsort((-keys if descending else keys, np.isnan(keys)))
+            rows = rows[order]
+
+        matches = []
+        for row in rows[:limit]:
+            entry = self._records[row].to_dict()
+            if distances is not None:
+                entry["distance_miles"] = round(float(distances[row]), 3)
+            matches.append(entry)
+        return {"total": int(len(rows)), "properties": matches}
+
+    def fields(self) -> Dict[str, List[str]]:
+        """Searchable fields by kind."""
+        return {"range": list(RANGE_FIELDS), "categorical": list(CATEGORICAL_FIELDS)}
+
+    def clear(self) -> None:
+        """Remove all properties."""
+        for attom_id in list(self._rows):
+            self.remove(attom_id)
+        for dictionary in self._dictionaries.values():
+            dictionary.clear()
+
+
+# Create a singleton index shared by the tools
+search_index = AttributeIndex()
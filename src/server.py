@@ -3,44 +3,154 @@
 This module provides a MCP server for the ATTOM API.
 """
 
-import logging
+import hmac
+import os
 import sys
+from functools import partial
+from typing import Optional
 
 import structlog
-from src import config
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+
+from src import config, runtime
+from src.lifecycle import run_stdio
+from src.limits import limiter
+from src.logs import configure_logging
+from src.manifest import register_tools, select_profile
+from src.metrics import MetricsFileWriter, registry
+from src.profiling import install_signal_handler, profile_options, profiler
+from src.tracing import configure_tracing
+from src.usage import ledger
 from src.mcp_server import mcp
 
-# Import all tool modules to register the @mcp.tool decorators
-from src.tools import (
-    area_tools,
-    assessment_tools,
-    community_tools,
-    event_tools,
-    misc_tools,
-    poi_tools,
-    property_tools,
-    sale_tools,
-    school_tools,
-    valuation_tools,
-)
-
-# Configure logging
-log_level = getattr(logging, config.LOG_LEVEL.upper(), logging.INFO)
-logging.basicConfig(
-    format="%(message)s",
-    stream=sys.stderr,
-    level=log_level,
-)
-
-# Configure structlog to also use stderr
-structlog.configure(
-    processors=[
-        structlog.dev.ConsoleRenderer(),
-    ],
-    wrapper_class=structlog.make_filtering_bound_logger(log_level),
-    logger_factory=structlog.WriteLoggerFactory(file=sys.stderr),
-    cache_logger_on_first_use=True,
-)
+# Register the tools from the manifest; their modules are imported on first call
+register_tools(mcp, lazy=config.ATTOM_LAZY_TOOLS, profile=config.ATTOM_TOOL_PROFILE)
+
+# Configure logging to stderr, keeping stdout for the stdio transport
+configure_logging()
+
+# Export traces when an exporter is configured (each HTTP worker sets up its own)
+configure_tracing()
+
+
+@mcp.custom_route("/health", methods=["GET"])
+async def health(request: Request) -> JSONResponse:
+    """Liveness probe for the HTTP transport, with this worker's call queue stats."""
+    return JSONResponse({"status": "ok", "pid": os.getpid(), "concurrency": limiter.stats()})
+
+
+def route_error(request: Request, enabled: bool) -> Optional[JSONResponse]:
+    """Error response for a diagnostic route that is disabled or lacks ``ATTOM_ROUTE_TOKEN``.
+
+    Returns:
+        None if the request may be served
+    """
+    if not enabled:
+        return JSONResponse({"error": "Not found"}, status_code=404)
+    if config.ATTOM_ROUTE_TOKEN:
+        expected = f"Bearer {config.ATTOM_ROUTE_TOKEN}".encode()
+        if not hmac.compare_digest(request.headers.get("authorization", "").encode(), expected):
+            return JSONResponse({"error": "Unauthorized"}, status_code=401)
+    return None
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics(request: Request) -> Response:
+    """Prometheus scrape endpoint for the HTTP transport (per worker), when ``ATTOM_METRICS_ROUTE`` is on."""
+    error = route_error(request, config.ATTOM_METRICS_ROUTE)
+    if error is not None:
+        return error
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@mcp.custom_route("/debug/profile", methods=["GET", "POST"])
+async def profile(request: Request) -> JSONResponse:
+    """Start a profiling session (POST) or report on it (GET), when ``ATTOM_PROFILE_ROUTE`` is on.
+
+    POST takes ``seconds``, ``calls`` and ``memory`` query parameters.
+    """
+    error = route_error(request, config.ATTOM_PROFILE_ROUTE)
+    if error is not None:
+        return error
+    if request.method == "POST":
+        try:
+            options = profile_options(dict(request.query_params))
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        if not profiler.start(**options):
+            return JSONResponse({"error": "A profiling session is already running"}, status_code=409)
+    return JSONResponse(profiler.status())
+
+
+@mcp.custom_route("/usage", methods=["GET"])
+async def usage(request: Request) -> JSONResponse:
+    """ATTOM API usage and budgets for the HTTP transport, when ``ATTOM_USAGE_ROUTE`` is on.
+
+    Reports across workers sharing ``ATTOM_CACHE_DIR``, with the top sessions
+    by fingerprint. Takes ``days``, ``session`` (a fingerprint) and ``top``
+    query parameters.
+    """
+    error = route_error(request, config.ATTOM_USAGE_ROUTE)
+    if error is not None:
+        return error
+    try:
+        days = int(request.query_params.get("days", "1"))
+        top = int(request.query_params.get("top", "20"))
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    return JSONResponse(ledger.report(days=days, session=request.query_params.get("session"), top=top))
+
+
+def create_app():
+    """Build the ASGI app for the streamable HTTP transport.
+
+    Used as a uvicorn factory, so every worker process builds its own app
+    with its own connection pool and caches.
+    """
+    install_signal_handler()
+    return mcp.http_app(
+        path=config.MCP_HTTP_PATH,
+        stateless_http=config.MCP_STATELESS_HTTP or config.MCP_WORKERS > 1,
+    )
+
+
+def run_http(
+    host: str, port: int, workers: int, path: str, reload: bool, log_level: str, loop: str = "asyncio"
+) -> None:
+    """Serve the MCP server over streamable HTTP with uvicorn.
+
+    Several workers share the listening socket. Sending SIGHUP to the parent
+    process replaces the workers one at a time, and SIGTERM lets in-flight
+    requests finish for up to ``MCP_GRACEFUL_TIMEOUT`` seconds.
+
+    Args:
+        host: Host to bind to
+        port: Port to bind to
+        workers: Number of worker processes
+        path: URL path of the MCP endpoint
+        reload: Restart on code changes (development only, single worker)
+        log_level: uvicorn log level
+        loop: Event loop, ``asyncio`` or ``uvloop``
+    """
+    import uvicorn
+
+    # Worker processes re-import this module, so hand the settings down via the environment
+    config.MCP_HTTP_PATH = os.environ["MCP_HTTP_PATH"] = path
+    config.MCP_WORKERS = workers
+    os.environ["MCP_WORKERS"] = str(workers)
+
+    uvicorn.run(
+        "src.server:create_app",
+        factory=True,
+        host=host,
+        port=port,
+        workers=None if reload else workers,
+        reload=reload,
+        log_level=log_level,
+        loop=loop,
+        timeout_graceful_shutdown=config.MCP_GRACEFUL_TIMEOUT,
+    )
 
 
 def main() -> None:
@@ -57,7 +167,28 @@ def main() -> None:
     # Parse command line arguments for flexible configuration
     parser = argparse.ArgumentParser(description="ATTOM API MCP Server")
     parser.add_argument(
-        "--port", type=int, default=8000, help="Port to bind the server to"
+        "--transport", choices=["stdio", "http"], default=config.MCP_TRANSPORT, help="MCP transport"
+    )
+    parser.add_argument(
+        "--host", default=config.MCP_HOST, help="Host to bind the HTTP server to"
+    )
+    parser.add_argument(
+        "--port", type=int, default=config.MCP_PORT, help="Port to bind the server to"
+    )
+    parser.add_argument(
+        "--path", default=config.MCP_HTTP_PATH, help="URL path of the HTTP MCP endpoint"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=config.MCP_WORKERS, help="Number of HTTP worker processes"
+    )
+    parser.add_argument(
+        "--reload", action="store_true", help="Restart the HTTP server on code changes"
+    )
+    parser.add_argument(
+        "--profile", default=config.ATTOM_TOOL_PROFILE, help="Comma-separated tool profiles (all, property, area)"
+    )
+    parser.add_argument(
+        "--loop", choices=runtime.EVENT_LOOPS, default=config.ATTOM_EVENT_LOOP, help="Event loop implementation"
     )
     parser.add_argument(
         "--log-level", default=config.LOG_LEVEL.lower(), help="Logging level (debug, info, warning, error)"
@@ -69,7 +200,14 @@ def main() -> None:
     except SystemExit:
         # If parsing fails, use defaults
         class DefaultArgs:
-            port = 8000
+            transport = config.MCP_TRANSPORT
+            host = config.MCP_HOST
+            port = config.MCP_PORT
+            path = config.MCP_HTTP_PATH
+            workers = config.MCP_WORKERS
+            reload = False
+            profile = config.ATTOM_TOOL_PROFILE
+            loop = config.ATTOM_EVENT_LOOP
             log_level = config.LOG_LEVEL.lower()
         args = DefaultArgs()
 
@@ -78,11 +216,40 @@ def main() -> None:
         logger.error("ATTOM_API_KEY environment variable is required")
         sys.exit(1)
 
+    if args.profile != config.ATTOM_TOOL_PROFILE:
+        try:
+            removed = select_profile(mcp, args.profile, lazy=config.ATTOM_LAZY_TOOLS)
+        except ValueError as e:
+            logger.error(str(e))
+            sys.exit(1)
+        # HTTP workers re-import this module and register tools from the environment
+        config.ATTOM_TOOL_PROFILE = os.environ["ATTOM_TOOL_PROFILE"] = args.profile
+        logger.info("Selected tool profile", profile=args.profile, removed=removed)
+
+    try:
+        loop = runtime.resolve_loop(args.loop)
+    except ValueError as e:
+        logger.error(str(e))
+        sys.exit(1)
+
     # Run the MCP server
-    logger.info("Running MCP server with STDIO transport")
-    mcp.run(
-        transport="stdio"
-    )
+    if args.transport == "http":
+        logger.info(
+            "Running MCP server with HTTP transport",
+            host=args.host,
+            port=args.port,
+            path=args.path,
+            workers=args.workers,
+            loop=loop,
+        )
+        run_http(args.host, args.port, max(1, args.workers), args.path, args.reload, args.log_level, loop)
+        return
+
+    logger.info("Running MCP server with STDIO transport", loop=loop)
+    install_signal_handler()
+    if config.ATTOM_METRICS_FILE:
+        MetricsFileWriter(config.ATTOM_METRICS_FILE, config.ATTOM_METRICS_INTERVAL).start()
+    runtime.run(partial(run_stdio, mcp), loop)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,450 @@
+"""Local spatial index over cached ATTOM boundary geometries.
+
+This module indexes GeoJSON boundaries returned by ``boundary_detail`` in an
+R-tree over polygon bounding boxes and answers point-in-polygon lookups
+locally, so ``hierarchy_lookup`` only goes upstream for uncovered points.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import structlog
+
+from src import config
+
+# Configure logging
+logger = structlog.get_logger(__name__)
+
+GEOMETRY_TYPES = ("Polygon", "MultiPolygon")
+GEOJSON_TYPES = GEOMETRY_TYPES + (
+    "Point",
+    "MultiPoint",
+    "LineString",
+    "MultiLineString",
+    "GeometryCollection",
+    "Feature",
+    "FeatureCollection",
+)
+
+# Property keys that identify the geography type of a boundary
+GEO_TYPE_KEYS = ("geographyTypeAbbreviation", "geoType", "geo_type", "type")
+
+BBox = Tuple[float, float, float, float]
+
+
+class PreparedGeometry:
+    """Polygon or multipolygon with edge arrays ready for point tests."""
+
+    __slots__ = ("bbox", "_polygons")
+
+    def __init__(self, geometry: Dict[str, Any]):
+        polygons = geometry["coordinates"]
+        if geometry["type"] == "Polygon":
+            polygons = [polygons]
+        self._polygons = []
+        min_x = min_y = float("inf")
+        max_x = max_y = float("-inf")
+        for polygon in polygons:
+            rings = []
+            for ring in polygon:
+                points = np.asarray(ring, dtype=np.float64)[:, :2]
+                if len(points) < 3:
+                    continue
+                # Edge start points and deltas to the next vertex (ring closed implicitly)
+                start = points
+                delta = np.roll(points, -1, axis=0) - points
+                rings.append((start[:, 0], start[:, 1], delta[:, 0], delta[:, 1]))
+                min_x, min_y = min(min_x, points[:, 0].min()), min(min_y, points[:, 1].min())
+                max_x, max_y = max(max_x, points[:, 0].max()), max(max_y, points[:, 1].max())
+            if rings:
+                self._polygons.append(rings)
+        self.bbox: BBox = (float(min_x), float(min_y), float(max_x), float(max_y))
+
+    @property
+    def empty(self) -> bool:
+        """Whether the geometry has no usable rings."""
+        return not self._polygons
+
+    def contains(self, x: float, y: float) -> bool:
+        """Test whether the point (x=longitude, y=latitude) is inside."""
+        for rings in self._polygons:
+            # Even-odd rule across the outer ring and its holes
+            crossings = 0
+            for x0, y0, dx, dy in rings:
+                straddles = (y0 > y) != (y0 + dy > y)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    x_cross = x0 + dx * (y - y0) / dy
+                crossings += int(np.count_nonzero(straddles & (x < x_cross)))
+            if crossings % 2 == 1:
+                return True
+        return False
+
+
+class RTree:
+    """Static R-tree over bounding boxes, bulk loaded with Sort-Tile-Recursive."""
+
+    def __init__(self, boxes: List[BBox], node_size: int = 16):
+        self.node_size = node_size
+        # Each node is (min_x, min_y, max_x, max_y, children, is_leaf)
+        self.root = None
+        level = [(*box, index, True) for index, box in enumerate(boxes)]
+        if not level:
+            return
+        level = self._pack(level)
+        while len(level) > 1:
+            level = self._pack(level)
+        self.root = level[0]
+
+    def _pack(self, entries: List[tuple]) -> List[tuple]:
+        """Group one level of entries into parent nodes."""
+        count = len(entries)
+        node_count = -(-count // self.node_size)
+        slice_count = max(1, int(np.ceil(np.sqrt(node_count))))
+        slice_size = slice_count * self.node_size
+        entries = sorted(entries, key=lambda e: e[0] + e[2])
+        parents = []
+        for start in range(0, count, slice_size):
+            vertical = sorted(entries[start : start + slice_size], key=lambda e: e[1] + e[3])
+            for offset in range(0, len(vertical), self.node_size):
+                children = vertical[offset : offset + self.node_size]
+                parents.append(
+                    (
+                        min(c[0] for c in children),
+                        min(c[1] for c in children),
+                        max(c[2] for c in children),
+                        max(c[3] for c in children),
+                        children,
+                        False,
+                    )
+                )
+        return parents
+
+    def query_point(self, x: float, y: float) -> List[int]:
+        """Get the indexes of all boxes containing the point."""
+        if self.root is None:
+            return []
+        found, stack = [], [self.root]
+        while stack:
+            min_x, min_y, max_x, max_y, children, is_leaf = stack.pop()
+            if x < min_x or x > max_x or y < min_y or y > max_y:
+                continue
+            if is_leaf:
+                found.append(children)
+            else:
+                stack.extend(children)
+        return found
+
+
+def _load_geometry(value: Any) -> Optional[Dict[str, Any]]:
+    """Decode a GeoJSON geometry that may be embedded as a JSON string."""
+    if isinstance(value, str) and value.lstrip().startswith("{"):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return None
+    return value if isinstance(value, dict) else None
+
+
+def _is_embedded(value: Any) -> bool:
+    """Whether a value is a GeoJSON object serialized into a string."""
+    return isinstance(value, str) and value.lstrip().startswith("{") and "coordinates" in value
+
+
+def iter_boundaries(node: Any, properties: Optional[Dict[str, Any]] = None) -> Iterator[tuple]:
+    """Find polygon geometries and their properties in a boundary payload.
+
+    GeoJSON features, feature collections and bare geometries are recognized,
+    including geometries embedded as JSON strings. Bare geometries take their
+    properties from the scalar fields of the enclosing object.
+
+    Args:
+        node: Decoded boundary detail response, or any part of it
+        properties: Properties inherited from the enclosing object
+
+    Yields:
+        Tuples of (geometry, properties)
+    """
+    node = _load_geometry(node) if isinstance(node, str) else node
+    if isinstance(node, list):
+        for value in node:
+            yield from iter_boundaries(value, properties)
+        return
+    if not isinstance(node, dict):
+        return
+
+    node_type = node.get("type")
+    if node_type in GEOMETRY_TYPES and "coordinates" in node:
+        yield node, dict(properties or {})
+        return
+    if node_type == "Feature":
+        geometry = _load_geometry(node.get("geometry"))
+        if geometry and geometry.get("type") in GEOMETRY_TYPES:
+            yield geometry, {**(properties or {}), **(node.get("properties") or {})}
+        return
+
+    scalars = {
+        k: v
+        for k, v in node.items()
+        if isinstance(v, (str, int, float)) and not _is_embedded(v) and v not in GEOJSON_TYPES
+    }
+    inherited = {**(properties or {}), **scalars}
+    for value in node.values():
+        if isinstance(value, (dict, list)) or _is_embedded(value):
+            yield from iter_boundaries(value, inherited)
+
+
+def map_geometries(node: Any, transform: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Any:
+    """Copy a boundary payload with every polygon geometry transformed.
+
+    Geometries embedded as JSON strings are transformed and serialized back
+    to strings. Other values are shared with the input, not copied.
+
+    Args:
+        node: Decoded boundary detail response, or any part of it
+        transform: Function mapping a Polygon or MultiPolygon to a new geometry
+
+    Returns:
+        Transformed payload
+    """
+    if _is_embedded(node):
+        geometry = _load_geometry(node)
+        if geometry is not None:
+            return json.dumps(map_geometries(geometry, transform))
+        return node
+    if isinstance(node, list):
+        return [map_geometries(value, transform) for value in node]
+    if not isinstance(node, dict):
+        return node
+    if node.get("type") in GEOMETRY_TYPES and "coordinates" in node:
+        return transform(node)
+    return {key: map_geometries(value, transform) for key, value in node.items()}
+
+
+def _geo_type(properties: Dict[str, Any]) -> Optional[str]:
+    """Get the geography type abbreviation of a boundary, if known."""
+    for key in GEO_TYPE_KEYS:
+        value = properties.get(key)
+        if isinstance(value, str) and value and value not in GEOJSON_TYPES:
+            return value.upper()
+    return None
+
+
+class SpatialIndex:
+    """Point-in-polygon index over cached boundary geometries.
+
+    Boundaries are persisted as JSON lines under ``ATTOM_CACHE_DIR`` when it
+    is set, and reloaded lazily on first use. A boundary fetched again
+    unchanged is not written again; replaced copies are dropped from the file
+    when it is loaded. Boundaries may be added from executor threads while the
+    event loop looks points up, so the index is guarded by a lock that is only
+    held to swap prepared boundaries in.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._geometries: List[PreparedGeometry] = []
+        self._properties: List[Dict[str, Any]] = []
+        # Digest of each boundary's geometry and properties, to skip unchanged copies
+        self._digests: List[str] = []
+        self._keys: Dict[tuple, int] = {}
+        self._tree: Optional[RTree] = None
+        self._loaded = path is None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._geometries)
+
+    def _ensure_loaded(self) -> None:
+        """Load persisted boundaries on first use."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+
+    def _load(self) -> None:
+        """Load persisted boundaries, compacting the file if copies were replaced."""
+        self._loaded = True
+        if not os.path.exists(self.path):
+            return
+        # Last line of each indexed boundary
+        latest: Dict[int, str] = {}
+        lines = 0
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                lines += 1
+                try:
+                    entry = json.loads(line)
+                    index = self._add(entry["geometry"], entry["properties"])
+                except (ValueError, KeyError, TypeError):
+                    logger.warning("Skipping invalid boundary entry", path=self.path)
+                    continue
+                if index is not None:
+                    latest[index] = line if line.endswith("\n") else line + "\n"
+        logger.info("Loaded boundary index", path=self.path, boundaries=len(self._geometries))
+        if lines > len(latest):
+            temporary = f"{self.path}.{os.getpid()}.tmp"
+            with open(temporary, "w", encoding="utf-8") as f:
+                f.writelines(latest[index] for index in sorted(latest))
+            os.replace(temporary, self.path)
+            logger.info("Compacted boundary index", path=self.path, lines_before=lines, lines=len(latest))
+
+    def _prepare(
+        self, geometry: Dict[str, Any], properties: Dict[str, Any]
+    ) -> Optional[Tuple[tuple, PreparedGeometry, str]]:
+        """Prepare a boundary for the index without touching it.
+
+        Returns:
+            Boundary key, prepared geometry and digest, or None if the geometry is unusable
+        """
+        key = (properties.get("geoIdV4"), _geo_type(properties), properties.get("name"))
+        try:
+            prepared = PreparedGeometry(geometry)
+        except (KeyError, TypeError, ValueError, IndexError):
+            return None
+        if prepared.empty:
+            return None
+        digest = hashlib.sha1(
+            json.dumps([geometry, properties], sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        return key, prepared, digest
+
+    def _insert(self, key: tuple, prepared: PreparedGeometry, properties: Dict[str, Any], digest: str) -> int:
+        """Insert a prepared boundary, replacing any earlier copy of the same area.
+
+        Returns:
+            Position of the boundary
+        """
+        if key[0] is not None and key in self._keys:
+            index = self._keys[key]
+            self._geometries[index] = prepared
+            self._properties[index] = properties
+            self._digests[index] = digest
+        else:
+            index = self._keys[key] = len(self._geometries)
+            self._geometries.append(prepared)
+            self._properties.append(properties)
+            self._digests.append(digest)
+        self._tree = None
+        return index
+
+    def _add(self, geometry: Dict[str, Any], properties: Dict[str, Any]) -> Optional[int]:
+        """Add a boundary, replacing any earlier copy of the same area.
+
+        Returns:
+            Position of the boundary, or None if its geometry is unusable
+        """
+        prepared = self._prepare(geometry, properties)
+        if prepared is None:
+            return None
+        return self._insert(prepared[0], prepared[1], properties, prepared[2])
+
+    def add(self, geometry: Dict[str, Any], properties: Dict[str, Any]) -> bool:
+        """Add a boundary to the index and persist it.
+
+        Args:
+            geometry: GeoJSON Polygon or MultiPolygon
+            properties: Boundary attributes such as geoIdV4, name and type
+
+        Returns:
+            True if the boundary was indexed
+        """
+        self._ensure_loaded()
+        prepared = self._prepare(geometry, properties)
+        if prepared is None:
+            return False
+        key, geometry_index, digest = prepared
+        with self._lock:
+            previous = self._digests[self._keys[key]] if key[0] is not None and key in self._keys else None
+            self._insert(key, geometry_index, properties, digest)
+            # Unchanged boundaries fetched again are already on disk
+            if self.path and digest != previous:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"geometry": geometry, "properties": properties}) + "\n")
+        return True
+
+    def observe_boundary(self, payload: Dict[str, Any], geoid_v4: Optional[str] = None) -> int:
+        """Index every boundary found in a ``boundary_detail`` response.
+
+        Args:
+            payload: Decoded boundary detail response
+            geoid_v4: Requested geoIdV4, used when the payload omits it
+
+        Returns:
+            Number of boundaries indexed
+        """
+        count = 0
+        for geometry, properties in iter_boundaries(payload):
+            if geoid_v4 and "geoIdV4" not in properties:
+                properties["geoIdV4"] = geoid_v4
+            properties = {k: v for k, v in properties.items() if k not in ("status", "msg", "code")}
+            count += self.add(geometry, properties)
+        return count
+
+    def lookup(self, latitude: float, longitude: float, geo_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get the properties of all indexed boundaries containing a point.
+
+        Args:
+            latitude: Point latitude
+            longitude: Point longitude
+            geo_type: Optional geography type abbreviation to filter by
+
+        Returns:
+            Properties of the containing boundaries
+        """
+        wanted = geo_type.upper() if geo_type else None
+        matches = []
+        with self._lock:
+            self._ensure_loaded()
+            if self._tree is None:
+                self._tree = RTree([g.bbox for g in self._geometries])
+            for index in sorted(self._tree.query_point(longitude, latitude)):
+                properties = self._properties[index]
+                if wanted and _geo_type(properties) != wanted:
+                    continue
+                if self._geometries[index].contains(longitude, latitude):
+                    matches.append(properties)
+        return matches
+
+    def resolve(self, latitude: float, longitude: float, geo_type: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """Answer a hierarchy lookup locally if every requested geography type is covered.
+
+        A lookup without geography types (or with ``all``) asks for the full
+        hierarchy, which the index cannot know it holds, so it is never
+        answered locally.
+
+        Args:
+            latitude: Point latitude
+            longitude: Point longitude
+            geo_type: Geography type abbreviations, comma separated (e.g. ``CO,ZI``)
+
+        Returns:
+            Containing boundaries of the requested types, or None if a type is not covered
+        """
+        wanted = {value.strip().upper() for value in (geo_type or "").split(",") if value.strip()}
+        if not wanted or "ALL" in wanted or not len(self):
+            return None
+        matches = [p for p in self.lookup(latitude, longitude) if _geo_type(p) in wanted]
+        if {_geo_type(p) for p in matches} != wanted:
+            return None
+        return matches
+
+    def clear(self) -> None:
+        """Remove all boundaries from memory."""
+        with self._lock:
+            self._geometries.clear()
+            self._properties.clear()
+            self._digests.clear()
+            self._keys.clear()
+            self._tree = None
+
+
+# Create a singleton index shared by the area tools
+spatial_index = SpatialIndex(
+    os.path.join(config.ATTOM_CACHE_DIR, "boundaries.jsonl") if config.ATTOM_CACHE_DIR else None
+)
@@ -0,0 +1,459 @@
+"""Local time series of AVM, sale and assessment history per property.
+
+Responses of ``avm_history_detail``, ``sales_history_detail`` and
+``assessment_history_detail`` are merged into per-property columnar series:
+a sorted array of dates (days since the epoch) and one float array per
+value column. New responses only add or replace points, so a series keeps
+history that a later response no longer lists. Trend questions (annualized
+appreciation, value at a date, assessed market value against the AVM) are
+answered from these arrays with numpy, and a history is fetched again only
+once it is older than ``ATTOM_TIMESERIES_MAX_AGE``.
+
+New and changed points are persisted as JSON lines under ``ATTOM_CACHE_DIR``
+when it is set, and reloaded lazily on first use. Once most lines are
+superseded (refresh times, evicted properties), the file is rewritten with
+one line per series.
+"""
+
+import json
+import os
+import time
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import structlog
+
+from src import config
+from src.records import parse_date, parse_float
+
+# Configure logging
+logger = structlog.get_logger(__name__)
+
+# History endpoint of each series kind
+HISTORY_ENDPOINTS = {
+    "avm": "avm_history_detail",
+    "sale": "sales_history_detail",
+    "assessment": "assessment_history_detail",
+}
+KIND_OF_ENDPOINT = {name: kind for kind, name in HISTORY_ENDPOINTS.items()}
+
+# History list keys of each kind in a property item, and the section holding the latest entry
+HISTORY_KEYS = {
+    "avm": (("avmhistory", "avmHistory"), "avm"),
+    "sale": (("salehistory", "saleHistory"), "sale"),
+    "assessment": (("assessmenthistory", "assessmentHistory"), "assessment"),
+}
+
+# Value columns of each kind
+COLUMNS = {
+    "avm": ("value", "low", "high", "score"),
+    "sale": ("amount",),
+    "assessment": ("assessed", "market", "tax"),
+}
+
+DAYS_PER_YEAR = 365.25
+EPOCH = date(1970, 1, 1)
+
+# Fewest lines in the time series file before it is compacted
+COMPACT_MIN_LINES = 1000
+
+
+def _get(node: Any, *path: str) -> Any:
+    for key in path:
+        if not isinstance(node, dict):
+            return None
+        node = node.get(key)
+    return node
+
+
+def to_day(value: Any) -> Optional[int]:
+    """Days since the epoch of an ATTOM date, or None if it does not parse."""
+    parsed = parse_date(value)
+    if parsed is None:
+        return None
+    try:
+        return (date.fromisoformat(parsed) - EPOCH).days
+    except ValueError:
+        return None
+
+
+def from_day(day: float) -> str:
+    """ISO date of a day number."""
+    return date.fromordinal(EPOCH.toordinal() + int(day)).isoformat()
+
+
+def _point(kind: str, entry: Dict[str, Any]) -> Optional[Tuple[int, Tuple[Optional[float], ...]]]:
+    """Date and column values of one history entry, or None if it has no date or values."""
+    if kind == "avm":
+        day = to_day(entry.get("eventDate"))
+        amount = entry.get("amount") or {}
+        values = tuple(parse_float(amount.get(key)) for key in ("value", "low", "high", "scr"))
+    elif kind == "sale":
+        day = to_day(entry.get("saleTransDate") or _get(entry, "amount", "salerecdate") or entry.get("saleSearchDate"))
+        values = (parse_float(_get(entry, "amount", "saleamt")),)
+        if not values[0]:
+            # Sales without a price (transfers, foreclosure deeds) say nothing about value
+            return None
+    else:
+        year = parse_float(_get(entry, "tax", "taxyear"))
+        day = to_day(f"{int(year)}-01-01") if year else None
+        values = (
+            parse_float(_get(entry, "assessed", "assdttlvalue")),
+            parse_float(_get(entry, "market", "mktttlvalue")),
+            parse_float(_get(entry, "tax", "taxamt")),
+        )
+    if day is None or all(value is None for value in values):
+        return None
+    return day, values
+
+
+def extract_points(kind: str, item: Dict[str, Any]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """History points of one kind in a property item, as date and column arrays."""
+    keys, latest = HISTORY_KEYS[kind]
+    entries: List[Any] = []
+    for key in keys:
+        if isinstance(item.get(key), list):
+            entries.extend(item[key])
+    if isinstance(item.get(latest), dict):
+        entries.append(item[latest])
+    points = [point for point in (_point(kind, entry) for entry in entries if isinstance(entry, dict)) if point]
+    days = np.array([day for day, _ in points], dtype=np.int32)
+    values = np.array([[np.nan if v is None else v for v in row] for _, row in points], dtype=np.float64)
+    values = values.reshape(len(points), len(COLUMNS[kind]))
+    return days, {column: values[:, index] for index, column in enumerate(COLUMNS[kind])}
+
+
+class Series:
+    """Dated points of one kind for one property, sorted by date."""
+
+    __slots__ = ("days", "columns", "refreshed")
+
+    def __init__(self, kind: str):
+        self.days = np.empty(0, dtype=np.int32)
+        self.columns = {column: np.empty(0, dtype=np.float64) for column in COLUMNS[kind]}
+        # When the full history was last fetched (None if only merged from other sources)
+        self.refreshed: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def merge(self, days: np.ndarray, columns: Dict[str, np.ndarray]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Add points, replacing existing points of the same date.
+
+        Returns:
+            Dates and column values of the points that were added or changed
+        """
+        if not len(days):
+            return days[:0], {name: np.empty(0, dtype=np.float64) for name in self.columns}
+        all_days = np.concatenate([self.days, days])
+        merged = {name: np.concatenate([self.columns[name], columns[name]]) for name in self.columns}
+        order = np.argsort(all_days, kind="stable")
+        all_days = all_days[order]
+        # Keep the last point of each date, i.e. the newly merged one
+        keep = np.append(all_days[1:] != all_days[:-1], True)
+        new_days = all_days[keep]
+        new_columns = {name: values[order][keep] for name, values in merged.items()}
+
+        # A point is new unless the same date held the same values before
+        changed = np.ones(len(new_days), dtype=bool)
+        if len(self.days):
+            positions = np.minimum(np.searchsorted(self.days, new_days), len(self.days) - 1)
+            same = self.days[positions] == new_days
+            for name, values in new_columns.items():
+                old = self.columns[name][positions]
+                same &= (old == values) | (np.isnan(old) & np.isnan(values))
+            changed = ~same
+        self.days, self.columns = new_days, new_columns
+        return new_days[changed], {name: values[changed] for name, values in new_columns.items()}
+
+    def column(self, name: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Dates and values of a column, without missing values."""
+        values = self.columns[name]
+        present = ~np.isnan(values)
+        return self.days[present], values[present]
+
+
+def value_at(days: np.ndarray, values: np.ndarray, day: float) -> Optional[float]:
+    """Value interpolated linearly at ``day``; the last value after the last date, None before the first."""
+    if not len(days) or day < days[0]:
+        return None
+    return float(np.interp(day, days, values))
+
+
+def annualized(start: float, end: float, years: float) -> Optional[float]:
+    """Compound annual growth rate from ``start`` to ``end`` over ``years``."""
+    if start <= 0 or end <= 0 or years <= 0:
+        return None
+    return float((end / start) ** (1 / years) - 1)
+
+
+def _line(
+    attom_id: str, kind: str, days: np.ndarray, columns: Dict[str, np.ndarray], refreshed: Optional[float]
+) -> str:
+    """JSON line persisting points of one series."""
+    entry = {
+        "id": attom_id,
+        "kind": kind,
+        "refreshed": refreshed,
+        "days": days.tolist(),
+        "columns": {
+            name: [None if np.isnan(value) else value for value in values.tolist()] for name, values in columns.items()
+        },
+    }
+    return json.dumps(entry, separators=(",", ":")) + "\n"
+
+
+class TimeSeriesStore:
+    """Per-property AVM, sale and assessment series, merged from history responses."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_size: int = config.ATTOM_TIMESERIES_SIZE,
+        max_age: float = config.ATTOM_TIMESERIES_MAX_AGE,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize the store.
+
+        Args:
+            path: JSON lines file the merged points are appended to (None keeps them in memory)
+            max_size: Most properties kept; the least recently updated are evicted
+            max_age: Seconds before a fetched history is considered stale
+            clock: Source of refresh timestamps
+        """
+        self.path = path
+        self.max_size = max_size
+        self.max_age = max_age
+        self.clock = clock
+        self._series: Dict[str, Dict[str, Series]] = {}
+        self._loaded = path is None
+        # Lines in the persisted file
+        self._lines = 0
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._series)
+
+    def _ensure_loaded(self) -> None:
+        """Replay persisted points on first use."""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                self._lines += 1
+                try:
+                    entry = json.loads(line)
+                    columns = {
+                        name: np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+                        for name, values in entry["columns"].items()
+                    }
+                    self._merge(entry["id"], entry["kind"], np.array(entry["days"], dtype=np.int32), columns)
+                    if entry.get("refreshed") is not None:
+                        self._series[entry["id"]][entry["kind"]].refreshed = entry["refreshed"]
+                except (ValueError, KeyError, TypeError):
+                    logger.warning("Skipping invalid time series entry", path=self.path)
+        logger.info("Loaded time series", path=self.path, properties=len(self._series))
+        self._compact_if_needed()
+
+    def _merge(
+        self, attom_id: str, kind: str, days: np.ndarray, columns: Dict[str, np.ndarray]
+    ) -> Tuple[Series, Tuple[np.ndarray, Dict[str, np.ndarray]]]:
+        series_by_kind = self._series.pop(attom_id, None)
+        if series_by_kind is None:
+            series_by_kind = {}
+            if self.max_size > 0 and len(self._series) >= self.max_size:
+                del self._series[next(iter(self._series))]
+        self._series[attom_id] = series_by_kind
+        series = series_by_kind.get(kind)
+        if series is None:
+            series = series_by_kind[kind] = Series(kind)
+        return series, series.merge(days, columns)
+
+    def observe(self, name: str, payload: Dict[str, Any]) -> int:
+        """Merge the history in a response of one of the history endpoints.
+
+        Args:
+            name: Endpoint the payload came from; other endpoints are ignored
+            payload: Decoded ATTOM response
+
+        Returns:
+            Number of properties whose series changed
+        """
+        kind = KIND_OF_ENDPOINT.get(name)
+        items = payload.get("property") if isinstance(payload, dict) else None
+        if kind is None or not isinstance(items, list) or self.max_size <= 0:
+            return 0
+        self._ensure_loaded()
+        now = self.clock()
+        changed = 0
+        for item in items:
+            attom_id = _get(item, "identifier", "attomId") or _get(item, "identifier", "Id")
+            if attom_id is None:
+                continue
+            attom_id = str(attom_id)
+            series, (days, columns) = self._merge(attom_id, kind, *extract_points(kind, item))
+            series.refreshed = now
+            changed += bool(len(days))
+            # Only new and changed points are appended, or just the refresh time
+            self._append(attom_id, kind, days, columns, now)
+        self._compact_if_needed()
+        return changed
+
+    def _append(self, attom_id: str, kind: str, days: np.ndarray, columns: Dict[str, np.ndarray], now: float) -> None:
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(_line(attom_id, kind, days, columns, now))
+        self._lines += 1
+
+    def _compact_if_needed(self) -> None:
+        series = sum(len(by_kind) for by_kind in self._series.values())
+        if self.path and self._lines > max(2 * series, COMPACT_MIN_LINES):
+            self.compact()
+
+    def compact(self) -> None:
+        """Rewrite the persisted file with one line per series, dropping superseded lines."""
+        if not self.path:
+            return
+        self._ensure_loaded()
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        before, self._lines = self._lines, 0
+        with open(temporary, "w", encoding="utf-8") as f:
+            # Least recently updated first, as they were appended
+            for attom_id, by_kind in self._series.items():
+                for kind, series in by_kind.items():
+                    f.write(_line(attom_id, kind, series.days, series.columns, series.refreshed))
+                    self._lines += 1
+        os.replace(temporary, self.path)
+        logger.info("Compacted time series", path=self.path, lines_before=before, lines=self._lines)
+
+    def touch(self, attom_id: str, kind: str) -> None:
+        """Record a fetch of a property's history that merged nothing, e.g. when ATTOM has none.
+
+        Histories already refreshed by ``observe`` are left alone.
+        """
+        if self.max_size <= 0 or not self.stale(attom_id, [kind]):
+            return
+        attom_id = str(attom_id)
+        now = self.clock()
+        series, (days, columns) = self._merge(attom_id, kind, np.empty(0, dtype=np.int32), {})
+        series.refreshed = now
+        self._append(attom_id, kind, days, columns, now)
+
+    def get(self, attom_id: str, kind: str) -> Optional[Series]:
+        """Series of one kind for a property, if known."""
+        self._ensure_loaded()
+        return self._series.get(str(attom_id), {}).get(kind)
+
+    def stale(self, attom_id: str, kinds: Iterable[str] = tuple(HISTORY_ENDPOINTS)) -> List[str]:
+        """Kinds whose history was never fetched or is older than ``max_age``."""
+        now = self.clock()
+        stale = []
+        for kind in kinds:
+            series = self.get(attom_id, kind)
+            if series is None or series.refreshed is None or now - series.refreshed > self.max_age:
+                stale.append(kind)
+        return stale
+
+    def trends(self, attom_id: str, as_of: Optional[str] = None, years: Iterable[int] = (1, 3, 5)) -> Dict[str, Any]:
+        """Appreciation, value at a date and assessment-to-AVM gap of a property.
+
+        Args:
+            attom_id: Property ATTOM ID
+            as_of: Date of the reported values (default: today)
+            years: Trailing windows of the AVM appreciation rates
+
+        Returns:
+            Trends of each kind with data, and the number of points behind them
+
+        Raises:
+            ValueError: If ``as_of`` is not a date
+        """
+        day = to_day(as_of) if as_of else (date.today() - EPOCH).days
+        if day is None:
+            raise ValueError(f"Invalid date {as_of!r}; expected YYYY-MM-DD")
+        result: Dict[str, Any] = {"attom_id": str(attom_id), "as_of": from_day(day), "points": {}}
+
+        avm = self.get(attom_id, "avm")
+        avm_days, avm_values = avm.column("value") if avm is not None else (np.empty(0), np.empty(0))
+        # Values between AVM dates are interpolated, so later points count for earlier dates too
+        current = value_at(avm_days, avm_values, day)
+        if current is not None:
+            result["points"]["avm"] = len(avm_days)
+            span = (day - avm_days[0]) / DAYS_PER_YEAR
+            appreciation = {"since_first": annualized(avm_values[0], current, span)}
+            for window in years:
+                start = value_at(avm_days, avm_values, day - window * DAYS_PER_YEAR)
+                appreciation[f"{window}y"] = annualized(start, current, window) if start is not None else None
+            result["avm"] = {
+                "value_at": current,
+                "first": {"date": from_day(avm_days[0]), "value": float(avm_values[0])},
+                "last": {"date": from_day(avm_days[-1]), "value": float(avm_values[-1])},
+                "annualized_appreciation": appreciation,
+            }
+
+        sale = self.get(attom_id, "sale")
+        if sale is not None:
+            sale_days, amounts = sale.column("amount")
+            sale_days, amounts = sale_days[sale_days <= day], amounts[sale_days <= day]
+            if len(sale_days):
+                result["points"]["sale"] = len(sale_days)
+                # Annualized appreciation between consecutive sales
+                held = np.diff(sale_days) / DAYS_PER_YEAR
+                ratios = amounts[1:] / amounts[:-1]
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    rates = np.where(held > 0, ratios ** (1 / np.where(held > 0, held, 1)) - 1, np.nan)
+                result["sale"] = {
+                    "last": {"date": from_day(sale_days[-1]), "amount": float(amounts[-1])},
+                    "sales": [
+                        {
+                            "date": from_day(sale_day),
+                            "amount": float(amount),
+                            "annualized_since_previous": None if index == 0 or np.isnan(rates[index - 1])
+                            else float(rates[index - 1]),
+                        }
+                        for index, (sale_day, amount) in enumerate(zip(sale_days, amounts))
+                    ],
+                }
+                if current is not None:
+                    since = annualized(amounts[-1], current, (day - sale_days[-1]) / DAYS_PER_YEAR)
+                    result["sale"]["annualized_since_last_sale"] = since
+
+        assessment = self.get(attom_id, "assessment")
+        if assessment is not None:
+            market_days, market = assessment.column("market")
+            market_days, market = market_days[market_days <= day], market[market_days <= day]
+            if len(market_days):
+                result["points"]["assessment"] = len(market_days)
+                gaps = []
+                if current is not None:
+                    # AVM at each assessment date, within the AVM history only
+                    inside = (market_days >= avm_days[0]) & (market_days <= avm_days[-1])
+                    avm_at = np.interp(market_days[inside], avm_days, avm_values)
+                    gap = market[inside] / avm_at - 1
+                    gaps = [
+                        {"date": from_day(d), "market": float(m), "avm": float(a), "gap": float(g)}
+                        for d, m, a, g in zip(market_days[inside], market[inside], avm_at, gap)
+                    ]
+                result["assessment"] = {
+                    "latest": {"date": from_day(market_days[-1]), "market": float(market[-1])},
+                    "market_vs_avm": gaps,
+                }
+                if current is not None:
+                    result["assessment"]["latest"]["gap_to_current_avm"] = float(market[-1] / current - 1)
+        return result
+
+
+def default_path() -> Optional[str]:
+    """Time series file under ``ATTOM_CACHE_DIR``, or None to keep series in memory."""
+    return os.path.join(config.ATTOM_CACHE_DIR, "timeseries.jsonl") if config.ATTOM_CACHE_DIR else None
+
+
+# Create a singleton store shared by the tools
+timeseries = TimeSeriesStore(default_path())
@@ -4,17 +4,29 @@ This module provides MCP tools for accessing the Area API endpoints
 including boundary details, hierarchy lookups, and geographic data.
 """
 
+from functools import partial
+
 import structlog
 from src.mcp_server import mcp
 from typing import Optional
 
-from src.client import client
+from src import config, metrics
+from src.cache import LRUCache
+from src.geo import GEOMETRY_OUTPUTS, shape_geometry, zoom_tolerance
 from src.models import AttomResponse
-from pydantic import BaseModel
+from src.payload import TRUNCATED_KEY
+from src.reference import reference
+from src.spatial import map_geometries, spatial_index
+from src.tools.utils import fetch_endpoint
+from pydantic import BaseModel, Field
 
 # Configure logging
 logger = structlog.get_logger(__name__)
 
+# Reduced boundary responses keyed by area and geometry options
+geometry_cache = LRUCache(config.ATTOM_GEOMETRY_CACHE_SIZE)
+metrics.registry.watch_cache("geometry", geometry_cache)
+
 
 # Area Models
 class AreaParams(BaseModel):
@@ -28,8 +40,14 @@ class AreaParams(BaseModel):
     state_id: Optional[str] = None
     format: Optional[str] = None
     mime: Optional[str] = None
-    page: Optional[int] = None
-    page_size: Optional[int] = None
+    page: Optional[int] = Field(None, ge=1)
+    page_size: Optional[int] = Field(None, ge=1)
+    tolerance: Optional[float] = None
+    zoom: Optional[int] = None
+    precision: Optional[int] = None
+    geometry_output: Optional[str] = None
+    name: Optional[str] = None
+    fips: Optional[str] = None
 
 
 class AreaResponse(AttomResponse):
@@ -37,21 +55,37 @@ class AreaResponse(AttomResponse):
     pass
 
 
+def reference_response(rows: list, params: AreaParams) -> AreaResponse:
+    """Build a paged response from local reference rows."""
+    total = len(rows)
+    if params.page_size:
+        start = ((params.page or 1) - 1) * params.page_size
+        rows = rows[start : start + params.page_size]
+    return AreaResponse(
+        status_code=200,
+        status_message="Success",
+        data={"source": "reference", "version": reference.version, "total": total, "items": rows},
+    )
+
+
 # Boundary Detail Tool
 @mcp.tool()
 async def boundary_detail(params: AreaParams) -> AreaResponse:
     """Get boundary detail information for a geographic area.
 
     Returns boundary information including geographic shapes and details
-    for counties, cities, neighborhoods, etc.
+    for counties, cities, neighborhoods, etc. Polygons can be simplified with
+    a tolerance in degrees (or a web map zoom level), rounded to a number of
+    decimal places, or reduced to their bounding box or centroid.
 
     Args:
-        params: Parameters including geoIdV4, areaId, format (geojson), mime (json)
+        params: Parameters including geoIdV4, areaId, format (geojson), mime (json),
+            tolerance, zoom, precision and geometry_output (full, bbox or centroid)
 
     Returns:
         Boundary detail information
     """
-    log = logger.bind(tool="boundary_detail", params=params.model_dump())
+    log = logger.bind(tool="boundary_detail", params=params)
 
     # Build request parameters
     request_params = {}
@@ -71,10 +105,41 @@ async def boundary_detail(params: AreaParams) -> AreaResponse:
             status_message="Either geoIdV4 or areaId is required.",
         )
 
+    output = (params.geometry_output or "full").lower()
+    if output not in GEOMETRY_OUTPUTS:
+        log.error("Invalid geometry output", geometry_output=params.geometry_output)
+        return AreaResponse(
+            status_code=400,
+            status_message=f"geometry_output must be one of: {', '.join(GEOMETRY_OUTPUTS)}.",
+        )
+    tolerance = params.tolerance
+    if tolerance is None and params.zoom is not None:
+        tolerance = zoom_tolerance(params.zoom)
+    reduce = bool(tolerance) or params.precision is not None or output != "full"
+
+    cache_key = (tuple(sorted(request_params.items())), tolerance, params.precision, output)
+    if reduce:
+        cached = geometry_cache.get(cache_key)
+        if cached is not None:
+            log.info("Serving reduced boundary from cache")
+            return AreaResponse(status_code=200, status_message="Success", data=cached)
+
     log.info("Fetching boundary detail")
 
     try:
-        response = await client.get("areaapi/area/boundary/detail", request_params)
+        # Fresh GeoJSON boundaries are indexed once, off the event loop
+        index = None
+        if (params.format or "").lower() == "geojson":
+            index = partial(spatial_index.observe_boundary, geoid_v4=params.geoid_v4)
+        response = await fetch_endpoint("boundary_detail", request_params, index=index)
+        # A payload cut at the byte limit is returned, but not cached
+        complete = TRUNCATED_KEY not in response
+        if reduce:
+            response = map_geometries(
+                response, lambda geometry: shape_geometry(geometry, output, tolerance, params.precision)
+            )
+            if complete:
+                geometry_cache.put(cache_key, response)
         return AreaResponse(status_code=200, status_message="Success", data=response)
     except Exception as e:
         log.error("Error fetching boundary detail", error=str(e))
@@ -92,13 +157,20 @@ async def hierarchy_lookup(params: AreaParams) -> AreaResponse:
     Returns all geographic areas that contain the specified location
     (county, city, neighborhood, etc.)
 
+    When ``geoType`` names only types whose boundaries were already fetched
+    with ``boundary_detail`` and all of them contain the point, the answer
+    comes from the local boundary index instead of ATTOM. Its data then is
+    ``{"source": "local_index", "areas": [...]}``, each area being the
+    boundary's GeoJSON properties, rather than the ATTOM payload. Lookups
+    without ``geoType`` always go to ATTOM.
+
     Args:
         params: Parameters including latitude, longitude, wktstring, geoType
 
     Returns:
         Area hierarchy information
     """
-    log = logger.bind(tool="hierarchy_lookup", params=params.model_dump())
+    log = logger.bind(tool="hierarchy_lookup", params=params)
 
     # Build request parameters
     request_params = {}
@@ -120,10 +192,20 @@ async def hierarchy_lookup(params: AreaParams) -> AreaResponse:
             status_message="Either latitude/longitude or wktstring is required.",
         )
 
+    if params.latitude is not None and params.longitude is not None:
+        areas = spatial_index.resolve(params.latitude, params.longitude, params.geo_type)
+        if areas is not None:
+            log.info("Resolved hierarchy lookup from local index", areas=len(areas))
+            return AreaResponse(
+                status_code=200,
+                status_message="Success",
+                data={"source": "local_index", "areas": areas},
+            )
+
     log.info("Fetching hierarchy lookup")
 
     try:
-        response = await client.get("areaapi/area/hierarchy/lookup", request_params)
+        response = await fetch_endpoint("hierarchy_lookup", request_params)
         return AreaResponse(status_code=200, status_message="Success", data=response)
     except Exception as e:
         log.error("Error fetching hierarchy lookup", error=str(e))
@@ -138,13 +220,15 @@ async def hierarchy_lookup(params: AreaParams) -> AreaResponse:
 async def state_lookup(params: AreaParams) -> AreaResponse:
     """Get state information for a geographic area.
 
+    Served from the local reference dataset when it has a match.
+
     Args:
-        params: Parameters including geoIdV4, areaId
+        params: Parameters including geoIdV4, areaId, and fips or name (reference data only)
 
     Returns:
         State information
     """
-    log = logger.bind(tool="state_lookup", params=params.model_dump())
+    log = logger.bind(tool="state_lookup", params=params)
 
     # Build request parameters
     request_params = {}
@@ -159,10 +243,17 @@ async def state_lookup(params: AreaParams) -> AreaResponse:
     if params.page_size:
         request_params["pageSize"] = params.page_size
 
+    rows = reference.find(
+        "state", geoid_v4=params.geoid_v4, geoid=params.area_id, fips=params.fips, name=params.name
+    )
+    if rows:
+        log.info("Serving state lookup from reference data", rows=len(rows))
+        return reference_response(rows, params)
+
     log.info("Fetching state lookup")
 
     try:
-        response = await client.get("areaapi/area/state/lookup", request_params)
+        response = await fetch_endpoint("state_lookup", request_params)
         return AreaResponse(status_code=200, status_message="Success", data=response)
     except Exception as e:
         log.error("Error fetching state lookup", error=str(e))
@@ -177,13 +268,15 @@ async def state_lookup(params: AreaParams) -> AreaResponse:
 async def county_lookup(params: AreaParams) -> AreaResponse:
     """Get county information for a state.
 
+    Served from the local reference dataset when it has a match.
+
     Args:
-        params: Parameters including stateId, geoIdV4
+        params: Parameters including stateId, geoIdV4, and fips or name (reference data only)
 
     Returns:
         County information
     """
-    log = logger.bind(tool="county_lookup", params=params.model_dump())
+    log = logger.bind(tool="county_lookup", params=params)
 
     # Build request parameters
     request_params = {}
@@ -198,10 +291,17 @@ async def county_lookup(params: AreaParams) -> AreaResponse:
     if params.page_size:
         request_params["pageSize"] = params.page_size
 
+    rows = reference.find(
+        "county", geoid_v4=params.geoid_v4, state_id=params.state_id, fips=params.fips, name=params.name
+    )
+    if rows:
+        log.info("Serving county lookup from reference data", rows=len(rows))
+        return reference_response(rows, params)
+
     log.info("Fetching county lookup")
 
     try:
-        response = await client.get("areaapi/area/county/lookup", request_params)
+        response = await fetch_endpoint("county_lookup", request_params)
         return AreaResponse(status_code=200, status_message="Success", data=response)
     except Exception as e:
         log.error("Error fetching county lookup", error=str(e))
@@ -216,13 +316,15 @@ async def county_lookup(params: AreaParams) -> AreaResponse:
 async def cbsa_lookup(params: AreaParams) -> AreaResponse:
     """Get Core Based Statistical Area (CBSA) information.
 
+    Served from the local reference dataset when it has a match.
+
     Args:
-        params: Parameters including stateId, geoIdV4
+        params: Parameters including stateId, geoIdV4, and fips or name (reference data only)
 
     Returns:
         CBSA information
     """
-    log = logger.bind(tool="cbsa_lookup", params=params.model_dump())
+    log = logger.bind(tool="cbsa_lookup", params=params)
 
     # Build request parameters
     request_params = {}
@@ -237,10 +339,17 @@ async def cbsa_lookup(params: AreaParams) -> AreaResponse:
     if params.page_size:
         request_params["pageSize"] = params.page_size
 
+    rows = reference.find(
+        "cbsa", geoid_v4=params.geoid_v4, state_id=params.state_id, fips=params.fips, name=params.name
+    )
+    if rows:
+        log.info("Serving CBSA lookup from reference data", rows=len(rows))
+        return reference_response(rows, params)
+
     log.info("Fetching CBSA lookup")
 
     try:
-        response = await client.get("areaapi/area/cbsa/lookup", request_params)
+        response = await fetch_endpoint("cbsa_lookup", request_params)
         return AreaResponse(status_code=200, status_message="Success", data=response)
     except Exception as e:
         log.error("Error fetching CBSA lookup", error=str(e))
@@ -261,7 +370,7 @@ async def geoid_lookup(params: AreaParams) -> AreaResponse:
     Returns:
         GeoID information
     """
-    log = logger.bind(tool="geoid_lookup", params=params.model_dump())
+    log = logger.bind(tool="geoid_lookup", params=params)
 
     # Build request parameters
     request_params = {}
@@ -281,7 +390,7 @@ async def geoid_lookup(params: AreaParams) -> AreaResponse:
     log.info("Fetching GeoID lookup")
 
     try:
-        response = await client.get("areaapi/area/geoid/lookup", request_params)
+        response = await fetch_endpoint("geoid_lookup", request_params)
         return AreaResponse(status_code=200, status_message="Success", data=response)
     except Exception as e:
         log.error("Error fetching GeoID lookup", error=str(e))
@@ -296,13 +405,15 @@ async def geoid_lookup(params: AreaParams) -> AreaResponse:
 async def geocode_legacy_lookup(params: AreaParams) -> AreaResponse:
     """Get legacy geocode lookup information.
 
+    Served from the local reference dataset when it has a match.
+
     Args:
         params: Parameters including geoId, geoIdV4
 
     Returns:
         Legacy geocode information
     """
-    log = logger.bind(tool="geocode_legacy_lookup", params=params.model_dump())
+    log = logger.bind(tool="geocode_legacy_lookup", params=params)
 
     # Build request parameters
     request_params = {}
@@ -311,10 +422,16 @@ async def geocode_legacy_lookup(params: AreaParams) -> AreaResponse:
     if params.geoid_v4:
         request_params["geoIdV4"] = params.geoid_v4
 
+    if params.area_id or params.geoid_v4:
+        rows = reference.find_any(geoid_v4=params.geoid_v4, geoid=params.area_id)
+        if rows:
+            log.info("Serving legacy geocode lookup from reference data", rows=len(rows))
+            return reference_response(rows, params)
+
     log.info("Fetching legacy geocode lookup")
 
     try:
-        response = await client.get("areaapi/area/geoId/legacyLookup", request_params)
+        response = await fetch_endpoint("geocode_legacy_lookup", request_params)
         return AreaResponse(status_code=200, status_message="Success", data=response)
     except Exception as e:
         log.error("Error fetching legacy geocode lookup", error=str(e))
@@ -335,7 +452,7 @@ async def location_lookup(params: AreaParams) -> AreaResponse:
     Returns:
         Location information
     """
-    log = logger.bind(tool="location_lookup", params=params.model_dump())
+    log = logger.bind(tool="location_lookup", params=params)
 
     # Build request parameters
     request_params = {}
@@ -351,7 +468,7 @@ async def location_lookup(params: AreaParams) -> AreaResponse:
     log.info("Fetching location lookup")
 
     try:
-        response = await client.get("v4/location/lookup", request_params)
+        response = await fetch_endpoint("location_lookup", request_params)
         return AreaResponse(status_code=200, status_message="Success", data=response)
     except Exception as e:
         log.error("Error fetching location lookup", error=str(e))
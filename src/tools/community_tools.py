@@ -8,8 +8,8 @@ import structlog
 from src.mcp_server import mcp
 from typing import Optional
 
-from src.client import client
 from src.models import AttomResponse
+from src.tools.utils import fetch_endpoint
 from pydantic import BaseModel
 
 # Configure logging
@@ -49,7 +49,7 @@ async def neighborhood_community(params: CommunityParams) -> CommunityResponse:
         - Weather statistics and historical averages
         - Commuter times and transportation data
     """
-    log = logger.bind(tool="neighborhood_community", params=params.model_dump())
+    log = logger.bind(tool="neighborhood_community", params=params)
 
     # Build request parameters
     request_params = {}
@@ -65,7 +65,7 @@ async def neighborhood_community(params: CommunityParams) -> CommunityResponse:
     log.info("Fetching neighborhood community data")
 
     try:
-        response = await client.get("v4.0.0/neighborhood/community", request_params)
+        response = await fetch_endpoint("neighborhood_community", request_params)
         return CommunityResponse(status_code=200, status_message="Success", data=response)
     except Exception as e:
         log.error("Error fetching neighborhood community data", error=str(e))
@@ -8,8 +8,11 @@ import structlog
 from src.mcp_server import mcp
 from typing import Optional
 
-from src.client import client
+from src import config
 from src.models import AttomResponse
+from src.payload import TRUNCATED_KEY
+from src.poi_cache import parse_point, poi_cache
+from src.tools.utils import fetch_endpoint
 from pydantic import BaseModel
 
 # Configure logging
@@ -56,7 +59,7 @@ async def poi_search(params: POIParams) -> POIResponse:
     Returns:
         POI search results with business information
     """
-    log = logger.bind(tool="poi_search", params=params.model_dump())
+    log = logger.bind(tool="poi_search", params=params)
 
     # Build request parameters
     request_params = {}
@@ -94,10 +97,47 @@ async def poi_search(params: POIParams) -> POIResponse:
     if params.page_size:
         request_params["pageSize"] = params.page_size
 
+    # Radius queries around a point can be served from a cached superset
+    latitude, longitude = params.latitude, params.longitude
+    if params.point and not params.address:
+        latitude, longitude = parse_point(params.point)
+    cacheable = (
+        not params.address
+        and latitude is not None
+        and longitude is not None
+        and params.radius is not None
+        and (params.page or 1) == 1
+    )
+    category = (
+        (params.category_name or "").lower(),
+        (params.line_of_business_name or "").lower(),
+        (params.industry_name or "").lower(),
+        params.category_id or "",
+    )
+    if cacheable:
+        cached = poi_cache.get(latitude, longitude, params.radius, category, params.page_size)
+        if cached is not None:
+            log.info("Serving POI search results from cache")
+            return POIResponse(status_code=200, status_message="Success", data=cached)
+
+        # Fetch a larger, unpaged result set so later nearby queries hit the cache
+        fetch_params = {k: v for k, v in request_params.items() if k != "page"}
+        fetch_radius = max(params.radius, config.ATTOM_POI_FETCH_RADIUS)
+        fetch_page_size = max(params.page_size or 0, config.ATTOM_POI_FETCH_PAGE_SIZE)
+        fetch_params["radius"] = fetch_radius
+        fetch_params["pageSize"] = fetch_page_size
+
     log.info("Fetching POI search results")
 
     try:
-        response = await client.get("v4/neighborhood/poi", request_params)
+        if cacheable:
+            response = await fetch_endpoint("poi_search", fetch_params)
+            # A superset cut at the byte limit cannot answer narrower queries
+            if TRUNCATED_KEY not in response and poi_cache.put(latitude, longitude, fetch_radius, category, response, fetch_page_size):
+                cached = poi_cache.get(latitude, longitude, params.radius, category, params.page_size)
+                return POIResponse(status_code=200, status_message="Success", data=cached)
+            log.debug("POI result set incomplete, fetching the original query")
+        response = await fetch_endpoint("poi_search", request_params)
         return POIResponse(status_code=200, status_message="Success", data=response)
     except Exception as e:
         log.error("Error fetching POI search results", error=str(e))
@@ -121,7 +161,7 @@ async def poi_category_lookup(params: POIParams) -> POIResponse:
     Returns:
         POI category and classification information
     """
-    log = logger.bind(tool="poi_category_lookup", params=params.model_dump())
+    log = logger.bind(tool="poi_category_lookup", params=params)
 
     # Build request parameters
     request_params = {}
@@ -139,7 +179,7 @@ async def poi_category_lookup(params: POIParams) -> POIResponse:
     log.info("Fetching POI category lookup")
 
     try:
-        response = await client.get("v4/neighborhood/poi/categorylookup", request_params)
+        response = await fetch_endpoint("poi_category_lookup", request_params)
         return POIResponse(status_code=200, status_message="Success", data=response)
     except Exception as e:
         log.error("Error fetching POI category lookup", error=str(e))
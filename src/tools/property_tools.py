@@ -3,12 +3,17 @@
 This module provides MCP tools for accessing the Property API endpoints.
 """
 
+import time
+from typing import Any, List, Optional
+
 import structlog
+from pydantic import BaseModel, Field
 from src.mcp_server import mcp
 
-from src.client import client
+from src.addresses import address_index
 from src.models import AttomResponse, PropertyIdentifier
-from src.tools.utils import make_api_call
+from src.search import search_index
+from src.tools.utils import call_endpoint
 
 # Configure logging
 logger = structlog.get_logger(__name__)
@@ -18,72 +23,72 @@ logger = structlog.get_logger(__name__)
 @mcp.tool()
 async def property_address(params: PropertyIdentifier) -> AttomResponse:
     """Get property address information."""
-    return await make_api_call("property/address", params, "property_address")
+    return await call_endpoint("property_address", params)
 
 
 # Property Detail Tool
 @mcp.tool()
 async def property_detail(params: PropertyIdentifier) -> AttomResponse:
     """Get property detail information."""
-    return await make_api_call("property/detail", params, "property_detail")
+    return await call_endpoint("property_detail", params)
 
 # Property Basic Profile Tool
 @mcp.tool()
 async def property_basic_profile(params: PropertyIdentifier) -> AttomResponse:
     """Get property basic profile information."""
-    return await make_api_call("property/basicprofile", params, "property_basic_profile")
+    return await call_endpoint("property_basic_profile", params)
 
 # Property Expanded Profile Tool
 @mcp.tool()
 async def property_expanded_profile(params: PropertyIdentifier) -> AttomResponse:
     """Get property expanded profile information."""
-    return await make_api_call("property/expandedprofile", params, "property_expanded_profile")
+    return await call_endpoint("property_expanded_profile", params)
 
 # Property Detail With Schools Tool
 @mcp.tool()
 async def property_detail_with_schools(params: PropertyIdentifier) -> AttomResponse:
     """Get property detail with schools information."""
-    return await make_api_call("property/detailwithschools", params, "property_detail_with_schools")
+    return await call_endpoint("property_detail_with_schools", params)
 
 @mcp.tool()
 async def property_basic_history(params: PropertyIdentifier) -> AttomResponse:
     """Get property basic history information."""
-    return await make_api_call("saleshistory/basichistory", params, "property_basic_history")
+    return await call_endpoint("property_basic_history", params)
 
 @mcp.tool()
 async def property_building_permits(params: PropertyIdentifier) -> AttomResponse:
     """Get property building permits information."""
-    return await make_api_call("property/buildingpermits", params, "property_building_permits")
+    return await call_endpoint("property_building_permits", params)
 
 @mcp.tool()
 async def property_detail_mortgage(params: PropertyIdentifier) -> AttomResponse:
     """Get property detail mortgage information."""
-    return await make_api_call("property/detailmortgage", params, "property_detail_mortgage")
+    return await call_endpoint("property_detail_mortgage", params)
 
 @mcp.tool()
 async def property_detail_owner(params: PropertyIdentifier) -> AttomResponse:
     """Get property detail owner information."""
-    return await make_api_call("property/detailowner", params, "property_detail_owner")
+    return await call_endpoint("property_detail_owner", params)
 
 @mcp.tool()
 async def property_detail_mortgage_owner(params: PropertyIdentifier) -> AttomResponse:
     """Get property detail mortgage owner information."""
-    return await make_api_call("property/detailmortgageowner", params, "property_detail_mortgage_owner")
+    return await call_endpoint("property_detail_mortgage_owner", params)
 
 @mcp.tool()
 async def property_expanded_history(params: PropertyIdentifier) -> AttomResponse:
     """Get property expanded history information."""
-    return await make_api_call("saleshistory/expandedhistory", params, "property_expanded_history")
+    return await call_endpoint("property_expanded_history", params)
 
 @mcp.tool()
 async def building_permits(params: PropertyIdentifier) -> AttomResponse:
     """Get building permits information."""
-    return await make_api_call("property/BuildingPermits", params, "building_permits")
+    return await call_endpoint("building_permits", params)
 
 @mcp.tool()
 async def property_id_search_sort(params: PropertyIdentifier) -> AttomResponse:
     """Get property id search sort information."""
-    return await make_api_call("property/id", params, "property_id_search_sort")
+    return await call_endpoint("property_id_search_sort", params)
 
 @mcp.tool()
 async def property_snapshot(params: PropertyIdentifier) -> AttomResponse:
@@ -97,35 +102,100 @@ async def property_snapshot(params: PropertyIdentifier) -> AttomResponse:
     Returns:
         Propertysnapshot information
     """
-    log = logger.bind(tool="property_snapshot", params=params.model_dump())
-
-    # Build request parameters
-    request_params = {}
-    if params.attom_id:
-        request_params["AttomID"] = params.attom_id
-    elif params.address:
-        request_params["address"] = params.address
-    elif params.address1 and params.address2:
-        request_params["address1"] = params.address1
-        request_params["address2"] = params.address2
-    elif params.fips and params.apn:
-        request_params["fips"] = params.fips
-        request_params["apn"] = params.apn
-    else:
-        log.error("Invalid property identifier")
-        return AttomResponse(
-            status_code=400,
-            status_message="Invalid property identifier. Please provide attom_id, address, address1+address2, or fips+apn.",
-        )
+    return await call_endpoint("property_snapshot", params)
+
+
+class SearchFilter(BaseModel):
+    """One condition of a local property search."""
+
+    field: str = Field(..., description="Field to filter on, e.g. beds, avm_value, sale_date, state, zip_code")
+    op: str = Field(
+        ..., description="gt, gte, lt, lte or between for numeric and date fields; eq, ne or in for categorical fields"
+    )
+    value: Any = Field(..., description="Bound, [low, high] for between, or a list of values for in")
+
+
+class PropertySearchParams(BaseModel):
+    """Parameters for the local property search."""
 
-    log.info("Fetching propertysnapshot")
+    filters: List[SearchFilter] = Field(default_factory=list, description="Conditions that must all hold")
+    latitude: Optional[float] = Field(None, description="Latitude of a point to search around")
+    longitude: Optional[float] = Field(None, description="Longitude of a point to search around")
+    radius_miles: Optional[float] = Field(None, description="Radius around the point, in miles")
+    sort_by: Optional[str] = Field(None, description="Numeric field to rank by, or distance")
+    descending: bool = Field(False, description="Rank from the highest value")
+    limit: int = Field(50, ge=1, le=1000, description="Maximum number of properties returned")
 
+
+@mcp.tool()
+async def property_search(params: PropertySearchParams) -> AttomResponse:
+    """Search the properties already fetched from ATTOM by their attributes.
+
+    Filters and ranks every property seen in earlier responses (beds, baths,
+    square footage, year built, AVM, sale price and date, assessment, state,
+    city, ZIP, property type) from a local index, without calling ATTOM.
+    Properties never fetched are not included.
+
+    Args:
+        params: Filters, optional point and radius, ranking field and limit
+
+    Returns:
+        Number of matching properties and the top matches
+    """
+    log = logger.bind(tool="property_search", filters=len(params.filters))
+    near = None
+    if params.radius_miles is not None:
+        if params.latitude is None or params.longitude is None:
+            return AttomResponse(status_code=400, status_message="radius_miles needs latitude and longitude.")
+        near = (params.latitude, params.longitude, params.radius_miles)
+    start = time.perf_counter()
     try:
-        response = await client.get("property/snapshot", request_params)
-        return AttomResponse(status_code=200, status_message="Success", data=response)
-    except Exception as e:
-        log.error("Error fetching propertysnapshot", error=str(e))
-        return AttomResponse(
-            status_code=500,
-            status_message=f"Error: {str(e)}",
+        result = search_index.search(
+            [(condition.field, condition.op, condition.value) for condition in params.filters],
+            near=near,
+            sort_by=params.sort_by,
+            descending=params.descending,
+            limit=params.limit,
         )
+    except (ValueError, TypeError) as e:
+        log.error("Invalid property search", error=str(e))
+        return AttomResponse(status_code=400, status_message=f"Invalid search: {e}")
+    result["indexed"] = len(search_index)
+    result["took_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    log.info("Searched local properties", total=result["total"], took_ms=result["took_ms"])
+    return AttomResponse(status_code=200, status_message="Success", data=result)
+
+
+class AddressSuggestParams(BaseModel):
+    """Parameters for matching a typed address against known properties."""
+
+    address: str = Field(..., description="Address as typed, e.g. 4529 Winona Ct, Denver, CO 80212")
+    limit: int = Field(5, ge=1, le=50, description="Maximum number of suggestions")
+
+
+@mcp.tool()
+async def address_suggest(params: AddressSuggestParams) -> AttomResponse:
+    """Match a typed address against the properties already fetched from ATTOM.
+
+    Tolerates typos, abbreviations and missing punctuation in street and city
+    names; house, unit and ZIP numbers must agree. Property tools called with
+    an address resolve an unambiguous match to its ATTOM ID on their own, so
+    use this to check an address or to pick between close matches without
+    calling ATTOM.
+
+    Args:
+        params: Address and maximum number of suggestions
+
+    Returns:
+        Known addresses with their ATTOM IDs and similarity scores, best first,
+        and the ATTOM ID the address resolves to, if any
+    """
+    matches = address_index.search(params.address, limit=params.limit)
+    resolved = address_index.resolve(params.address)
+    data = {
+        "suggestions": [match.to_dict() for match in matches],
+        "resolved": resolved.attom_id if resolved is not None else None,
+        "indexed": len(address_index),
+    }
+    logger.info("Matched address", suggestions=len(matches), resolved=data["resolved"])
+    return AttomResponse(status_code=200, status_message="Success", data=data)
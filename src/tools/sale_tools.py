@@ -3,12 +3,16 @@
 This module provides MCP tools for accessing the Sales API endpoints.
 """
 
+from typing import Any, Dict, Optional
+
 import structlog
+from pydantic import Field
 from src.mcp_server import mcp
 
-from src.client import client
+from src import comparables
 from src.models import AttomResponse, PropertyIdentifier
-from src.tools.utils import make_api_call
+from src.records import extract_records, store
+from src.tools.utils import call_endpoint
 
 # Configure logging
 logger = structlog.get_logger(__name__)
@@ -17,28 +21,114 @@ logger = structlog.get_logger(__name__)
 @mcp.tool()
 async def sale_detail(params: PropertyIdentifier) -> AttomResponse:
     """Get detailed sales information for a property."""
-    return await make_api_call("sale/detail", params, "sale_detail")
+    return await call_endpoint("sale_detail", params)
 
 
 @mcp.tool()
 async def sale_snapshot(params: PropertyIdentifier) -> AttomResponse:
     """Get sales snapshot information."""
-    return await make_api_call("sale/snapshot", params, "sale_snapshot")
+    return await call_endpoint("sale_snapshot", params)
 
 
 @mcp.tool()
 async def sales_history_detail(params: PropertyIdentifier) -> AttomResponse:
     """Get sales history detail information."""
-    return await make_api_call("saleshistory/detail", params, "sales_history_detail")
+    return await call_endpoint("sales_history_detail", params)
 
 
 @mcp.tool()
 async def sales_history_snapshot(params: PropertyIdentifier) -> AttomResponse:
     """Get sales history snapshot information."""
-    return await make_api_call("saleshistory/snapshot", params, "sales_history_snapshot")
+    return await call_endpoint("sales_history_snapshot", params)
 
 
 @mcp.tool()
 async def sales_comparables(params: PropertyIdentifier) -> AttomResponse:
     """Get sales comparables information."""
-    return await make_api_call("salescomparables/", params, "sales_comparables")
+    return await call_endpoint("sales_comparables", params)
+
+
+class ComparablesParams(PropertyIdentifier):
+    """Parameters for the local sales comparables analysis."""
+
+    comps: Optional[Dict[str, Any]] = Field(
+        None, description="Sales comparables payload to analyze instead of fetching one"
+    )
+    radius_miles: float = Field(
+        1.0, description="Radius for selecting cached nearby sales when no payload is given"
+    )
+    min_comps: int = Field(3, description="Minimum cached comps before falling back to ATTOM")
+    max_rows: int = Field(10, ge=1, le=100, description="Maximum number of comps in the summary table")
+    bed_adjustment: float = Field(
+        comparables.DEFAULT_BED_ADJUSTMENT, description="Dollar adjustment per bedroom difference"
+    )
+    bath_adjustment: float = Field(
+        comparables.DEFAULT_BATH_ADJUSTMENT, description="Dollar adjustment per bathroom difference"
+    )
+    year_adjustment: float = Field(
+        comparables.DEFAULT_YEAR_ADJUSTMENT, description="Dollar adjustment per year built difference"
+    )
+
+
+@mcp.tool()
+async def sales_comparables_analysis(params: ComparablesParams) -> AttomResponse:
+    """Analyze sales comparables for a property locally.
+
+    Computes price-per-square-foot statistics, adjusted comp values and a
+    distance-weighted value estimate. Comps come from the given payload, from
+    cached sales near the subject, or from the ATTOM sales comparables endpoint.
+
+    Args:
+        params: Subject property identifier, optional comps payload and adjustments
+
+    Returns:
+        Summary statistics, value estimates and a compact comps table
+    """
+    log = logger.bind(tool="sales_comparables_analysis", attom_id=params.attom_id)
+    identifier = PropertyIdentifier.model_validate(
+        params.model_dump(include=set(PropertyIdentifier.model_fields))
+    )
+
+    subject = store.get(params.attom_id) if params.attom_id else None
+    comps, distances, source = [], [], None
+    if params.comps is not None:
+        payload_subject, comps, distances = comparables.extract_comparables(params.comps)
+        subject = subject or payload_subject
+        source = "payload"
+    elif subject is not None:
+        comps, distances = comparables.nearby_sales(subject, store.records(), params.radius_miles)
+        if len(comps) >= params.min_comps:
+            source = "cache"
+
+    if source is None:
+        response = await call_endpoint("sales_comparables", identifier)
+        if response.status_code != 200:
+            return response
+        payload_subject, comps, distances = comparables.extract_comparables(response.data)
+        subject = subject or payload_subject
+        source = "upstream"
+
+    if subject is None:
+        response = await call_endpoint("property_detail", identifier)
+        if response.status_code != 200:
+            return response
+        subject = store.get(params.attom_id) if params.attom_id else None
+        if subject is None:
+            records = extract_records(response.data)
+            subject = records[0] if records else None
+    if subject is None:
+        log.error("Subject property not found")
+        return AttomResponse(status_code=404, status_message="Subject property not found.")
+
+    log.info("Analyzing sales comparables", source=source, comps=len(comps))
+    summary = comparables.analyze_comparables(
+        subject,
+        comps,
+        distances,
+        bed_adjustment=params.bed_adjustment,
+        bath_adjustment=params.bath_adjustment,
+        year_adjustment=params.year_adjustment,
+        max_rows=params.max_rows,
+    )
+    summary["source"] = source
+    return AttomResponse(status_code=200, status_message="Success", data=summary)
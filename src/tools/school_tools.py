@@ -8,8 +8,8 @@ import structlog
 from src.mcp_server import mcp
 from typing import Optional
 
-from src.client import client
 from src.models import AttomResponse
+from src.tools.utils import fetch_endpoint
 from pydantic import BaseModel
 
 # Configure logging
@@ -46,7 +46,7 @@ async def school_profile(params: SchoolParams) -> SchoolResponse:
     Returns:
         Detailed school profile information
     """
-    log = logger.bind(tool="school_profile", params=params.model_dump())
+    log = logger.bind(tool="school_profile", params=params)
 
     # Build request parameters
     request_params = {}
@@ -62,7 +62,7 @@ async def school_profile(params: SchoolParams) -> SchoolResponse:
     log.info("Fetching school profile")
 
     try:
-        response = await client.get("v4/school/profile", request_params)
+        response = await fetch_endpoint("school_profile", request_params)
         return SchoolResponse(status_code=200, status_message="Success", data=response)
     except Exception as e:
         log.error("Error fetching school profile", error=str(e))
@@ -86,7 +86,7 @@ async def school_district(params: SchoolParams) -> SchoolResponse:
     Returns:
         School district information
     """
-    log = logger.bind(tool="school_district", params=params.model_dump())
+    log = logger.bind(tool="school_district", params=params)
 
     # Build request parameters
     request_params = {}
@@ -102,7 +102,7 @@ async def school_district(params: SchoolParams) -> SchoolResponse:
     log.info("Fetching school district")
 
     try:
-        response = await client.get("v4/school/district", request_params)
+        response = await fetch_endpoint("school_district", request_params)
         return SchoolResponse(status_code=200, status_message="Success", data=response)
     except Exception as e:
         log.error("Error fetching school district", error=str(e))
@@ -126,7 +126,7 @@ async def school_search(params: SchoolParams) -> SchoolResponse:
     Returns:
         School search results
     """
-    log = logger.bind(tool="school_search", params=params.model_dump())
+    log = logger.bind(tool="school_search", params=params)
 
     # Build request parameters
     request_params = {}
@@ -155,7 +155,7 @@ async def school_search(params: SchoolParams) -> SchoolResponse:
     log.info("Fetching school search results")
 
     try:
-        response = await client.get("v4/school/search", request_params)
+        response = await fetch_endpoint("school_search", request_params)
         return SchoolResponse(status_code=200, status_message="Success", data=response)
     except Exception as e:
         log.error("Error fetching school search results", error=str(e))
@@ -0,0 +1,47 @@
+"""MCP tools reporting ATTOM API usage.
+
+This module provides MCP tools for reading the usage ledger: calls, cache
+hits, bytes and cost per day, endpoint and tool, and the budgets they are
+spent against. The breakdown by session is only served by the ``/usage``
+HTTP route.
+"""
+
+import structlog
+from pydantic import BaseModel, Field
+from src.mcp_server import mcp
+
+from src.models import AttomResponse
+from src.usage import call_scope, ledger
+
+# Configure logging
+logger = structlog.get_logger(__name__)
+
+
+class UsageReportParams(BaseModel):
+    """Parameters for the usage report."""
+
+    days: int = Field(1, ge=1, le=366, description="Most recent UTC days to report, today included")
+    session_only: bool = Field(False, description="Only report the calling session's usage")
+    top: int = Field(20, ge=1, le=1000, description="Endpoints and tools listed per day")
+
+
+@mcp.tool()
+async def usage_report(params: UsageReportParams) -> AttomResponse:
+    """Get ATTOM API usage and spend.
+
+    Returns calls, billed calls, cache hits, errors, bytes and cost per UTC
+    day, broken down by endpoint and tool, along with the configured budgets
+    and today's spend against them. Once a budget is spent, tools only
+    return cached responses. With session_only, only the calling session's
+    spend is reported; other sessions are never listed.
+
+    Args:
+        params: Parameters including days, session_only and top
+
+    Returns:
+        Usage report
+    """
+    session = call_scope.get()[0] if params.session_only else None
+    logger.info("Reporting usage", days=params.days, session=session)
+    report = ledger.report(days=params.days, session=session, top=params.top, sessions=False)
+    return AttomResponse(status_code=200, status_message="Success", data=report)
@@ -1,11 +1,45 @@
-"""Utility functions shared across MCP tools."""
+"""Utility functions shared across MCP tools.
+
+Every upstream request goes through ``fetch_endpoint``, which resolves the
+tool's endpoint from the registry, reuses cached responses according to the
+endpoint's cache class, coalesces identical requests already in flight and
+records each call in the usage ledger, serving cached responses only once a
+usage budget is spent. ``call_endpoint`` resolves typed addresses that
+certainly name a known property to its ATTOM ID first, reporting the swap,
+and suggests close matches when ATTOM finds nothing.
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, Hashable, Optional
 
 import structlog
-from src.client import client
+from pydantic import BaseModel
+
+from src import config, metrics, tracing, usage
+from src.addresses import address_index, typed_address
+from src.cache import LRUCache
+from src.client import AttomAPIError, client
+from src.endpoints import get_endpoint, template_path
 from src.models import AttomResponse, PropertyIdentifier
+from src.payload import TRUNCATED_KEY
+from src.records import store
+from src.runtime import run_blocking
+from src.search import search_index
+from src.timeseries import timeseries
 
 logger = structlog.get_logger(__name__)
 
+# Upstream responses by (endpoint, path, query parameters)
+response_cache = LRUCache(config.ATTOM_RESPONSE_CACHE_SIZE)
+metrics.registry.watch_cache("response", response_cache)
+
+# Requests in flight by the same key
+_inflight: Dict[Hashable, "asyncio.Future[Dict[str, Any]]"] = {}
+
+INVALID_IDENTIFIER = (
+    "Invalid property identifier. Please provide attom_id, address, address1+address2, or fips+apn."
+)
+
 
 def build_property_params(params: PropertyIdentifier) -> dict:
     """Build request parameters from PropertyIdentifier."""
@@ -23,26 +57,191 @@ def build_property_params(params: PropertyIdentifier) -> dict:
     return request_params
 
 
-async def make_api_call(endpoint: str, params: PropertyIdentifier, tool_name: str) -> AttomResponse:
-    """Make an API call with standardized error handling."""
-    log = logger.bind(tool=tool_name, params=params.model_dump())
-    
-    request_params = build_property_params(params)
-    if not request_params:
+def _cache_key(name: str, path: str, request_params: Dict[str, Any]) -> Hashable:
+    return (name, path, tuple(sorted((key, str(value)) for key, value in request_params.items())))
+
+
+def _observe(name: str, response: Dict[str, Any]) -> None:
+    """Feed a fetched response to the local stores and indexes.
+
+    They only speed up later calls, so a failure in one is logged and never
+    fails the call that paid for the response.
+    """
+    try:
+        records = store.observe(response)
+        known = [store.get(record.attom_id) for record in records if record.attom_id is not None]
+    except Exception as e:
+        logger.warning("Could not index response", index="records", endpoint=name, error=str(e))
+        known = []
+    for index, observe in (
+        ("search", lambda: search_index.add(known)),
+        ("addresses", lambda: address_index.add(known)),
+        ("timeseries", lambda: timeseries.observe(name, response)),
+    ):
+        try:
+            observe()
+        except Exception as e:
+            logger.warning("Could not index response", index=index, endpoint=name, error=str(e))
+
+
+async def fetch_endpoint(
+    name: str,
+    request_params: Dict[str, Any],
+    path: Optional[str] = None,
+    refresh: bool = False,
+    index: Optional[Callable[[Dict[str, Any]], Any]] = None,
+) -> Dict[str, Any]:
+    """Fetch a tool's endpoint from the ATTOM API.
+
+    Args:
+        name: Tool name in the endpoint registry
+        request_params: Query parameters
+        path: Endpoint path, for endpoints taking path parameters
+        refresh: Skip the response cache and fetch from ATTOM; the fresh
+            response replaces the cached one
+        index: Called on the shared executor with each complete response
+            fetched from ATTOM, to index it; never called for cached responses
+
+    Returns:
+        API response as a dictionary
+
+    Raises:
+        AttomAPIError: If the API returns an error, or with status 429 when
+            the request would go upstream after a usage budget is spent
+    """
+    endpoint = get_endpoint(name)
+    path = path or endpoint.path
+    key = _cache_key(name, path, request_params)
+    with tracing.span(
+        f"attom.fetch {name}", **{"attom.endpoint": name, "attom.cache_class": endpoint.cache_class}
+    ) as span:
+        if endpoint.ttl is not None and not refresh:
+            cached = response_cache.get(key)
+            if cached is not None:
+                span.set_attribute("attom.cache", "hit")
+                usage.ledger.record(name, "hit")
+                return cached
+
+        pending = _inflight.get(key)
+        if pending is not None:
+            span.set_attribute("attom.cache", "coalesced")
+            metrics.coalesced_requests.inc(endpoint=name)
+            usage.ledger.record(name, "coalesced")
+            return await asyncio.shield(pending)
+
+        outcome = "miss" if endpoint.ttl is not None and not refresh else "bypass"
+        span.set_attribute("attom.cache", outcome)
+        exhausted = usage.ledger.exhausted(name)
+        if exhausted is not None:
+            span.set_attribute("attom.budget_exhausted", True)
+            logger.warning("Usage budget exhausted", endpoint=name, reason=exhausted)
+            raise AttomAPIError(429, exhausted)
+        future = asyncio.get_running_loop().create_future()
+        _inflight[key] = future
+        try:
+            token = usage.cache_outcome.set(outcome)
+            try:
+                response = await client.get(path, request_params, api_prefix=endpoint.api_prefix(client), label=name)
+            finally:
+                usage.cache_outcome.reset(token)
+            # A payload cut off at the size limit is returned, but neither indexed nor cached as complete
+            if TRUNCATED_KEY not in response:
+                _observe(name, response)
+                if index is not None:
+                    try:
+                        await run_blocking(index, response)
+                    except Exception as e:
+                        logger.warning("Could not index response", index="tool", endpoint=name, error=str(e))
+                if endpoint.ttl is not None:
+                    response_cache.put(key, response, ttl=endpoint.ttl)
+            future.set_result(response)
+            return response
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when nobody else was waiting on it
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del _inflight[key]
+
+
+async def call_endpoint(name: str, params: BaseModel) -> AttomResponse:
+    """Call a tool's endpoint with parameters built from the registry.
+
+    Args:
+        name: Tool name in the endpoint registry
+        params: Tool parameter model
+
+    Returns:
+        Response with the API data, or a 400/500 status on failure. Addresses
+        resolved to a known ATTOM ID add ``resolved_from`` to the data; failed
+        address lookups carry suggested known addresses
+    """
+    log = logger.bind(tool=name, params=params)
+    endpoint = get_endpoint(name)
+
+    address = None
+    resolved_from = None
+    if endpoint.identifier in ("property", "path") and "attom_id" in type(params).model_fields:
+        address = typed_address(params)
+    if address is not None:
+        match = address_index.resolve(address)
+        if match is not None:
+            log.info("Resolved address to a known property", attom_id=match.attom_id, score=round(match.score, 3))
+            metrics.address_matches.inc(outcome="resolved")
+            params = params.model_copy(update={"attom_id": match.attom_id})
+            resolved_from = {
+                "address": address,
+                "attom_id": match.attom_id,
+                "matched_address": match.address,
+                "score": round(match.score, 3),
+            }
+
+    path = None
+    request_params: Dict[str, Any] = {}
+    if endpoint.identifier == "path":
+        path = template_path(endpoint, params)
+        if path is None:
+            log.error("Invalid property identifier")
+            return AttomResponse(
+                status_code=400,
+                status_message="Invalid property identifier. Please provide attom_id, or a street address "
+                "with city and state (address1 + address2, or address).",
+            )
+    else:
+        request_params = endpoint.build_params(params)
+    if endpoint.identifier == "property" and not request_params:
         log.error("Invalid property identifier")
-        return AttomResponse(
-            status_code=400,
-            status_message="Invalid property identifier. Please provide attom_id, address, address1+address2, or fips+apn.",
-        )
+        return AttomResponse(status_code=400, status_message=INVALID_IDENTIFIER)
 
-    log.info(f"Fetching {tool_name}")
+    log.info(f"Fetching {name}")
 
     try:
-        response = await client.get(endpoint, request_params)
+        response = await fetch_endpoint(name, request_params, path)
+        if resolved_from is not None:
+            # A shallow copy, so the cached response stays as ATTOM sent it
+            response = {**response, "resolved_from": resolved_from}
         return AttomResponse(status_code=200, status_message="Success", data=response)
     except Exception as e:
-        log.error(f"Error fetching {tool_name}", error=str(e))
+        log.error(f"Error fetching {name}", error=str(e))
+        data: Dict[str, Any] = {}
+        suggestions = address_index.search(address) if address is not None else []
+        if suggestions:
+            metrics.address_matches.inc(outcome="suggested")
+            data["suggestions"] = [match.to_dict() for match in suggestions]
+        if resolved_from is not None:
+            data["resolved_from"] = resolved_from
+        if not data:
+            return AttomResponse(
+                status_code=500,
+                status_message=f"Error: {str(e)}",
+            )
         return AttomResponse(
             status_code=500,
             status_message=f"Error: {str(e)}",
-        )
\ No newline at end of file
+            data=data,
+        )
+
@@ -3,12 +3,17 @@
 This module provides MCP tools for accessing the Valuation API endpoints.
 """
 
+import asyncio
+from typing import List, Optional
+
 import structlog
+from pydantic import BaseModel, Field
 from src.mcp_server import mcp
 
-from src.client import client
 from src.models import AttomResponse, PropertyIdentifier
-from src.tools.utils import make_api_call
+from src.payload import TRUNCATED_KEY
+from src.timeseries import HISTORY_ENDPOINTS, timeseries
+from src.tools.utils import call_endpoint, fetch_endpoint
 
 # Configure logging
 logger = structlog.get_logger(__name__)
@@ -17,34 +22,93 @@ logger = structlog.get_logger(__name__)
 @mcp.tool()
 async def avm_detail(params: PropertyIdentifier) -> AttomResponse:
     """Get detailed AVM (Automated Valuation Model) information."""
-    return await make_api_call("avm/detail", params, "avm_detail")
+    return await call_endpoint("avm_detail", params)
 
 
 @mcp.tool()
 async def avm_snapshot(params: PropertyIdentifier) -> AttomResponse:
     """Get AVM snapshot information."""
-    return await make_api_call("avm/snapshot", params, "avm_snapshot")
+    return await call_endpoint("avm_snapshot", params)
 
 
 @mcp.tool()
 async def avm_history_detail(params: PropertyIdentifier) -> AttomResponse:
     """Get AVM history detail information."""
-    return await make_api_call("avmhistory/detail", params, "avm_history_detail")
+    return await call_endpoint("avm_history_detail", params)
 
 
 @mcp.tool()
 async def attom_avm_detail(params: PropertyIdentifier) -> AttomResponse:
     """Get ATTOM AVM detail information."""
-    return await make_api_call("attomavm/detail", params, "attom_avm_detail")
+    return await call_endpoint("attom_avm_detail", params)
 
 
 @mcp.tool()
 async def home_equity(params: PropertyIdentifier) -> AttomResponse:
     """Get home equity valuation information."""
-    return await make_api_call("valuation/homeequity", params, "home_equity")
+    return await call_endpoint("home_equity", params)
 
 
 @mcp.tool()
 async def rental_avm(params: PropertyIdentifier) -> AttomResponse:
     """Get rental AVM information."""
-    return await make_api_call("valuation/rentalavm", params, "rental_avm")
+    return await call_endpoint("rental_avm", params)
+
+
+class TrendParams(BaseModel):
+    """Parameters for the local property trends."""
+
+    attom_id: str = Field(..., description="ATTOM ID of the property")
+    as_of: Optional[str] = Field(None, description="Date of the reported values, YYYY-MM-DD (default: today)")
+    years: List[int] = Field([1, 3, 5], description="Trailing windows in years for AVM appreciation rates")
+    refresh: bool = Field(False, description="Fetch the histories again even if the local copies are recent")
+
+
+@mcp.tool()
+async def property_trends(params: TrendParams) -> AttomResponse:
+    """Analyze AVM, sale and assessment trends for a property locally.
+
+    Computes annualized AVM appreciation over trailing windows, the value at a
+    date, appreciation between sales and the gap between the assessed market
+    value and the AVM. Histories come from a local time-series store and are
+    fetched from ATTOM only when missing or older than ATTOM_TIMESERIES_MAX_AGE.
+
+    Args:
+        params: Parameters including attom_id, as_of, years and refresh
+
+    Returns:
+        Trends of each history, with the number of points behind them
+    """
+    log = logger.bind(tool="property_trends", attom_id=params.attom_id)
+    kinds = list(HISTORY_ENDPOINTS) if params.refresh else timeseries.stale(params.attom_id)
+    results = await asyncio.gather(
+        # Cached responses were merged when they were fetched, so only a fresh fetch can add points
+        *(fetch_endpoint(HISTORY_ENDPOINTS[kind], {"AttomID": params.attom_id}, refresh=True) for kind in kinds),
+        return_exceptions=True,
+    )
+    errors = {
+        HISTORY_ENDPOINTS[kind]: str(result)
+        for kind, result in zip(kinds, results)
+        if isinstance(result, Exception)
+    }
+    for endpoint, error in errors.items():
+        log.warning("History fetch failed", endpoint=endpoint, error=error)
+    for kind, result in zip(kinds, results):
+        if isinstance(result, dict) and TRUNCATED_KEY not in result:
+            # Histories ATTOM has nothing for are not fetched again until they are stale
+            timeseries.touch(params.attom_id, kind)
+
+    try:
+        trends = timeseries.trends(params.attom_id, params.as_of, params.years)
+    except ValueError as e:
+        return AttomResponse(status_code=400, status_message=str(e))
+    if not trends["points"]:
+        message = "No AVM, sale or assessment history found for this property."
+        if errors:
+            message = f"Error: {'; '.join(errors.values())}"
+        return AttomResponse(status_code=404 if not errors else 500, status_message=message)
+    trends["fetched"] = [HISTORY_ENDPOINTS[kind] for kind in kinds if HISTORY_ENDPOINTS[kind] not in errors]
+    if errors:
+        trends["errors"] = errors
+    log.info("Computed property trends", fetched=len(trends["fetched"]))
+    return AttomResponse(status_code=200, status_message="Success", data=trends)
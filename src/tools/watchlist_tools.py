@@ -0,0 +1,102 @@
+"""MCP tools for the property watchlist.
+
+This module provides MCP tools for watching properties, polling them for
+changes and reading the change feed.
+"""
+
+from functools import partial
+from typing import List, Optional
+
+import structlog
+from pydantic import BaseModel, Field
+from src.mcp_server import mcp
+
+from src.models import AttomResponse
+from src.tools.utils import fetch_endpoint
+from src.watchlist import watchlist
+
+# Configure logging
+logger = structlog.get_logger(__name__)
+
+
+class WatchlistUpdateParams(BaseModel):
+    """Parameters for updating the watchlist."""
+
+    add: List[str] = Field(default_factory=list, description="ATTOM IDs to watch")
+    remove: List[str] = Field(default_factory=list, description="ATTOM IDs to stop watching")
+    label: Optional[str] = Field(None, description="Label of the added properties, e.g. a portfolio name")
+
+
+class WatchlistPollParams(BaseModel):
+    """Parameters for polling the watchlist."""
+
+    max_properties: Optional[int] = Field(
+        None, ge=1, description="Most properties checked by this poll (default: every due property)"
+    )
+    force: bool = Field(False, description="Check every property, even those checked recently")
+
+
+class WatchlistChangesParams(BaseModel):
+    """Parameters for reading the change feed."""
+
+    since: int = Field(0, ge=0, description="Return changes after this sequence number (next_since of a previous read)")
+    attom_id: Optional[str] = Field(None, description="Only changes of this property")
+    limit: int = Field(100, ge=1, le=1000, description="Most changes returned")
+
+
+@mcp.tool()
+async def watchlist_update(params: WatchlistUpdateParams) -> AttomResponse:
+    """Add properties to or remove them from the watchlist.
+
+    Watched properties are checked for new sales, AVM changes, assessments
+    and other events by watchlist_poll.
+
+    Args:
+        params: Parameters including add, remove and label
+
+    Returns:
+        Counts of properties added, removed and watched
+    """
+    counts = watchlist.update(add=params.add, remove=params.remove, label=params.label)
+    logger.info("Updated watchlist", **counts)
+    return AttomResponse(status_code=200, status_message="Success", data=counts)
+
+
+@mcp.tool()
+async def watchlist_poll(params: WatchlistPollParams) -> AttomResponse:
+    """Check watched properties for changes.
+
+    Fetches the events snapshot of each due property and compares it with
+    the last one; only changed properties are fetched in detail and added
+    to the change feed.
+
+    Args:
+        params: Parameters including max_properties and force
+
+    Returns:
+        Counts of properties checked, changed and failed, and the new change sequence numbers
+    """
+    # Compare against fresh snapshots, never against the response cache
+    fetch = partial(fetch_endpoint, refresh=True)
+    summary = await watchlist.poll(fetch, params.max_properties, params.force)
+    if "error" in summary:
+        return AttomResponse(status_code=409, status_message=summary["error"])
+    return AttomResponse(status_code=200, status_message="Success", data=summary)
+
+
+@mcp.tool()
+async def watchlist_changes(params: WatchlistChangesParams) -> AttomResponse:
+    """Get changes detected on watched properties.
+
+    Returns changed event sections, before and after sale, AVM and
+    assessment values, and the detail of the changed sections, oldest first.
+    Pass next_since as since to read only newer changes.
+
+    Args:
+        params: Parameters including since, attom_id and limit
+
+    Returns:
+        Change feed entries and the next cursor
+    """
+    feed = watchlist.changes(since=params.since, attom_id=params.attom_id, limit=params.limit)
+    return AttomResponse(status_code=200, status_message="Success", data=feed)
@@ -0,0 +1,150 @@
+"""OpenTelemetry tracing from MCP tool call to ATTOM request.
+
+FastMCP already opens a server span for every ``tools/call``, continuing
+the client's trace when the request carries a ``traceparent``. Beneath it
+this module adds spans for queueing, each endpoint fetch (with its cache
+outcome), the upstream HTTP request and its JSON decoding.
+
+Spans are only recorded once ``configure_tracing`` installs a tracer
+provider, which needs the optional OpenTelemetry SDK
+(``pip install "mcp-server-attom[tracing]"``). Otherwise the helpers here
+cost one attribute check per span.
+"""
+
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional, Sequence
+
+import structlog
+from opentelemetry import trace
+from opentelemetry.trace import INVALID_SPAN, Span, SpanKind
+
+from src import config
+from src.lifecycle import lifecycle
+
+# Configure logging
+logger = structlog.get_logger(__name__)
+
+INSTRUMENTATION_NAME = "mcp-server-attom"
+
+# Tracer used for the server's own spans; None while tracing is off
+tracer: Optional[trace.Tracer] = None
+
+
+def use_provider(provider: Optional[Any]) -> None:
+    """Record the server's spans with ``provider``, or stop recording with None."""
+    global tracer
+    tracer = provider.get_tracer(INSTRUMENTATION_NAME) if provider is not None else None
+
+
+@contextmanager
+def span(name: str, kind: SpanKind = SpanKind.INTERNAL, **attributes: Any) -> Iterator[Span]:
+    """Open a span as a child of the current one; a no-op while tracing is off.
+
+    Attributes with a None value are left out. Exceptions are recorded and
+    mark the span as failed.
+    """
+    if tracer is None:
+        yield INVALID_SPAN
+        return
+    with tracer.start_as_current_span(
+        name, kind=kind, attributes={key: value for key, value in attributes.items() if value is not None}
+    ) as current:
+        yield current
+
+
+def record_interval(name: str, start_ns: int, end_ns: int, **attributes: Any) -> None:
+    """Record a finished child span from timestamps taken elsewhere, e.g. on a worker thread."""
+    if tracer is None:
+        return
+    child = tracer.start_span(name, start_time=start_ns, attributes=attributes)
+    child.end(end_time=end_ns)
+
+
+class FileSpanExporter:
+    """Span exporter writing one OTLP-style JSON object per line to a file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[Any]) -> Any:
+        from opentelemetry.sdk.trace.export import SpanExportResult
+
+        lines = "".join(item.to_json(indent=None) + "\n" for item in spans)
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except OSError as e:
+            logger.warning("Could not write spans", path=self.path, error=str(e))
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+    def shutdown(self) -> None:
+        pass
+
+
+def make_exporter(spec: str) -> Any:
+    """Build a span exporter from a ``ATTOM_TRACE_EXPORTER`` setting.
+
+    Args:
+        spec: ``console`` (stderr), ``otlp`` (OTLP over HTTP, configured with the
+            standard ``OTEL_EXPORTER_OTLP_*`` variables) or ``file:<path>``
+
+    Raises:
+        ValueError: If the setting is unknown
+        ImportError: If the exporter's package is not installed
+    """
+    if spec == "console":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+        # stdout carries the stdio transport
+        return ConsoleSpanExporter(out=sys.stderr)
+    if spec == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        return OTLPSpanExporter()
+    if spec.startswith("file:") and spec[5:]:
+        return FileSpanExporter(spec[5:])
+    raise ValueError(f"Unknown trace exporter {spec!r}; expected console, otlp or file:<path>")
+
+
+def configure_tracing(
+    exporter: str = config.ATTOM_TRACE_EXPORTER, service_name: str = config.ATTOM_TRACE_SERVICE_NAME
+) -> Optional[Any]:
+    """Install a tracer provider exporting the server's and FastMCP's spans.
+
+    Args:
+        exporter: Exporter setting (see ``make_exporter``); empty leaves tracing off
+        service_name: ``service.name`` resource attribute
+
+    Returns:
+        The tracer provider, or None when tracing stays off
+
+    Raises:
+        ValueError: If the exporter setting is unknown
+    """
+    if not exporter:
+        return None
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+        span_exporter = make_exporter(exporter)
+    except ImportError as e:
+        logger.warning('Tracing needs the OpenTelemetry SDK: pip install "mcp-server-attom[tracing]"', error=str(e))
+        return None
+
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    # FastMCP's tools/call spans come from the global provider
+    trace.set_tracer_provider(provider)
+    use_provider(provider)
+    lifecycle.on_shutdown(provider.force_flush)
+    logger.info("Tracing enabled", exporter=exporter)
+    return provider
@@ -0,0 +1,454 @@
+"""Usage ledger of ATTOM API calls, with spend reports and budgets.
+
+Every upstream request and every response served from the response cache is
+recorded with its endpoint, API key fingerprint, client session, tool, cache
+outcome, HTTP status, body size and cost. Records are appended as
+tab-separated lines to one file per UTC day under ``ATTOM_CACHE_DIR/usage``
+(in memory only when no cache directory is set), and rolling per-day
+aggregates by endpoint, session and tool are kept for reports.
+
+Several server processes can share the directory: each appends whole lines
+tagged with its writer id and reads the lines other processes appended, at
+most once per ``REFRESH_INTERVAL``, before reporting or checking a budget.
+A process aggregates its own records as it makes them and writes them in
+batches off the event loop. Once a daily, per-session or per-endpoint budget
+is spent, tools are served from the response cache only.
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import structlog
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+from src import config
+from src.lifecycle import lifecycle
+from src.limits import fingerprint, session_key
+from src.runtime import run_blocking
+
+# Configure logging
+logger = structlog.get_logger(__name__)
+
+# Record fields, in file order (files written before writer ids lack the last field)
+FIELDS = ("time", "endpoint", "tool", "session", "key", "outcome", "status", "bytes", "cost", "writer")
+
+# Seconds between reads of the records other processes appended
+REFRESH_INTERVAL = 1.0
+
+# Cache outcomes that did not go upstream
+CACHED_OUTCOMES = ("hit", "coalesced")
+
+# Report dimensions
+DIMENSIONS = ("endpoint", "session", "tool")
+
+# (session, tool) of the tool call being served
+call_scope: ContextVar[Tuple[str, str]] = ContextVar("usage_call_scope", default=("-", "-"))
+
+# Cache outcome of the upstream request being made; requests made outside
+# ``fetch_endpoint`` (e.g. reference refreshes) are "direct"
+cache_outcome: ContextVar[str] = ContextVar("usage_cache_outcome", default="direct")
+
+
+def key_fingerprint(api_key: str) -> str:
+    """Short, non-reversible identifier of an API key."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:8] if api_key else "-"
+
+
+def parse_costs(spec: str) -> Dict[str, float]:
+    """Parse ``name=value,...`` pairs, e.g. ``default=1,sales_comparables=5``.
+
+    Raises:
+        ValueError: If a pair is malformed or its value is not a number
+    """
+    values: Dict[str, float] = {}
+    for pair in (part.strip() for part in spec.split(",") if part.strip()):
+        name, sep, value = pair.partition("=")
+        if not sep or not name.strip():
+            raise ValueError(f"Expected name=value, got {pair!r}")
+        values[name.strip()] = float(value)
+    return values
+
+
+def day_of(timestamp: float) -> str:
+    """UTC date of a timestamp, e.g. ``2026-10-19``."""
+    return time.strftime("%Y-%m-%d", time.gmtime(timestamp))
+
+
+def _clean(value: str) -> str:
+    return value.replace("\t", " ").replace("\n", " ") or "-"
+
+
+class Usage:
+    """Counters of one aggregate."""
+
+    __slots__ = ("calls", "billed", "cached", "errors", "bytes", "cost")
+
+    def __init__(self) -> None:
+        self.calls = self.billed = self.cached = self.errors = self.bytes = 0
+        self.cost = 0.0
+
+    def add(self, outcome: str, status: int, size: int, cost: float) -> None:
+        self.calls += 1
+        if outcome in CACHED_OUTCOMES:
+            self.cached += 1
+        elif status == 200:
+            self.billed += 1
+        else:
+            self.errors += 1
+        self.bytes += size
+        self.cost += cost
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "billed": self.billed,
+            "cached": self.cached,
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "cost": round(self.cost, 4),
+        }
+
+
+class DayUsage:
+    """Aggregates of one UTC day: the total and each endpoint, session and tool."""
+
+    __slots__ = ("total", "groups")
+
+    def __init__(self) -> None:
+        self.total = Usage()
+        self.groups: Dict[str, Dict[str, Usage]] = {dimension: {} for dimension in DIMENSIONS}
+
+    def add(self, endpoint: str, session: str, tool: str, outcome: str, status: int, size: int, cost: float) -> None:
+        self.total.add(outcome, status, size, cost)
+        for dimension, name in zip(DIMENSIONS, (endpoint, session, tool)):
+            group = self.groups[dimension]
+            usage = group.get(name)
+            if usage is None:
+                usage = group[name] = Usage()
+            usage.add(outcome, status, size, cost)
+
+
+class UsageLedger:
+    """Append-only ledger of upstream calls with rolling daily aggregates."""
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        costs: Optional[Dict[str, float]] = None,
+        daily_budget: float = 0.0,
+        session_budget: float = 0.0,
+        endpoint_budgets: Optional[Dict[str, float]] = None,
+        retention_days: int = 31,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize the ledger.
+
+        Args:
+            directory: Directory of the daily ledger files (None keeps usage in memory)
+            costs: Cost of a billed call by endpoint, with a ``default`` entry (default 1)
+            daily_budget: Cost allowed per UTC day across all sessions (0 is unlimited)
+            session_budget: Cost allowed per session per UTC day (0 is unlimited)
+            endpoint_budgets: Cost allowed per endpoint per UTC day
+            retention_days: Days of aggregates kept in memory
+            clock: Source of record timestamps
+        """
+        self.directory = directory
+        self.costs = dict(costs or {})
+        self.default_cost = self.costs.pop("default", 1.0)
+        self.daily_budget = daily_budget
+        self.session_budget = session_budget
+        self.endpoint_budgets = dict(endpoint_budgets or {})
+        self.retention_days = max(1, retention_days)
+        self.clock = clock
+        self._days: Dict[str, DayUsage] = {}
+        # Bytes of each day file already aggregated
+        self._offsets: Dict[str, int] = {}
+        self._loaded = directory is None
+        self._refreshed_at = 0.0
+        # Tags this ledger's lines, which it aggregated when recording them
+        self.writer = uuid.uuid4().hex[:12]
+        # (day, line) records not yet written, and whether a write is scheduled
+        self._pending: List[Tuple[str, str]] = []
+        self._pending_lock = threading.Lock()
+        self._flushing = False
+
+    def cost(self, endpoint: str, outcome: str, status: int) -> float:
+        """Cost of a call: billed calls cost their endpoint's rate, others nothing."""
+        if outcome in CACHED_OUTCOMES or status != 200:
+            return 0.0
+        return self.costs.get(endpoint, self.default_cost)
+
+    def record(
+        self,
+        endpoint: str,
+        outcome: str,
+        status: int = 200,
+        size: int = 0,
+        key: str = "-",
+    ) -> None:
+        """Record a call under the session and tool of the current tool call.
+
+        Args:
+            endpoint: Endpoint name
+            outcome: Cache outcome (hit, coalesced, miss, bypass or direct)
+            status: HTTP status of an upstream call (0 when it failed without one)
+            size: Response body bytes
+            key: API key fingerprint
+        """
+        session, tool = call_scope.get()
+        now = self.clock()
+        cost = self.cost(endpoint, outcome, status)
+        day = day_of(now)
+        self._day(day).add(endpoint, session, tool, outcome, status, size, cost)
+        if self.directory is None:
+            return
+        line = "\t".join(
+            (
+                f"{now:.3f}",
+                _clean(endpoint),
+                _clean(tool),
+                _clean(session),
+                _clean(key),
+                outcome,
+                str(status),
+                str(size),
+                f"{cost:g}",
+                self.writer,
+            )
+        )
+        with self._pending_lock:
+            self._pending.append((day, line))
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        """Write pending records off the event loop, or at once outside one."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        if not self._flushing:
+            self._flushing = True
+            loop.create_task(self._flush_async())
+
+    async def _flush_async(self) -> None:
+        try:
+            await run_blocking(self.flush)
+        finally:
+            self._flushing = False
+        # Records made while the batch was being written
+        if self._pending:
+            self._schedule_flush()
+
+    def flush(self) -> None:
+        """Append pending records to their day files (blocking)."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        by_day: Dict[str, List[str]] = {}
+        for day, line in pending:
+            by_day.setdefault(day, []).append(line + "\n")
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for day, lines in by_day.items():
+                # One write of whole lines to a file opened for appending, so
+                # processes sharing the directory do not interleave records
+                with open(self._path(day), "a", encoding="utf-8") as f:
+                    f.write("".join(lines))
+        except OSError as e:
+            logger.warning("Could not write usage records", directory=self.directory, error=str(e))
+
+    def _path(self, day: str) -> str:
+        return os.path.join(self.directory, f"{day}.tsv")
+
+    def _day(self, day: str) -> DayUsage:
+        usage = self._days.get(day)
+        if usage is None:
+            usage = self._days[day] = DayUsage()
+            # Drop aggregates older than the retention period
+            for old in sorted(self._days)[: -self.retention_days]:
+                del self._days[old]
+        return usage
+
+    def _retained_days(self) -> List[str]:
+        now = self.clock()
+        return [day_of(now - offset * 86400) for offset in range(self.retention_days - 1, -1, -1)]
+
+    def _read(self, day: str) -> None:
+        """Aggregate the lines appended to a day file since it was last read."""
+        path = self._path(day)
+        offset = self._offsets.get(day, 0)
+        try:
+            if os.path.getsize(path) <= offset:
+                return
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except OSError:
+            return
+        # A line still being written is read on the next refresh
+        end = data.rfind(b"\n") + 1
+        self._offsets[day] = offset + end
+        usage = self._day(day)
+        for line in data[:end].decode("utf-8", errors="replace").splitlines():
+            fields = line.split("\t")
+            if len(fields) not in (len(FIELDS) - 1, len(FIELDS)):
+                continue
+            if len(fields) == len(FIELDS) and fields[9] == self.writer:
+                # Aggregated when it was recorded
+                continue
+            try:
+                usage.add(
+                    fields[1], fields[3], fields[2], fields[5], int(fields[6]), int(fields[7]), float(fields[8])
+                )
+            except ValueError:
+                logger.warning("Skipping invalid usage record", path=path)
+
+    def refresh(self, force: bool = False) -> None:
+        """Aggregate records other processes appended since the last refresh.
+
+        Args:
+            force: Read even if the last read was less than ``REFRESH_INTERVAL`` ago
+        """
+        if self.directory is None:
+            return
+        monotonic = time.monotonic()
+        if self._loaded and not force and monotonic - self._refreshed_at < REFRESH_INTERVAL:
+            return
+        self._refreshed_at = monotonic
+        if not self._loaded:
+            self._loaded = True
+            days = self._retained_days()
+        else:
+            # Only today's file (and yesterday's, just after midnight) still grows
+            days = self._retained_days()[-2:]
+        for day in days:
+            self._read(day)
+
+    def spent(self, dimension: Optional[str] = None, name: Optional[str] = None, day: Optional[str] = None) -> float:
+        """Cost spent on a day (default today), in total or by one endpoint, session or tool."""
+        self.refresh()
+        return self._spent(dimension, name, day)
+
+    def _spent(self, dimension: Optional[str] = None, name: Optional[str] = None, day: Optional[str] = None) -> float:
+        usage = self._days.get(day or day_of(self.clock()))
+        if usage is None:
+            return 0.0
+        if dimension is None:
+            return usage.total.cost
+        group = usage.groups[dimension].get(name)
+        return group.cost if group is not None else 0.0
+
+    def exhausted(self, endpoint: str) -> Optional[str]:
+        """Why an upstream call to ``endpoint`` would exceed a budget, or None if it is allowed."""
+        if not (self.daily_budget or self.session_budget or self.endpoint_budgets):
+            return None
+        self.refresh()
+        session, _ = call_scope.get()
+        checks = (
+            ("Daily", self.daily_budget, None, None),
+            ("Session", self.session_budget, "session", session),
+            (f"Endpoint {endpoint}", self.endpoint_budgets.get(endpoint, 0.0), "endpoint", endpoint),
+        )
+        for label, budget, dimension, name in checks:
+            if budget and self._spent(dimension, name) + self.cost(endpoint, "miss", 200) > budget:
+                return (
+                    f"{label} ATTOM usage budget of {budget:g} is spent for {day_of(self.clock())} (UTC); "
+                    "only cached responses are available"
+                )
+        return None
+
+    def report(
+        self, days: int = 1, session: Optional[str] = None, top: int = 20, sessions: bool = True
+    ) -> Dict[str, Any]:
+        """Spend per day, with the top endpoints, sessions and tools of each day.
+
+        Args:
+            days: Most recent UTC days to report, today included
+            session: Only report this session's spend
+            top: Entries listed per dimension, by cost then calls
+            sessions: Whether to list the top sessions of each day
+        """
+        self.refresh(force=True)
+        report: Dict[str, Any] = {"budgets": self.budgets(session), "days": []}
+        for day in self._retained_days()[-max(1, days):][::-1]:
+            usage = self._days.get(day)
+            if usage is None:
+                continue
+            if session is not None:
+                total = usage.groups["session"].get(session)
+                if total is None:
+                    continue
+                report["days"].append({"day": day, "session": session, "total": total.as_dict()})
+                continue
+            entry: Dict[str, Any] = {"day": day, "total": usage.total.as_dict()}
+            for dimension in DIMENSIONS:
+                if dimension == "session" and not sessions:
+                    continue
+                ranked = sorted(
+                    usage.groups[dimension].items(), key=lambda item: (-item[1].cost, -item[1].calls, item[0])
+                )
+                entry[f"by_{dimension}"] = {name: counts.as_dict() for name, counts in ranked[:top]}
+            report["days"].append(entry)
+        return report
+
+    def budgets(self, session: Optional[str] = None) -> Dict[str, Any]:
+        """Configured budgets with today's spend against them."""
+        self.refresh()
+        budgets: Dict[str, Any] = {}
+        if self.daily_budget:
+            budgets["daily"] = {"budget": self.daily_budget, "spent": round(self._spent(), 4)}
+        if self.session_budget:
+            budgets["session"] = {"budget": self.session_budget}
+            if session is not None:
+                budgets["session"]["spent"] = round(self._spent("session", session), 4)
+        for endpoint, budget in self.endpoint_budgets.items():
+            budgets.setdefault("endpoints", {})[endpoint] = {
+                "budget": budget,
+                "spent": round(self._spent("endpoint", endpoint), 4),
+            }
+        return budgets
+
+
+class UsageMiddleware(Middleware):
+    """Attributes the ATTOM calls made by a tool call to its session and tool.
+
+    Sessions are recorded by fingerprint, so neither the ledger files nor
+    the reports hold session ids a client could reuse.
+    """
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: Callable) -> Any:
+        token = call_scope.set((fingerprint(session_key(context)), getattr(context.message, "name", None) or "-"))
+        try:
+            return await call_next(context)
+        finally:
+            call_scope.reset(token)
+
+
+def default_directory() -> Optional[str]:
+    """Ledger directory under ``ATTOM_CACHE_DIR``, or None to keep usage in memory."""
+    return os.path.join(config.ATTOM_CACHE_DIR, "usage") if config.ATTOM_CACHE_DIR else None
+
+
+@lifecycle.on_shutdown
+def flush_ledger() -> None:
+    """Write the usage records still pending."""
+    ledger.flush()
+
+
+# Create a singleton ledger shared by the server
+ledger = UsageLedger(
+    default_directory(),
+    costs=parse_costs(config.ATTOM_USAGE_COSTS),
+    daily_budget=config.ATTOM_DAILY_BUDGET,
+    session_budget=config.ATTOM_SESSION_BUDGET,
+    endpoint_budgets=parse_costs(config.ATTOM_ENDPOINT_BUDGETS),
+    retention_days=config.ATTOM_USAGE_RETENTION_DAYS,
+)
@@ -0,0 +1,414 @@
+"""Watchlist of properties with an incremental change feed.
+
+Each poll fetches the cheap ``all_events_snapshot`` of the watched
+properties that are due, fingerprints every section of the snapshot (sale,
+AVM, assessment, ...) and compares the fingerprints with the stored ones.
+Only properties whose fingerprints changed are fetched again with
+``all_events_detail``, and each one adds an entry to the change feed with the
+changed sections, the before and after values of the key sale, AVM and
+assessment fields, and the detail of the changed sections. Polling cost is
+one snapshot per due property plus one detail per change.
+
+With ``ATTOM_CACHE_DIR`` set the watchlist is kept in ``watchlist.json``
+and the feed is appended to ``watchlist_changes.jsonl``. Poll from one
+process (the ``watchlist_poll`` tool or ``python -m src.watchlist poll``);
+other processes sharing the directory pick up its changes. Every write
+re-reads the state under a lock on ``watchlist.lock`` and changes only what
+it is about, so properties added or removed by another process while a poll
+runs are kept.
+
+Usage::
+
+    python -m src.watchlist add 123456 234567 [--label NAME]
+    python -m src.watchlist poll [--every SECONDS] [--max N] [--force]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import structlog
+
+from src import config
+from src.records import record_from_property
+
+try:
+    import fcntl
+except ImportError:  # Windows: state writes are not serialized across processes
+    fcntl = None
+
+# Configure logging
+logger = structlog.get_logger(__name__)
+
+# Snapshot sections that identify a property rather than describe its events
+IGNORED_SECTIONS = ("identifier", "address", "location", "vintage")
+
+# Record fields compared before and after a change
+VALUE_FIELDS = (
+    "sale_date",
+    "sale_amount",
+    "avm_date",
+    "avm_value",
+    "assessed_total",
+    "market_total",
+    "tax_amount",
+)
+
+Fetch = Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+def _first_property(payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    items = payload.get("property") if isinstance(payload, dict) else None
+    if isinstance(items, list) and items and isinstance(items[0], dict):
+        return items[0]
+    return None
+
+
+def fingerprints(item: Dict[str, Any]) -> Dict[str, str]:
+    """Short hash of each event section of a snapshot property."""
+    return {
+        section: hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+        for section, value in item.items()
+        if section not in IGNORED_SECTIONS
+    }
+
+
+def key_values(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Sale, AVM and assessment values of a snapshot property."""
+    record = record_from_property(item)
+    return {field: getattr(record, field) for field in VALUE_FIELDS}
+
+
+class Watchlist:
+    """Watched properties, their last fingerprints and the change feed."""
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        interval: float = config.ATTOM_WATCHLIST_INTERVAL,
+        feed_size: int = config.ATTOM_WATCHLIST_FEED_SIZE,
+        concurrency: int = config.ATTOM_WATCHLIST_CONCURRENCY,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize the watchlist.
+
+        Args:
+            directory: Directory of the watchlist files (None keeps them in memory)
+            interval: Seconds between checks of a property
+            feed_size: Most recent changes kept in memory for queries
+            concurrency: Snapshot requests in flight during a poll
+            clock: Source of timestamps
+        """
+        self.directory = directory
+        self.interval = interval
+        self.concurrency = max(1, concurrency)
+        self.clock = clock
+        self._properties: Dict[str, Dict[str, Any]] = {}
+        self._feed: Deque[Dict[str, Any]] = deque(maxlen=max(1, feed_size))
+        self._seq = 0
+        self._state_mtime: Optional[float] = None
+        self._feed_offset = 0
+        self._polling = False
+
+    @property
+    def state_path(self) -> Optional[str]:
+        return os.path.join(self.directory, "watchlist.json") if self.directory else None
+
+    @property
+    def feed_path(self) -> Optional[str]:
+        return os.path.join(self.directory, "watchlist_changes.jsonl") if self.directory else None
+
+    def __len__(self) -> int:
+        self._refresh()
+        return len(self._properties)
+
+    def _refresh(self) -> None:
+        """Reload state written by another process and read newly appended changes."""
+        if not self.directory:
+            return
+        try:
+            mtime = os.path.getmtime(self.state_path)
+        except OSError:
+            mtime = None
+        if mtime is not None and mtime != self._state_mtime:
+            try:
+                with open(self.state_path, encoding="utf-8") as f:
+                    state = json.load(f)
+                self._properties = state.get("properties", {})
+                self._state_mtime = mtime
+            except (OSError, ValueError) as e:
+                logger.warning("Could not load watchlist", path=self.state_path, error=str(e))
+        try:
+            with open(self.feed_path, "rb") as f:
+                f.seek(self._feed_offset)
+                data = f.read()
+        except OSError:
+            return
+        end = data.rfind(b"\n") + 1
+        self._feed_offset += end
+        for line in data[:end].splitlines():
+            try:
+                change = json.loads(line)
+            except ValueError:
+                logger.warning("Skipping invalid watchlist change", path=self.feed_path)
+                continue
+            self._feed.append(change)
+            self._seq = max(self._seq, change.get("seq", 0))
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Serialize read-modify-write cycles of the state file across processes, with the state re-read."""
+        if not self.directory or fcntl is None:
+            self._state_mtime = None
+            self._refresh()
+            yield
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, "watchlist.lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                # Another process may have written within the same mtime tick
+                self._state_mtime = None
+                self._refresh()
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _save(self) -> None:
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        temporary = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump({"properties": self._properties}, f, separators=(",", ":"))
+        os.replace(temporary, self.state_path)
+        self._state_mtime = os.path.getmtime(self.state_path)
+
+    def _emit(self, change: Dict[str, Any]) -> None:
+        self._seq += 1
+        change = {"seq": self._seq, **change}
+        self._feed.append(change)
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            line = (json.dumps(change, separators=(",", ":"), default=str) + "\n").encode("utf-8")
+            with open(self.feed_path, "ab") as f:
+                f.write(line)
+            self._feed_offset += len(line)
+
+    def update(
+        self, add: Iterable[str] = (), remove: Iterable[str] = (), label: Optional[str] = None
+    ) -> Dict[str, int]:
+        """Add and remove watched properties by ATTOM ID.
+
+        Args:
+            add: Properties to watch; ones already watched keep their state
+            remove: Properties to stop watching
+            label: Label of the added properties, e.g. a portfolio name
+
+        Returns:
+            Counts of properties added, removed and watched
+        """
+        added = removed = 0
+        with self._locked():
+            for attom_id in (str(value).strip() for value in add):
+                if attom_id and attom_id not in self._properties:
+                    self._properties[attom_id] = {"label": label, "added": self.clock(), "checked": None}
+                    added += 1
+            for attom_id in (str(value).strip() for value in remove):
+                removed += self._properties.pop(attom_id, None) is not None
+            if added or removed:
+                self._save()
+        return {"added": added, "removed": removed, "watched": len(self._properties)}
+
+    def due(self, force: bool = False) -> List[str]:
+        """Watched properties to check, least recently checked first."""
+        self._refresh()
+        now = self.clock()
+        candidates = [
+            (entry.get("checked") or 0.0, attom_id)
+            for attom_id, entry in self._properties.items()
+            if force or entry.get("checked") is None or now - entry["checked"] >= self.interval
+        ]
+        return [attom_id for _, attom_id in sorted(candidates)]
+
+    async def poll(self, fetch: Fetch, max_properties: Optional[int] = None, force: bool = False) -> Dict[str, Any]:
+        """Check the due properties and record the changed ones in the feed.
+
+        Args:
+            fetch: Coroutine fetching an endpoint by name with query parameters, bypassing
+                any response cache so snapshots are compared as ATTOM has them now
+            max_properties: Most properties checked, to spread a large watchlist over polls
+            force: Check every property, due or not
+
+        Returns:
+            Counts of properties checked (unchanged, baselined or changed),
+            failed and still due, and the sequence numbers of the new changes
+        """
+        if self._polling:
+            return {"error": "A poll is already running"}
+        self._polling = True
+        try:
+            ids = self.due(force)
+            if max_properties:
+                ids = ids[:max_properties]
+            semaphore = asyncio.Semaphore(self.concurrency)
+            summary: Dict[str, Any] = {"checked": 0, "unchanged": 0, "baselined": 0, "changed": 0, "failed": 0}
+            first_seq = self._seq + 1
+            # Check results by property, merged into the state when the poll ends
+            results: Dict[str, Dict[str, Any]] = {}
+
+            async def check(attom_id: str) -> None:
+                async with semaphore:
+                    try:
+                        outcome, fields = await self._check(fetch, attom_id)
+                    except Exception as e:
+                        logger.warning("Watchlist check failed", attom_id=attom_id, error=str(e))
+                        outcome, fields = "failed", {}
+                if fields:
+                    results[attom_id] = fields
+                summary[outcome] += 1
+                if outcome != "failed":
+                    summary["checked"] += 1
+
+            await asyncio.gather(*(check(attom_id) for attom_id in ids))
+            with self._locked():
+                # Only the checked fields of properties still watched; others' updates are kept
+                for attom_id, fields in results.items():
+                    entry = self._properties.get(attom_id)
+                    if entry is not None:
+                        entry.update(fields)
+                self._save()
+            summary["remaining"] = len(self.due())
+            summary["changes"] = list(range(first_seq, self._seq + 1))
+            logger.info("Polled watchlist", **{k: v for k, v in summary.items() if k != "changes"})
+            return summary
+        finally:
+            self._polling = False
+
+    async def _check(self, fetch: Fetch, attom_id: str) -> Tuple[str, Dict[str, Any]]:
+        """Check one property.
+
+        Returns:
+            ``baselined``, ``changed`` or ``unchanged``, and the ``checked``,
+            ``fingerprints`` and ``values`` fields to store for the property
+        """
+        snapshot = _first_property(await fetch("all_events_snapshot", {"AttomID": attom_id}))
+        current = fingerprints(snapshot) if snapshot is not None else None
+        entry = self._properties.get(attom_id)
+        previous = entry.get("fingerprints") if entry is not None else None
+        sections = []
+        if current is not None and previous is not None:
+            sections = sorted(key for key in set(current) | set(previous) if current.get(key) != previous.get(key))
+        # Fetched before the fingerprints are stored, so a failure is retried next poll
+        detail = _first_property(await fetch("all_events_detail", {"AttomID": attom_id})) if sections else None
+
+        # The property may have been removed while this check was running
+        entry = self._properties.get(attom_id)
+        if entry is None:
+            return "unchanged", {}
+        now = self.clock()
+        if current is None:
+            return "unchanged", {"checked": now}
+        values = key_values(snapshot)
+        before = entry.get("values") or {}
+        fields = {"checked": now, "fingerprints": current, "values": values}
+        if previous is None:
+            return "baselined", fields
+        if not sections:
+            return "unchanged", fields
+        detail = detail or snapshot
+        self._emit(
+            {
+                "time": now,
+                "attom_id": attom_id,
+                "label": entry.get("label"),
+                "sections": sections,
+                "values": {
+                    field: {"before": before.get(field), "after": values[field]}
+                    for field in VALUE_FIELDS
+                    if before.get(field) != values[field]
+                },
+                "detail": {section: detail[section] for section in sections if section in detail},
+            }
+        )
+        return "changed", fields
+
+    def changes(self, since: int = 0, attom_id: Optional[str] = None, limit: int = 100) -> Dict[str, Any]:
+        """Changes after sequence number ``since``, oldest first.
+
+        Returns:
+            The changes, the cursor to pass as ``since`` next time, and whether
+            older changes than those kept in memory were skipped
+        """
+        self._refresh()
+        entries = [
+            change
+            for change in self._feed
+            if change["seq"] > since and (attom_id is None or change["attom_id"] == attom_id)
+        ][:limit]
+        oldest = self._feed[0]["seq"] if self._feed else self._seq + 1
+        return {
+            "changes": entries,
+            "next_since": entries[-1]["seq"] if entries else since,
+            "skipped": since + 1 < oldest,
+            "watched": len(self._properties),
+        }
+
+
+def default_directory() -> Optional[str]:
+    """Watchlist directory, or None to keep it in memory."""
+    return config.ATTOM_CACHE_DIR or None
+
+
+# Create a singleton watchlist shared by the server
+watchlist = Watchlist(default_directory())
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="ATTOM property watchlist")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    add_parser = subcommands.add_parser("add", help="Watch properties")
+    add_parser.add_argument("attom_ids", nargs="+", help="ATTOM IDs")
+    add_parser.add_argument("--label", default=None, help="Label of the properties")
+    remove_parser = subcommands.add_parser("remove", help="Stop watching properties")
+    remove_parser.add_argument("attom_ids", nargs="+", help="ATTOM IDs")
+    poll_parser = subcommands.add_parser("poll", help="Check due properties for changes")
+    poll_parser.add_argument("--every", type=float, default=0, help="Keep polling every SECONDS")
+    poll_parser.add_argument("--max", type=int, default=None, help="Most properties checked per poll")
+    poll_parser.add_argument("--force", action="store_true", help="Check every property")
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    if args.command == "add":
+        print(json.dumps(watchlist.update(add=args.attom_ids, label=args.label)))
+    elif args.command == "remove":
+        print(json.dumps(watchlist.update(remove=args.attom_ids)))
+    else:
+        if not config.ATTOM_API_KEY:
+            logger.error("ATTOM_API_KEY environment variable is required")
+            sys.exit(1)
+
+        from src.tools.utils import fetch_endpoint
+
+        fetch = partial(fetch_endpoint, refresh=True)
+
+        async def run() -> None:
+            while True:
+                print(json.dumps(await watchlist.poll(fetch, args.max, args.force)), flush=True)
+                if not args.every:
+                    return
+                await asyncio.sleep(args.every)
+
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+"""Shared test fixtures."""
+
+import pytest
+
+from src.tools.utils import response_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """Keep cached upstream responses from leaking between tests."""
+    response_cache.clear()
+    yield
+    response_cache.clear()
@@ -0,0 +1,106 @@
+"""Tests for fuzzy address matching against known properties."""
+
+import pytest
+
+from src.addresses import AddressIndex, address_index, normalize_address
+from src.client import AttomAPIError, client
+from src.models import AttomResponse, PropertyIdentifier
+from src.records import PropertyRecord
+from src.tools.utils import call_endpoint, response_cache
+
+
+def record(attom_id, line1, line2):
+    return PropertyRecord(attom_id=attom_id, address_full=f"{line1}, {line2}", address_line1=line1, address_line2=line2)
+
+
+def test_typos_match_but_numbers_must_agree():
+    """Misspelled names are suggested; house, unit and ZIP numbers pick the property."""
+    index = AddressIndex()
+    index.add(
+        [
+            record("1", "4529 WINONA CT", "DENVER, CO 80212"),
+            record("2", "4531 WINONA CT", "DENVER, CO 80212"),
+            record("3", "12 MAIN ST APT 4", "AUSTIN, TX 78701"),
+            record("4", "12 MAIN ST APT 5", "AUSTIN, TX 78701"),
+            PropertyRecord(attom_id="5"),
+        ]
+    )
+    assert len(index) == 4
+    assert normalize_address("4529 Winona Court, Denver CO 80212-1234, USA") == "4529 WINONA CT DENVER CO 80212"
+    assert index.resolve("4529 winona court denver co 80212").score == 1.0
+    assert index.resolve("Denver CO, 4529 Winona Ct").attom_id == "1"
+    assert index.resolve("12 Main Street #4, Austin TX").attom_id == "3"
+    assert [match.attom_id for match in index.search("4529 Winnona Ct, Denvr, CO")] == ["1"]
+    assert index.resolve("4529 Winnona Ct, Denvr, CO") is None
+
+    # A different house, unit or ZIP number is a different property
+    assert index.search("4528 Winona Ct, Denver, CO") == []
+    assert index.search("12 Main St, Austin TX") == []
+    assert index.search("4529 Winona Ct, Denver, CO 80213") == []
+
+    # Identical addresses under two IDs are ambiguous; re-indexing replaces an address
+    index.add([record("6", "4529 WINONA CT", "DENVER, CO 80212")])
+    assert index.resolve("4529 Winona Ct, Denver, CO") is None
+    assert [match.attom_id for match in index.search("4529 Winona Ct, Denver, CO")] == ["1", "6"]
+    index.add([record("6", "900 ELM AVE", "DENVER, CO 80212")])
+    assert index.resolve("4529 Winona Ct, Denver, CO").attom_id == "1"
+    assert index.remove("1") and index.resolve("4529 Winona Ct, Denver, CO") is None
+
+
+def test_other_streets_and_states_are_suggested_but_never_resolved():
+    """Close scores on a different street name, suffix, directional or state only make suggestions."""
+    index = AddressIndex()
+    index.add([record("7", "123 MAPLE ST", "SPRINGFIELD, IL 62704")])
+    assert index.resolve("123 Maple Street, Springfield, IL 62704").attom_id == "7"
+    for typed in (
+        "123 Main St, Springfield, IL 62704",
+        "123 Maple Ave, Springfield, IL 62704",
+        "123 N Maple St, Springfield, IL 62704",
+        "123 Maple St, Springfield, MO",
+    ):
+        assert index.resolve(typed) is None
+        assert [match.attom_id for match in index.search(typed)] == ["7"]
+
+
+@pytest.mark.asyncio
+async def test_addresses_resolve_to_known_ids_before_going_upstream(monkeypatch):
+    """Typed addresses of fetched properties are sent as ATTOM IDs; misses come back with suggestions."""
+    requests = []
+
+    def send(method, url, **kwargs):
+        params = dict(kwargs["params"])
+        requests.append(params)
+        if params.get("AttomID") == "145423726" or params.get("address1") == "4529 Winona Court":
+            item = {
+                "identifier": {"attomId": 145423726},
+                "address": {"line1": "4529 WINONA CT", "line2": "DENVER, CO 80212", "postal1": "80212"},
+            }
+            return {"property": [item]}, 100, 0, 0
+        raise AttomAPIError(400, "SuccessWithoutResult")
+
+    monkeypatch.setattr(client, "_send", send)
+    address_index.clear()
+    response_cache.clear()
+
+    found = await call_endpoint("property_detail", PropertyIdentifier(address1="4529 Winona Court", address2="Denver, CO"))
+    assert found.status_code == 200
+    spelled_out = PropertyIdentifier(address1="4529 Winona Court", address2="Denver, CO 80212")
+    resolved = await call_endpoint("property_expanded_profile", spelled_out)
+    assert resolved.status_code == 200
+    assert requests[-1] == {"AttomID": "145423726"}
+    assert resolved.data["resolved_from"] == {
+        "address": "4529 Winona Court, Denver, CO 80212",
+        "attom_id": "145423726",
+        "matched_address": "4529 WINONA CT, DENVER, CO 80212",
+        "score": 1.0,
+    }
+
+    missing = await call_endpoint("property_detail", PropertyIdentifier(address="4529 Wynona Pl, Denver, CO"))
+    assert missing.status_code == 500
+    assert missing.data["suggestions"][0]["attom_id"] == "145423726"
+    assert requests[-1] == {"address": "4529 Wynona Pl, Denver, CO"}
+    unknown = await call_endpoint("property_detail", PropertyIdentifier(attom_id="1"))
+    assert unknown.status_code == 500
+    assert unknown.data == AttomResponse(status_code=500).data
+    assert len(requests) == 4
+    address_index.clear()
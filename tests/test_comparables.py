@@ -0,0 +1,131 @@
+"""Tests for the local sales comparables analytics."""
+
+import pytest
+import respx
+from pydantic import ValidationError
+
+from src.comparables import analyze_comparables, extract_comparables, nearby_sales
+from src.records import PropertyRecord, store
+from src.tools import sale_tools
+
+DLP_PAYLOAD = {
+    "RESPONSE_GROUP": {
+        "RESPONSE": {
+            "RESPONSE_DATA": {
+                "PROPERTY_INFORMATION_RESPONSE_ext": {
+                    "SUBJECT_PROPERTY_ext": {
+                        "PROPERTY": [
+                            {
+                                "@_StreetAddress": "222 SIRIUS AVE",
+                                "@_City": "ANAHEIM",
+                                "@_State": "CA",
+                                "@_PostalCode": "92802",
+                                "@LatitudeNumber": "33.8",
+                                "@LongitudeNumber": "-117.9",
+                                "_IDENTIFICATION": {"@RTPropertyID_ext": "100"},
+                                "STRUCTURE": {
+                                    "@GrossLivingAreaSquareFeetCount": "1500",
+                                    "@TotalBedroomCount": "3",
+                                },
+                            },
+                            {
+                                "COMPARABLE_PROPERTY_ext": {
+                                    "@_StreetAddress": "1 A ST",
+                                    "@DistanceFromSubjectPropertyMilesCount": "0.2",
+                                    "_IDENTIFICATION": {"@RTPropertyID_ext": "101"},
+                                    "SALES_HISTORY": {"@PropertySalesAmount": "600000"},
+                                    "STRUCTURE": {
+                                        "@GrossLivingAreaSquareFeetCount": "1500",
+                                        "@TotalBedroomCount": "3",
+                                    },
+                                }
+                            },
+                            {
+                                "COMPARABLE_PROPERTY_ext": {
+                                    "@_StreetAddress": "2 B ST",
+                                    "@DistanceFromSubjectPropertyMilesCount": "0.9",
+                                    "_IDENTIFICATION": {"@RTPropertyID_ext": "102"},
+                                    "SALES_HISTORY": {"@PropertySalesAmount": "800000"},
+                                    "STRUCTURE": {
+                                        "@GrossLivingAreaSquareFeetCount": "2000",
+                                        "@TotalBedroomCount": "4",
+                                    },
+                                }
+                            },
+                        ]
+                    }
+                }
+            }
+        }
+    }
+}
+
+
+def test_extract_comparables_from_dlp_payload():
+    """Subject and comps are parsed from the DLP v2 response shape."""
+    subject, comps, distances = extract_comparables(DLP_PAYLOAD)
+
+    assert subject.attom_id == "100"
+    assert subject.living_sqft == 1500.0
+    assert [comp.attom_id for comp in comps] == ["101", "102"]
+    assert comps[1].sale_amount == 800000.0
+    assert distances == [0.2, 0.9]
+
+
+def test_analyze_comparables():
+    """Statistics, adjustments and ranking are computed per comp."""
+    subject, comps, distances = extract_comparables(DLP_PAYLOAD)
+    summary = analyze_comparables(subject, comps, distances, bed_adjustment=10000)
+
+    assert summary["used_count"] == 2
+    assert summary["price_per_sqft"]["p50"] == 400.0
+    # 2000 sqft comp adjusted down by 500 sqft at $400/sqft and one bedroom
+    assert summary["table"]["rows"][0][0] == "101"
+    assert summary["table"]["rows"][1][7] == 800000 - 500 * 400 - 10000
+    assert summary["estimate"]["median_ppsf_value"] == 600000
+    assert 590000 < summary["estimate"]["weighted_adjusted_value"] < 600000
+
+
+def test_analyze_comparables_without_usable_comps():
+    """Comps without price or size produce an empty summary."""
+    summary = analyze_comparables(PropertyRecord(attom_id="1"), [PropertyRecord(attom_id="2")])
+
+    assert summary["used_count"] == 0
+    assert summary["table"]["rows"] == []
+
+
+def test_nearby_sales():
+    """Only sold properties within the radius are selected."""
+    subject = PropertyRecord(attom_id="1", latitude=40.0, longitude=-75.0)
+    records = [
+        subject,
+        PropertyRecord(attom_id="2", latitude=40.001, longitude=-75.0, sale_amount=1.0),
+        PropertyRecord(attom_id="3", latitude=41.0, longitude=-75.0, sale_amount=1.0),
+        PropertyRecord(attom_id="4", latitude=40.001, longitude=-75.0),
+    ]
+    comps, distances = nearby_sales(subject, records, 1.0)
+
+    assert [comp.attom_id for comp in comps] == ["2"]
+    assert distances[0] < 0.1
+
+
+@pytest.mark.asyncio
+async def test_sales_comparables_analysis_with_payload():
+    """The tool analyzes a supplied payload without calling ATTOM."""
+    store.clear()
+    with respx.mock(assert_all_called=False) as respx_mock:
+        result = await sale_tools.sales_comparables_analysis(
+            sale_tools.ComparablesParams(comps=DLP_PAYLOAD)
+        )
+
+    assert not respx_mock.calls
+    assert result.status_code == 200
+    assert result.data["source"] == "payload"
+    assert result.data["subject"]["attom_id"] == "100"
+
+
+@pytest.mark.parametrize("max_rows", [0, -1, 101])
+def test_comparables_max_rows_bounded(max_rows):
+    """Summary table sizes outside 1-100 are rejected."""
+    with pytest.raises(ValidationError):
+        sale_tools.ComparablesParams(comps=DLP_PAYLOAD, max_rows=max_rows)
@@ -0,0 +1,91 @@
+"""Tests for the declarative endpoint registry and the shared request path."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+import respx
+
+from src.client import client
+from src.endpoints import COLLECTION_PATH, REGISTRY_PATH, generate_registry, get_endpoint, template_path
+from src.models import PropertyIdentifier
+from src.tools import misc_tools, sale_tools
+from src.tools.utils import fetch_endpoint, response_cache
+
+
+def test_registry_matches_collection():
+    """The committed registry is regenerated from the Postman collection."""
+    with open(COLLECTION_PATH, encoding="utf-8") as f:
+        expected = generate_registry(json.load(f))
+    with open(REGISTRY_PATH, encoding="utf-8") as f:
+        assert json.load(f) == expected, "Endpoint registry is stale; run python -m src.endpoints"
+
+
+def test_build_params_and_templates():
+    """Parameters follow identifier precedence, aliases and template paths."""
+    params = PropertyIdentifier(attom_id="1", address="1 Main St, Town, ST", fips="01001", apn="9")
+    assert get_endpoint("property_detail").build_params(params) == {"AttomID": "1"}
+
+    by_address = PropertyIdentifier(address="1 Main St, Town, ST")
+    assert get_endpoint("preforeclosure_details").build_params(by_address) == {
+        "combinedAddress": "1 Main St, Town, ST"
+    }
+    assert get_endpoint("property_detail").build_params(PropertyIdentifier(fips="01001")) == {}
+
+    comparables = get_endpoint("sales_comparables")
+    assert template_path(comparables, PropertyIdentifier(attom_id="42")) == "salescomparables/propid/42"
+    assert (
+        template_path(comparables, PropertyIdentifier(address1="1 Main St", address2="Town, ST 12345"))
+        == "salescomparables/address/1 Main St/Town/-/ST/12345"
+    )
+    assert template_path(comparables, PropertyIdentifier(fips="01001", apn="9")) is None
+
+
+@pytest.mark.asyncio
+async def test_tools_use_registry_prefixes():
+    """Tools reach each endpoint under its collection prefix."""
+    with respx.mock(base_url="https://api.gateway.attomdata.com") as mock:
+        enumerations = mock.get("/propertyapi/v1.0.0/enumerations/Detail").mock(
+            return_value=httpx.Response(200, json={"status": {"code": 0}})
+        )
+        noise = mock.get("/transportationnoise").mock(return_value=httpx.Response(200, json={"noise": 1}))
+        comps = mock.get("/property/v2/salescomparables/propid/42").mock(
+            return_value=httpx.Response(200, json={"RESPONSE_GROUP": {}})
+        )
+
+        await misc_tools.enumerations_detail(misc_tools.EnumerationsParams(fieldnames="propertyType"))
+        result = await misc_tools.transportation_noise(PropertyIdentifier(attom_id="42"))
+        await sale_tools.sales_comparables(PropertyIdentifier(attom_id="42"))
+        invalid = await misc_tools.transportation_noise(PropertyIdentifier())
+
+    assert enumerations.calls[0].request.url.params["fieldnames"] == "propertyType"
+    assert noise.calls[0].request.url.params["AttomID"] == "42"
+    assert result.data == {"noise": 1}
+    assert comps.called
+    assert invalid.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_fetch_endpoint_caches_and_coalesces(monkeypatch):
+    """Identical requests share one upstream call and later ones hit the cache."""
+    calls = []
+
+    async def get(endpoint, params=None, api_prefix=None, label=None):
+        calls.append((api_prefix, endpoint, dict(params)))
+        await asyncio.sleep(0.01)
+        return {"property": []}
+
+    monkeypatch.setattr(client, "get", get)
+    results = await asyncio.gather(*(fetch_endpoint("property_detail", {"AttomID": "7"}) for _ in range(3)))
+    again = await fetch_endpoint("property_detail", {"AttomID": "7"})
+    await fetch_endpoint("property_detail", {"AttomID": "8"})
+    await fetch_endpoint("state_lookup", {"geoIdV4": "s"})
+
+    assert calls == [
+        ("/propertyapi/v1.0.0", "property/detail", {"AttomID": "7"}),
+        ("/propertyapi/v1.0.0", "property/detail", {"AttomID": "8"}),
+        ("", "areaapi/area/state/lookup", {"geoIdV4": "s"}),
+    ]
+    assert all(result == {"property": []} for result in results + [again])
+    assert response_cache.hits == 1
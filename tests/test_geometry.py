@@ -0,0 +1,118 @@
+"""Tests for boundary geometry simplification and reduction."""
+
+import json
+import math
+
+import httpx
+import pytest
+import respx
+
+from src.client import client
+from src.geo import geometry_bbox, geometry_centroid, shape_geometry, simplify_ring, zoom_tolerance
+from src.spatial import spatial_index
+from src.tools import area_tools
+from src.tools.utils import response_cache
+
+
+def circle(cx, cy, radius, count=1000):
+    """Closed ring approximating a circle."""
+    ring = [
+        [cx + radius * math.cos(2 * math.pi * i / count), cy + radius * math.sin(2 * math.pi * i / count)]
+        for i in range(count)
+    ]
+    return ring + [ring[0]]
+
+
+def test_simplify_ring():
+    """Simplification bounds the deviation and never collapses a ring."""
+    ring = circle(0.0, 0.0, 1.0)
+    simplified = simplify_ring(ring, 0.01)
+
+    assert 10 < len(simplified) < 100
+    assert simplified[0] == simplified[-1]
+    # Every kept vertex is an original vertex on the circle
+    assert all(abs(math.hypot(x, y) - 1.0) < 1e-9 for x, y in simplified)
+
+    tiny = simplify_ring(circle(0.0, 0.0, 0.001, 50), 1.0)
+    assert len(tiny) == 4 and tiny[0] == tiny[-1]
+
+    rounded = simplify_ring(ring, 0.01, precision=2)
+    assert all(round(x, 2) == x and round(y, 2) == y for x, y in rounded)
+
+
+def test_bbox_and_centroid():
+    """Bounding boxes and area-weighted centroids account for holes and parts."""
+    square = [[0, 0], [4, 0], [4, 4], [0, 4], [0, 0]]
+    hole = [[2, 0], [4, 0], [4, 4], [2, 4], [2, 0]]
+    polygon = {"type": "Polygon", "coordinates": [square, hole]}
+
+    assert geometry_bbox(polygon) == (0.0, 0.0, 4.0, 4.0)
+    assert geometry_centroid(polygon) == pytest.approx((1.0, 2.0))
+
+    multi = {"type": "MultiPolygon", "coordinates": [[square], [[[10, 0], [14, 0], [14, 4], [10, 4], [10, 0]]]]}
+    assert geometry_centroid(multi) == pytest.approx((7.0, 2.0))
+    assert shape_geometry(multi, "centroid") == {"type": "Point", "coordinates": [7.0, 2.0]}
+    assert shape_geometry(multi, "bbox")["bbox"] == [0.0, 0.0, 14.0, 4.0]
+    assert zoom_tolerance(0) == 360.0 / 256
+
+
+@pytest.mark.asyncio
+async def test_boundary_detail_simplified_and_cached():
+    """Reduced boundaries are computed once per area and options."""
+    area_tools.geometry_cache.clear()
+    geometry = {"type": "Polygon", "coordinates": [circle(-75.0, 40.0, 0.5)]}
+    payload = {"response": {"result": {"package": {"item": [{"boundary": json.dumps(geometry)}]}}}}
+
+    with respx.mock(base_url="https://api.gateway.attomdata.com") as mock:
+        route = mock.get("/areaapi/area/boundary/detail").mock(
+            return_value=httpx.Response(200, json=payload)
+        )
+        params = area_tools.AreaParams(geoid_v4="county-2", zoom=8, precision=4)
+        first = await area_tools.boundary_detail(params)
+        second = await area_tools.boundary_detail(params)
+        centroid = await area_tools.boundary_detail(
+            area_tools.AreaParams(geoid_v4="county-2", geometry_output="centroid", precision=3)
+        )
+        invalid = await area_tools.boundary_detail(
+            area_tools.AreaParams(geoid_v4="county-2", geometry_output="hull")
+        )
+
+    # The geometry cache serves the repeat; the response cache serves the centroid
+    assert route.call_count == 1
+    assert first.data == second.data
+    simplified = json.loads(first.data["response"]["result"]["package"]["item"][0]["boundary"])
+    assert 4 <= len(simplified["coordinates"][0]) < 200
+    point = json.loads(centroid.data["response"]["result"]["package"]["item"][0]["boundary"])
+    assert point == {"type": "Point", "coordinates": [-75.0, 40.0]}
+    assert invalid.status_code == 400
+    area_tools.geometry_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_truncated_boundaries_are_neither_indexed_nor_cached(monkeypatch):
+    """A boundary cut at the byte limit is returned but kept out of the spatial index and geometry cache."""
+    area_tools.geometry_cache.clear()
+    spatial_index.clear()
+    response_cache.clear()
+    feature = {
+        "type": "Feature",
+        "properties": {"geoIdV4": "county-3", "name": "Cut County", "geographyTypeAbbreviation": "CO"},
+        "geometry": {"type": "Polygon", "coordinates": [circle(-75.0, 40.0, 0.5, count=20)]},
+    }
+    payload = {"type": "FeatureCollection", "features": [feature], "truncated": {"limit_bytes": 10, "cut_at": ""}}
+    sent = []
+
+    def send(method, url, **kwargs):
+        sent.append(kwargs["params"])
+        return payload, 10, 0, 0
+
+    monkeypatch.setattr(client, "_send", send)
+    params = area_tools.AreaParams(geoid_v4="county-3", format="geojson", zoom=8)
+    for _ in range(2):
+        response = await area_tools.boundary_detail(params)
+        assert response.status_code == 200
+        assert "truncated" in response.data
+
+    assert len(sent) == 2
+    assert len(spatial_index) == 0
+    assert len(area_tools.geometry_cache) == 0
@@ -0,0 +1,47 @@
+"""Tests for the streamable HTTP transport."""
+
+import json
+
+from starlette.testclient import TestClient
+
+from src import config, server
+
+INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2025-03-26",
+        "capabilities": {},
+        "clientInfo": {"name": "test-client", "version": "1.0"},
+    },
+}
+HEADERS = {"Accept": "application/json, text/event-stream"}
+
+
+def _message(response):
+    """Decode the JSON-RPC message from a JSON or event-stream response."""
+    if response.headers["content-type"].startswith("text/event-stream"):
+        data = [line[5:] for line in response.text.splitlines() if line.startswith("data:")]
+        return json.loads(data[0])
+    return response.json()
+
+
+def test_http_app_serves_health_and_mcp(monkeypatch):
+    """The app factory serves the health probe and MCP requests statelessly with several workers."""
+    monkeypatch.setattr(config, "MCP_WORKERS", 2)
+    with TestClient(server.create_app()) as http:
+        assert http.get("/health").json()["status"] == "ok"
+
+        initialized = _message(http.post(config.MCP_HTTP_PATH, json=INITIALIZE, headers=HEADERS))
+        assert initialized["result"]["serverInfo"]["name"] == "mcp-server-attom"
+
+        # No session id is needed, so any worker can answer the next request
+        listed = _message(
+            http.post(
+                config.MCP_HTTP_PATH,
+                json={"jsonrpc": "2.0", "id": 2, "method": "tools/list", "params": {}},
+                headers=HEADERS,
+            )
+        )
+        assert any(tool["name"] == "property_detail" for tool in listed["result"]["tools"])
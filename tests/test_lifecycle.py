@@ -0,0 +1,100 @@
+"""Tests for draining in-flight calls and orderly shutdown."""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from fastmcp.exceptions import ToolError
+
+from src.lifecycle import Lifecycle
+
+REPO_ROOT = Path(__file__).parent.parent
+
+SLOW_STDIO = """
+import asyncio
+from functools import partial
+import src.server
+from src import runtime
+from src.client import client
+from src.lifecycle import lifecycle, run_stdio
+from src.mcp_server import mcp
+
+async def slow_get(endpoint, params=None, api_prefix=None, label=None):
+    await asyncio.sleep(0.5)
+    return {"property": [{"identifier": {"attomId": 1}}]}
+
+client.get = slow_get
+lifecycle.on_shutdown(lambda: print("hook ran", file=__import__("sys").stderr))
+runtime.run(partial(run_stdio, mcp, timeout=5, show_banner=False), "asyncio")
+"""
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_calls_then_runs_hooks():
+    """Draining rejects new calls, waits for calls in flight and runs hooks last-first."""
+    lifecycle = Lifecycle()
+    order = []
+
+    async def async_hook():
+        order.append("async")
+
+    def failing_hook():
+        raise RuntimeError("boom")
+
+    lifecycle.on_shutdown(lambda: order.append("first"))
+    lifecycle.on_shutdown(failing_hook)
+    lifecycle.on_shutdown(async_hook)
+
+    async def call():
+        with lifecycle.track():
+            await asyncio.sleep(0.2)
+            order.append("call")
+
+    task = asyncio.create_task(call())
+    await asyncio.sleep(0.01)
+    await lifecycle.shutdown(timeout=2)
+    await task
+
+    assert order == ["call", "async", "first"]
+    with pytest.raises(ToolError):
+        with lifecycle.track():
+            pass
+    lifecycle.reset()
+    with lifecycle.track():
+        assert lifecycle.in_flight == 1
+
+
+def test_stdio_answers_calls_in_flight_when_stdin_closes():
+    """Closing stdin right after a call still delivers its response."""
+    messages = [
+        {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "initialize",
+            "params": {"protocolVersion": "2025-03-26", "capabilities": {}, "clientInfo": {"name": "t", "version": "1"}},
+        },
+        {"jsonrpc": "2.0", "method": "notifications/initialized"},
+        {
+            "jsonrpc": "2.0",
+            "id": 2,
+            "method": "tools/call",
+            "params": {"name": "property_detail", "arguments": {"params": {"attom_id": "1"}}},
+        },
+    ]
+    result = subprocess.run(
+        [sys.executable, "-c", SLOW_STDIO],
+        input="".join(json.dumps(message) + "\n" for message in messages),
+        capture_output=True,
+        text=True,
+        cwd=REPO_ROOT,
+        env={**os.environ, "ATTOM_API_KEY": "test", "LOG_LEVEL": "WARNING"},
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    responses = {message.get("id"): message for message in map(json.loads, result.stdout.splitlines())}
+    assert responses[2]["result"]["structuredContent"]["status_code"] == 200
+    assert "hook ran" in result.stderr
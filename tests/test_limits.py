@@ -0,0 +1,88 @@
+"""Tests for per-session and global concurrency limits."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.limits import DEFAULT_SESSION, ConcurrencyLimiter, ServerBusyError, fingerprint, session_key
+
+
+async def hold(limiter, session_id, release, order, name):
+    async with limiter.slot(session_id):
+        order.append(name)
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_session_limit_queues_then_rejects_when_full():
+    """A session over its cap queues in order and is rejected once its queue is full."""
+    limiter = ConcurrencyLimiter(max_calls=10, max_queued=10, max_session_calls=1, max_session_queued=1)
+    release = asyncio.Event()
+    order = []
+
+    first = asyncio.create_task(hold(limiter, "a", release, order, "first"))
+    second = asyncio.create_task(hold(limiter, "a", release, order, "second"))
+    other = asyncio.create_task(hold(limiter, "b", release, order, "other"))
+    await asyncio.sleep(0.01)
+
+    # Session b is not held up by session a's queue
+    assert order == ["first", "other"]
+    assert limiter.sessions["a"].queue_depth == 1
+    # Health stats never show the session ids themselves
+    assert set(limiter.stats()["sessions"]) == {fingerprint("a"), fingerprint("b")}
+    with pytest.raises(ServerBusyError):
+        async with limiter.slot("a"):
+            pass
+
+    release.set()
+    await asyncio.gather(first, second, other)
+    assert order == ["first", "other", "second"]
+    assert limiter.sessions == {}
+    stats = limiter.stats()
+    assert stats["in_flight"] == 0
+    assert stats["session_rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_global_limit_hands_slots_over_and_survives_cancellation():
+    """Cancelled waiters give up their place, and freed slots go to the next caller."""
+    limiter = ConcurrencyLimiter(max_calls=1, max_queued=2, max_session_calls=0, max_session_queued=0)
+    release = asyncio.Event()
+    order = []
+
+    first = asyncio.create_task(hold(limiter, "a", release, order, "first"))
+    cancelled = asyncio.create_task(hold(limiter, "b", release, order, "cancelled"))
+    last = asyncio.create_task(hold(limiter, "c", release, order, "last"))
+    await asyncio.sleep(0.01)
+    assert limiter.total.queue_depth == 2
+
+    cancelled.cancel()
+    await asyncio.sleep(0.01)
+    release.set()
+    await asyncio.gather(first, last)
+
+    assert order == ["first", "last"]
+    assert limiter.total.in_flight == 0
+    assert limiter.total.queue_depth == 0
+    assert limiter.stats()["queued"] == 2
+
+
+def test_sessionless_http_calls_are_keyed_by_client():
+    """Without an MCP session, clients are told apart by credential, client header or address."""
+
+    def context(headers=None, host="10.0.0.1", http=True):
+        request = SimpleNamespace(headers=headers or {}, client=SimpleNamespace(host=host)) if http else None
+        request_context = SimpleNamespace(session=SimpleNamespace(), request=request)
+        return SimpleNamespace(fastmcp_context=SimpleNamespace(request_context=request_context))
+
+    assert session_key(context({"mcp-session-id": "abc"})) == "abc"
+    first = session_key(context({"authorization": "Bearer one"}))
+    assert first.startswith("auth:") and "one" not in first
+    assert first != session_key(context({"authorization": "Bearer two"}))
+    assert session_key(context({"x-client-id": "agent-7"})) == "client:agent-7"
+    assert session_key(context()) == "peer:10.0.0.1"
+    assert session_key(context(host="10.0.0.2")) != session_key(context())
+    assert session_key(context(http=False)) == DEFAULT_SESSION
+    assert session_key(SimpleNamespace(fastmcp_context=None)) == DEFAULT_SESSION
+
@@ -0,0 +1,78 @@
+"""Tests for logging configuration, sampling and the queued sink."""
+
+import io
+import json
+
+import pytest
+import structlog
+
+from src.logs import EventSampler, QueueSink, configure_logging, parse_sample_rates
+from src.models import PropertyIdentifier
+
+
+@pytest.fixture
+def restore_logging():
+    """Put back the default structlog configuration after a test."""
+    yield
+    configure_logging(queue_size=0)
+    structlog.reset_defaults()
+
+
+def test_sampler_keeps_every_nth_info_event_and_all_warnings():
+    """Debug and info events are thinned per event name; warnings always pass."""
+    sampler = EventSampler(1.0, parse_sample_rates("Fetching property_detail=0.25, noisy=0"))
+
+    kept = []
+    for _ in range(8):
+        try:
+            kept.append(sampler(None, "info", {"event": "Fetching property_detail"}))
+        except structlog.DropEvent:
+            pass
+    assert len(kept) == 2
+    assert kept[0]["sampled"] == 4
+
+    with pytest.raises(structlog.DropEvent):
+        sampler(None, "debug", {"event": "noisy"})
+    assert sampler(None, "warning", {"event": "noisy"}) == {"event": "noisy"}
+    assert sampler(None, "info", {"event": "other"}) == {"event": "other"}
+
+    with pytest.raises(ValueError):
+        parse_sample_rates("noisy=2")
+
+
+def test_json_lines_are_queued_and_models_dumped_lazily(monkeypatch, restore_logging):
+    """Bound models are only dumped for emitted events, and queued lines are all written."""
+    stream = io.StringIO()
+    configure_logging(level="INFO", fmt="json", sample_rate=1.0, sample_rates="", queue_size=100, stream=stream)
+    dumps = []
+    original = PropertyIdentifier.model_dump
+
+    def counting_dump(self, **kwargs):
+        dumps.append(kwargs)
+        return original(self, **kwargs)
+
+    monkeypatch.setattr(PropertyIdentifier, "model_dump", counting_dump)
+    log = structlog.get_logger("test").bind(tool="property_detail", params=PropertyIdentifier(attom_id="1"))
+    log.debug("Not emitted")
+    assert dumps == []
+    for index in range(5):
+        log.info("Fetching property_detail", index=index)
+
+    from src import logs
+
+    logs.sink.close()
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["index"] for line in lines] == list(range(5))
+    assert lines[0]["params"] == {"attom_id": "1"}
+    assert lines[0]["level"] == "info"
+    assert len(dumps) == 5
+
+
+def test_queue_sink_drops_lines_instead_of_blocking():
+    """A full queue drops lines and reports how many were lost."""
+    stream = io.StringIO()
+    sink = QueueSink(stream, max_size=1)
+    sink._thread = object()  # Pretend the writer is running but stalled
+    sink.write("first")
+    sink.write("second")
+    assert sink.dropped == 1
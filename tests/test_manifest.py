@@ -0,0 +1,111 @@
+"""Tests for lazy tool registration from the tool manifest."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from fastmcp import FastMCP
+
+from src.manifest import _registered_tools, build_manifest, load_manifest, register_tools
+from src.mcp_server import mcp
+
+REPO_ROOT = Path(__file__).parent.parent
+
+LAZY_CALL = """
+import asyncio, sys
+from fastmcp import Client
+import src.server
+from src.mcp_server import mcp
+
+assert not [m for m in sys.modules if m.startswith("src.tools") or m in ("httpx", "numpy")]
+
+async def main():
+    async with Client(mcp) as client:
+        before = len(await client.list_tools())
+        result = await client.call_tool("boundary_detail", {"params": {}})
+        after = len(await client.list_tools())
+    print(before, after, result.structured_content["status_code"], "src.tools.area_tools" in sys.modules)
+
+asyncio.run(main())
+"""
+
+
+PROFILE_LIST = """
+import asyncio
+from fastmcp import Client
+import src.server
+from src.manifest import select_profile
+from src.mcp_server import mcp
+
+async def main():
+    async with Client(mcp) as client:
+        area = await client.list_tools()
+        await client.call_tool("school_profile", {"params": {}})
+        loaded = await client.list_tools()
+        select_profile(mcp, "property")
+        prop = await client.list_tools()
+    print(len(area), len(prop), "property_detail" in {t.name for t in prop} - {t.name for t in area})
+    print(any("$defs" in t.inputSchema for t in loaded), loaded == area)
+
+asyncio.run(main())
+"""
+
+
+def test_manifest_matches_tool_modules():
+    """The committed manifest describes the current tool modules (rebuild with python -m src.manifest)."""
+    built = json.loads(json.dumps(build_manifest(mcp)))
+    assert load_manifest() == built
+
+
+@pytest.mark.asyncio
+async def test_registered_tools_match_listed_tools():
+    """The pinned fastmcp's component table holds exactly the tools it lists."""
+    server = FastMCP("manifest-test")
+    register_tools(server, lazy=True)
+
+    @server.tool
+    def ping() -> str:
+        return "pong"
+
+    listed = await server.local_provider.list_tools()
+    assert sorted(tool.name for tool in _registered_tools(server)) == sorted(tool.name for tool in listed)
+    assert "ping" in {tool.name for tool in listed}
+
+
+def test_tools_load_on_first_call():
+    """Start-up imports no tool modules; the first call loads the real tool."""
+    result = subprocess.run(
+        [sys.executable, "-c", LAZY_CALL],
+        capture_output=True,
+        text=True,
+        cwd=REPO_ROOT,
+        env={**os.environ, "ATTOM_API_KEY": "test", "ATTOM_LAZY_TOOLS": "true"},
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    before, after, status, loaded = result.stdout.split()[-4:]
+    assert before == after
+    assert status == "400"
+    assert loaded == "True"
+
+
+def test_profiles_limit_listed_tools():
+    """Profiles select tool subsets and listed schemas stay inlined after loading."""
+    result = subprocess.run(
+        [sys.executable, "-c", PROFILE_LIST],
+        capture_output=True,
+        text=True,
+        cwd=REPO_ROOT,
+        env={**os.environ, "ATTOM_API_KEY": "test", "ATTOM_TOOL_PROFILE": "area"},
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    area, prop, switched, refs, unchanged = result.stdout.split()[-5:]
+    assert int(area) == 14
+    assert int(prop) == 40
+    assert switched == "True"
+    assert refs == "False"
+    assert unchanged == "True"
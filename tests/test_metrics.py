@@ -0,0 +1,92 @@
+"""Tests for the metrics registry, instrumentation and exposition."""
+
+from starlette.testclient import TestClient
+
+from src import config, server
+from src.client import client
+from src.metrics import MetricsFileWriter, Registry
+
+HEADERS = {"Accept": "application/json, text/event-stream"}
+
+
+def _samples(text):
+    """Parse exposition text into a dict of sample line keys to values."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            key, _, value = line.rpartition(" ")
+            samples[key] = float(value)
+    return samples
+
+
+def test_registry_renders_prometheus_text(tmp_path):
+    """Counters, callback gauges and cumulative histogram buckets render in the text format."""
+    registry = Registry()
+    calls = registry.counter("calls_total", "Calls", ("tool",))
+    latency = registry.histogram("latency_seconds", "Latency", ("tool",), buckets=(0.1, 1.0))
+    registry.gauge("queued", "Queued calls", lambda: 3)
+
+    calls.inc(tool='say "hi"')
+    calls.inc(2, tool='say "hi"')
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value, tool="a")
+
+    text = registry.render()
+    assert 'calls_total{tool="say \\"hi\\""} 3' in text
+    assert 'latency_seconds_bucket{tool="a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{tool="a",le="1"} 2' in text
+    assert 'latency_seconds_bucket{tool="a",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{tool="a"} 3' in text
+    assert "# TYPE queued gauge\nqueued 3" in text
+
+    path = tmp_path / "attom.prom"
+    writer = MetricsFileWriter(str(path), interval=0, metrics=registry)
+    writer.stop()
+    assert path.read_text() == text
+
+
+def test_tool_calls_and_upstream_requests_are_scraped(monkeypatch):
+    """A tool call over HTTP shows up in the tool, upstream and cache metrics at /metrics."""
+    monkeypatch.setattr(config, "MCP_WORKERS", 2)
+    monkeypatch.setattr(config, "ATTOM_METRICS_ROUTE", True)
+    monkeypatch.setattr(
+        client, "_send", lambda method, url, **kwargs: ({"property": [{"identifier": {"attomId": 7}}]}, 2048, 0, 1000)
+    )
+    call = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "tools/call",
+        "params": {"name": "property_detail", "arguments": {"params": {"attom_id": "7"}}},
+    }
+    with TestClient(server.create_app()) as http:
+        before = _samples(http.get("/metrics").text)
+        for _ in range(2):
+            assert http.post(config.MCP_HTTP_PATH, json=call, headers=HEADERS).status_code == 200
+        after = _samples(http.get("/metrics").text)
+
+    def delta(key):
+        return after.get(key, 0) - before.get(key, 0)
+
+    assert delta('attom_tool_calls_total{tool="property_detail",outcome="200"}') == 2
+    assert delta('attom_upstream_requests_total{endpoint="property_detail",status="200"}') == 1
+    assert delta('attom_upstream_response_bytes_bucket{endpoint="property_detail",le="4096"}') == 1
+    assert delta('attom_cache_hits_total{cache="response"}') == 1
+    assert delta("attom_queue_wait_seconds_count") == 2
+
+
+def test_diagnostic_routes_are_gated(monkeypatch):
+    """/metrics and /usage are off by default and require ATTOM_ROUTE_TOKEN once set."""
+    with TestClient(server.create_app()) as http:
+        assert http.get("/metrics").status_code == 404
+        assert http.get("/usage").status_code == 404
+
+        monkeypatch.setattr(config, "ATTOM_METRICS_ROUTE", True)
+        monkeypatch.setattr(config, "ATTOM_USAGE_ROUTE", True)
+        assert http.get("/metrics").status_code == 200
+        assert http.get("/usage").status_code == 200
+
+        monkeypatch.setattr(config, "ATTOM_ROUTE_TOKEN", "secret")
+        assert http.get("/metrics").status_code == 401
+        assert http.get("/usage", headers={"Authorization": "Bearer wrong"}).status_code == 401
+        assert http.get("/metrics", headers={"Authorization": "Bearer secret"}).status_code == 200
+        assert http.get("/usage", headers={"Authorization": "Bearer secret"}).status_code == 200
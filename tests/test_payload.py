@@ -0,0 +1,91 @@
+"""Tests for bounded-memory response reading and result conversion."""
+
+import json
+
+import pytest
+import respx
+from httpx import Response
+
+from src.client import AttomClient, client
+from src.manifest import response_result
+from src.models import AttomResponse
+from src.payload import decode_prefix, read_body
+from src.records import store
+from src.tools.utils import fetch_endpoint, response_cache
+
+
+def test_truncated_bodies_keep_complete_items():
+    """Cut-off bodies keep whole list items and nested containers, and record where they were cut."""
+    body = json.dumps(
+        {"status": {"code": 0}, "property": [{"id": i, "name": "x" * 20} for i in range(50)]}
+    ).encode()
+    chunks = [body[i : i + 64] for i in range(0, len(body), 64)]
+    prefix, complete = read_body(iter(chunks), 1000)
+    assert not complete and len(prefix) == 1000
+    assert read_body(iter(chunks))[0] == body
+
+    payload = decode_prefix(prefix, 1000)
+    kept = payload["property"]
+    assert payload["status"] == {"code": 0}
+    assert kept == [{"id": i, "name": "x" * 20} for i in range(len(kept))]
+    assert payload["truncated"] == {"limit_bytes": 1000, "cut_at": f"property[{len(kept)}]"}
+
+    # A single huge item is salvaged down to its complete parts
+    nested = json.dumps({"response": {"item": [{"name": "county", "shape": [[1.5, 2.5]] * 500}]}}).encode()
+    payload = decode_prefix(nested[:300], 300)
+    item = payload["response"]["item"][0]
+    assert item["name"] == "county" and all(point == [1.5, 2.5] for point in item["shape"])
+    assert payload["truncated"]["cut_at"] == f"response.item[0].shape[{len(item['shape'])}]"
+    with pytest.raises(ValueError):
+        decode_prefix(b'"abc', 4)
+
+    # Numbers running to the cut, or cut before a point or exponent, are dropped
+    assert decode_prefix(b'{"p": [1.5, 2.5, 3.', 20)["p"] == [1.5, 2.5]
+    assert decode_prefix(b'{"p": [1.5, 2.5, 3', 19)["p"] == [1.5, 2.5]
+    assert decode_prefix(b'{"p": [1e', 9)["p"] == []
+    cut = decode_prefix(b'{"a": {"price": 123456', 22)
+    assert cut["a"] == {} and cut["truncated"]["cut_at"] == "a.price"
+    assert decode_prefix(b'{"a": {"price": 123456, "beds": 3', 33)["a"] == {"price": 123456}
+    assert decode_prefix(b'{"a": [true, null, -2', 21)["a"] == [True, None]
+
+
+@pytest.mark.asyncio
+async def test_client_truncates_large_responses_and_results_share_data():
+    """The client stops reading at the limit; tool results reuse the decoded data."""
+    body = {"status": {"code": 0}, "property": [{"identifier": {"attomId": i}} for i in range(2000)]}
+    small = AttomClient(api_key="k", host_url="https://attom.test", max_response_bytes=4096)
+    with respx.mock(base_url="https://attom.test") as mock:
+        mock.get("/propertyapi/v1.0.0/property/detail").mock(return_value=Response(200, json=body))
+        payload = await small.get("property/detail", {"AttomID": "1"})
+        assert 0 < len(payload["property"]) < 2000
+        assert payload["truncated"]["cut_at"] == f"property[{len(payload['property'])}]"
+
+        unlimited = AttomClient(api_key="k", host_url="https://attom.test", max_response_bytes=0)
+        assert await unlimited.get("property/detail", {"AttomID": "1"}) == body
+    small.close()
+    unlimited.close()
+
+    response = AttomResponse(status_code=200, status_message="Success", data=body)
+    result = response_result(response)
+    assert result.structured_content["data"]["property"] is body["property"]
+    assert json.loads(result.content[0].text) == response.model_dump()
+    assert response_result(AttomResponse(status_code=200, data={"value": float("nan")})) is None
+
+
+@pytest.mark.asyncio
+async def test_truncated_responses_are_neither_cached_nor_indexed(monkeypatch):
+    """A cut-off payload is returned as is, and the next call fetches it again."""
+    sent = []
+
+    def send(method, url, **kwargs):
+        sent.append(kwargs["params"])
+        payload = {"property": [{"identifier": {"attomId": 918273}}], "truncated": {"limit_bytes": 10, "cut_at": ""}}
+        return payload, 10, 0, 0
+
+    monkeypatch.setattr(client, "_send", send)
+    response_cache.clear()
+    for _ in range(2):
+        payload = await fetch_endpoint("property_detail", {"AttomID": "918273"})
+        assert "truncated" in payload
+    assert len(sent) == 2
+    assert store.get("918273") is None
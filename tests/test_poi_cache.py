@@ -0,0 +1,106 @@
+"""Tests for the geohash-keyed POI superset cache."""
+
+import httpx
+import pytest
+import respx
+
+from src.client import client
+from src.geo import geohash_encode, geohash_neighbors
+from src.poi_cache import POICache, parse_point, poi_cache
+from src.tools import poi_tools
+from src.tools.utils import response_cache
+
+CATEGORY = ("restaurant", "", "", "")
+
+
+def _payload(points, total=None):
+    """Build a POI response with one item per (latitude, longitude) point."""
+    items = [
+        {"name": f"POI {i}", "latitude": str(lat), "longitude": str(lon)}
+        for i, (lat, lon) in enumerate(points)
+    ]
+    return {"status": {"code": 0, "total": len(items) if total is None else total}, "poi": items}
+
+
+def test_geohash():
+    """Geohash encoding matches the reference value and neighbors surround the cell."""
+    assert geohash_encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    neighbors = geohash_neighbors("u4pru")
+    assert len(neighbors) == 9
+    assert neighbors[4] == "u4pru"
+    assert parse_point("POINT(-75.1, 40.2)") == (40.2, -75.1)
+
+
+def test_cache_filters_covered_queries():
+    """Queries inside a cached circle are answered by distance filtering."""
+    cache = POICache(max_entries=10, ttl=60, precision=5)
+    # Points roughly 0.07, 0.35 and 0.69 miles north of the center
+    points = [(40.005, -75.0), (40.001, -75.0), (40.01, -75.0)]
+    assert cache.put(40.0, -75.0, 1.0, CATEGORY, _payload(points))
+
+    result = cache.get(40.0, -75.0, 0.5, CATEGORY)
+    assert [item["name"] for item in result["poi"]] == ["POI 1", "POI 0"]
+    assert result["status"]["total"] == 2
+
+    assert len(cache.get(40.0, -75.0, 1.0, CATEGORY, limit=1)["poi"]) == 1
+    assert cache.get(40.0, -75.0, 1.5, CATEGORY) is None
+    assert cache.get(40.0, -75.0, 0.5, ("bank", "", "", "")) is None
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_cache_rejects_truncated_results():
+    """Paged or coordinate-less result sets are not cached."""
+    cache = POICache(max_entries=10, ttl=60, precision=5)
+    assert not cache.put(40.0, -75.0, 1.0, CATEGORY, _payload([(40.0, -75.0)], total=5))
+    assert not cache.put(40.0, -75.0, 1.0, CATEGORY, {"poi": [{"name": "x"}]})
+    assert not cache.put(40.0, -75.0, 1.0, CATEGORY, {"poi": [{"lat": 40.0, "lon": -75.0}]}, page_size=1)
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_poi_search_served_from_cache():
+    """A nearby query inside the fetched superset does not call ATTOM again."""
+    poi_cache.clear()
+    payload = _payload([(40.001, -75.0), (40.01, -75.0)])
+    with respx.mock(base_url="https://api.gateway.attomdata.com") as respx_mock:
+        route = respx_mock.get("/v4/neighborhood/poi").mock(
+            return_value=httpx.Response(200, json=payload)
+        )
+        first = await poi_tools.poi_search(
+            poi_tools.POIParams(latitude=40.0, longitude=-75.0, radius=0.25, category_name="Restaurant")
+        )
+        second = await poi_tools.poi_search(
+            poi_tools.POIParams(latitude=40.002, longitude=-75.0, radius=0.6, category_name="restaurant")
+        )
+
+    assert route.call_count == 1
+    assert route.calls[0].request.url.params["radius"] == "1.0"
+    assert first.status_code == 200
+    assert [item["name"] for item in first.data["poi"]] == ["POI 0"]
+    assert second.status_code == 200
+    assert [item["name"] for item in second.data["poi"]] == ["POI 0", "POI 1"]
+    poi_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_truncated_supersets_are_not_cached(monkeypatch):
+    """A superset cut at the byte limit is not cached; the original query is fetched instead."""
+    poi_cache.clear()
+    response_cache.clear()
+    sent = []
+
+    def send(method, url, **kwargs):
+        sent.append(dict(kwargs["params"]))
+        payload = _payload([(40.001, -75.0)])
+        if float(kwargs["params"]["radius"]) > 0.25:
+            payload["truncated"] = {"limit_bytes": 10, "cut_at": "poi[1]"}
+        return payload, 10, 0, 0
+
+    monkeypatch.setattr(client, "_send", send)
+    params = poi_tools.POIParams(latitude=40.0, longitude=-75.0, radius=0.25, category_name="Restaurant")
+    response = await poi_tools.poi_search(params)
+
+    assert response.status_code == 200
+    assert "truncated" not in response.data
+    assert [float(p["radius"]) for p in sent] == [1.0, 0.25]
+    assert len(poi_cache) == 0
@@ -0,0 +1,95 @@
+"""Tests for on-demand CPU and allocation profiling."""
+
+import asyncio
+import os
+import signal
+import time
+
+import pytest
+
+from src import config
+from src.profiling import Profiler, ProfilingMiddleware, install_signal_handler, profile_options
+
+
+class _Message:
+    name = "property_detail"
+
+
+class _Context:
+    message = _Message()
+
+
+def _busy(seconds):
+    """Burn CPU for ``seconds``, keeping a few allocations alive."""
+    kept = []
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        kept.append(bytearray(64))
+    return kept
+
+
+@pytest.mark.asyncio
+async def test_session_tags_samples_by_tool_and_ends_after_calls(tmp_path, monkeypatch):
+    """Samples from the loop and from executor threads carry the tool; N calls end the session."""
+    monkeypatch.setattr(config, "ATTOM_PROFILE_DIR", str(tmp_path))
+    profiler = Profiler(interval=0.001)
+    middleware = ProfilingMiddleware(profiler)
+
+    async def call_next(context):
+        _busy(0.1)
+        return await asyncio.get_running_loop().run_in_executor(None, profiler.tagged(_busy), 0.1)
+
+    assert profiler.start(seconds=60, calls=2)
+    assert not profiler.start()
+    for _ in range(2):
+        await middleware.on_call_tool(_Context(), call_next)
+
+    # The last call hands the stop to a thread instead of writing on the loop
+    deadline = time.monotonic() + 5
+    while profiler.active and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+    assert not profiler.active
+    result = profiler.last_result
+    assert result["calls"] == 2 and result["samples"] > 0
+    stacks = [line.rpartition(" ")[0] for line in open(result["cpu"], encoding="utf-8")]
+    assert any(s.startswith("property_detail;") and "test_profiling:_busy" in s for s in stacks)
+    # Both the loop thread and the executor thread were sampled under the tool
+    assert any("call_next" in s for s in stacks)
+    assert any("concurrent.futures.thread" in s and s.startswith("property_detail;") for s in stacks)
+    assert result["allocated_bytes"] > 0
+    assert os.path.getsize(result["memory"]) > 0
+
+
+def test_signal_and_route_options_start_sessions(tmp_path, monkeypatch):
+    """SIGUSR1 starts a default session; route query parameters are parsed and validated."""
+    monkeypatch.setattr(config, "ATTOM_PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "ATTOM_PROFILE_SECONDS", 0.05)
+    from src import profiling
+
+    profiler = Profiler(interval=0.01)
+    monkeypatch.setattr(profiling, "profiler", profiler)
+    previous = signal.getsignal(signal.SIGUSR1)
+    try:
+        assert install_signal_handler()
+        # Held by the interrupted thread: the handler must not wait for it
+        with profiler._lock:
+            os.kill(os.getpid(), signal.SIGUSR1)
+        deadline = time.monotonic() + 5
+        while profiler.last_result is None and not profiler.active and time.monotonic() < deadline:
+            time.sleep(0.001)
+        assert profiler.active or profiler.last_result is not None
+        while profiler.active and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
+    assert not profiler.active
+    assert os.path.exists(profiler.last_result["cpu"])
+
+    assert profile_options({"seconds": "5", "calls": "10", "memory": "false"}) == {
+        "seconds": 5.0,
+        "calls": 10,
+        "memory": False,
+    }
+    assert profile_options({}) == {}
+    with pytest.raises(ValueError):
+        profile_options({"calls": "many"})
@@ -0,0 +1,93 @@
+"""Tests for typed property record extraction."""
+
+import math
+
+from src.records import (
+    PropertyRecord,
+    columns_to_json,
+    extract_records,
+    parse_date,
+    parse_float,
+    to_columns,
+)
+
+PAYLOAD = {
+    "status": {"version": "1.0.0", "code": 0, "msg": "SuccessWithResult"},
+    "property": [
+        {
+            "identifier": {"attomId": 145423726, "fips": "53063", "apn": "26252.2605"},
+            "address": {
+                "line1": "7804 N MILTON ST",
+                "line2": "SPOKANE, WA 99208",
+                "locality": "SPOKANE",
+                "countrySubd": "WA",
+                "postal1": "99208",
+                "postal2": "",
+                "oneLine": "7804 N MILTON ST, SPOKANE, WA 99208",
+            },
+            "location": {"latitude": "47.734118", "longitude": "-117.426547"},
+            "summary": {"proptype": "SFR", "yearbuilt": 2004},
+            "building": {"rooms": {"beds": 3, "bathstotal": "2.5"}, "size": {"livingsize": 1850}},
+            "sale": {"amount": {"saleamt": "325,000", "salerecdate": "2019-5-6"}},
+            "avm": {"eventDate": "2024-01-15", "amount": {"value": 410000, "low": 380000, "high": 440000}},
+        },
+        {
+            "identifier": {"attomId": 1},
+            "address": {"line1": "1 MAIN ST", "line2": "SPOKANE, WA 99201"},
+        },
+    ],
+}
+
+
+def test_parse_helpers():
+    """Numeric and date strings are parsed, junk is dropped."""
+    assert parse_float("47.734118") == 47.734118
+    assert parse_float("$1,250") == 1250.0
+    assert parse_float("") is None
+    assert parse_float("abc") is None
+    assert parse_date("2019-5-6") == "2019-05-06"
+    assert parse_date("2019/05/06T00:00") == "2019-05-06"
+    assert parse_date("bad") is None
+
+
+def test_extract_records():
+    """Property payloads become typed records."""
+    records = extract_records(PAYLOAD)
+
+    assert len(records) == 2
+    record = records[0]
+    assert record.attom_id == "145423726"
+    assert record.latitude == 47.734118
+    assert record.baths == 2.5
+    assert record.sale_amount == 325000.0
+    assert record.sale_date == "2019-05-06"
+    assert record.avm_value == 410000.0
+    assert record.zip_plus4 is None
+    assert records[1].address_full == "1 MAIN ST, SPOKANE, WA 99201"
+    assert not hasattr(record, "__dict__")
+
+
+def test_record_to_basic_info_and_merge():
+    """Records fill the basic info model and merge newer values."""
+    record = extract_records(PAYLOAD)[0]
+    info = record.to_basic_info()
+
+    assert info.attom_id == "145423726"
+    assert info.address_components.street_number == "7804"
+    assert info.address_components.street_name == "N MILTON ST"
+    assert info.longitude == -117.426547
+
+    record.merge(PropertyRecord(attom_id="145423726", avm_value=420000.0))
+    assert record.avm_value == 420000.0
+    assert record.beds == 3.0
+
+
+def test_to_columns():
+    """Batches become arrays per field with NaN for missing numbers."""
+    columns = to_columns(extract_records(PAYLOAD))
+
+    assert columns["attom_id"] == ["145423726", "1"]
+    assert columns["beds"].typecode == "d"
+    assert columns["beds"][0] == 3.0
+    assert math.isnan(columns["beds"][1])
+    assert columns_to_json(columns, ["beds"]) == {"beds": [3.0, None]}
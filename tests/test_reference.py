@@ -0,0 +1,94 @@
+"""Tests for the local reference tables."""
+
+import httpx
+import pytest
+import respx
+from pydantic import ValidationError
+
+from src.client import client
+from src.reference import ReferenceData, refresh, write_dataset
+from src.tools import area_tools
+
+STATES = [
+    {"geoIdV4": "st-nj", "geoId": "ST34", "name": "New Jersey", "StateFIPS": "34"},
+    {"geoIdV4": "st-ny", "geoId": "ST36", "name": "New York", "StateFIPS": "36"},
+]
+COUNTIES = {
+    "ST34": [
+        {"geoIdV4": "co-morris", "geoId": "CO34027", "CountyName": "Morris County", "StateFIPS": "34", "CountyFIPS": "027"},
+        {"geoIdV4": "co-sussex", "geoId": "CO34037", "CountyName": "Sussex County", "StateFIPS": "34", "CountyFIPS": "037"},
+    ],
+    "ST36": [{"geoIdV4": "co-kings", "geoId": "CO36047", "CountyName": "Kings County", "StateFIPS": "36", "CountyFIPS": "047"}],
+}
+
+
+def _lookup(rows):
+    """Wrap rows in an areaapi lookup response."""
+    return {"response": {"status": {"code": 0}, "result": {"package": {"item": rows}}}}
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    """Reference dataset with two states and their counties."""
+    counties = [
+        {**row, "_stateId": state["geoId"], "_stateGeoIdV4": state["geoIdV4"]}
+        for state in STATES
+        for row in COUNTIES[state["geoId"]]
+    ]
+    write_dataset(str(tmp_path), {"state": STATES, "county": counties})
+    data = ReferenceData(str(tmp_path))
+    yield data
+    data.close()
+
+
+def test_find_by_keys(dataset):
+    """Rows are found by geoIdV4, parent state, FIPS and name."""
+    assert [r["geoId"] for r in dataset.find("state")] == ["ST34", "ST36"]
+    assert [r["geoId"] for r in dataset.find("state", geoid_v4="co-kings")] == ["ST36"]
+    assert [r["geoId"] for r in dataset.find("county", state_id="ST34")] == ["CO34027", "CO34037"]
+    assert [r["geoId"] for r in dataset.find("county", geoid_v4="st-nj", name="sussex  county")] == ["CO34037"]
+    assert [r["geoId"] for r in dataset.find("county", fips="34027")] == ["CO34027"]
+    assert dataset.find("county", fips="99999") == []
+    assert dataset.find("cbsa") is None
+    assert [r["geoIdV4"] for r in dataset.find_any(geoid="CO36047")] == ["co-kings"]
+    assert ReferenceData("/nonexistent").find("state") is None
+
+
+@pytest.mark.parametrize("paging", [{"page": 0, "page_size": 10}, {"page": -1, "page_size": 10}, {"page_size": -5}])
+def test_lookup_paging_must_be_positive(paging):
+    """Pages and page sizes below 1 are rejected instead of slicing from the end."""
+    with pytest.raises(ValidationError):
+        area_tools.AreaParams(state_id="ST34", **paging)
+
+
+@pytest.mark.asyncio
+async def test_lookup_tools_served_locally(dataset, monkeypatch):
+    """Lookups answered by the dataset never call ATTOM."""
+    monkeypatch.setattr(area_tools, "reference", dataset)
+    with respx.mock(assert_all_called=False) as respx_mock:
+        counties = await area_tools.county_lookup(area_tools.AreaParams(state_id="ST34", page=2, page_size=1))
+        legacy = await area_tools.geocode_legacy_lookup(area_tools.AreaParams(area_id="ST36"))
+
+    assert not respx_mock.calls
+    assert counties.data["total"] == 2
+    assert [r["geoId"] for r in counties.data["items"]] == ["CO34037"]
+    assert legacy.data["items"][0]["geoIdV4"] == "st-ny"
+
+
+@pytest.mark.asyncio
+async def test_refresh_builds_dataset(tmp_path):
+    """The refresh command pages through states and their counties."""
+
+    def county_response(request):
+        return httpx.Response(200, json=_lookup(COUNTIES[request.url.params["stateId"]]))
+
+    with respx.mock(base_url="https://api.gateway.attomdata.com/areaapi/area") as mock:
+        mock.get("/state/lookup").mock(return_value=httpx.Response(200, json=_lookup(STATES)))
+        mock.get("/county/lookup").mock(side_effect=county_response)
+        mock.get("/cbsa/lookup").mock(return_value=httpx.Response(200, json=_lookup([])))
+        counts = await refresh(client, str(tmp_path))
+
+    assert counts == {"state": 2, "county": 3, "cbsa": 0}
+    data = ReferenceData(str(tmp_path))
+    assert [r["geoId"] for r in data.find("county", geoid_v4="st-ny")] == ["CO36047"]
+    data.close()
@@ -0,0 +1,38 @@
+"""Tests for event loop selection and the shared executor."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src import runtime
+
+
+def test_resolve_loop_falls_back_and_rejects_unknown(monkeypatch):
+    """uvloop is opt-in and falls back to asyncio when it is not installed."""
+    assert runtime.resolve_loop("asyncio") == "asyncio"
+    monkeypatch.setattr(runtime, "uvloop_available", lambda: False)
+    assert runtime.resolve_loop("uvloop") == "asyncio"
+    assert runtime.resolve_loop("auto") == "asyncio"
+    assert runtime.loop_factory("auto") is asyncio.new_event_loop
+    with pytest.raises(ValueError):
+        runtime.resolve_loop("trio")
+
+
+def test_blocking_work_runs_off_the_loop():
+    """Blocking calls overlap on the executor while the loop stays responsive."""
+
+    def blocking() -> str:
+        time.sleep(0.2)
+        return threading.current_thread().name
+
+    async def main():
+        start = time.perf_counter()
+        names = await asyncio.gather(*(runtime.run_blocking(blocking) for _ in range(4)))
+        return names, time.perf_counter() - start
+
+    for _ in range(2):
+        names, elapsed = runtime.run(main, "asyncio")
+        assert elapsed < 0.6
+        assert all(name.startswith("attom") for name in names)
@@ -0,0 +1,115 @@
+"""Tests for the local attribute search index."""
+
+import pytest
+
+from src.client import client
+from src.models import PropertyIdentifier
+from src.records import PropertyRecord
+from src.search import AttributeIndex, search_index
+from src.tools.property_tools import PropertySearchParams, property_search
+from src.tools.utils import call_endpoint
+
+
+def record(attom_id, **values):
+    return PropertyRecord(attom_id=str(attom_id), **values)
+
+
+def test_filters_rank_and_reindex_properties():
+    """Range, date, categorical and radius filters intersect; updates and evictions keep the index right."""
+    index = AttributeIndex(max_size=4)
+    index.add(
+        [
+            record(1, beds=4, avm_value=450000, state="CA", city="Oakland", sale_date="2021-05-01",
+                   latitude=37.80, longitude=-122.27),
+            record(2, beds=3, avm_value=420000, state="CA", city="Oakland", latitude=37.81, longitude=-122.26),
+            record(3, beds=5, avm_value=900000, state="ca", city="Berkeley", sale_date="2019-02-01",
+                   latitude=37.87, longitude=-122.27),
+            record(4, beds=4, state="NV"),
+            None,
+        ]
+    )
+    ids = lambda result: [entry["attom_id"] for entry in result["properties"]]  # noqa: E731
+
+    result = index.search([("beds", "gt", 3), ("avm_value", "lt", 500000)])
+    assert result["total"] == 1 and ids(result) == ["1"]
+    assert ids(index.search([("beds", "gte", 4)], sort_by="avm_value", descending=True)) == ["3", "1", "4"]
+    assert ids(index.search([("state", "eq", "ca"), ("city", "ne", "oakland")])) == ["3"]
+    assert ids(index.search([("sale_date", "between", ["2020-01-01", "2022-01-01"])])) == ["1"]
+    near = index.search(near=(37.80, -122.27, 2.0), sort_by="distance")
+    assert ids(near) == ["1", "2"] and near["properties"][0]["distance_miles"] == 0
+
+    # Re-indexing a property replaces its values; a fifth property evicts the least recently updated
+    index.add([record(2, beds=4, avm_value=480000, state="CA")])
+    assert ids(index.search([("beds", "gt", 3), ("avm_value", "lt", 500000)], sort_by="avm_value")) == ["1", "2"]
+    index.add([record(5, beds=6, state="NV")])
+    assert len(index) == 4
+    assert sorted(ids(index.search([("state", "in", ["NV", "TX"])]))) == ["4", "5"]
+    assert sorted(ids(index.search([("beds", "gte", 4)]))) == ["2", "3", "4", "5"]
+
+    for bad in ([("beds", "eq", 3)], [("color", "eq", "red")], [("sale_date", "gt", "last year")]):
+        with pytest.raises(ValueError):
+            index.search(bad)
+    with pytest.raises(ValueError):
+        index.search(sort_by="distance")
+
+
+@pytest.mark.asyncio
+async def test_search_tool_finds_properties_from_fetched_responses(monkeypatch):
+    """Properties in fetched responses are searchable without further upstream requests."""
+    requests = []
+
+    def send(method, url, **kwargs):
+        attom_id = int(kwargs["params"]["AttomID"])
+        requests.append(attom_id)
+        item = {
+            "identifier": {"attomId": attom_id},
+            "address": {"countrySubd": "TX", "locality": "Austin"},
+            "building": {"rooms": {"beds": attom_id}},
+            "avm": {"amount": {"value": attom_id * 100000}},
+        }
+        return {"property": [item]}, 100, 0, 0
+
+    monkeypatch.setattr(client, "_send", send)
+    search_index.clear()
+    for attom_id in range(1, 8):
+        assert (await call_endpoint("avm_detail", PropertyIdentifier(attom_id=str(attom_id)))).status_code == 200
+
+    params = PropertySearchParams(
+        filters=[
+            {"field": "beds", "op": "gt", "value": 3},
+            {"field": "avm_value", "op": "lt", "value": 650000},
+            {"field": "city", "op": "eq", "value": "AUSTIN"},
+        ],
+        sort_by="avm_value",
+        descending=True,
+    )
+    response = await property_search(params)
+    assert response.status_code == 200
+    assert [entry["attom_id"] for entry in response.data["properties"]] == ["6", "5", "4"]
+    assert response.data["indexed"] == 7
+    assert len(requests) == 7
+
+    invalid = await property_search(PropertySearchParams(filters=[{"field": "beds", "op": "in", "value": 3}]))
+    assert invalid.status_code == 400
+    search_index.clear()
+
+
+@pytest.mark.asyncio
+async def test_index_failures_do_not_fail_the_call(monkeypatch):
+    """A secondary index raising leaves the fetched response served and cached."""
+    requests = []
+
+    def send(method, url, **kwargs):
+        requests.append(url)
+        return {"property": [{"identifier": {"attomId": 424242}}]}, 100, 0, 0
+
+    def broken(records):
+        raise RuntimeError("index corrupted")
+
+    monkeypatch.setattr(client, "_send", send)
+    monkeypatch.setattr(search_index, "add", broken)
+    for _ in range(2):
+        response = await call_endpoint("property_detail", PropertyIdentifier(attom_id="424242"))
+        assert response.status_code == 200
+        assert response.data["property"][0]["identifier"]["attomId"] == 424242
+    assert len(requests) == 1
@@ -0,0 +1,166 @@
+"""Tests for the local boundary spatial index."""
+
+import json
+import random
+import threading
+
+import httpx
+import pytest
+import respx
+
+from src.spatial import RTree, SpatialIndex, spatial_index
+from src.tools import area_tools
+
+
+def square(x0, y0, size):
+    """Closed square ring with its lower-left corner at (x0, y0)."""
+    return [[x0, y0], [x0 + size, y0], [x0 + size, y0 + size], [x0, y0 + size], [x0, y0]]
+
+
+COUNTY = {
+    "type": "Feature",
+    "properties": {"geoIdV4": "county-1", "name": "Test County", "geographyTypeAbbreviation": "CO"},
+    "geometry": {"type": "Polygon", "coordinates": [square(-75, 40, 1), square(-74.6, 40.4, 0.2)]},
+}
+ZIP = {
+    "type": "Feature",
+    "properties": {"geoIdV4": "zip-1", "name": "99999", "geographyTypeAbbreviation": "ZI"},
+    "geometry": {
+        "type": "MultiPolygon",
+        "coordinates": [[square(-75, 40, 0.3)], [square(-74.2, 40.7, 0.2)]],
+    },
+}
+
+
+def test_rtree_matches_brute_force():
+    """R-tree point queries return exactly the containing boxes."""
+    rng = random.Random(7)
+    boxes = []
+    for _ in range(500):
+        x, y = rng.uniform(0, 100), rng.uniform(0, 100)
+        boxes.append((x, y, x + rng.uniform(0, 10), y + rng.uniform(0, 10)))
+    tree = RTree(boxes)
+
+    for _ in range(200):
+        x, y = rng.uniform(0, 110), rng.uniform(0, 110)
+        expected = [i for i, b in enumerate(boxes) if b[0] <= x <= b[2] and b[1] <= y <= b[3]]
+        assert sorted(tree.query_point(x, y)) == expected
+
+
+def test_point_in_polygon_with_holes_and_parts():
+    """Holes are excluded and every multipolygon part is searched."""
+    index = SpatialIndex()
+    index.observe_boundary({"type": "FeatureCollection", "features": [COUNTY, ZIP]})
+
+    assert [a["geoIdV4"] for a in index.lookup(40.1, -74.9)] == ["county-1", "zip-1"]
+    assert index.lookup(40.5, -74.5) == []  # inside the county's hole
+    assert [a["geoIdV4"] for a in index.lookup(40.8, -74.1)] == ["county-1", "zip-1"]
+    assert [a["geoIdV4"] for a in index.lookup(40.8, -74.1, "zi")] == ["zip-1"]
+    assert index.lookup(45.0, -74.1) == []
+
+
+def test_resolve_requires_full_coverage():
+    """Every requested geo type must contain the point; the full hierarchy is never local."""
+    index = SpatialIndex()
+    index.observe_boundary({"type": "FeatureCollection", "features": [COUNTY, ZIP]})
+
+    assert len(index.resolve(40.1, -74.9, "CO,zi")) == 2
+    assert index.resolve(40.1, -74.9) is None  # full hierarchy requested
+    assert index.resolve(40.1, -74.9, "CO,ZI,PL") is None  # no place boundaries
+    assert index.resolve(40.2, -74.3, "CO,ZI") is None  # county only, no zip
+    assert len(index.resolve(40.2, -74.3, "CO")) == 1
+    assert SpatialIndex().resolve(40.1, -74.9, "CO") is None
+
+
+def test_embedded_geometry_and_persistence(tmp_path):
+    """Geometries embedded as strings are indexed and reloaded from disk."""
+    path = str(tmp_path / "boundaries.jsonl")
+    payload = {
+        "response": {
+            "result": {
+                "package": {
+                    "item": [{"name": "Test County", "boundary": json.dumps(COUNTY["geometry"])}]
+                }
+            }
+        }
+    }
+    assert SpatialIndex(path).observe_boundary(payload, geoid_v4="county-1") == 1
+
+    reloaded = SpatialIndex(path)
+    assert [a["geoIdV4"] for a in reloaded.lookup(40.1, -74.9)] == ["county-1"]
+    assert reloaded.lookup(40.1, -74.9)[0]["name"] == "Test County"
+
+
+def test_refetched_boundaries_are_stored_once(tmp_path):
+    """Unchanged boundaries are not appended again and replaced copies are compacted on load."""
+    path = tmp_path / "boundaries.jsonl"
+    index = SpatialIndex(str(path))
+    for _ in range(3):
+        index.observe_boundary({"type": "FeatureCollection", "features": [COUNTY, ZIP]})
+    assert len(path.read_text().splitlines()) == 2
+
+    moved = {**ZIP, "geometry": {"type": "Polygon", "coordinates": [square(-80, 30, 1)]}}
+    index.observe_boundary({"type": "FeatureCollection", "features": [moved]})
+    assert len(path.read_text().splitlines()) == 3
+
+    reloaded = SpatialIndex(str(path))
+    assert len(reloaded) == 2
+    assert [a["geoIdV4"] for a in reloaded.lookup(30.5, -79.5)] == ["zip-1"]
+    assert [a["geoIdV4"] for a in reloaded.lookup(40.1, -74.9)] == ["county-1"]
+    assert len(path.read_text().splitlines()) == 2
+
+
+@pytest.mark.asyncio
+async def test_hierarchy_lookup_served_locally():
+    """Cached boundaries answer hierarchy lookups without calling ATTOM."""
+    spatial_index.clear()
+    with respx.mock(base_url="https://api.gateway.attomdata.com", assert_all_called=False) as mock:
+        boundary = mock.get("/areaapi/area/boundary/detail").mock(
+            return_value=httpx.Response(200, json={"type": "FeatureCollection", "features": [COUNTY]})
+        )
+        hierarchy = mock.get("/areaapi/area/hierarchy/lookup").mock(
+            return_value=httpx.Response(200, json={"response": {}})
+        )
+
+        await area_tools.boundary_detail(area_tools.AreaParams(geoid_v4="county-1", format="geojson"))
+        inside = await area_tools.hierarchy_lookup(
+            area_tools.AreaParams(latitude=40.1, longitude=-74.9, geo_type="CO")
+        )
+        full = await area_tools.hierarchy_lookup(area_tools.AreaParams(latitude=40.1, longitude=-74.9))
+        outside = await area_tools.hierarchy_lookup(
+            area_tools.AreaParams(latitude=30.0, longitude=-90.0, geo_type="CO")
+        )
+
+    assert boundary.call_count == 1
+    assert inside.data == {"source": "local_index", "areas": [COUNTY["properties"]]}
+    assert full.data == {"response": {}}
+    assert hierarchy.call_count == 2
+    assert outside.data == {"response": {}}
+    spatial_index.clear()
+
+
+@pytest.mark.asyncio
+async def test_boundaries_indexed_once_off_the_event_loop(monkeypatch):
+    """Only freshly fetched boundaries are indexed, on an executor thread."""
+    spatial_index.clear()
+    threads = []
+    observe = spatial_index.observe_boundary
+
+    def observe_boundary(payload, geoid_v4=None):
+        threads.append(threading.current_thread())
+        return observe(payload, geoid_v4)
+
+    monkeypatch.setattr(spatial_index, "observe_boundary", observe_boundary)
+    with respx.mock(base_url="https://api.gateway.attomdata.com") as mock:
+        boundary = mock.get("/areaapi/area/boundary/detail").mock(
+            return_value=httpx.Response(200, json={"type": "FeatureCollection", "features": [COUNTY]})
+        )
+        params = area_tools.AreaParams(geoid_v4="county-1", format="geojson")
+        await area_tools.boundary_detail(params)
+        await area_tools.boundary_detail(params)
+
+    assert boundary.call_count == 1
+    assert len(threads) == 1
+    assert threads[0] is not threading.main_thread()
+    assert [a["geoIdV4"] for a in spatial_index.lookup(40.1, -74.9)] == ["county-1"]
+    spatial_index.clear()
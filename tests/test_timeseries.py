@@ -0,0 +1,124 @@
+"""Tests for the local AVM, sale and assessment time series."""
+
+import json
+
+import pytest
+
+from src.client import client
+from src.timeseries import TimeSeriesStore, timeseries
+from src.tools.valuation_tools import TrendParams, property_trends
+
+
+def avm_history(attom_id, points):
+    """An AVM history payload with (date, value) points."""
+    return {
+        "property": [
+            {
+                "identifier": {"attomId": attom_id},
+                "avmhistory": [{"eventDate": day, "amount": {"value": value}} for day, value in points],
+            }
+        ]
+    }
+
+
+SALES = {
+    "property": [
+        {
+            "identifier": {"attomId": 5},
+            "salehistory": [
+                {"saleTransDate": "2020-01-01", "amount": {"saleamt": 400000}},
+                {"saleTransDate": "2015-01-01", "amount": {"saleamt": 300000}},
+                {"saleTransDate": "2012-06-01", "amount": {"saleamt": 0}},
+            ],
+        }
+    ]
+}
+
+ASSESSMENTS = {
+    "property": [
+        {
+            "identifier": {"attomId": 5},
+            "assessmenthistory": [
+                {"tax": {"taxyear": 2021, "taxamt": 5000}, "market": {"mktttlvalue": 360000}},
+                {"tax": {"taxyear": 2022, "taxamt": 5200}, "market": {"mktttlvalue": 390000}},
+            ],
+        }
+    ]
+}
+
+
+def test_histories_merge_incrementally_and_answer_trends(tmp_path):
+    """Later responses add and replace points; trends come from the merged arrays and survive a restart."""
+    path = str(tmp_path / "timeseries.jsonl")
+    store = TimeSeriesStore(path, clock=lambda: 1000.0)
+    assert store.observe("avm_history_detail", avm_history(5, [("2020-01-01", 400000), ("2021-01-01", 420000)]))
+    assert store.observe("avm_history_detail", avm_history(5, [("2022-01-01", 480000), ("2021-01-01", 440000)]))
+    assert not store.observe("avm_history_detail", avm_history(5, [("2022-01-01", 480000)]))
+    assert store.observe("property_detail", avm_history(5, [("2023-01-01", 1)])) == 0
+    store.observe("sales_history_detail", SALES)
+    store.observe("assessment_history_detail", ASSESSMENTS)
+
+    avm = store.get("5", "avm")
+    assert avm.days.tolist() == [18262, 18628, 18993]
+    assert avm.columns["value"].tolist() == [400000, 440000, 480000]
+
+    trends = store.trends("5", as_of="2022-01-01", years=[1, 5])
+    assert trends["points"] == {"avm": 3, "sale": 2, "assessment": 2}
+    assert trends["avm"]["value_at"] == 480000
+    assert trends["avm"]["annualized_appreciation"]["1y"] == pytest.approx(480000 / 440000 - 1, abs=1e-3)
+    assert trends["avm"]["annualized_appreciation"]["5y"] is None
+    sales = trends["sale"]["sales"]
+    assert [sale["amount"] for sale in sales] == [300000, 400000]
+    assert sales[1]["annualized_since_previous"] == pytest.approx((4 / 3) ** (1 / 5) - 1, abs=1e-3)
+    assert trends["sale"]["annualized_since_last_sale"] == pytest.approx(0.0954, abs=1e-3)
+    (gap_2021, gap_2022) = trends["assessment"]["market_vs_avm"]
+    assert gap_2021["avm"] == 440000 and gap_2021["gap"] == pytest.approx(360000 / 440000 - 1)
+    assert gap_2022["gap"] == pytest.approx(390000 / 480000 - 1)
+    assert store.trends("5", as_of="2020-06-01")["avm"]["value_at"] == pytest.approx(420000, rel=0.01)
+
+    # Only new and changed points are appended; compaction leaves one line per series
+    with open(path) as f:
+        assert [len(json.loads(line)["days"]) for line in f][:3] == [2, 2, 0]
+    store.compact()
+    with open(path) as f:
+        assert [json.loads(line)["kind"] for line in f] == ["avm", "sale", "assessment"]
+
+    reloaded = TimeSeriesStore(path, clock=lambda: 2000.0, max_age=5000)
+    assert reloaded.get("5", "avm").columns["value"].tolist() == [400000, 440000, 480000]
+    assert reloaded.stale("5") == []
+    assert TimeSeriesStore(path, clock=lambda: 9000.0, max_age=5000).stale("5") == ["avm", "sale", "assessment"]
+    with pytest.raises(ValueError):
+        store.trends("5", as_of="soon")
+
+
+@pytest.mark.asyncio
+async def test_trends_fetch_histories_only_when_stale(monkeypatch):
+    """The first trend query fetches the three histories; later ones are answered locally."""
+    requests = []
+    payloads = {
+        "avmhistory/detail": avm_history(6, [("2021-01-01", 300000), ("2024-01-01", 330000)]),
+        "saleshistory/detail": {"property": [{"identifier": {"attomId": 6}}]},
+        "assessmenthistory/detail": {"property": []},
+    }
+
+    def send(method, url, **kwargs):
+        requests.append(url)
+        return next(payload for path, payload in payloads.items() if url.endswith(path)), 100, 0, 0
+
+    monkeypatch.setattr(client, "_send", send)
+    monkeypatch.setattr(timeseries, "_series", {})
+    for _ in range(2):
+        response = await property_trends(TrendParams(attom_id="6", as_of="2024-01-02", years=[3]))
+        assert response.status_code == 200
+        assert response.data["avm"]["annualized_appreciation"]["3y"] == pytest.approx(0.0323, abs=1e-3)
+    assert len(requests) == 3
+
+    # A refresh skips the response cache, so points ATTOM added since are merged
+    payloads["avmhistory/detail"] = avm_history(6, [("2021-01-01", 300000), ("2025-01-01", 360000)])
+    refreshed = await property_trends(TrendParams(attom_id="6", as_of="2025-01-01", refresh=True))
+    assert len(requests) == 6
+    assert refreshed.data["points"]["avm"] == 3
+    assert refreshed.data["avm"]["value_at"] == 360000
+
+    missing = await property_trends(TrendParams(attom_id="7"))
+    assert missing.status_code == 404
@@ -0,0 +1,87 @@
+"""Tests for tracing spans from endpoint fetch to ATTOM request."""
+
+import json
+
+import httpx
+import pytest
+
+pytest.importorskip("opentelemetry.sdk")
+
+from opentelemetry.sdk.trace import TracerProvider  # noqa: E402
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor  # noqa: E402
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter  # noqa: E402
+from opentelemetry.trace import StatusCode  # noqa: E402
+
+from src import tracing  # noqa: E402
+from src.client import client  # noqa: E402
+from src.models import PropertyIdentifier  # noqa: E402
+from src.tools.utils import call_endpoint  # noqa: E402
+
+
+@pytest.fixture
+def spans():
+    """Record the server's spans in memory for one test."""
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    tracing.use_provider(provider)
+    yield exporter
+    tracing.use_provider(None)
+
+
+@pytest.mark.asyncio
+async def test_fetch_spans_nest_http_and_decode_with_cache_outcome(spans, monkeypatch):
+    """A miss traces fetch > HTTP request > decode; the repeat call is a cache hit."""
+    monkeypatch.setattr(
+        client, "_send", lambda method, url, **kwargs: ({"property": []}, 512, 1_000_000, 3_000_000)
+    )
+    with tracing.span("tools/call property_detail"):
+        for _ in range(2):
+            response = await call_endpoint("property_detail", PropertyIdentifier(attom_id="9"))
+            assert response.status_code == 200
+
+    by_name = {}
+    for finished in spans.get_finished_spans():
+        by_name.setdefault(finished.name, []).append(finished)
+    root = by_name["tools/call property_detail"][0]
+    miss, hit = by_name["attom.fetch property_detail"]
+    http = by_name["attom.http GET"][0]
+    decode = by_name["attom.decode"][0]
+
+    assert miss.parent.span_id == root.context.span_id
+    assert miss.attributes["attom.cache"] == "miss"
+    assert miss.attributes["attom.cache_class"] == "daily"
+    assert hit.attributes["attom.cache"] == "hit"
+    assert http.parent.span_id == miss.context.span_id
+    assert http.attributes["http.response.status_code"] == 200
+    assert http.attributes["attom.endpoint"] == "property_detail"
+    assert decode.parent.span_id == http.context.span_id
+    assert decode.end_time - decode.start_time == 2_000_000
+
+
+@pytest.mark.asyncio
+async def test_upstream_errors_mark_spans_and_export_to_file(tmp_path, monkeypatch):
+    """Failed requests are recorded as errors, and the file exporter writes JSON lines."""
+    path = tmp_path / "spans.jsonl"
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(tracing.make_exporter(f"file:{path}")))
+    tracing.use_provider(provider)
+
+    def fail(method, url, **kwargs):
+        request = httpx.Request(method, url)
+        raise httpx.HTTPStatusError("nope", request=request, response=httpx.Response(429, request=request))
+
+    monkeypatch.setattr(client, "_send", fail)
+    try:
+        response = await call_endpoint("property_detail", PropertyIdentifier(attom_id="10"))
+    finally:
+        tracing.use_provider(None)
+
+    assert response.status_code == 500
+    exported = {item["name"]: item for item in map(json.loads, path.read_text().splitlines())}
+    http = exported["attom.http GET"]
+    assert http["attributes"]["http.response.status_code"] == 429
+    assert http["status"]["status_code"] == StatusCode.ERROR.name
+    assert exported["attom.fetch property_detail"]["attributes"]["attom.cache"] == "miss"
+    with pytest.raises(ValueError):
+        tracing.make_exporter("zipkin")
@@ -0,0 +1,127 @@
+"""Tests for the usage ledger, spend reports and budgets."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src import usage
+from src.client import client
+from src.limits import fingerprint
+from src.models import PropertyIdentifier
+from src.tools import usage_tools
+from src.tools.utils import call_endpoint
+from src.usage import UsageLedger, call_scope
+
+
+def test_ledger_files_aggregate_across_processes_and_days(tmp_path):
+    """Ledgers sharing a directory see each other's records, aggregated per day, endpoint and session."""
+    now = [1_790_000_000.0]
+    costs = {"default": 1, "sales_comparables": 5}
+    first = UsageLedger(str(tmp_path), costs=costs, clock=lambda: now[0])
+    second = UsageLedger(str(tmp_path), costs=costs, clock=lambda: now[0])
+
+    token = call_scope.set(("session-a", "property_detail"))
+    first.record("property_detail", "miss", 200, 1000, key="abcd1234")
+    first.record("property_detail", "hit")
+    call_scope.reset(token)
+    token = call_scope.set(("session-b", "sales_comparables_analysis"))
+    second.record("sales_comparables", "miss", 200, 4000)
+    second.record("sales_comparables", "miss", 429, 0)
+    now[0] += 86400
+    second.record("avm_detail", "bypass", 200, 10)
+    call_scope.reset(token)
+
+    lines = (tmp_path / "2026-09-21.tsv").read_text().splitlines()
+    assert lines[0].split("\t")[1:] == [
+        "property_detail", "property_detail", "session-a", "abcd1234", "miss", "200", "1000", "1", first.writer
+    ]
+
+    report = first.report(days=2)
+    today, yesterday = report["days"]
+    assert today["day"] == "2026-09-22" and today["total"]["cost"] == 1
+    assert yesterday["total"] == {"calls": 4, "billed": 2, "cached": 1, "errors": 1, "bytes": 5000, "cost": 6}
+    assert list(yesterday["by_endpoint"]) == ["sales_comparables", "property_detail"]
+    assert yesterday["by_session"]["session-a"]["cached"] == 1
+    assert yesterday["by_tool"]["sales_comparables_analysis"]["cost"] == 5
+    assert first.report(days=2, session="session-a")["days"] == [
+        {"day": "2026-09-21", "session": "session-a", "total": yesterday["by_session"]["session-a"]}
+    ]
+
+    # A fresh ledger rebuilds the aggregates from the files
+    assert UsageLedger(str(tmp_path), clock=lambda: now[0]).spent(day="2026-09-21") == 6
+
+
+@pytest.mark.asyncio
+async def test_spent_budgets_serve_cached_responses_only(monkeypatch):
+    """Once the session budget is spent, cached responses are still served and new requests are refused."""
+    ledger = UsageLedger(session_budget=2)
+    monkeypatch.setattr(usage, "ledger", ledger)
+    monkeypatch.setattr(client, "_send", lambda method, url, **kwargs: ({"property": []}, 100, 0, 0))
+
+    token = call_scope.set(("session-a", "property_detail"))
+    try:
+        for attom_id in ("1", "2", "1"):
+            response = await call_endpoint("property_detail", PropertyIdentifier(attom_id=attom_id))
+            assert response.status_code == 200
+        refused = await call_endpoint("property_detail", PropertyIdentifier(attom_id="3"))
+        assert refused.status_code == 500
+        assert "Session ATTOM usage budget of 2 is spent" in refused.status_message
+        cached = await call_endpoint("property_detail", PropertyIdentifier(attom_id="2"))
+        assert cached.status_code == 200
+    finally:
+        call_scope.reset(token)
+
+    # Other sessions keep their own budget
+    token = call_scope.set(("session-b", "property_detail"))
+    try:
+        response = await call_endpoint("property_detail", PropertyIdentifier(attom_id="3"))
+        assert response.status_code == 200
+    finally:
+        call_scope.reset(token)
+
+    report = ledger.report()
+    assert report["days"][0]["by_session"]["session-a"] == {
+        "calls": 4, "billed": 2, "cached": 2, "errors": 0, "bytes": 200, "cost": 2
+    }
+    assert report["budgets"] == {"session": {"budget": 2}}
+
+
+@pytest.mark.asyncio
+async def test_records_are_counted_at_once_and_written_in_batches_off_the_loop(tmp_path):
+    """Inside the event loop, records count toward budgets immediately and reach the file in one batch."""
+    ledger = UsageLedger(str(tmp_path), daily_budget=2, clock=lambda: 1_790_000_000.0)
+    for _ in range(2):
+        ledger.record("property_detail", "miss")
+    assert not (tmp_path / "2026-09-21.tsv").exists()
+    assert ledger.exhausted("property_detail") is not None
+
+    await asyncio.sleep(0.1)
+    assert len((tmp_path / "2026-09-21.tsv").read_text().splitlines()) == 2
+    # Its own lines are not counted twice when read back; another ledger sees them
+    assert ledger.spent() == 2
+    assert UsageLedger(str(tmp_path), clock=lambda: 1_790_000_000.0).spent() == 2
+
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_fingerprinted_and_only_listed_by_the_route(monkeypatch):
+    """The ledger never holds session ids, and the usage tool lists no other sessions."""
+    ledger = UsageLedger()
+    monkeypatch.setattr(usage, "ledger", ledger)
+    monkeypatch.setattr(usage_tools, "ledger", ledger)
+    monkeypatch.setattr(usage, "session_key", lambda context: "6f1c2a9e-secret-session")
+
+    async def call_next(context):
+        ledger.record("property_detail", "miss")
+        return await usage_tools.usage_report(usage_tools.UsageReportParams(session_only=True))
+
+    context = SimpleNamespace(message=SimpleNamespace(name="usage_report"))
+    own = await usage.UsageMiddleware().on_call_tool(context, call_next)
+
+    day = ledger.report()["days"][0]
+    assert list(day["by_session"]) == [fingerprint("6f1c2a9e-secret-session")]
+    assert own.data["days"][0]["session"] == fingerprint("6f1c2a9e-secret-session")
+    everyone = await usage_tools.usage_report(usage_tools.UsageReportParams())
+    assert "by_session" not in everyone.data["days"][0]
+    assert "secret" not in str(everyone.data) + str(own.data)
@@ -0,0 +1,151 @@
+"""Tests for the property watchlist and its change feed."""
+
+import copy
+
+import pytest
+
+from src.client import client
+from src.tools import watchlist_tools
+from src.tools.utils import fetch_endpoint, response_cache
+from src.watchlist import Watchlist
+
+
+def snapshot(attom_id, sale_amount=300000, avm_value=350000):
+    """An events snapshot payload of one property."""
+    return {
+        "property": [
+            {
+                "identifier": {"attomId": int(attom_id)},
+                "vintage": {"pubDate": "2026-10-19"},
+                "sale": {"saleTransDate": "2024-05-01", "amount": {"saleamt": sale_amount}},
+                "avm": {"eventDate": "2026-10-01", "amount": {"value": avm_value}},
+            }
+        ]
+    }
+
+
+class FakeAttom:
+    """Serves snapshots and details, counting the calls per endpoint."""
+
+    def __init__(self, ids):
+        self.payloads = {attom_id: snapshot(attom_id) for attom_id in ids}
+        self.calls = {"all_events_snapshot": 0, "all_events_detail": 0}
+
+    async def fetch(self, name, params):
+        self.calls[name] += 1
+        payload = copy.deepcopy(self.payloads[params["AttomID"]])
+        if name == "all_events_detail":
+            payload["property"][0]["avm"]["amount"]["high"] = 400000
+        return payload
+
+
+@pytest.mark.asyncio
+async def test_polls_fetch_details_only_for_changed_properties(tmp_path):
+    """Unchanged properties cost one snapshot each; changes are fetched in detail and fed."""
+    now = [1_000_000.0]
+    attom = FakeAttom([str(i) for i in range(1, 6)])
+    watchlist = Watchlist(str(tmp_path), interval=3600, clock=lambda: now[0])
+    assert watchlist.update(add=["1", "2", "3", "4", "5", "5"], label="portfolio") == {
+        "added": 5, "removed": 0, "watched": 5
+    }
+
+    first = await watchlist.poll(attom.fetch)
+    assert (first["baselined"], first["changed"], first["changes"]) == (5, 0, [])
+    assert await watchlist.poll(attom.fetch) == {
+        "checked": 0, "unchanged": 0, "baselined": 0, "changed": 0, "failed": 0, "remaining": 0, "changes": []
+    }
+
+    attom.payloads["2"] = snapshot("2", avm_value=420000)
+    attom.payloads["4"]["property"][0]["vintage"]["pubDate"] = "2026-10-20"
+    now[0] += 3600
+    second = await watchlist.poll(attom.fetch, max_properties=3)
+    assert (second["checked"], second["changed"], second["remaining"]) == (3, 1, 2)
+    third = await watchlist.poll(attom.fetch)
+    assert (third["unchanged"], third["changed"]) == (2, 0)
+    assert attom.calls == {"all_events_snapshot": 10, "all_events_detail": 1}
+
+    feed = watchlist.changes()
+    (change,) = feed["changes"]
+    assert change["seq"] == 1 and feed["next_since"] == 1
+    assert change["attom_id"] == "2" and change["label"] == "portfolio"
+    assert change["sections"] == ["avm"]
+    assert change["values"] == {"avm_value": {"before": 350000.0, "after": 420000.0}}
+    assert change["detail"]["avm"]["amount"] == {"value": 420000, "high": 400000}
+    assert watchlist.changes(since=1)["changes"] == []
+
+
+@pytest.mark.asyncio
+async def test_state_and_feed_persist_and_failed_checks_retry(tmp_path):
+    """A new process sees the watchlist and feed; a failed detail fetch is retried next poll."""
+    now = [1_000_000.0]
+    attom = FakeAttom(["7"])
+    watchlist = Watchlist(str(tmp_path), interval=60, clock=lambda: now[0])
+    watchlist.update(add=["7"])
+    await watchlist.poll(attom.fetch)
+
+    attom.payloads["7"] = snapshot("7", sale_amount=500000)
+    fetch = attom.fetch
+
+    async def failing_detail(name, params):
+        if name == "all_events_detail":
+            raise RuntimeError("upstream down")
+        return await fetch(name, params)
+
+    now[0] += 60
+    assert (await watchlist.poll(failing_detail))["failed"] == 1
+    assert watchlist.changes()["changes"] == []
+    assert (await watchlist.poll(attom.fetch, force=True))["changed"] == 1
+
+    other = Watchlist(str(tmp_path), interval=60, clock=lambda: now[0])
+    assert len(other) == 1
+    feed = other.changes(attom_id="7")
+    assert [change["sections"] for change in feed["changes"]] == [["sale"]]
+    assert feed["changes"][0]["values"]["sale_amount"] == {"before": 300000.0, "after": 500000.0}
+    assert other.update(remove=["7"]) == {"added": 0, "removed": 1, "watched": 0}
+    assert len(watchlist) == 0
+
+
+@pytest.mark.asyncio
+async def test_updates_from_another_process_during_a_poll_are_kept(tmp_path):
+    """A poll stores only its check results; properties added or removed meanwhile elsewhere stay so."""
+    now = [1_000_000.0]
+    attom = FakeAttom(["1", "2", "3"])
+    watchlist = Watchlist(str(tmp_path), interval=60, clock=lambda: now[0])
+    other = Watchlist(str(tmp_path), interval=60, clock=lambda: now[0])
+    watchlist.update(add=["1", "2"])
+
+    async def fetch_while_updating(name, params):
+        if params["AttomID"] == "1":
+            other.update(add=["3"], remove=["2"], label="added meanwhile")
+        return await attom.fetch(name, params)
+
+    assert (await watchlist.poll(fetch_while_updating))["baselined"] == 2
+    reloaded = Watchlist(str(tmp_path), interval=60, clock=lambda: now[0])
+    assert reloaded.due() == ["3"]
+    assert len(reloaded) == 2
+    assert reloaded._properties["1"]["fingerprints"] and "2" not in reloaded._properties
+    assert reloaded._properties["3"]["label"] == "added meanwhile"
+
+
+@pytest.mark.asyncio
+async def test_poll_tool_bypasses_the_response_cache(tmp_path, monkeypatch):
+    """A poll right after a cached lookup still sees the property as ATTOM has it now."""
+    attom = FakeAttom(["1"])
+    monkeypatch.setattr(client, "_send", lambda method, url, **kwargs: (attom.payloads["1"], 100, 0, 0))
+    monkeypatch.setattr(watchlist_tools, "watchlist", Watchlist(str(tmp_path)))
+    response_cache.clear()
+
+    watchlist_tools.watchlist.update(add=["1"])
+    # An agent's own lookup leaves the snapshot in the response cache
+    await fetch_endpoint("all_events_snapshot", {"AttomID": "1"})
+    attom.payloads["1"] = snapshot("1", avm_value=360000)
+    first = await watchlist_tools.watchlist_poll(watchlist_tools.WatchlistPollParams())
+    assert first.data["baselined"] == 1
+
+    attom.payloads["1"] = snapshot("1", avm_value=370000)
+    second = await watchlist_tools.watchlist_poll(watchlist_tools.WatchlistPollParams(force=True))
+    assert second.data["changed"] == 1
+    change = watchlist_tools.watchlist.changes()["changes"][0]
+    # Compared with the fresh baseline, not the cached 350000
+    assert {"before": 360000, "after": 370000} in change["values"].values()
+    response_cache.clear()